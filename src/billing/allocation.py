@@ -0,0 +1,413 @@
+"""
+Stromkosten-Verteilung für den ZEV
+Berechnet aus dem Verbrauch einer Periode pro Messpunkt und den Tarifen die
+kWh, Promille-Anteile und Beträge aller Eigentümer für alle Tarif-Kategorien
+(Netz/PV × Hochtarif/Niedertarif × Wohnung/Ladestation, Wärme) in einem
+Durchgang mit NumPy-Arrays. Gerundet wird erst am Schluss exakt mit Decimal.
+Intervall-Messpunkte ohne HT/NT im Namen teilt der Tarif-Kalender auf.
+"""
+
+import re
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .tarif_kalender import DEFAULT_KALENDER, TarifKalender, load_tarif_verbrauch
+
+# Achsen der Verbrauchsmatrix pro Eigentümer: [Quelle, Tarif, Nutzung]
+QUELLEN = ('netz', 'pv')
+TARIFE = ('hochtarif', 'niedertarif')
+NUTZUNGEN = ('wohnung', 'ladestation')
+
+# Messpunkt-Namen des ZEV-Servers, z.B. "W0103 Wohnung 1.3 - Bezug Netz HT [kWh]"
+# (ohne HT/NT: Intervalldaten, Tarif aus dem Zeitstempel)
+BEZUG_PATTERN = re.compile(r'Bezug\s+(Netz|lokal)(?:\s+(HT|NT))?\b', re.IGNORECASE)
+LADESTATION_PATTERN = re.compile(r'Ladestation', re.IGNORECASE)
+WAERME_PATTERN = re.compile(r'Wärmepumpe|Waermepumpe|Heizung', re.IGNORECASE)
+
+CHF = Decimal('0.01')
+PROMILLE = Decimal('0.01')
+
+
+class TarifTabelle(NamedTuple):
+    """Tarife einer Abrechnungsperiode in Rp./kWh (inkl. MwSt)"""
+    netz_hochtarif: Decimal
+    netz_niedertarif: Decimal
+    pv_hochtarif: Decimal
+    pv_niedertarif: Decimal
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TarifTabelle':
+        """
+        Erstellt eine Tariftabelle aus einem Dictionary (z.B. JSON der API)
+
+        Die Netz-Tarife (NETZ_TARIFE) sind Pflicht, sie stehen auf der
+        ewz-Rechnung der Periode; fehlende PV-Tarife kommen aus DEFAULT_PV_TARIFE.
+
+        Raises:
+            ValueError: Bei fehlenden Netz-Tarifen, unbekannten Schlüsseln, Text
+                oder negativen Tarifen
+        """
+        unknown = set(data) - set(cls._fields)
+        if unknown:
+            raise ValueError(f"Unbekannte Tarife: {', '.join(sorted(unknown))}")
+        missing = [key for key in NETZ_TARIFE if data.get(key) in (None, '')]
+        if missing:
+            raise ValueError(f"Netz-Tarife fehlen (Rp./kWh laut ewz-Rechnung): {', '.join(missing)}")
+
+        values = dict(DEFAULT_PV_TARIFE)
+        try:
+            values.update({key: Decimal(str(value)) for key, value in data.items()})
+        except InvalidOperation:
+            raise ValueError(f"Tarife müssen Zahlen sein, erhalten: {data}")
+        if any(not value.is_finite() or value < 0 for value in values.values()):
+            raise ValueError("Tarife müssen endlich und nicht negativ sein")
+        return cls(**values)
+
+    def as_array(self) -> np.ndarray:
+        """Tarife als Array [Quelle, Tarif] in Rp./kWh"""
+        return np.array([
+            [float(self.netz_hochtarif), float(self.netz_niedertarif)],
+            [float(self.pv_hochtarif), float(self.pv_niedertarif)]
+        ])
+
+
+# Pflicht-Tarife: Netzbezug ändert sich mit jeder ewz-Rechnung, keine Vorgabe
+NETZ_TARIFE = ('netz_hochtarif', 'netz_niedertarif')
+
+# PV-Tarif der STWEG (wie in der Rechnungsvorlage); pro Periode überschreibbar
+DEFAULT_PV_TARIFE = {
+    'pv_hochtarif': Decimal('16.40'),
+    'pv_niedertarif': Decimal('16.40')
+}
+
+
+class Verbrauchstabelle(NamedTuple):
+    """
+    Verbrauch einer Periode, eine Zeile pro klassifiziertem Messpunkt
+
+    Die Kategorien sind Indizes in QUELLEN, TARIFE und NUTZUNGEN; nutzung -1
+    steht für Wärme (Gebäudeverbrauch ohne Eigentümer).
+    """
+    eigentuemer_id: np.ndarray  # int, 0 = ohne Eigentümer
+    quelle: np.ndarray
+    tarif: np.ndarray
+    nutzung: np.ndarray
+    kwh: np.ndarray  # float
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple]) -> 'Verbrauchstabelle':
+        """
+        Klassifiziert Messpunkte anhand ihres Namens
+
+        Messpunkte ohne Strombezug (z.B. Einspeisung) werden ignoriert, ebenso
+        solche ohne HT/NT im Namen, wenn kein Tarif mitgegeben wird.
+
+        Args:
+            rows: (Messpunkt-Name, Eigentümer-ID oder None, kWh der Periode) oder
+                mit viertem Element Tarif (HOCHTARIF/NIEDERTARIF) für Intervalldaten
+        """
+        columns = []
+        for name, eigentuemer_id, kwh, *tarif in rows:
+            kategorie = classify_messpunkt(name)
+            if kategorie is None or not kwh:
+                continue
+            quelle, name_tarif, nutzung = kategorie
+            tarif = tarif[0] if tarif else name_tarif
+            if tarif is not None:
+                columns.append((eigentuemer_id or 0, quelle, tarif, nutzung, kwh))
+
+        if not columns:
+            empty = np.empty(0, dtype=np.int64)
+            return cls(empty, empty, empty, empty, np.empty(0))
+
+        eigentuemer_id, quelle, tarif, nutzung, kwh = zip(*columns)
+        return cls(
+            np.asarray(eigentuemer_id, dtype=np.int64),
+            np.asarray(quelle, dtype=np.int64),
+            np.asarray(tarif, dtype=np.int64),
+            np.asarray(nutzung, dtype=np.int64),
+            np.asarray(kwh, dtype=float)
+        )
+
+
+def classify_messpunkt(name: str) -> Optional[Tuple[int, Optional[int], int]]:
+    """
+    Tarif-Kategorie eines Messpunkts aus seinem Namen
+
+    Args:
+        name (str): Messpunkt-Name wie beim ZEV-Import ("<Zähler> - <Messpunkt>")
+
+    Returns:
+        Optional[Tuple[int, Optional[int], int]]: (Quelle, Tarif, Nutzung) als
+            Indizes, Tarif None ohne HT/NT, Nutzung -1 für Wärme; None wenn kein
+            Strombezug
+    """
+    match = BEZUG_PATTERN.search(name or '')
+    if not match:
+        return None
+
+    quelle = 0 if match.group(1).lower() == 'netz' else 1
+    tarif = None if match.group(2) is None else (0 if match.group(2).upper() == 'HT' else 1)
+    if WAERME_PATTERN.search(name):
+        nutzung = -1
+    elif LADESTATION_PATTERN.search(name):
+        nutzung = 1
+    else:
+        nutzung = 0
+    return quelle, tarif, nutzung
+
+
+def load_verbrauchstabelle(session, periode: str, kalender: Optional[TarifKalender] = None) -> Verbrauchstabelle:
+    """
+    Verbrauch aller Messpunkte einer Periode
+
+    Messpunkte mit HT/NT im Namen kommen aus dem Monats-Rollup. Messpunkte
+    ohne HT/NT mit Intervalldaten (mehr als ein Wert pro Monat) werden in der
+    Datenbank nach dem Tarif-Kalender aufgeteilt; Monatswerte ohne HT/NT
+    lassen sich nicht aufteilen und werden ignoriert.
+
+    Args:
+        session: SQLAlchemy-Session
+        periode (str): 'YYYY' (alle Monate des Jahres) oder 'YYYY-MM'
+        kalender (Optional[TarifKalender]): Standard: DEFAULT_KALENDER
+
+    Returns:
+        Verbrauchstabelle: Ein Eintrag pro Strom-Messpunkt und Tarif
+    """
+    from sqlalchemy import func
+    from src.models.models import Messpunkt, VerbrauchMonat
+
+    query = session.query(
+        Messpunkt.id, Messpunkt.name, Messpunkt.eigentuemer_id,
+        func.sum(VerbrauchMonat.total_verbrauch), func.sum(VerbrauchMonat.anzahl), func.count()
+    ).join(VerbrauchMonat, VerbrauchMonat.messpunkt_id == Messpunkt.id)
+
+    if len(periode) == 4:
+        query = query.filter(VerbrauchMonat.periode.like(f"{periode}-%"))
+    else:
+        query = query.filter(VerbrauchMonat.periode == periode)
+
+    rows = []
+    intervall = {}
+    for messpunkt_id, name, eigentuemer_id, kwh, anzahl, monate in query.group_by(Messpunkt.id):
+        kategorie = classify_messpunkt(name)
+        if kategorie is not None and kategorie[1] is None and anzahl > monate:
+            intervall[messpunkt_id] = (name, eigentuemer_id)
+        else:
+            rows.append((name, eigentuemer_id, kwh))
+
+    for messpunkt_id, tarif, kwh in load_tarif_verbrauch(session, list(intervall), periode,
+                                                         kalender or DEFAULT_KALENDER):
+        rows.append((*intervall[messpunkt_id], kwh, tarif))
+
+    return Verbrauchstabelle.from_rows(rows)
+
+
+class StromkostenVerteilung(NamedTuple):
+    """
+    Ergebnis von allocate_strom_costs (Arrays, noch ungerundet)
+
+    Achsen pro Eigentümer [Eigentümer, Quelle, Tarif, Nutzung]; Wärme pro
+    Eigentümer [Eigentümer, Quelle].
+    """
+    eigentuemer_ids: np.ndarray
+    kwh: np.ndarray
+    promille: np.ndarray
+    chf: np.ndarray
+    tarife_rp: np.ndarray  # [Quelle, Tarif]
+    waerme_total_chf: np.ndarray  # [Quelle]
+    waerme_promille: np.ndarray  # [Eigentümer]
+    waerme_chf: np.ndarray
+
+    def strom_details(self, eigentuemer_id: int) -> Dict[str, Any]:
+        """Gerundete 'strom_details' eines Eigentümers für STWEGPDFGenerator"""
+        index = int(np.flatnonzero(self.eigentuemer_ids == eigentuemer_id)[0])
+        return _strom_details(self, index)
+
+    def all_strom_details(self) -> Dict[int, Dict[str, Any]]:
+        """Gerundete 'strom_details' aller Eigentümer, nach ID"""
+        return {int(eigentuemer_id): _strom_details(self, index)
+                for index, eigentuemer_id in enumerate(self.eigentuemer_ids)}
+
+
+def allocate_strom_costs(eigentuemer_ids: Sequence[int], verbrauch: Verbrauchstabelle,
+                         tarife: TarifTabelle,
+                         waerme_promille: Optional[Sequence[float]] = None) -> StromkostenVerteilung:
+    """
+    Verteilt die Stromkosten einer Periode auf die Eigentümer
+
+    - Netz/PV: kWh pro Eigentümer und Kategorie × Tarif; Promille = Anteil am
+      Gebäudeverbrauch derselben Quelle und desselben Tarifs (Wohnung und
+      Ladestation zusammen, inkl. Messpunkte ohne abgerechneten Eigentümer)
+    - Wärme: Kosten der Wärmepumpen-Messpunkte, verteilt nach waerme_promille
+
+    Alles läuft als Array-Operationen über alle Eigentümer gleichzeitig.
+
+    Args:
+        eigentuemer_ids (Sequence[int]): Abzurechnende Eigentümer
+        verbrauch (Verbrauchstabelle): Verbrauch der Periode pro Messpunkt
+        tarife (TarifTabelle): Tarife in Rp./kWh
+        waerme_promille (Optional[Sequence[float]]): Wärme-Schlüssel pro
+            Eigentümer in ‰ (gleiche Reihenfolge wie eigentuemer_ids)
+
+    Returns:
+        StromkostenVerteilung: Ungerundete Arrays, siehe strom_details()
+    """
+    ids = np.asarray(eigentuemer_ids, dtype=np.int64)
+    n = len(ids)
+    shape = (len(QUELLEN), len(TARIFE), len(NUTZUNGEN))
+    buckets = int(np.prod(shape))
+
+    waerme = verbrauch.nutzung < 0
+    private = ~waerme
+    bucket = (verbrauch.quelle * len(TARIFE) + verbrauch.tarif) * len(NUTZUNGEN) + verbrauch.nutzung
+
+    # Messpunkt -> Position des Eigentümers (-1 = nicht abgerechnet)
+    owner = np.full(len(verbrauch.kwh), -1, dtype=np.int64)
+    if n:
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+        pos = np.minimum(np.searchsorted(sorted_ids, verbrauch.eigentuemer_id), n - 1)
+        owner = np.where(sorted_ids[pos] == verbrauch.eigentuemer_id, order[pos], -1)
+
+    billed = private & (owner >= 0)
+    kwh = np.bincount(owner[billed] * buckets + bucket[billed], weights=verbrauch.kwh[billed],
+                      minlength=n * buckets).reshape((n,) + shape)
+
+    # Gebäudeverbrauch pro [Quelle, Tarif] (Nenner der Promille)
+    gebaeude = np.bincount(verbrauch.quelle[private] * len(TARIFE) + verbrauch.tarif[private],
+                           weights=verbrauch.kwh[private], minlength=len(QUELLEN) * len(TARIFE))
+    gebaeude = gebaeude.reshape(len(QUELLEN), len(TARIFE))
+
+    rates = tarife.as_array()
+    chf = kwh * rates[None, :, :, None] / 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        promille = np.where(gebaeude[None, :, :, None] > 0, kwh * 1000 / gebaeude[None, :, :, None], 0.0)
+
+    # Wärme: Gebäudekosten pro Quelle, verteilt nach Schlüssel
+    waerme_kwh = np.bincount(verbrauch.quelle[waerme] * len(TARIFE) + verbrauch.tarif[waerme],
+                             weights=verbrauch.kwh[waerme], minlength=len(QUELLEN) * len(TARIFE))
+    waerme_total = (waerme_kwh.reshape(len(QUELLEN), len(TARIFE)) * rates / 100).sum(axis=1)
+    schluessel = np.zeros(n) if waerme_promille is None else np.asarray(waerme_promille, dtype=float)
+    waerme_chf = schluessel[:, None] * waerme_total[None, :] / 1000
+
+    return StromkostenVerteilung(ids, kwh, promille, chf, rates, waerme_total, schluessel, waerme_chf)
+
+
+def _decimal(value: float, quantum: Decimal = CHF) -> Decimal:
+    """
+    Rundet einen Array-Wert kaufmännisch
+
+    Auf 6 Stellen vorgerundet, damit Binär-Rundungsfehler (z.B. 0.145 als
+    0.14499999…) nicht die letzte Stelle kippen.
+    """
+    return Decimal(f"{value:.6f}").quantize(quantum, rounding=ROUND_HALF_UP)
+
+
+def _strom_details(verteilung: StromkostenVerteilung, index: int) -> Dict[str, Any]:
+    """'strom_details' eines Eigentümers; Totale als Summe der gerundeten Zeilen"""
+    def lines(quelle, with_tarif):
+        result = {}
+        for t, tarif in enumerate(TARIFE):
+            for u, nutzung in enumerate(NUTZUNGEN):
+                line = {
+                    'kwh': int(_decimal(verteilung.kwh[index, quelle, t, u], Decimal('1'))),
+                    'betrag': _decimal(verteilung.chf[index, quelle, t, u])
+                }
+                if with_tarif:
+                    line['tarif'] = float(_decimal(verteilung.tarife_rp[quelle, t]))
+                else:
+                    line['promille'] = float(_decimal(verteilung.promille[index, quelle, t, u], PROMILLE))
+                result[f"{nutzung}_{tarif}"] = line
+        result['total'] = sum((line['betrag'] for line in result.values()), Decimal('0.00'))
+        return result
+
+    netz_ewz = lines(0, with_tarif=False)
+    pv = lines(1, with_tarif=True)
+
+    waerme_promille = float(_decimal(verteilung.waerme_promille[index], PROMILLE))
+    waerme = {
+        'netz_ewz': {'total': _decimal(verteilung.waerme_total_chf[0]), 'promille': waerme_promille,
+                     'betrag': _decimal(verteilung.waerme_chf[index, 0])},
+        'pv': {'total': _decimal(verteilung.waerme_total_chf[1]), 'promille': waerme_promille,
+               'betrag': _decimal(verteilung.waerme_chf[index, 1])}
+    }
+    waerme['total'] = waerme['netz_ewz']['betrag'] + waerme['pv']['betrag']
+
+    return {
+        'netz_ewz': netz_ewz,
+        'waerme': waerme,
+        'pv': pv,
+        'total_strom': netz_ewz['total'] + waerme['total'] + pv['total'],
+        # Strom aus PV (direkt und für Wärme) fliesst in den Erneuerungsfond
+        'erneuerungsfond': pv['total'] + waerme['pv']['betrag']
+    }
+
+
+def apply_strom_details(data: Dict[str, Any], strom_details: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Setzt berechnete Stromkosten in Rechnungsdaten ein und führt die Totale nach
+
+    Wasser- und Betriebskosten bleiben unverändert.
+
+    Args:
+        data (Dict[str, Any]): Rechnungsdaten (Struktur wie _generate_sample_data)
+        strom_details (Dict[str, Any]): Ergebnis von StromkostenVerteilung.strom_details
+
+    Returns:
+        Dict[str, Any]: Neue Rechnungsdaten (data wird nicht verändert)
+    """
+    data = dict(data)
+    costs = dict(data['costs'])
+
+    strom_wasser = strom_details['total_strom'] + data['wasser_details']['total']
+    total_nebenkosten = strom_wasser + costs['betriebskosten']['owner_share']
+    difference = total_nebenkosten - costs['akonto_paid']
+
+    costs['strom_wasser'] = dict(costs['strom_wasser'], amount=strom_wasser)
+    costs['total_nebenkosten'] = total_nebenkosten
+    costs['difference'] = abs(difference)
+    costs['difference_favor'] = 'STWEG' if difference >= 0 else 'Eigentümer'
+
+    data['costs'] = costs
+    data['strom_details'] = strom_details
+    data['totals'] = {
+        'strom_wasser_total': strom_wasser,
+        'erneuerungsfond_total': strom_details['erneuerungsfond']
+    }
+    return data
+
+
+def allocate_period(session, eigentuemer: List[Dict[str, Any]], periode: str,
+                    tarife: TarifTabelle,
+                    kalender: Optional[TarifKalender] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    Stromkosten einer Periode für mehrere Eigentümer aus der Datenbank
+
+    Der Wärme-Schlüssel ist die Wertquote (anteil × 1000 ‰), solange keine
+    Neovac-Schlüssel erfasst sind.
+
+    Args:
+        session: SQLAlchemy-Session
+        eigentuemer (List[Dict[str, Any]]): Eigentümer wie Eigentuemer.to_dict()
+        periode (str): 'YYYY' oder 'YYYY-MM'
+        tarife (TarifTabelle): Tarife in Rp./kWh
+        kalender (Optional[TarifKalender]): Für Intervall-Messpunkte ohne HT/NT
+
+    Returns:
+        Dict[int, Dict[str, Any]]: 'strom_details' pro Eigentümer-ID
+
+    Raises:
+        ValueError: Wenn die Periode keinen Stromverbrauch enthält
+    """
+    verbrauch = load_verbrauchstabelle(session, periode, kalender)
+    if not len(verbrauch.kwh):
+        # Sonst würden Rechnungen mit 0 CHF Strom erstellt
+        raise ValueError(f"Keine Stromverbrauchsdaten für die Periode {periode}")
+    verteilung = allocate_strom_costs(
+        [owner['id'] for owner in eigentuemer], verbrauch, tarife,
+        waerme_promille=[(owner.get('anteil') or 0.0) * 1000 for owner in eigentuemer]
+    )
+    return verteilung.all_strom_details()
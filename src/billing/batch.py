@@ -0,0 +1,458 @@
+"""
+Batch-Erstellung von Rechnungen
+Rendert die Rechnungen aller Eigentümer einer Abrechnungsperiode parallel in
+einem Prozess-Pool und schreibt ein Manifest mit Laufzeit und SHA-256 pro PDF.
+Rechnungen, deren Eingabedaten sich seit dem letzten Lauf nicht geändert
+haben, werden übersprungen (Hash der Eingabedaten in einer Begleitdatei).
+"""
+
+import calendar
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime
+from decimal import Decimal
+from multiprocessing.context import BaseContext
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .allocation import apply_strom_details
+from .pdf_generator import STWEGPDFGenerator, project_root, write_invoice_file
+from src.models.models import Eigentuemer
+
+logger = logging.getLogger(__name__)
+
+# Standard-Ablage der Rechnungen (wie generate_sample_invoice)
+INVOICE_FOLDER = project_root / 'data' / 'exports' / 'invoices'
+
+# Abrechnungsperiode: Jahr (YYYY) oder Monat (YYYY-MM)
+PERIODE_PATTERN = re.compile(r'(\d{4})(?:-(\d{2}))?')
+
+# Bei Layout-Änderungen am Generator erhöhen: alle Rechnungen werden neu erstellt
+INVOICE_LAYOUT_VERSION = 1
+
+# Nicht Teil des Eingabe-Hashes: das Rechnungsdatum ist das Ausstellungsdatum,
+# eine unveränderte Rechnung behält das Datum ihrer ersten Erstellung
+HASH_EXCLUDED_KEYS = ('invoice_date',)
+
+# Begleitdatei mit Eingabe-Hash neben jeder PDF (rechnung_2024_0001.pdf.input.json)
+INPUT_HASH_SUFFIX = '.input.json'
+
+# Generator des Worker-Prozesses (einmal pro Prozess initialisiert)
+_generator = None
+
+
+def billing_period_label(periode: str) -> str:
+    """
+    Formatiert eine Abrechnungsperiode wie auf der Rechnung
+
+    Args:
+        periode (str): 'YYYY' oder 'YYYY-MM'
+
+    Returns:
+        str: z.B. '01.01.2024 - 31.12.2024'
+    """
+    match = PERIODE_PATTERN.fullmatch(periode or '')
+    if not match:
+        raise ValueError(f"Periode muss im Format YYYY oder YYYY-MM sein, erhalten: {periode}")
+
+    jahr = int(match.group(1))
+    if match.group(2) is None:
+        start, ende = date(jahr, 1, 1), date(jahr, 12, 31)
+    else:
+        monat = int(match.group(2))
+        if not 1 <= monat <= 12:
+            raise ValueError(f"Ungültiger Monat in Periode: {periode}")
+        start = date(jahr, monat, 1)
+        ende = date(jahr, monat, calendar.monthrange(jahr, monat)[1])
+    return f"{start.strftime('%d.%m.%Y')} - {ende.strftime('%d.%m.%Y')}"
+
+
+def invoice_file_name(periode: str, eigentuemer_id: int) -> str:
+    """Dateiname der Rechnung eines Eigentümers"""
+    return f"rechnung_{periode}_{eigentuemer_id:04d}.pdf"
+
+
+def load_eigentuemer(session, eigentuemer_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Eigentümer für einen Rechnungs-Batch
+
+    Args:
+        session: SQLAlchemy-Session
+        eigentuemer_ids (Optional[Iterable[int]]): Nur diese Eigentümer (auch
+            inaktive); ohne Angabe alle aktiven
+
+    Returns:
+        List[Dict[str, Any]]: Eigentümer wie Eigentuemer.to_dict()
+
+    Raises:
+        ValueError: Wenn eine angegebene ID nicht existiert
+    """
+    if eigentuemer_ids is None:
+        return Eigentuemer.get_all_dicts(session, nur_aktive=True)
+
+    wanted = {int(eigentuemer_id) for eigentuemer_id in eigentuemer_ids}
+    owners = [owner for owner in Eigentuemer.get_all_dicts(session) if owner['id'] in wanted]
+    missing = wanted - {owner['id'] for owner in owners}
+    if missing:
+        raise ValueError(f"Eigentümer nicht gefunden: {', '.join(str(i) for i in sorted(missing))}")
+    return owners
+
+
+def invoice_data_for_owner(eigentuemer: Dict[str, Any], periode: str,
+                           template: Optional[Dict[str, Any]] = None,
+                           strom_details: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Rechnungsdaten eines Eigentümers
+
+    Eigentümer, Periode und Rechnungsnummer kommen aus den Stammdaten, die
+    Stromkosten aus strom_details (siehe allocation.allocate_period); alle
+    übrigen Beträge aus template (Standard: Beispieldaten des Generators).
+
+    Args:
+        eigentuemer (Dict[str, Any]): Eigentümer wie Eigentuemer.to_dict()
+        periode (str): 'YYYY' oder 'YYYY-MM'
+        template (Optional[Dict[str, Any]]): Rechnungsdaten als Vorlage
+        strom_details (Optional[Dict[str, Any]]): Berechnete Stromkosten des Eigentümers
+
+    Returns:
+        Dict[str, Any]: Rechnungsdaten für STWEGPDFGenerator.generate_invoice
+    """
+    data = dict(template if template is not None else STWEGPDFGenerator._generate_sample_data())
+    stweg = data['stweg_info']
+
+    data['invoice_number'] = f"R-{periode.replace('-', '')}-{eigentuemer['id']:03d}"
+    data['billing_period'] = billing_period_label(periode)
+    data['owner'] = {
+        'name': eigentuemer['name'],
+        'address': stweg['address'],
+        'apartment': eigentuemer['wohnung'],
+        'city': stweg['city'],
+        'parcel': eigentuemer.get('parcel', '')
+    }
+    data['property_info'] = {'property': stweg['address'], 'apartment': eigentuemer['wohnung']}
+    if strom_details is not None:
+        data = apply_strom_details(data, strom_details)
+    return data
+
+
+def _json_default(value):
+    """Normalisiert Decimal und Datumswerte für den Eingabe-Hash"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Nicht serialisierbarer Wert in Rechnungsdaten: {type(value).__name__}")
+
+
+def invoice_input_hash(data: Dict[str, Any]) -> str:
+    """
+    SHA-256 der normalisierten Rechnungsdaten
+
+    Schlüssel werden sortiert, Decimal-Beträge als Text (Stellen bleiben
+    erhalten, da sie die PDF bestimmen) und die Layout-Version eingerechnet;
+    HASH_EXCLUDED_KEYS zählen nicht.
+
+    Args:
+        data (Dict[str, Any]): Rechnungsdaten wie invoice_data_for_owner
+
+    Returns:
+        str: Hex-Digest
+    """
+    inputs = {key: value for key, value in data.items() if key not in HASH_EXCLUDED_KEYS}
+    payload = json.dumps({'layout_version': INVOICE_LAYOUT_VERSION, 'data': inputs}, sort_keys=True,
+                         separators=(',', ':'), ensure_ascii=False, default=_json_default)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def input_hash_path(output_path) -> Path:
+    """Pfad der Begleitdatei mit dem Eingabe-Hash einer Rechnung"""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + INPUT_HASH_SUFFIX)
+
+
+def current_invoice(output_path, input_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Prüft, ob die Rechnung auf der Platte zu den Eingabedaten passt
+
+    Die Begleitdatei muss denselben Eingabe-Hash enthalten und die PDF den
+    dort vermerkten SHA-256 haben (fehlende oder veränderte PDF → neu erstellen).
+
+    Args:
+        output_path: Pfad der PDF
+        input_hash (str): Eingabe-Hash wie invoice_input_hash
+
+    Returns:
+        Optional[Dict[str, Any]]: Inhalt der Begleitdatei, None wenn neu zu erstellen
+    """
+    try:
+        sidecar = json.loads(input_hash_path(output_path).read_text(encoding='utf-8'))
+        if sidecar.get('input_hash') != input_hash:
+            return None
+        content = Path(output_path).read_bytes()
+    except (OSError, ValueError):
+        return None
+
+    if hashlib.sha256(content).hexdigest() != sidecar.get('sha256'):
+        return None
+    return sidecar
+
+
+def _init_worker():
+    """Initializer der Worker-Prozesse: ein Generator (mit Styles) pro Prozess"""
+    global _generator
+    _generator = STWEGPDFGenerator()
+
+
+def render_invoice(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Rendert eine Rechnung und misst die Laufzeit (läuft im Worker-Prozess)
+
+    Args:
+        job (Dict[str, Any]): eigentuemer_id, name, data, input_hash und output_path
+
+    Returns:
+        Dict[str, Any]: Manifest-Eintrag mit Status, Laufzeit und SHA-256
+    """
+    if _generator is None:
+        _init_worker()
+
+    start = time.perf_counter()
+    entry = {
+        'eigentuemer_id': job['eigentuemer_id'],
+        'name': job['name'],
+        'file': str(job['output_path']),
+        'success': False,
+        'skipped': False,
+        'duration_s': None,
+        'sha256': None,
+        'size_bytes': None,
+        'input_hash': job['input_hash'],
+        'errors': [],
+        'worker_pid': os.getpid()
+    }
+    try:
+        content = _generator.render_invoice(job['data'])
+        sha256 = hashlib.sha256(content).hexdigest()
+        write_invoice_file(content, job['output_path'])
+        # Begleitdatei erst nach der PDF: bricht der Lauf dazwischen ab, passt der Hash nicht
+        sidecar = {'input_hash': job['input_hash'], 'sha256': sha256, 'size_bytes': len(content)}
+        write_invoice_file(json.dumps(sidecar, indent=2).encode('utf-8'), input_hash_path(job['output_path']))
+        entry.update({
+            'success': True,
+            'sha256': sha256,
+            'size_bytes': len(content)
+        })
+    except Exception as e:
+        entry['errors'] = [str(e)]
+
+    entry['duration_s'] = round(time.perf_counter() - start, 4)
+    return entry
+
+
+def check_workers(workers: Any) -> Optional[int]:
+    """
+    Prüft die Anzahl Worker-Prozesse
+
+    Args:
+        workers: None (Anzahl CPUs) oder positive Ganzzahl
+
+    Returns:
+        Optional[int]: workers unverändert
+
+    Raises:
+        ValueError: Bei anderen Werten (z.B. '4', 0 oder True)
+    """
+    if workers is None or (isinstance(workers, int) and not isinstance(workers, bool) and workers > 0):
+        return workers
+    raise ValueError(f"Ungültige Anzahl Worker: {workers!r} (positive Ganzzahl erwartet)")
+
+
+def _failed_entry(job: Dict[str, Any], error: str) -> Dict[str, Any]:
+    """Manifest-Eintrag für eine Rechnung, deren Worker keinen Eintrag geliefert hat"""
+    return {
+        'eigentuemer_id': job['eigentuemer_id'],
+        'name': job['name'],
+        'file': str(job['output_path']),
+        'success': False,
+        'skipped': False,
+        'duration_s': None,
+        'sha256': None,
+        'size_bytes': None,
+        'input_hash': job['input_hash'],
+        'errors': [error],
+        'worker_pid': None
+    }
+
+
+def iter_invoice_batch(jobs: Iterable[Dict[str, Any]], workers: Optional[int] = None,
+                       mp_context: Optional[BaseContext] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Rendert Rechnungen parallel und liefert jeden Eintrag, sobald er fertig ist
+
+    Eine fehlerhafte Rechnung erzeugt nur einen Fehler-Eintrag. Stürzt ein
+    Worker ab (BrokenProcessPool), wird der Pool neu gestartet: die Rechnungen,
+    die gerade liefen, werden einzeln wiederholt, damit nur die Rechnung, die
+    den Absturz auslöst, als fehlgeschlagen gilt; noch nicht gestartete laufen normal.
+
+    Args:
+        jobs (Iterable[Dict[str, Any]]): Aufträge wie bei render_invoice
+        workers (Optional[int]): Anzahl Worker-Prozesse (None = Anzahl CPUs,
+            1 = ohne Pool im aktuellen Prozess)
+        mp_context (Optional[BaseContext]): Start-Methode des Pools; aus
+            Prozessen mit Threads (Web-Server) 'spawn' statt fork verwenden
+
+    Yields:
+        Dict[str, Any]: Manifest-Eintrag pro Rechnung in Fertigstellungs-Reihenfolge
+    """
+    jobs = list(jobs)
+
+    if workers == 1:
+        for job in jobs:
+            yield render_invoice(job)
+        return
+
+    max_workers = workers or os.cpu_count()
+    pending = deque(jobs)
+    # Liefen beim Absturz eines Workers: werden einzeln wiederholt
+    suspects = deque()
+
+    while pending or suspects:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context, initializer=_init_worker) as executor:
+            running = {}
+            try:
+                while pending or suspects or running:
+                    if suspects and not running:
+                        job = suspects.popleft()
+                        running[executor.submit(render_invoice, job)] = job
+                    while not suspects and pending and len(running) < max_workers:
+                        job = pending.popleft()
+                        running[executor.submit(render_invoice, job)] = job
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    broken = None
+                    for future in done:
+                        if isinstance(future.exception(), BrokenProcessPool):
+                            broken = future.exception()
+                            continue
+                        job = running.pop(future)
+                        try:
+                            yield future.result()
+                        except Exception as e:
+                            logger.error("Rechnungs-Batch: Worker für Eigentümer %s fehlgeschlagen: %s",
+                                         job['eigentuemer_id'], e)
+                            yield _failed_entry(job, f"Worker fehlgeschlagen: {e}")
+                    if broken is not None:
+                        raise broken
+            except BrokenProcessPool as e:
+                if len(running) == 1:
+                    job = running.popitem()[1]
+                    logger.error("Rechnungs-Batch: Worker für Eigentümer %s abgestürzt: %s", job['eigentuemer_id'], e)
+                    yield _failed_entry(job, f"Worker abgestürzt: {e}")
+                else:
+                    logger.warning("Rechnungs-Batch: Worker abgestürzt, wiederhole %d Rechnungen einzeln", len(running))
+                    suspects.extend(running.values())
+
+
+def generate_invoice_batch(eigentuemer: Iterable[Dict[str, Any]], periode: str,
+                           output_dir: Optional[Path] = None, workers: Optional[int] = None,
+                           on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                           force: bool = False,
+                           strom_details: Optional[Dict[int, Dict[str, Any]]] = None,
+                           mp_context: Optional[BaseContext] = None) -> Dict[str, Any]:
+    """
+    Erstellt die Rechnungen mehrerer Eigentümer und schreibt das Manifest
+
+    Rechnungen, deren Eingabe-Hash zur vorhandenen PDF passt, werden nicht neu
+    gerendert, sondern mit skipped=True ins Manifest übernommen.
+
+    Args:
+        eigentuemer (Iterable[Dict[str, Any]]): Eigentümer wie Eigentuemer.to_dict()
+        periode (str): Abrechnungsperiode 'YYYY' oder 'YYYY-MM'
+        output_dir (Optional[Path]): Zielverzeichnis (Standard: data/exports/invoices)
+        workers (Optional[int]): Anzahl Worker-Prozesse
+        on_result (Optional[Callable]): Wird für jeden fertigen Eintrag aufgerufen
+        force (bool): Alle Rechnungen neu erstellen, auch unveränderte
+        strom_details (Optional[Dict[int, Dict]]): Berechnete Stromkosten pro
+            Eigentümer-ID (ohne Angabe: Beträge der Vorlage)
+        mp_context (Optional[BaseContext]): Start-Methode des Prozess-Pools
+
+    Returns:
+        Dict[str, Any]: Manifest mit Zusammenfassung und Einträgen pro Rechnung
+    """
+    billing_period_label(periode)  # Periode und Worker vor dem Start prüfen
+    check_workers(workers)
+    output_dir = Path(output_dir) if output_dir is not None else INVOICE_FOLDER
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    template = STWEGPDFGenerator._generate_sample_data()
+    start = time.perf_counter()
+    jobs = []
+    invoices = []
+
+    def add_result(entry):
+        invoices.append(entry)
+        if on_result:
+            on_result(entry)
+
+    for owner in eigentuemer:
+        details = strom_details.get(owner['id']) if strom_details is not None else None
+        data = invoice_data_for_owner(owner, periode, template, details)
+        job = {
+            'eigentuemer_id': owner['id'],
+            'name': owner['name'],
+            'data': data,
+            'input_hash': invoice_input_hash(data),
+            'output_path': output_dir / invoice_file_name(periode, owner['id'])
+        }
+        sidecar = None if force else current_invoice(job['output_path'], job['input_hash'])
+        if sidecar is None:
+            jobs.append(job)
+            continue
+        add_result({
+            'eigentuemer_id': job['eigentuemer_id'],
+            'name': job['name'],
+            'file': str(job['output_path']),
+            'success': True,
+            'skipped': True,
+            'duration_s': 0.0,
+            'sha256': sidecar['sha256'],
+            'size_bytes': sidecar.get('size_bytes'),
+            'input_hash': job['input_hash'],
+            'errors': [],
+            'worker_pid': None
+        })
+
+    if jobs:
+        for entry in iter_invoice_batch(jobs, workers=workers, mp_context=mp_context):
+            add_result(entry)
+
+    invoices.sort(key=lambda entry: entry['eigentuemer_id'])
+    succeeded = sum(1 for entry in invoices if entry['success'])
+    skipped = sum(1 for entry in invoices if entry['skipped'])
+
+    manifest = {
+        'periode': periode,
+        'created_at': datetime.now().isoformat(),
+        'output_dir': str(output_dir),
+        'total': len(invoices),
+        'succeeded': succeeded,
+        'failed': len(invoices) - succeeded,
+        'skipped': skipped,
+        'wall_time_s': round(time.perf_counter() - start, 4),
+        'render_time_s': round(sum(entry['duration_s'] or 0 for entry in invoices), 4),
+        'workers': 1 if workers == 1 else (workers or os.cpu_count()),
+        'invoices': invoices
+    }
+
+    manifest_path = output_dir / f"manifest_{periode}.json"
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    manifest['manifest_file'] = str(manifest_path)
+    return manifest
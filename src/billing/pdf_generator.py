@@ -3,8 +3,12 @@ STWEG PDF-Rechnungsgenerator
 Generiert professionelle Rechnungen basierend auf der analysierten Vorlage
 """
 
+import io
+import logging
 import os
 import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, date
 from decimal import Decimal
@@ -27,6 +31,220 @@ from reportlab.lib import colors
 # Modelle importieren
 from src.models.models import Eigentuemer, Messpunkt, Verbrauchsdaten
 from src.models.database import get_db_session
+from .tarif_kalender import DEFAULT_KALENDER
+
+logger = logging.getLogger(__name__)
+
+# Farben der Vorlage
+PRIMARY_COLOR = Color(0.2, 0.4, 0.6)  # Dunkelblau
+SECONDARY_COLOR = Color(0.8, 0.8, 0.8)  # Hellgrau
+ACCENT_COLOR = Color(0.9, 0.3, 0.3)  # Rot für Beträge
+
+# Tabellen mit Kopfzeile und Total (Strom Netz/EWZ, Wärme, PV, Wasser)
+DETAIL_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), PRIMARY_COLOR),
+    ('TEXTCOLOR', (0, 0), (-1, 0), white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('GRID', (0, 0), (-1, -1), 1, black),
+    ('PADDING', (0, 0), (-1, -1), 4),
+])
+
+# Zusammenfassung auf Seite 1
+SUMMARY_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTNAME', (1, -1), (1, -1), 'Helvetica-Bold'),  # Letzte Zeile fett
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('FONTSIZE', (1, -1), (1, -1), 12),  # Letzte Zeile größer
+    ('TEXTCOLOR', (1, -1), (1, -1), ACCENT_COLOR),
+    ('LINEBELOW', (0, -1), (-1, -1), 1, ACCENT_COLOR),
+    ('PADDING', (0, 0), (-1, -1), 6),
+])
+
+# Strom-Totals
+STROM_TOTALS_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('PADDING', (0, 0), (-1, -1), 4),
+])
+
+# Finale Totals
+FINAL_TOTALS_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 11),
+    ('PADDING', (0, 0), (-1, -1), 6),
+    ('LINEABOVE', (0, 0), (-1, 0), 2, ACCENT_COLOR),
+    ('LINEBELOW', (0, -1), (-1, -1), 2, ACCENT_COLOR),
+])
+
+# StyleSheet aller Generatoren eines Prozesses (siehe get_shared_styles)
+_shared_styles = None
+_shared_styles_lock = threading.Lock()
+
+# Writer-Thread für save_invoice_async (beim ersten Aufruf gestartet)
+_invoice_writer = None
+_invoice_writer_lock = threading.Lock()
+
+
+def build_styles():
+    """Erstellt das StyleSheet mit den benutzerdefinierten Styles der Vorlage"""
+    styles = getSampleStyleSheet()
+
+    # Header-Style (STWEG)
+    styles.add(ParagraphStyle(
+        name='STWEGHeader',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=PRIMARY_COLOR,
+        alignment=TA_LEFT,
+        spaceAfter=6
+    ))
+    
+    # Adresse-Style
+    styles.add(ParagraphStyle(
+        name='Address',
+        parent=styles['Normal'],
+        fontSize=10,
+        alignment=TA_LEFT,
+        spaceAfter=3
+    ))
+    
+    # Rechnungstitel
+    styles.add(ParagraphStyle(
+        name='InvoiceTitle',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor=PRIMARY_COLOR,
+        alignment=TA_LEFT,
+        spaceAfter=12
+    ))
+    
+    # Eigentümer-Info
+    styles.add(ParagraphStyle(
+        name='OwnerInfo',
+        parent=styles['Normal'],
+        fontSize=11,
+        alignment=TA_LEFT,
+        spaceAfter=6
+    ))
+    
+    # Tabellen-Header
+    styles.add(ParagraphStyle(
+        name='TableHeader',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=white,
+        alignment=TA_CENTER,
+        backColor=PRIMARY_COLOR
+    ))
+    
+    # Tabellen-Inhalt
+    styles.add(ParagraphStyle(
+        name='TableContent',
+        parent=styles['Normal'],
+        fontSize=9,
+        alignment=TA_LEFT
+    ))
+    
+    # Betrag-Style
+    styles.add(ParagraphStyle(
+        name='Amount',
+        parent=styles['Normal'],
+        fontSize=10,
+        alignment=TA_RIGHT,
+        textColor=ACCENT_COLOR
+    ))
+    
+    # Total-Style
+    styles.add(ParagraphStyle(
+        name='Total',
+        parent=styles['Normal'],
+        fontSize=12,
+        alignment=TA_RIGHT,
+        textColor=ACCENT_COLOR,
+        fontName='Helvetica-Bold'
+    ))
+
+    return styles
+
+
+def get_shared_styles():
+    """
+    StyleSheet für alle Generatoren, einmal pro Prozess erstellt (threadsicher)
+
+    Die Styles werden beim Rendern nur gelesen und dürfen nicht verändert werden.
+    """
+    global _shared_styles
+    if _shared_styles is None:
+        with _shared_styles_lock:
+            if _shared_styles is None:
+                _shared_styles = build_styles()
+    return _shared_styles
+
+
+def write_invoice_file(content: bytes, output_path) -> str:
+    """
+    Schreibt eine gerenderte Rechnung atomar (temporäre Datei + os.replace)
+
+    Ein gleichzeitiger Download sieht so nie eine halb geschriebene PDF.
+
+    Args:
+        content (bytes): PDF-Inhalt
+        output_path: Ziel-Datei (Verzeichnis wird bei Bedarf angelegt)
+
+    Returns:
+        str: Pfad der geschriebenen Datei
+    """
+    path = Path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return str(path)
+
+
+def _log_write_error(future: Future):
+    """Meldet Fehler beim Speichern im Hintergrund (niemand wartet auf das Future)"""
+    error = future.exception()
+    if error is not None:
+        logger.error("Rechnung konnte nicht gespeichert werden: %s", error)
+
+
+def save_invoice_async(content: bytes, output_path) -> Future:
+    """
+    Speichert eine gerenderte Rechnung im Hintergrund
+
+    Ein einzelner Writer-Thread pro Prozess schreibt die Dateien nacheinander,
+    die aufrufende Anfrage wartet nicht auf das Dateisystem.
+
+    Args:
+        content (bytes): PDF-Inhalt
+        output_path: Ziel-Datei
+
+    Returns:
+        Future: Liefert den Pfad der geschriebenen Datei
+    """
+    global _invoice_writer
+    if _invoice_writer is None:
+        with _invoice_writer_lock:
+            if _invoice_writer is None:
+                _invoice_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='invoice-writer')
+    future = _invoice_writer.submit(write_invoice_file, content, output_path)
+    future.add_done_callback(_log_write_error)
+    return future
 
 
 class STWEGPDFGenerator:
@@ -38,91 +256,12 @@ class STWEGPDFGenerator:
         self.content_width = self.page_width - 2 * self.margin
         
         # Farben definieren
-        self.primary_color = Color(0.2, 0.4, 0.6)  # Dunkelblau
-        self.secondary_color = Color(0.8, 0.8, 0.8)  # Hellgrau
-        self.accent_color = Color(0.9, 0.3, 0.3)  # Rot für Beträge
+        self.primary_color = PRIMARY_COLOR
+        self.secondary_color = SECONDARY_COLOR
+        self.accent_color = ACCENT_COLOR
         
-        # Styles definieren
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-    
-    def _setup_custom_styles(self):
-        """Definiert benutzerdefinierte Styles basierend auf der Vorlage"""
-        
-        # Header-Style (STWEG)
-        self.styles.add(ParagraphStyle(
-            name='STWEGHeader',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            textColor=self.primary_color,
-            alignment=TA_LEFT,
-            spaceAfter=6
-        ))
-        
-        # Adresse-Style
-        self.styles.add(ParagraphStyle(
-            name='Address',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            alignment=TA_LEFT,
-            spaceAfter=3
-        ))
-        
-        # Rechnungstitel
-        self.styles.add(ParagraphStyle(
-            name='InvoiceTitle',
-            parent=self.styles['Heading2'],
-            fontSize=16,
-            textColor=self.primary_color,
-            alignment=TA_LEFT,
-            spaceAfter=12
-        ))
-        
-        # Eigentümer-Info
-        self.styles.add(ParagraphStyle(
-            name='OwnerInfo',
-            parent=self.styles['Normal'],
-            fontSize=11,
-            alignment=TA_LEFT,
-            spaceAfter=6
-        ))
-        
-        # Tabellen-Header
-        self.styles.add(ParagraphStyle(
-            name='TableHeader',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=white,
-            alignment=TA_CENTER,
-            backColor=self.primary_color
-        ))
-        
-        # Tabellen-Inhalt
-        self.styles.add(ParagraphStyle(
-            name='TableContent',
-            parent=self.styles['Normal'],
-            fontSize=9,
-            alignment=TA_LEFT
-        ))
-        
-        # Betrag-Style
-        self.styles.add(ParagraphStyle(
-            name='Amount',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            alignment=TA_RIGHT,
-            textColor=self.accent_color
-        ))
-        
-        # Total-Style
-        self.styles.add(ParagraphStyle(
-            name='Total',
-            parent=self.styles['Normal'],
-            fontSize=12,
-            alignment=TA_RIGHT,
-            textColor=self.accent_color,
-            fontName='Helvetica-Bold'
-        ))
+        # Styles und Tabellen-Styles werden pro Prozess geteilt
+        self.styles = get_shared_styles()
     
     def generate_sample_invoice(self, output_path: str = None) -> str:
         """Generiert eine Beispiel-Rechnung mit Test-Daten"""
@@ -130,39 +269,71 @@ class STWEGPDFGenerator:
         if not output_path:
             output_path = str(project_root / 'data' / 'exports' / 'invoices' / f'sample_invoice_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf')
         
-        # Export-Verzeichnis erstellen
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-        
         # Beispiel-Daten generieren
         sample_data = self._generate_sample_data()
         
-        # PDF erstellen
+        self.generate_invoice(sample_data, output_path)
+        
+        print(f"✅ Beispiel-Rechnung generiert: {output_path}")
+        return output_path
+    
+    def render_sample_invoice(self) -> bytes:
+        """Rendert eine Beispiel-Rechnung mit Test-Daten im Speicher"""
+        return self.render_invoice(self._generate_sample_data())
+    
+    def generate_invoice(self, data: Dict[str, Any], output_path: str) -> str:
+        """
+        Erstellt eine Rechnung aus Rechnungsdaten (Struktur wie _generate_sample_data)
+        
+        Args:
+            data (Dict[str, Any]): Rechnungsdaten
+            output_path (str): Ziel-Datei (Verzeichnis wird bei Bedarf angelegt)
+        
+        Returns:
+            str: Pfad der erzeugten PDF-Datei
+        """
+        return write_invoice_file(self.render_invoice(data), output_path)
+    
+    def render_invoice(self, data: Dict[str, Any]) -> bytes:
+        """
+        Rendert eine Rechnung in einen Speicherpuffer, ohne Dateisystem
+        
+        Args:
+            data (Dict[str, Any]): Rechnungsdaten (Struktur wie _generate_sample_data)
+        
+        Returns:
+            bytes: PDF-Inhalt
+        """
+        buffer = io.BytesIO()
+        
+        # PDF erstellen (invariant: gleiche Daten ergeben identische Bytes)
         doc = SimpleDocTemplate(
-            output_path,
+            buffer,
             pagesize=A4,
             rightMargin=self.margin,
             leftMargin=self.margin,
             topMargin=self.margin,
-            bottomMargin=self.margin
+            bottomMargin=self.margin,
+            invariant=True
         )
         
         # Story (Inhalt) erstellen
         story = []
         
         # Seite 1: Hauptrechnung
-        story.extend(self._create_header_page(sample_data))
+        story.extend(self._create_header_page(data))
         
         # Seite 2: Detailaufstellung
         story.append(PageBreak())
-        story.extend(self._create_detail_page(sample_data))
+        story.extend(self._create_detail_page(data))
         
         # PDF generieren
         doc.build(story)
         
-        print(f"✅ Beispiel-Rechnung generiert: {output_path}")
-        return output_path
+        return buffer.getvalue()
     
-    def _generate_sample_data(self) -> Dict[str, Any]:
+    @staticmethod
+    def _generate_sample_data() -> Dict[str, Any]:
         """Generiert realistische Beispiel-Daten für die Rechnung"""
         
         return {
@@ -304,17 +475,7 @@ class STWEGPDFGenerator:
         ]
         
         summary_table = Table(summary_data, colWidths=[8*cm, 4*cm])
-        summary_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTNAME', (1, -1), (1, -1), 'Helvetica-Bold'),  # Letzte Zeile fett
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('FONTSIZE', (1, -1), (1, -1), 12),  # Letzte Zeile größer
-            ('TEXTCOLOR', (1, -1), (1, -1), self.accent_color),
-            ('LINEBELOW', (0, -1), (-1, -1), 1, self.accent_color),
-            ('PADDING', (0, 0), (-1, -1), 6),
-        ]))
+        summary_table.setStyle(SUMMARY_TABLE_STYLE)
         
         story.append(summary_table)
         
@@ -344,17 +505,7 @@ class STWEGPDFGenerator:
         ]
         
         strom_table = Table(strom_table_data, colWidths=[6*cm, 2*cm, 2*cm, 2*cm])
-        strom_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.primary_color),
-            ('TEXTCOLOR', (0, 0), (-1, 0), white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, black),
-            ('PADDING', (0, 0), (-1, -1), 4),
-        ]))
+        strom_table.setStyle(DETAIL_TABLE_STYLE)
         
         story.append(strom_table)
         story.append(Spacer(1, 15))
@@ -371,17 +522,7 @@ class STWEGPDFGenerator:
         ]
         
         waerme_table = Table(waerme_table_data, colWidths=[6*cm, 3*cm, 3*cm])
-        waerme_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.primary_color),
-            ('TEXTCOLOR', (0, 0), (-1, 0), white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, black),
-            ('PADDING', (0, 0), (-1, -1), 4),
-        ]))
+        waerme_table.setStyle(DETAIL_TABLE_STYLE)
         
         story.append(waerme_table)
         story.append(Spacer(1, 15))
@@ -400,17 +541,7 @@ class STWEGPDFGenerator:
         ]
         
         pv_table = Table(pv_table_data, colWidths=[6*cm, 3*cm, 3*cm])
-        pv_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.primary_color),
-            ('TEXTCOLOR', (0, 0), (-1, 0), white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, black),
-            ('PADDING', (0, 0), (-1, -1), 4),
-        ]))
+        pv_table.setStyle(DETAIL_TABLE_STYLE)
         
         story.append(pv_table)
         story.append(Spacer(1, 15))
@@ -422,13 +553,7 @@ class STWEGPDFGenerator:
         ]
         
         totals_table = Table(totals_table_data, colWidths=[8*cm, 4*cm])
-        totals_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('PADDING', (0, 0), (-1, -1), 4),
-        ]))
+        totals_table.setStyle(STROM_TOTALS_TABLE_STYLE)
         
         story.append(totals_table)
         story.append(Spacer(1, 20))
@@ -446,17 +571,7 @@ class STWEGPDFGenerator:
         ]
         
         wasser_table = Table(wasser_table_data, colWidths=[6*cm, 3*cm, 3*cm])
-        wasser_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), self.primary_color),
-            ('TEXTCOLOR', (0, 0), (-1, 0), white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 1, black),
-            ('PADDING', (0, 0), (-1, -1), 4),
-        ]))
+        wasser_table.setStyle(DETAIL_TABLE_STYLE)
         
         story.append(wasser_table)
         story.append(Spacer(1, 15))
@@ -468,21 +583,13 @@ class STWEGPDFGenerator:
         ]
         
         final_totals_table = Table(final_totals_data, colWidths=[8*cm, 4*cm])
-        final_totals_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('PADDING', (0, 0), (-1, -1), 6),
-            ('LINEABOVE', (0, 0), (-1, 0), 2, self.accent_color),
-            ('LINEBELOW', (0, -1), (-1, -1), 2, self.accent_color),
-        ]))
+        final_totals_table.setStyle(FINAL_TOTALS_TABLE_STYLE)
         
         story.append(final_totals_table)
         story.append(Spacer(1, 20))
         
         # Fußnoten
-        story.append(Paragraph("Hochtarif Mo - Sa, 6-22 Uhr", self.styles['Address']))
+        story.append(Paragraph(DEFAULT_KALENDER.beschreibung(), self.styles['Address']))
         story.append(Paragraph("Niedertarif übrige Zeit", self.styles['Address']))
         story.append(Paragraph("* Stromkosten für Strom aus PV wird in Erneuerungsfond eingezahlt und ist damit steuerlich abzugsfähig", self.styles['Address']))
         
@@ -0,0 +1,272 @@
+"""
+Tarif-Kalender für Hoch- und Niedertarif
+Ordnet Zeitstempel von Intervalldaten (z.B. 15-Minuten-Werte) anhand von
+Wochentag/Stunden-Fenstern und Feiertagen dem Hoch- oder Niedertarif zu,
+vektorisiert über ganze Arrays oder in der Datenbank (Summen pro Wochenstunde
+über idx_verbrauchsdaten_stunde_der_woche, Feiertage als Korrektur)
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select, union_all
+
+from src.models.verbrauchsdaten import stunde_der_woche
+
+# Tarif-Indizes wie allocation.TARIFE
+HOCHTARIF = 0
+NIEDERTARIF = 1
+
+WOCHENTAGE = ('Mo', 'Di', 'Mi', 'Do', 'Fr', 'Sa', 'So')
+
+
+class TarifFenster(NamedTuple):
+    """Hochtarif-Fenster: Wochentage (0 = Montag) und Stunden [von, bis)"""
+    wochentage: Tuple[int, ...]
+    von: int
+    bis: int
+
+
+def ostersonntag(jahr: int) -> date:
+    """Ostersonntag (Gregorianischer Kalender, Anonymer Algorithmus)"""
+    a, b, c = jahr % 19, jahr // 100, jahr % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    monat, tag = divmod(h + l - 7 * m + 114, 31)
+    return date(jahr, monat, tag + 1)
+
+
+def feiertage_zuerich(jahr: int) -> List[date]:
+    """
+    Gesetzliche Feiertage im Kanton Zürich
+
+    Args:
+        jahr (int): Kalenderjahr
+
+    Returns:
+        List[date]: Feiertage, sortiert
+    """
+    ostern = ostersonntag(jahr)
+    return sorted([
+        date(jahr, 1, 1),                    # Neujahr
+        date(jahr, 1, 2),                    # Berchtoldstag
+        ostern - timedelta(days=2),          # Karfreitag
+        ostern + timedelta(days=1),          # Ostermontag
+        date(jahr, 5, 1),                    # Tag der Arbeit
+        ostern + timedelta(days=39),         # Auffahrt
+        ostern + timedelta(days=50),         # Pfingstmontag
+        date(jahr, 8, 1),                    # Bundesfeier
+        date(jahr, 12, 25),                  # Weihnachten
+        date(jahr, 12, 26)                   # Stephanstag
+    ])
+
+
+class TarifKalender:
+    """
+    Hochtarif in den Fenstern, Niedertarif übrige Zeit und an Feiertagen
+
+    Ein Intervall wird nach seinem Zeitstempel (Beginn des Intervalls) eingeteilt.
+    """
+
+    def __init__(self, hochtarif: Sequence[TarifFenster] = (TarifFenster((0, 1, 2, 3, 4, 5), 6, 22),),
+                 feiertage: Callable[[int], Iterable[date]] = feiertage_zuerich):
+        """
+        Args:
+            hochtarif (Sequence[TarifFenster]): Hochtarif-Fenster
+            feiertage (Callable[[int], Iterable[date]]): Feiertage eines Jahres
+        """
+        for fenster in hochtarif:
+            if (not 0 <= fenster.von < fenster.bis <= 24 or not fenster.wochentage
+                    or not set(fenster.wochentage) <= set(range(7))):
+                raise ValueError(f"Ungültiges Tarif-Fenster: {fenster}")
+        self.hochtarif = tuple(TarifFenster(tuple(sorted(f.wochentage)), f.von, f.bis) for f in hochtarif)
+        self._feiertage = lru_cache(maxsize=None)(lambda jahr: tuple(sorted(feiertage(jahr))))
+
+        # Nachschlagetabelle [Wochentag, Stunde] -> Tarif
+        self._tabelle = np.full((7, 24), NIEDERTARIF, dtype=np.int8)
+        for fenster in self.hochtarif:
+            self._tabelle[np.ix_(fenster.wochentage, range(fenster.von, fenster.bis))] = HOCHTARIF
+
+    def feiertage(self, jahre: Iterable[int]) -> List[date]:
+        """Feiertage der angegebenen Jahre, sortiert"""
+        return [tag for jahr in sorted(set(jahre)) for tag in self._feiertage(jahr)]
+
+    def beschreibung(self) -> str:
+        """Hinweis für die Rechnung, z.B. 'Hochtarif Mo - Sa, 6-22 Uhr'"""
+        teile = []
+        for fenster in self.hochtarif:
+            tage = fenster.wochentage
+            if tage == tuple(range(tage[0], tage[-1] + 1)) and len(tage) > 1:
+                tage_text = f"{WOCHENTAGE[tage[0]]} - {WOCHENTAGE[tage[-1]]}"
+            else:
+                tage_text = ', '.join(WOCHENTAGE[tag] for tag in tage)
+            teile.append(f"{tage_text}, {fenster.von}-{fenster.bis} Uhr")
+        return "Hochtarif " + '; '.join(teile)
+
+    def classify(self, zeitstempel) -> np.ndarray:
+        """
+        Tarif pro Zeitstempel, vektorisiert über das ganze Array
+
+        Args:
+            zeitstempel: Array-artig mit Zeitstempeln (datetime64, pandas, datetime)
+
+        Returns:
+            np.ndarray: int8, HOCHTARIF (0) oder NIEDERTARIF (1) pro Zeitstempel
+        """
+        stamps = np.asarray(zeitstempel, dtype='datetime64[m]')
+        if stamps.size == 0:
+            return np.empty(stamps.shape, dtype=np.int8)
+
+        tage = stamps.astype('datetime64[D]')
+        # 1970-01-01 war ein Donnerstag (Wochentag 3)
+        wochentag = (tage.astype(np.int64) + 3) % 7
+        stunde = (stamps - tage).astype('timedelta64[h]').astype(np.int64)
+        tarif = self._tabelle[wochentag, stunde]
+
+        jahre = range(int(str(tage.min())[:4]), int(str(tage.max())[:4]) + 1)
+        feiertage = np.array(self.feiertage(jahre), dtype='datetime64[D]')
+        tarif[np.isin(tage, feiertage)] = NIEDERTARIF
+        return tarif
+
+    def split_kwh(self, zeitstempel, kwh) -> np.ndarray:
+        """
+        Summiert Intervallwerte nach Tarif
+
+        Returns:
+            np.ndarray: [kWh Hochtarif, kWh Niedertarif]
+        """
+        return np.bincount(self.classify(zeitstempel), weights=np.asarray(kwh, dtype=float), minlength=2)
+
+    def hochtarif_slots(self) -> List[int]:
+        """Hochtarif-Stunden wie stunde_der_woche (Wochentag × 100 + Stunde, 0 = Sonntag)"""
+        return sorted({((tag + 1) % 7) * 100 + stunde
+                       for fenster in self.hochtarif
+                       for tag in fenster.wochentage
+                       for stunde in range(fenster.von, fenster.bis)})
+
+
+def zeitraum(periode: str) -> Tuple[datetime, datetime]:
+    """
+    Zeitraum einer Abrechnungsperiode
+
+    Args:
+        periode (str): 'YYYY' oder 'YYYY-MM'
+
+    Returns:
+        Tuple[datetime, datetime]: [Beginn, Ende)
+    """
+    jahr = int(periode[:4])
+    if len(periode) == 4:
+        return datetime(jahr, 1, 1), datetime(jahr + 1, 1, 1)
+    monat = int(periode[5:7])
+    ende = datetime(jahr + 1, 1, 1) if monat == 12 else datetime(jahr, monat + 1, 1)
+    return datetime(jahr, monat, 1), ende
+
+
+def tarif_verbrauch_query(session, messpunkt_ids: Sequence[int], periode: str):
+    """
+    Verbrauch pro Messpunkt und Wochenstunde (z.B. für EXPLAIN)
+
+    Gruppiert in Reihenfolge von idx_verbrauchsdaten_stunde_der_woche; der
+    Index deckt die Abfrage ab und hängt weder vom Jahr noch vom Kalender ab.
+
+    Returns:
+        Query: (messpunkt_id, stunde_der_woche, kWh)
+    """
+    from src.models.models import Verbrauchsdaten
+
+    start, ende = zeitraum(periode)
+    stunde = stunde_der_woche(Verbrauchsdaten.zeitstempel)
+    return session.query(
+        Verbrauchsdaten.messpunkt_id, stunde, func.sum(Verbrauchsdaten.verbrauch)
+    ).filter(
+        Verbrauchsdaten.messpunkt_id.in_(list(messpunkt_ids)),
+        Verbrauchsdaten.zeitstempel >= start,
+        Verbrauchsdaten.zeitstempel < ende
+    ).group_by(Verbrauchsdaten.messpunkt_id, stunde)
+
+
+def feiertag_verbrauch_query(messpunkt_ids: Sequence[int], periode: str,
+                             kalender: Optional[TarifKalender] = None):
+    """
+    Hochtarif-Verbrauch an Feiertagen pro Messpunkt (wird zum Niedertarif)
+
+    Eine Teilabfrage pro Feiertag mit den Hochtarif-Stunden seines Wochentags,
+    jeweils eine Bereichssuche in idx_verbrauchsdaten_stunde_der_woche.
+
+    Returns:
+        Optional[CompoundSelect]: (messpunkt_id, kWh) pro Feiertag; None ohne
+        Hochtarif-Feiertage in der Periode
+    """
+    from src.models.models import Verbrauchsdaten
+
+    kalender = kalender or DEFAULT_KALENDER
+    start, ende = zeitraum(periode)
+    stunde = stunde_der_woche(Verbrauchsdaten.zeitstempel)
+
+    teile = []
+    for tag in kalender.feiertage([start.year]):
+        beginn = datetime(tag.year, tag.month, tag.day)
+        slots = [slot for slot in kalender.hochtarif_slots() if slot // 100 == (tag.weekday() + 1) % 7]
+        if not slots or not start <= beginn < ende:
+            continue
+        teile.append(select(
+            Verbrauchsdaten.messpunkt_id, func.sum(Verbrauchsdaten.verbrauch)
+        ).where(
+            Verbrauchsdaten.messpunkt_id.in_(list(messpunkt_ids)),
+            stunde.in_(slots),
+            Verbrauchsdaten.zeitstempel >= beginn,
+            Verbrauchsdaten.zeitstempel < beginn + timedelta(days=1)
+        ).group_by(Verbrauchsdaten.messpunkt_id))
+
+    return union_all(*teile) if teile else None
+
+
+def load_tarif_verbrauch(session, messpunkt_ids: Sequence[int], periode: str,
+                         kalender: Optional[TarifKalender] = None) -> List[Tuple[int, int, float]]:
+    """
+    Verbrauch von Intervall-Messpunkten pro Tarif, in der Datenbank gruppiert
+
+    Summiert pro Wochenstunde (tarif_verbrauch_query), teilt die Stunden nach
+    den Fenstern des Kalenders auf und verschiebt den Hochtarif-Verbrauch an
+    Feiertagen in den Niedertarif (feiertag_verbrauch_query).
+
+    Args:
+        session: SQLAlchemy-Session
+        messpunkt_ids (Sequence[int]): Messpunkte mit Intervalldaten
+        periode (str): 'YYYY' oder 'YYYY-MM'
+        kalender (Optional[TarifKalender]): Standard: DEFAULT_KALENDER
+
+    Returns:
+        List[Tuple[int, int, float]]: (messpunkt_id, Tarif, kWh)
+    """
+    if not messpunkt_ids:
+        return []
+
+    kalender = kalender or DEFAULT_KALENDER
+    slots = set(kalender.hochtarif_slots())
+    summen: Dict[int, Dict[int, float]] = defaultdict(dict)
+
+    for messpunkt_id, stunde, kwh in tarif_verbrauch_query(session, messpunkt_ids, periode):
+        tarif = HOCHTARIF if stunde in slots else NIEDERTARIF
+        summen[messpunkt_id][tarif] = summen[messpunkt_id].get(tarif, 0.0) + kwh
+
+    feiertage = feiertag_verbrauch_query(messpunkt_ids, periode, kalender)
+    for messpunkt_id, kwh in (session.execute(feiertage) if feiertage is not None else []):
+        summen[messpunkt_id][HOCHTARIF] -= kwh
+        summen[messpunkt_id][NIEDERTARIF] = summen[messpunkt_id].get(NIEDERTARIF, 0.0) + kwh
+
+    return [(messpunkt_id, tarif, kwh)
+            for messpunkt_id, tarife in sorted(summen.items())
+            for tarif, kwh in sorted(tarife.items())]
+
+
+# Hochtarif Mo - Sa, 6-22 Uhr, Feiertage Kanton Zürich
+DEFAULT_KALENDER = TarifKalender()
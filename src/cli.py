@@ -4,9 +4,12 @@ CLI für STWEG - Stockwerkeigentümergesellschaft Nebenkostenverwaltung
 """
 
 import argparse
+import json
 import sys
 from pathlib import Path
 from excel_analysis.excel_analyzer import ExcelAnalyzer
+from excel_analysis.batch import check_workers, find_zev_files, parse_batch
+from excel_analysis.simple_zev_parser import ENGINES
 
 
 def main():
@@ -28,12 +31,41 @@ def main():
     validate_parser = subparsers.add_parser('validate', help='Excel-Datei validieren')
     validate_parser.add_argument('file', help='Pfad zur Excel-Datei')
     
+    # Batch-Parsing Befehl
+    batch_parser = subparsers.add_parser('parse-batch', help='Alle ZEV-Dateien eines Verzeichnisses parsen')
+    batch_parser.add_argument('directory', help='Verzeichnis mit ZEV-Exporten')
+    batch_parser.add_argument('--workers', '-w', type=int, default=None,
+                              help='Anzahl Worker-Prozesse (Standard: Anzahl CPUs)')
+    batch_parser.add_argument('--engine', choices=ENGINES, default='vectorized',
+                              help='Parser-Engine')
+    batch_parser.add_argument('--pattern', default='*.xlsx', help='Glob-Muster der Dateien')
+    batch_parser.add_argument('--output', '-o', help='Zusammenfassung als JSON speichern')
+    
+    # Rechnungs-Batch Befehl
+    invoices_parser = subparsers.add_parser('generate-invoices', help='Rechnungen einer Periode erstellen')
+    invoices_parser.add_argument('periode', help='Abrechnungsperiode YYYY oder YYYY-MM')
+    invoices_parser.add_argument('--eigentuemer', '-e', type=int, nargs='+', metavar='ID',
+                                 help='Nur diese Eigentümer (Standard: alle aktiven)')
+    invoices_parser.add_argument('--workers', '-w', type=int, default=None,
+                                 help='Anzahl Worker-Prozesse (Standard: Anzahl CPUs)')
+    invoices_parser.add_argument('--output-dir', '-o', help='Zielverzeichnis (Standard: data/exports/invoices)')
+    invoices_parser.add_argument('--force', '-f', action='store_true',
+                                 help='Auch Rechnungen mit unveränderten Eingabedaten neu erstellen')
+    invoices_parser.add_argument('--tarife', '-t', metavar='JSON', required=True,
+                                 help='Tarife in Rp./kWh laut ewz-Rechnung, z.B. '
+                                      '\'{"netz_hochtarif": 54.9, "netz_niedertarif": 34.9}\' '
+                                      '(PV-Tarife optional, Standard 16.40)')
+    
     args = parser.parse_args()
     
     if args.command == 'analyze':
         analyze_excel(args)
     elif args.command == 'validate':
         validate_excel(args)
+    elif args.command == 'parse-batch':
+        parse_batch_command(args)
+    elif args.command == 'generate-invoices':
+        generate_invoices_command(args)
     else:
         parser.print_help()
 
@@ -106,6 +138,95 @@ def validate_excel(args):
         sys.exit(1)
 
 
+def parse_batch_command(args):
+    """Parst alle ZEV-Dateien eines Verzeichnisses parallel"""
+    try:
+        check_workers(args.workers)
+        files = find_zev_files(args.directory, args.pattern)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ Fehler: {e}")
+        sys.exit(1)
+    
+    if not files:
+        print(f"Keine Dateien ({args.pattern}) in {args.directory} gefunden")
+        sys.exit(1)
+    
+    print(f"Parse {len(files)} Dateien ...")
+    
+    def print_result(file_result):
+        name = Path(file_result['file']).name
+        if file_result['success']:
+            summary = file_result['summary']
+            print(f"  ✓ {name}: {summary['total_zaehler']} Zähler, "
+                  f"{summary['total_messpunkte']} Messpunkte ({file_result['duration_s']:.2f}s)")
+        else:
+            print(f"  ✗ {name}: {'; '.join(file_result['errors'])}")
+    
+    summary = parse_batch(files, workers=args.workers, engine=args.engine, on_result=print_result)
+    
+    print(f"\nDateien: {summary['succeeded']}/{summary['total_files']} erfolgreich, {summary['failed']} fehlgeschlagen")
+    print(f"Zähler: {summary['total_zaehler']}, Messpunkte: {summary['total_messpunkte']}")
+    print(f"Laufzeit: {summary['wall_time_s']:.2f}s (Summe Parse-Zeit: {summary['parse_time_s']:.2f}s, "
+          f"{summary['workers']} Worker)")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"Zusammenfassung gespeichert in: {args.output}")
+    
+    sys.exit(1 if summary['failed'] else 0)
+
+
+def generate_invoices_command(args):
+    """Erstellt die Rechnungen einer Periode parallel"""
+    # Erst hier importieren: ReportLab und Datenbank nur für diesen Befehl laden
+    from billing.batch import billing_period_label, generate_invoice_batch, load_eigentuemer
+    from billing.allocation import TarifTabelle, allocate_period
+    from src.models.database import get_db_session
+    
+    session = get_db_session()
+    try:
+        billing_period_label(args.periode)
+        tarife = TarifTabelle.from_dict(json.loads(args.tarife))
+        eigentuemer = load_eigentuemer(session, args.eigentuemer)
+        strom_details = allocate_period(session, eigentuemer, args.periode, tarife)
+    except ValueError as e:
+        print(f"❌ Fehler: {e}")
+        sys.exit(1)
+    finally:
+        session.close()
+    
+    if not eigentuemer:
+        print("Keine Eigentümer gefunden")
+        sys.exit(1)
+    
+    print(f"Erstelle {len(eigentuemer)} Rechnungen für {args.periode} ...")
+    
+    def print_result(entry):
+        if entry['skipped']:
+            print(f"  = {entry['name']}: {Path(entry['file']).name} (unverändert)")
+        elif entry['success']:
+            print(f"  ✓ {entry['name']}: {Path(entry['file']).name} ({entry['duration_s']:.2f}s)")
+        else:
+            print(f"  ✗ {entry['name']}: {'; '.join(entry['errors'])}")
+    
+    try:
+        manifest = generate_invoice_batch(eigentuemer, args.periode, output_dir=args.output_dir,
+                                          workers=args.workers, on_result=print_result, force=args.force,
+                                          strom_details=strom_details)
+    except ValueError as e:
+        print(f"❌ Fehler: {e}")
+        sys.exit(1)
+    
+    print(f"\nRechnungen: {manifest['succeeded']}/{manifest['total']} erfolgreich ({manifest['skipped']} unverändert), "
+          f"{manifest['failed']} fehlgeschlagen")
+    print(f"Laufzeit: {manifest['wall_time_s']:.2f}s (Summe Renderzeit: {manifest['render_time_s']:.2f}s, "
+          f"{manifest['workers']} Worker)")
+    print(f"Manifest: {manifest['manifest_file']}")
+    
+    sys.exit(1 if manifest['failed'] else 0)
+
+
 if __name__ == "__main__":
     main()
 
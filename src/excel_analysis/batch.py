@@ -0,0 +1,208 @@
+"""
+Batch-Verarbeitung von ZEV-Dateien
+Parst viele ZEV-Exporte parallel in einem Prozess-Pool (z.B. Jahresabschluss)
+"""
+
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.context import BaseContext
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .simple_zev_parser import SimpleZEVParser
+
+logger = logging.getLogger(__name__)
+
+
+def find_zev_files(directory: str, pattern: str = '*.xlsx') -> List[Path]:
+    """
+    Sucht ZEV-Dateien in einem Verzeichnis (ohne Excel-Sperrdateien ~$...)
+
+    Args:
+        directory (str): Verzeichnis mit den Exporten
+        pattern (str): Glob-Muster der Dateien
+
+    Returns:
+        List[Path]: Sortierte Liste der Dateien
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        raise FileNotFoundError(f"Verzeichnis nicht gefunden: {directory}")
+
+    return sorted(p for p in directory.glob(pattern) if p.is_file() and not p.name.startswith('~$'))
+
+
+def parse_file(file_path: str, engine: str = 'vectorized') -> Dict[str, Any]:
+    """
+    Parst eine einzelne Datei und misst die Laufzeit (läuft im Worker-Prozess)
+
+    Args:
+        file_path (str): Pfad zur ZEV-Datei
+        engine (str): Parser-Engine
+
+    Returns:
+        Dict[str, Any]: Ergebnis mit Status, Laufzeit und Zusammenfassung
+    """
+    start = time.perf_counter()
+    try:
+        result = SimpleZEVParser(engine=engine).parse_zev_file(file_path)
+        errors = result['structure_info'].get('errors', [])
+        success = result['structure_verified']
+        summary = result['summary']
+    except Exception as e:
+        errors = [str(e)]
+        success = False
+        summary = {}
+
+    return {
+        'file': str(file_path),
+        'success': success,
+        'duration_s': round(time.perf_counter() - start, 4),
+        'summary': summary,
+        'errors': errors,
+        'worker_pid': os.getpid()
+    }
+
+
+def check_workers(workers: Any) -> Optional[int]:
+    """
+    Prüft die Anzahl Worker-Prozesse
+
+    Args:
+        workers: None (Anzahl CPUs) oder positive Ganzzahl
+
+    Returns:
+        Optional[int]: workers unverändert
+
+    Raises:
+        ValueError: Bei anderen Werten (z.B. 0 oder '4')
+    """
+    if workers is None or (isinstance(workers, int) and not isinstance(workers, bool) and workers > 0):
+        return workers
+    raise ValueError(f"Ungültige Anzahl Worker: {workers!r} (positive Ganzzahl erwartet)")
+
+
+def _failed_result(file_path: str, error: str) -> Dict[str, Any]:
+    """Fehler-Ergebnis für eine Datei, deren Worker kein Ergebnis geliefert hat"""
+    return {
+        'file': file_path,
+        'success': False,
+        'duration_s': None,
+        'summary': {},
+        'errors': [error],
+        'worker_pid': None
+    }
+
+
+def iter_batch(files: Iterable[str], workers: Optional[int] = None, engine: str = 'vectorized',
+               mp_context: Optional[BaseContext] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Parst Dateien parallel und liefert jedes Ergebnis, sobald es fertig ist
+
+    Eine fehlerhafte Datei erzeugt nur ein Fehler-Ergebnis. Stürzt ein Worker
+    ab (BrokenProcessPool), wird der Pool neu gestartet: die Dateien, die
+    gerade liefen, werden einzeln wiederholt, damit nur die Datei, die den
+    Absturz auslöst, als fehlgeschlagen gilt; noch nicht gestartete laufen normal.
+
+    Args:
+        files (Iterable[str]): Zu parsende Dateien
+        workers (Optional[int]): Anzahl Worker-Prozesse (None = Anzahl CPUs,
+            1 = ohne Pool im aktuellen Prozess)
+        engine (str): Parser-Engine
+        mp_context (Optional[BaseContext]): Start-Methode des Pools
+
+    Yields:
+        Dict[str, Any]: Ergebnis pro Datei in Fertigstellungs-Reihenfolge
+    """
+    files = [str(f) for f in files]
+    check_workers(workers)
+
+    if workers == 1:
+        for file_path in files:
+            yield parse_file(file_path, engine)
+        return
+
+    max_workers = workers or os.cpu_count()
+    pending = deque(files)
+    # Liefen beim Absturz eines Workers: werden einzeln wiederholt
+    suspects = deque()
+
+    while pending or suspects:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+            running = {}
+            try:
+                while pending or suspects or running:
+                    if suspects and not running:
+                        file_path = suspects.popleft()
+                        running[executor.submit(parse_file, file_path, engine)] = file_path
+                    while not suspects and pending and len(running) < max_workers:
+                        file_path = pending.popleft()
+                        running[executor.submit(parse_file, file_path, engine)] = file_path
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    broken = None
+                    for future in done:
+                        if isinstance(future.exception(), BrokenProcessPool):
+                            broken = future.exception()
+                            continue
+                        file_path = running.pop(future)
+                        try:
+                            yield future.result()
+                        except Exception as e:
+                            logger.error("Batch: Worker für %s fehlgeschlagen: %s", file_path, e)
+                            yield _failed_result(file_path, f"Worker fehlgeschlagen: {e}")
+                    if broken is not None:
+                        raise broken
+            except BrokenProcessPool as e:
+                if len(running) == 1:
+                    file_path = running.popitem()[1]
+                    logger.error("Batch: Worker beim Parsen von %s abgestürzt: %s", file_path, e)
+                    yield _failed_result(file_path, f"Worker abgestürzt: {e}")
+                else:
+                    logger.warning("Batch: Worker abgestürzt, wiederhole %d Dateien einzeln", len(running))
+                    suspects.extend(running.values())
+
+
+def parse_batch(files: Iterable[str], workers: Optional[int] = None, engine: str = 'vectorized',
+                on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                mp_context: Optional[BaseContext] = None) -> Dict[str, Any]:
+    """
+    Parst alle Dateien und fasst die Ergebnisse zusammen
+
+    Args:
+        files (Iterable[str]): Zu parsende Dateien
+        workers (Optional[int]): Anzahl Worker-Prozesse
+        engine (str): Parser-Engine
+        on_result (Optional[Callable]): Wird für jedes fertige Ergebnis aufgerufen
+        mp_context (Optional[BaseContext]): Start-Methode des Pools
+
+    Returns:
+        Dict[str, Any]: Gesamtzusammenfassung mit Ergebnissen pro Datei
+    """
+    start = time.perf_counter()
+    results = []
+
+    for file_result in iter_batch(files, workers=workers, engine=engine, mp_context=mp_context):
+        results.append(file_result)
+        if on_result:
+            on_result(file_result)
+
+    results.sort(key=lambda r: r['file'])
+    succeeded = [r for r in results if r['success']]
+
+    return {
+        'total_files': len(results),
+        'succeeded': len(succeeded),
+        'failed': len(results) - len(succeeded),
+        'total_zaehler': sum(r['summary'].get('total_zaehler', 0) for r in succeeded),
+        'total_messpunkte': sum(r['summary'].get('total_messpunkte', 0) for r in succeeded),
+        'wall_time_s': round(time.perf_counter() - start, 4),
+        'parse_time_s': round(sum(r['duration_s'] or 0 for r in results), 4),
+        'workers': workers or os.cpu_count(),
+        'engine': engine,
+        'files': results
+    }
@@ -4,11 +4,11 @@ Analysiert Excel-Dateien vom ZEV-Server und extrahiert Strukturinformationen
 """
 
 import pandas as pd
-import openpyxl
-from pathlib import Path
 from typing import Dict, List, Any, Optional
 import logging
 
+from .workbook_session import WorkbookSession
+
 # Logger konfigurieren
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,6 +21,9 @@ class ExcelAnalyzer:
     Diese Klasse implementiert US-001: Excel-File Struktur Analyse
     """
     
+    # Anzahl Beispielzeilen pro Tabellenblatt
+    SAMPLE_ROWS = 5
+    
     def __init__(self):
         """Initialisiert den Excel-Analyzer"""
         # Spalten die mindestens vorhanden sein sollten (flexible Validierung)
@@ -41,12 +44,18 @@ class ExcelAnalyzer:
             'Zeitraum': 'string'
         }
     
-    def analyze_file(self, file_path: str) -> Dict[str, Any]:
+    def analyze_file(self, file_path: str, count_rows: bool = False) -> Dict[str, Any]:
         """
         Analysiert eine Excel-Datei und gibt Strukturinformationen zurück
         
+        Die Datei wird nur einmal geöffnet; pro Tabellenblatt werden nur die
+        Beispielzeilen gelesen. Die Zeilenzahl stammt dann aus der Blatt-Dimension
+        ('row_count_exact': False), mit count_rows=True wird das Haupt-Sheet
+        vollständig gelesen und exakt gezählt.
+        
         Args:
             file_path (str): Pfad zur Excel-Datei
+            count_rows (bool): Exakte Zeilenzahl des Haupt-Sheets ermitteln
             
         Returns:
             Dict[str, Any]: Analyseergebnis mit Strukturinformationen
@@ -57,45 +66,51 @@ class ExcelAnalyzer:
         """
         logger.info(f"Analysiere Excel-Datei: {file_path}")
         
-        # Datei-Existenz prüfen
-        if not Path(file_path).exists():
-            raise FileNotFoundError(f"Datei nicht gefunden: {file_path}")
-        
-        # Excel-Format prüfen
-        if not self._is_excel_file(file_path):
-            raise ValueError("File is not a valid Excel file")
-        
+        # Datei öffnen (prüft Existenz und Excel-Format)
+        with WorkbookSession(file_path) as session:
+            return self._analyze_session(session, count_rows)
+    
+    def _analyze_session(self, session: WorkbookSession, count_rows: bool) -> Dict[str, Any]:
+        """Strukturanalyse über eine geöffnete Workbook-Session"""
         try:
-            # Excel-Datei laden
-            excel_data = pd.ExcelFile(file_path)
+            sheet_names = session.sheet_names
             
             # Strukturanalyse durchführen
             result = {
-                'file_path': file_path,
-                'sheets': excel_data.sheet_names,
-                'main_sheet': excel_data.sheet_names[0] if excel_data.sheet_names else None,
+                'file_path': session.file_path,
+                'sheets': sheet_names,
+                'main_sheet': sheet_names[0] if sheet_names else None,
                 'columns': {},
                 'sample_data': {},
                 'row_count': 0,
+                'row_count_exact': count_rows,
                 'validation_status': 'unknown',
                 'validation_errors': []
             }
             
             # Jedes Tabellenblatt analysieren
-            for sheet_name in excel_data.sheet_names:
-                df = pd.read_excel(file_path, sheet_name=sheet_name)
+            for sheet_name in sheet_names:
+                is_main = result['main_sheet'] == sheet_name
+                row_count = None if count_rows or not is_main else session.estimated_row_count(sheet_name)
+                
+                # Beispiel-Daten (maximal 5 Zeilen), Haupt-Sheet bei Bedarf vollständig
+                if is_main and row_count is None:
+                    df = session.read_sheet(sheet_name)
+                    row_count = len(df)
+                    result['row_count_exact'] = True
+                else:
+                    df = session.read_sheet(sheet_name, nrows=self.SAMPLE_ROWS)
                 
                 # Spalten extrahieren
                 result['columns'][sheet_name] = list(df.columns)
                 
-                # Beispiel-Daten extrahieren (maximal 5 Zeilen)
-                sample_size = min(5, len(df))
+                sample_size = min(self.SAMPLE_ROWS, len(df))
                 result['sample_data'][sheet_name] = df.head(sample_size).to_dict('records')
                 
                 # Haupt-Sheet bestimmen (erstes Sheet mit Daten)
-                if result['main_sheet'] == sheet_name and len(df) > 0:
+                if is_main and len(df) > 0:
                     result['main_columns'] = list(df.columns)  # Für main_sheet
-                    result['row_count'] = len(df)
+                    result['row_count'] = row_count
                     result['main_sample_data'] = df.head(sample_size).to_dict('records')  # Für main_sheet
             
             # Validierung durchführen
@@ -109,29 +124,6 @@ class ExcelAnalyzer:
             logger.error(f"Fehler bei der Excel-Analyse: {str(e)}")
             raise ValueError(f"Fehler beim Lesen der Excel-Datei: {str(e)}")
     
-    def _is_excel_file(self, file_path: str) -> bool:
-        """
-        Prüft, ob eine Datei ein gültiges Excel-Format hat
-        
-        Args:
-            file_path (str): Pfad zur Datei
-            
-        Returns:
-            bool: True wenn Excel-Format, False sonst
-        """
-        excel_extensions = ['.xlsx', '.xls', '.xlsm', '.xlsb']
-        file_extension = Path(file_path).suffix.lower()
-        
-        if file_extension not in excel_extensions:
-            return False
-        
-        # Zusätzliche Prüfung mit openpyxl
-        try:
-            openpyxl.load_workbook(file_path, read_only=True)
-            return True
-        except:
-            return False
-    
     def _validate_structure(self, analysis_result: Dict[str, Any]) -> Dict[str, Any]:
         """
         Validiert die Excel-Struktur gegen erwartete Formate
@@ -226,15 +218,16 @@ class ExcelAnalyzer:
         """
         logger.info(f"Extrahiere Verbrauchsdaten aus: {file_path}")
         
-        # Analyse durchführen
-        analysis = self.analyze_file(file_path)
-        
-        # Sheet auswählen
-        if sheet_name is None:
-            sheet_name = analysis['sheets'][0]
-        
-        # Daten laden
-        df = pd.read_excel(file_path, sheet_name=sheet_name)
+        with WorkbookSession(file_path) as session:
+            # Analyse durchführen
+            analysis = self._analyze_session(session, count_rows=False)
+            
+            # Sheet auswählen
+            if sheet_name is None:
+                sheet_name = analysis['sheets'][0]
+            
+            # Daten laden (gleicher Datei-Handle)
+            df = session.read_sheet(sheet_name)
         
         # Datenvalidierung und -bereinigung
         df = self._clean_consumption_data(df)
@@ -0,0 +1,138 @@
+"""
+Parse-Cache für ZEV-Dateien
+Speichert Parser-Ergebnisse als JSON, adressiert über den SHA-256 des
+Dateiinhalts und die Parser-Version
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class ParseCache:
+    """
+    Inhaltsadressierter Cache für Parser-Ergebnisse auf Disk
+
+    Gleiche Dateiinhalte (auch unter anderem Dateinamen) liefern denselben
+    Eintrag. Überschreitet der Cache max_bytes, werden die am längsten nicht
+    mehr gelesenen Einträge gelöscht (LRU über die Änderungszeit der Datei).
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 50 * 1024 * 1024):
+        """
+        Args:
+            cache_dir (Path): Verzeichnis für die Cache-Einträge
+            max_bytes (int): Maximale Gesamtgrösse aller Einträge
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def file_digest(file_path: str) -> str:
+        """Berechnet den SHA-256 des Dateiinhalts"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _entry_path(self, digest: str, parser_version: str) -> Path:
+        """Pfad des Cache-Eintrags für Inhalt und Parser-Version"""
+        return self.cache_dir / f"{digest}_{parser_version}.json"
+
+    def get(self, digest: str, parser_version: str) -> Optional[Dict[str, Any]]:
+        """
+        Liest ein Ergebnis aus dem Cache
+
+        Args:
+            digest (str): SHA-256 des Dateiinhalts
+            parser_version (str): Version des Parsers
+
+        Returns:
+            Optional[Dict[str, Any]]: Gespeichertes Ergebnis oder None
+        """
+        entry = self._entry_path(digest, parser_version)
+        try:
+            with open(entry, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            # Zugriffszeit für LRU auffrischen
+            os.utime(entry, None)
+        except (FileNotFoundError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, digest: str, parser_version: str, result: Dict[str, Any]):
+        """
+        Speichert ein Ergebnis und räumt den Cache bei Bedarf auf
+
+        Args:
+            digest (str): SHA-256 des Dateiinhalts
+            parser_version (str): Version des Parsers
+            result (Dict[str, Any]): JSON-serialisierbares Parser-Ergebnis
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = self._entry_path(digest, parser_version)
+
+        # Atomar schreiben, damit parallele Leser nie halbe Dateien sehen
+        tmp_entry = entry.with_suffix(f'.{threading.get_ident()}.tmp')
+        with open(tmp_entry, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        os.replace(tmp_entry, entry)
+
+        self._evict()
+
+    def _evict(self):
+        """Löscht die ältesten Einträge, bis max_bytes eingehalten ist"""
+        with self._lock:
+            entries = []
+            for entry in self.cache_dir.glob('*.json'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry in sorted(entries, key=lambda e: e[0]):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    entry.unlink()
+                    total -= size
+                except FileNotFoundError:
+                    continue
+
+    def clear(self):
+        """Löscht alle Einträge und setzt die Zähler zurück"""
+        with self._lock:
+            for entry in self.cache_dir.glob('*.json'):
+                entry.unlink(missing_ok=True)
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Gibt Treffer-/Fehlzähler und Belegung des Caches zurück"""
+        entries = list(self.cache_dir.glob('*.json')) if self.cache_dir.exists() else []
+        size_bytes = sum(entry.stat().st_size for entry in entries if entry.exists())
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'entries': len(entries),
+                'size_bytes': size_bytes,
+                'max_bytes': self.max_bytes
+            }
@@ -0,0 +1,69 @@
+"""
+Tracing für den ZEV-Parser
+Strukturierte Entscheidungen pro Zeile (Zeile, Zähler, Entscheidung) über
+logging, optional gesammelt als Diagnose-Bericht eines einzelnen Parse-Laufs
+"""
+
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+
+class ParseTrace:
+    """
+    Sammelt Parser-Entscheidungen für Logging und Diagnose
+
+    Aufrufer prüfen ``trace.enabled`` vor jedem record()-Aufruf. Ist das
+    Tracing aus (kein DEBUG-Level, keine Sammlung), wird pro Zeile also
+    nichts formatiert oder gespeichert.
+    """
+
+    def __init__(self, logger: logging.Logger, collect: bool = False, max_records: int = 10000):
+        """
+        Args:
+            logger (logging.Logger): Logger für die DEBUG-Ausgabe
+            collect (bool): Einträge für den Diagnose-Bericht sammeln
+            max_records (int): Obergrenze der gesammelten Einträge
+        """
+        self.logger = logger
+        self.collect = collect
+        self.max_records = max_records
+        self.log_enabled = logger.isEnabledFor(logging.DEBUG)
+        self.enabled = collect or self.log_enabled
+        self.records: List[Dict[str, Any]] = []
+        self.decision_counts = Counter()
+        self.truncated = False
+
+    def record(self, row: int, zaehler_id: Optional[str], decision: str, **details):
+        """
+        Hält eine Entscheidung fest
+
+        Args:
+            row (int): Zeilenindex im Tabellenblatt
+            zaehler_id (Optional[str]): Aktueller Zähler (None vor dem ersten Zähler)
+            decision (str): Art der Entscheidung, z.B. 'messpunkt'
+            **details: Weitere JSON-serialisierbare Angaben
+        """
+        if self.log_enabled:
+            # Formatierung erst im Handler (lazy %-Formatierung)
+            self.logger.debug("Zeile %s [%s] %s %s", row, zaehler_id, decision, details)
+
+        if not self.collect:
+            return
+
+        self.decision_counts[decision] += 1
+        if len(self.records) >= self.max_records:
+            self.truncated = True
+            return
+
+        entry = {'row': int(row), 'zaehler_id': zaehler_id, 'decision': decision}
+        entry.update(details)
+        self.records.append(entry)
+
+    def report(self) -> Dict[str, Any]:
+        """Gibt den Diagnose-Bericht des Parse-Laufs zurück"""
+        return {
+            'records': self.records,
+            'decision_counts': dict(self.decision_counts),
+            'truncated': self.truncated
+        }
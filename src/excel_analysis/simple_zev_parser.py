@@ -3,30 +3,268 @@
 Einfacher ZEV-Parser - garantiert NaN-frei für JSON
 """
 
+import logging
+import numpy as np
 import pandas as pd
 import json
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .parse_trace import ParseTrace
+from .streaming_reader import iter_sheet_rows, with_lookahead
+from .zev_columns import MONTH_NAMES, ZEVColumns
+
+logger = logging.getLogger(__name__)
+
+# Verfügbare Parser-Engines (gleiche Ausgabe, unterschiedliche Laufzeit)
+ENGINES = ('iterrows', 'vectorized', 'streaming')
+
+# Bei jeder Änderung der Ausgabe erhöhen (macht Cache-Einträge ungültig)
+PARSER_VERSION = '1'
+
+# Zeilen zwischen zwei Fortschrittsmeldungen (progress-Callback)
+PROGRESS_INTERVAL = 1000
+
+
+class ZEVStateMachine:
+    """
+    Zustandsmaschine des ZEV-Layouts (Hauptzähler / Untermessungen / Messpunkt)
+    
+    Verarbeitet eine Zeile nach der anderen und gibt einen Zähler zurück,
+    sobald sein Block durch den nächsten Zähler (oder finish()) abgeschlossen ist.
+    """
+    
+    def __init__(self, month_names: List[str], trace: Optional[ParseTrace] = None):
+        self.month_names = month_names
+        self.trace = trace if trace is not None else ParseTrace(logger)
+        self.zaehler_count = 0
+        self.total_messpunkte = 0
+        self.current_zaehler = None
+        self.month_columns = []  # Monats-Spalten des ersten Hauptzählers
+        self.in_submeter_section = False  # Flag für Unterzähler-Bereich
+    
+    def feed(self, idx: int, row: Sequence[Any], next_row: Optional[Sequence[Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Verarbeitet eine Zeile
+        
+        Args:
+            idx (int): Zeilenindex (nur für das Tracing)
+            row (Sequence[Any]): Zellwerte der Zeile, leere Zellen als ''
+            next_row (Optional[Sequence[Any]]): Folgezeile (Code und Name des Zählers)
+            
+        Returns:
+            Optional[Dict[str, Any]]: Abgeschlossener Zähler oder None
+        """
+        completed = None
+        trace = self.trace
+        
+        col_a = str(row[0]).strip() if len(row) > 0 else ''
+        col_b = str(row[1]).strip() if len(row) > 1 else ''
+        col_c = str(row[2]).strip() if len(row) > 2 else ''
+        
+        # "Untermessungen" Header erkennen -> Unterzähler-Bereich starten
+        if 'Untermessungen' in col_a or 'Untermessungen' in col_b or 'Untermessungen' in col_c:
+            self.in_submeter_section = True
+            if trace.enabled:
+                trace.record(idx, self._current_id(), 'untermessungen_start')
+            return None  # Header überspringen
+        
+        # Zähler-ID in Spalte A erkannt -> Beendet Unterzähler-Modus und startet neuen Hauptzähler
+        if col_a and ('CHINV' in col_a.upper() or col_a.startswith('XX')):
+            # Vorherigen Zähler abschließen
+            completed = self.current_zaehler
+            
+            # Unterzähler-Modus beenden (neuer Hauptzähler gefunden)
+            if self.in_submeter_section:
+                self.in_submeter_section = False
+                if trace.enabled:
+                    trace.record(idx, self._current_id(), 'untermessungen_ende')
+            
+            # Monats-Header aus derselben Zeile extrahieren (Spalten E-P)
+            current_month_columns = []
+            for col_idx in range(4, min(16, len(row))):  # Spalten E-P (4-15)
+                if col_idx < len(row):
+                    month_name = str(row[col_idx]).strip()
+                    if month_name in self.month_names:
+                        current_month_columns.append(month_name)
+            
+            # Monats-Spalten für alle Zähler sammeln
+            if current_month_columns and not self.month_columns:
+                self.month_columns = current_month_columns
+            
+            # Neuen Hauptzähler starten
+            self.zaehler_count += 1
+            zaehler_type = 'hauptzaehler' if 'CHINV' in col_a.upper() else 'virtueller_zaehler'
+            
+            # Code und Name aus nächster Zeile
+            code_und_name = ''
+            if next_row is not None:
+                code_und_name = str(next_row[0]).strip() if len(next_row) > 0 else ''
+            
+            if trace.enabled:
+                trace.record(idx, col_a, 'zaehler', type=zaehler_type,
+                             code_und_name=code_und_name, month_columns=current_month_columns)
+            
+            self.current_zaehler = {
+                'id': col_a,
+                'type': zaehler_type,
+                'code_und_name': code_und_name,
+                'messpunkte_count': 0,
+                'messpunkte_names': [],
+                'messpunkte_details': [],
+                'month_columns': current_month_columns,
+                'parent_id': None  # Hauptzähler haben keinen Parent
+            }
+        
+        # Unterzähler in Spalte B erkennen (nur im Unterzähler-Modus)
+        elif self.in_submeter_section and col_b and ('CHINV' in col_b.upper() or col_b.startswith('XX')):
+            # Vorherigen Zähler abschließen
+            completed = self.current_zaehler
+            
+            # Monats-Header aus derselben Zeile extrahieren (Spalten E-P)
+            current_month_columns = []
+            for col_idx in range(4, min(16, len(row))):  # Spalten E-P (4-15)
+                if col_idx < len(row):
+                    month_name = str(row[col_idx]).strip()
+                    if month_name in self.month_names:
+                        current_month_columns.append(month_name)
+            
+            # Neuen Unterzähler starten
+            self.zaehler_count += 1
+            zaehler_type = 'unterzaehler' if 'CHINV' in col_b.upper() else 'virtueller_unterzaehler'
+            
+            # Code und Name aus nächster Zeile (Spalte B)
+            code_und_name = ''
+            if next_row is not None:
+                code_und_name = str(next_row[1]).strip() if len(next_row) > 1 else ''
+            
+            if trace.enabled:
+                trace.record(idx, col_b, 'zaehler', type=zaehler_type,
+                             code_und_name=code_und_name, month_columns=current_month_columns)
+            
+            self.current_zaehler = {
+                'id': col_b,
+                'type': zaehler_type,
+                'code_und_name': code_und_name,
+                'messpunkte_count': 0,
+                'messpunkte_names': [],
+                'messpunkte_details': [],
+                'month_columns': current_month_columns,
+                'parent_id': 'Hauptzähler'  # Unterzähler gehören zu Hauptzähler
+            }
+        
+        # Messpunkte erkennen (nach Zähler-ID)
+        elif self.current_zaehler and not col_a.startswith('Untermessungen'):
+            # Für Unterzähler: Messpunkte können in verschiedenen Spalten stehen
+            messpunkt_candidates = []
+            
+            # Für Unterzähler: Messpunkte stehen hauptsächlich in Spalte B
+            if self.current_zaehler['type'] == 'unterzaehler':
+                if col_b and col_b != self.current_zaehler['code_und_name']:
+                    messpunkt_candidates.append(('B', col_b))
+                # Auch Spalte A prüfen, falls dort Messpunkte stehen
+                if col_a and col_a != self.current_zaehler['code_und_name']:
+                    messpunkt_candidates.append(('A', col_a))
+            else:
+                # Für Hauptzähler: Messpunkte stehen in Spalte A
+                if col_a and col_a != self.current_zaehler['code_und_name']:
+                    messpunkt_candidates.append(('A', col_a))
+            
+            # Für jeden Kandidaten prüfen
+            for col_letter, messpunkt_text in messpunkt_candidates:
+                is_messpunkt = (
+                    '[kWh]' in messpunkt_text or  # Standard kWh-Messpunkte
+                    ('Bezug' in messpunkt_text and ('Netz' in messpunkt_text or 'lokal' in messpunkt_text)) or  # Bezug-Messpunkte
+                    'Messung' in messpunkt_text or  # Messung-Messpunkte
+                    ('Verbrauch' in messpunkt_text or 'Leistung' in messpunkt_text) or  # Andere Verbrauchs-Messpunkte
+                    (self.current_zaehler['type'].startswith('virtuell') and len(messpunkt_text) > 5)  # Virtuelle Zähler: alles außer kurzen Titeln
+                )
+                
+                if trace.enabled:
+                    trace.record(idx, self.current_zaehler['id'],
+                                 'messpunkt' if is_messpunkt else 'kein_messpunkt',
+                                 column=col_letter, text=messpunkt_text)
+                
+                if is_messpunkt:
+                    messpunkt_name = messpunkt_text
+                    self.current_zaehler['messpunkte_names'].append(messpunkt_name)
+                    self.current_zaehler['messpunkte_count'] += 1
+                    self.total_messpunkte += 1
+                    
+                    # Werte aus Monats-Spalten extrahieren
+                    messpunkt_values = {}
+                    if self.current_zaehler['month_columns']:
+                        for i, month_name in enumerate(self.current_zaehler['month_columns']):
+                            col_idx = 4 + i  # E=4, F=5, etc.
+                            if col_idx < len(row):
+                                value = row[col_idx]
+                                if pd.notna(value) and str(value).strip() != '':
+                                    try:
+                                        messpunkt_values[month_name] = float(value)
+                                    except (ValueError, TypeError):
+                                        messpunkt_values[month_name] = str(value)
+                                else:
+                                    messpunkt_values[month_name] = 0.0
+                    elif trace.enabled:
+                        trace.record(idx, self.current_zaehler['id'], 'keine_monatsspalten', text=messpunkt_name)
+                    
+                    messpunkt_detail = {
+                        'name': messpunkt_name,
+                        'values': messpunkt_values
+                    }
+                    self.current_zaehler['messpunkte_details'].append(messpunkt_detail)
+        
+        return completed
+    
+    def _current_id(self) -> Optional[str]:
+        """ID des offenen Zählers (für das Tracing)"""
+        return self.current_zaehler['id'] if self.current_zaehler else None
+    
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """Schliesst den letzten offenen Zähler ab"""
+        completed = self.current_zaehler
+        self.current_zaehler = None
+        return completed
+
 
 class SimpleZEVParser:
     """Einfacher ZEV-Parser ohne NaN-Probleme"""
     
-    def __init__(self):
-        self.month_names = [
-            "Januar", "Februar", "März", "April", "Mai", "Juni",
-            "Juli", "August", "September", "Oktober", "November", "Dezember"
-        ]
+    def __init__(self, engine: str = 'iterrows'):
+        """
+        Args:
+            engine (str): 'iterrows' (zeilenweise Referenz), 'vectorized'
+                (spaltenweise Masken, für grosse Jahresexporte) oder 'streaming'
+                (openpyxl read-only, konstanter Speicherbedarf)
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unbekannte Parser-Engine: {engine} (erlaubt: {', '.join(ENGINES)})")
+        
+        self.engine = engine
+        self.month_names = list(MONTH_NAMES)
     
-    def parse_zev_file(self, file_path: str) -> Dict[str, Any]:
-        """Parst ZEV-Datei und gibt garantiert JSON-sichere Daten zurück"""
+    def parse_zev_file(self, file_path: str, trace: bool = False,
+                       progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Parst ZEV-Datei und gibt garantiert JSON-sichere Daten zurück
         
-        print(f"🔍 SimpleZEVParser: Parse {Path(file_path).name}")
+        Args:
+            file_path (str): Pfad zur ZEV-Datei
+            trace (bool): Entscheidungen pro Zeile sammeln und als
+                'diagnostics' ins Ergebnis schreiben
+            progress (Callable): Erhält regelmässig {'rows_scanned', 'total_rows',
+                'zaehler_found'} (zeilenweise Engines alle PROGRESS_INTERVAL Zeilen,
+                'vectorized' nach dem Einlesen und am Ende; total_rows ist bei
+                'streaming' None)
+            
+        Returns:
+            Dict[str, Any]: Parser-Ergebnis
+        """
+        
+        logger.info("SimpleZEVParser: Parse %s", Path(file_path).name)
+        parse_trace = ParseTrace(logger, collect=trace)
         
         try:
-            # Excel laden
-            df = pd.read_excel(file_path, header=None)
-            df = df.fillna('')  # Alle NaN zu leeren Strings
-            
             result = {
                 'file_name': Path(file_path).name,
                 'structure_verified': True,
@@ -45,180 +283,25 @@ class SimpleZEVParser:
                 'zaehler_overview': []
             }
             
-            # Dynamische Zähler-Suche: Hauptzähler (Spalte A) und Unterzähler (Spalte B)
-            zaehler_count = 0
-            total_messpunkte = 0
-            current_zaehler = None
-            month_columns = []  # Monats-Spalten sammeln
-            in_submeter_section = False  # Flag für Unterzähler-Bereich
-            
-            for idx, row in df.iterrows():
-                col_a = str(row[0]).strip() if len(row) > 0 else ''
-                col_b = str(row[1]).strip() if len(row) > 1 else ''
-                col_c = str(row[2]).strip() if len(row) > 2 else ''
-                
-                # Debug: Zeige alle Zeilen mit Unterzähler-Context
-                if current_zaehler and current_zaehler['type'] == 'unterzaehler':
-                    print(f"🔍 DEBUG Alle Zeilen (Unterzähler): Zeile {idx}: col_a='{col_a}', col_b='{col_b}', current_zaehler={current_zaehler['id']}")
-                
-                # Debug: Zeige alle Zeilen mit potentiellen Zähler-IDs
-                if col_a.startswith('XX') or 'CHINV' in col_a.upper():
-                    print(f"🔍 DEBUG Zeile {idx}: col_a='{col_a}', col_b='{col_b}', in_submeter={in_submeter_section}")
-                
-                # "Untermessungen" Header erkennen -> Unterzähler-Bereich starten
-                if 'Untermessungen' in col_a or 'Untermessungen' in col_b or 'Untermessungen' in col_c:
-                    in_submeter_section = True
-                    print(f"🔄 DEBUG Starte Unterzähler-Modus in Zeile {idx}")
-                    continue  # Header überspringen
-                
-                # Zähler-ID in Spalte A erkannt -> Beendet Unterzähler-Modus und startet neuen Hauptzähler
-                if col_a and ('CHINV' in col_a.upper() or col_a.startswith('XX')):
-                    # Vorherigen Zähler abschließen
-                    if current_zaehler:
-                        result['zaehler_overview'].append(current_zaehler)
-                    
-                    # Unterzähler-Modus beenden (neuer Hauptzähler gefunden)
-                    if in_submeter_section:
-                        in_submeter_section = False
-                        print(f"🔄 DEBUG Beende Unterzähler-Modus in Zeile {idx}")
-                    
-                    # Monats-Header aus derselben Zeile extrahieren (Spalten E-P)
-                    current_month_columns = []
-                    for col_idx in range(4, min(16, len(row))):  # Spalten E-P (4-15)
-                        if col_idx < len(row):
-                            month_name = str(row[col_idx]).strip()
-                            if month_name in self.month_names:
-                                current_month_columns.append(month_name)
-                    
-                    # Monats-Spalten für alle Zähler sammeln
-                    if current_month_columns and not month_columns:
-                        month_columns = current_month_columns
-                        result['structure_info']['month_columns'] = month_columns
-                    
-                    # Neuen Hauptzähler starten
-                    zaehler_count += 1
-                    zaehler_type = 'hauptzaehler' if 'CHINV' in col_a.upper() else 'virtueller_zaehler'
-                    
-                    # Code und Name aus nächster Zeile
-                    code_und_name = ''
-                    if idx + 1 < len(df):
-                        code_und_name = str(df.iloc[idx + 1, 0]).strip() if len(df.iloc[idx + 1]) > 0 else ''
-                    
-                    print(f"✅ DEBUG Erstelle Hauptzähler: {zaehler_type} - {col_a} - {code_und_name}")
-                    
-                    current_zaehler = {
-                        'id': col_a,
-                        'type': zaehler_type,
-                        'code_und_name': code_und_name,
-                        'messpunkte_count': 0,
-                        'messpunkte_names': [],
-                        'messpunkte_details': [],
-                        'month_columns': current_month_columns,
-                        'parent_id': None  # Hauptzähler haben keinen Parent
-                    }
+            # Zähler und Messpunkte mit der gewählten Engine extrahieren
+            if self.engine == 'streaming':
+                total_messpunkte = self._parse_streaming(file_path, result, parse_trace, progress)
+            else:
+                # Excel laden
+                df = pd.read_excel(file_path, header=None)
+                df = df.fillna('')  # Alle NaN zu leeren Strings
+                if progress is not None:
+                    progress({'rows_scanned': 0, 'total_rows': len(df), 'zaehler_found': 0})
                 
-                # Unterzähler in Spalte B erkennen (nur im Unterzähler-Modus)
-                elif in_submeter_section and col_b and ('CHINV' in col_b.upper() or col_b.startswith('XX')):
-                    # Vorherigen Zähler abschließen
-                    if current_zaehler:
-                        result['zaehler_overview'].append(current_zaehler)
-                    
-                    # Monats-Header aus derselben Zeile extrahieren (Spalten E-P)
-                    current_month_columns = []
-                    for col_idx in range(4, min(16, len(row))):  # Spalten E-P (4-15)
-                        if col_idx < len(row):
-                            month_name = str(row[col_idx]).strip()
-                            if month_name in self.month_names:
-                                current_month_columns.append(month_name)
-                    
-                    print(f"🔍 DEBUG Unterzähler Monats-Header: {current_month_columns}")
-                    
-                    # Neuen Unterzähler starten
-                    zaehler_count += 1
-                    zaehler_type = 'unterzaehler' if 'CHINV' in col_b.upper() else 'virtueller_unterzaehler'
-                    
-                    # Code und Name aus nächster Zeile (Spalte B)
-                    code_und_name = ''
-                    if idx + 1 < len(df):
-                        code_und_name = str(df.iloc[idx + 1, 1]).strip() if len(df.iloc[idx + 1]) > 1 else ''
-                    
-                    print(f"✅ DEBUG Erstelle Unterzähler: {zaehler_type} - {col_b} - {code_und_name}")
-                    
-                    current_zaehler = {
-                        'id': col_b,
-                        'type': zaehler_type,
-                        'code_und_name': code_und_name,
-                        'messpunkte_count': 0,
-                        'messpunkte_names': [],
-                        'messpunkte_details': [],
-                        'month_columns': current_month_columns,
-                        'parent_id': 'Hauptzähler'  # Unterzähler gehören zu Hauptzähler
-                    }
-                
-                # Messpunkte erkennen (nach Zähler-ID)
-                elif current_zaehler and not col_a.startswith('Untermessungen'):
-                    # Für Unterzähler: Messpunkte können in verschiedenen Spalten stehen
-                    messpunkt_candidates = []
-                    
-                    # Für Unterzähler: Messpunkte stehen hauptsächlich in Spalte B
-                    if current_zaehler['type'] == 'unterzaehler':
-                        if col_b and col_b != current_zaehler['code_und_name']:
-                            messpunkt_candidates.append(('B', col_b))
-                        # Auch Spalte A prüfen, falls dort Messpunkte stehen
-                        if col_a and col_a != current_zaehler['code_und_name']:
-                            messpunkt_candidates.append(('A', col_a))
-                    else:
-                        # Für Hauptzähler: Messpunkte stehen in Spalte A
-                        if col_a and col_a != current_zaehler['code_und_name']:
-                            messpunkt_candidates.append(('A', col_a))
-                    
-                    # Für jeden Kandidaten prüfen
-                    for col_letter, messpunkt_text in messpunkt_candidates:
-                        is_messpunkt = (
-                            '[kWh]' in messpunkt_text or  # Standard kWh-Messpunkte
-                            ('Bezug' in messpunkt_text and ('Netz' in messpunkt_text or 'lokal' in messpunkt_text)) or  # Bezug-Messpunkte
-                            'Messung' in messpunkt_text or  # Messung-Messpunkte
-                            ('Verbrauch' in messpunkt_text or 'Leistung' in messpunkt_text) or  # Andere Verbrauchs-Messpunkte
-                            (current_zaehler['type'].startswith('virtuell') and len(messpunkt_text) > 5)  # Virtuelle Zähler: alles außer kurzen Titeln
-                        )
-                        
-                        # Debug: Zeige Messpunkt-Erkennung
-                        print(f"🔍 DEBUG Messpunkt-Prüfung ({col_letter}): '{messpunkt_text}' -> is_messpunkt={is_messpunkt} (Zähler: {current_zaehler['id']})")
-                        
-                        if is_messpunkt:
-                            messpunkt_name = messpunkt_text
-                            current_zaehler['messpunkte_names'].append(messpunkt_name)
-                            current_zaehler['messpunkte_count'] += 1
-                            total_messpunkte += 1
-                            
-                            # Werte aus Monats-Spalten extrahieren
-                            messpunkt_values = {}
-                            if current_zaehler['month_columns']:
-                                for i, month_name in enumerate(current_zaehler['month_columns']):
-                                    col_idx = 4 + i  # E=4, F=5, etc.
-                                    if col_idx < len(row):
-                                        value = row[col_idx]
-                                        if pd.notna(value) and str(value).strip() != '':
-                                            try:
-                                                messpunkt_values[month_name] = float(value)
-                                            except (ValueError, TypeError):
-                                                messpunkt_values[month_name] = str(value)
-                                        else:
-                                            messpunkt_values[month_name] = 0.0
-                                
-                                print(f"🔍 DEBUG Messpunkt '{messpunkt_name}' Werte: {messpunkt_values}")
-                            else:
-                                print(f"⚠️ DEBUG Messpunkt '{messpunkt_name}' hat keine Monats-Spalten!")
-                            
-                            messpunkt_detail = {
-                                'name': messpunkt_name,
-                                'values': messpunkt_values
-                            }
-                            current_zaehler['messpunkte_details'].append(messpunkt_detail)
-            
-            # Letzten Zähler hinzufügen
-            if current_zaehler:
-                result['zaehler_overview'].append(current_zaehler)
+                # Die Masken der vektorisierten Engine kennen keine Einzelentscheidungen,
+                # Trace-Läufe gehen deshalb über die Zustandsmaschine
+                if self.engine == 'vectorized' and not parse_trace.enabled:
+                    total_messpunkte = self._parse_vectorized(df, result)
+                    if progress is not None:
+                        progress({'rows_scanned': len(df), 'total_rows': len(df),
+                                  'zaehler_found': len(result['zaehler_overview'])})
+                else:
+                    total_messpunkte = self._parse_iterrows(df, result, parse_trace, progress)
             
             # Zusammenfassung aktualisieren
             result['summary']['total_zaehler'] = len(result['zaehler_overview'])
@@ -233,25 +316,362 @@ class SimpleZEVParser:
                 elif zaehler['type'].startswith('virtuell'):
                     result['summary']['virtuelle_zaehler'] += 1
             
-            print(f"✅ SimpleZEVParser: {len(result['zaehler_overview'])} Zähler, {total_messpunkte} Messpunkte gefunden")
+            logger.info("SimpleZEVParser: %d Zähler, %d Messpunkte gefunden",
+                        len(result['zaehler_overview']), total_messpunkte)
+            
+            if trace:
+                result['diagnostics'] = parse_trace.report()
             
             # JSON-Test
             try:
                 json.dumps(result)
-                print("✅ SimpleZEVParser: JSON-Test erfolgreich")
             except Exception as json_error:
-                print(f"❌ SimpleZEVParser: JSON-Fehler: {json_error}")
+                logger.error("SimpleZEVParser: JSON-Fehler: %s", json_error)
                 result['structure_verified'] = False
                 result['structure_info']['errors'].append(f"JSON-Serialisierung fehlgeschlagen: {json_error}")
             
             return result
             
         except Exception as e:
-            print(f"❌ SimpleZEVParser: Fehler: {e}")
+            logger.error("SimpleZEVParser: Fehler: %s", e)
             return {
                 'file_name': Path(file_path).name,
                 'structure_verified': False,
                 'structure_info': {'errors': [str(e)], 'warnings': []},
                 'summary': {'total_zaehler': 0, 'total_messpunkte': 0},
                 'zaehler_overview': []
-            }
\ No newline at end of file
+            }
+    
+    def parse_zev_columns(self, file_path: str) -> ZEVColumns:
+        """
+        Parst eine ZEV-Datei in Spaltenform (float64-Matrix Messpunkte × Monate)
+        
+        Die Spaltenform entsteht direkt aus dem Monatsblock der vektorisierten
+        Engine, unabhängig von der gewählten Engine und ohne Umweg über
+        'zaehler_overview'.
+        
+        Args:
+            file_path (str): Pfad zur ZEV-Datei
+            
+        Returns:
+            ZEVColumns: Messwerte mit parallelen Zähler-/Messpunkt-Arrays
+            
+        Raises:
+            ValueError: Wenn die Datei nicht geparst werden konnte
+        """
+        try:
+            df = pd.read_excel(file_path, header=None)
+            columns, _ = self._vectorized_columns(df.fillna(''))
+        except Exception as e:
+            raise ValueError(f"ZEV-Datei konnte nicht geparst werden: {e}") from e
+        
+        return columns
+    
+    def _parse_iterrows(self, df: pd.DataFrame, result: Dict[str, Any],
+                        trace: Optional[ParseTrace] = None,
+                        progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> int:
+        """Zeilenweise Zustandsmaschine über den DataFrame (Referenz-Engine)"""
+        machine = ZEVStateMachine(self.month_names, trace)
+        total_rows = len(df)
+        
+        for position, ((idx, row), following) in enumerate(with_lookahead(df.iterrows())):
+            next_row = following[1] if following is not None else None
+            completed = machine.feed(idx, row, next_row)
+            if completed:
+                result['zaehler_overview'].append(completed)
+            if progress is not None and position % PROGRESS_INTERVAL == 0:
+                progress({'rows_scanned': position, 'total_rows': total_rows,
+                          'zaehler_found': len(result['zaehler_overview'])})
+        
+        total_messpunkte = self._finish(machine, result)
+        if progress is not None:
+            progress({'rows_scanned': total_rows, 'total_rows': total_rows,
+                      'zaehler_found': len(result['zaehler_overview'])})
+        return total_messpunkte
+    
+    def _parse_streaming(self, file_path: str, result: Dict[str, Any],
+                         trace: Optional[ParseTrace] = None,
+                         progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> int:
+        """Zustandsmaschine direkt über openpyxl-Zeilen, ohne DataFrame"""
+        machine = ZEVStateMachine(self.month_names, trace)
+        rows_scanned = 0
+        
+        def counted(rows):
+            nonlocal rows_scanned
+            for row in rows:
+                if progress is not None and rows_scanned % PROGRESS_INTERVAL == 0:
+                    progress({'rows_scanned': rows_scanned, 'total_rows': None,
+                              'zaehler_found': len(result['zaehler_overview'])})
+                rows_scanned += 1
+                yield row
+        
+        for zaehler in self._stream_zaehler(machine, counted(iter_sheet_rows(file_path))):
+            result['zaehler_overview'].append(zaehler)
+        
+        total_messpunkte = self._finish(machine, result)
+        if progress is not None:
+            progress({'rows_scanned': rows_scanned, 'total_rows': rows_scanned,
+                      'zaehler_found': len(result['zaehler_overview'])})
+        return total_messpunkte
+    
+    def iter_zaehler(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """
+        Streamt die Zähler einer ZEV-Datei einzeln
+        
+        Jeder Zähler wird geliefert, sobald sein Block vollständig gelesen ist.
+        Der Speicherbedarf bleibt dabei unabhängig von der Dateigrösse konstant.
+        
+        Args:
+            file_path (str): Pfad zur ZEV-Datei
+            
+        Yields:
+            Dict[str, Any]: Zähler im Format von 'zaehler_overview'
+        """
+        machine = ZEVStateMachine(self.month_names)
+        yield from self._stream_zaehler(machine, iter_sheet_rows(file_path))
+    
+    @staticmethod
+    def _stream_zaehler(machine: 'ZEVStateMachine', rows: Iterable[Sequence[Any]]) -> Iterator[Dict[str, Any]]:
+        """Füttert die Zustandsmaschine zeilenweise und liefert fertige Zähler"""
+        for idx, (row, next_row) in enumerate(with_lookahead(rows)):
+            completed = machine.feed(idx, row, next_row)
+            if completed:
+                yield completed
+        
+        last = machine.finish()
+        if last:
+            yield last
+    
+    @staticmethod
+    def _finish(machine: 'ZEVStateMachine', result: Dict[str, Any]) -> int:
+        """Letzten Zähler übernehmen und Monats-Spalten ins Ergebnis schreiben"""
+        last = machine.finish()
+        if last:
+            result['zaehler_overview'].append(last)
+        
+        if machine.month_columns:
+            result['structure_info']['month_columns'] = machine.month_columns
+        
+        return machine.total_messpunkte
+    
+    def _parse_vectorized(self, df: pd.DataFrame, result: Dict[str, Any]) -> int:
+        """
+        Spaltenweise Engine mit identischer Ausgabe wie _parse_iterrows
+        
+        'zaehler_overview' wird aus der Spaltenform von _vectorized_columns abgeleitet.
+        """
+        columns, month_columns = self._vectorized_columns(df)
+        if month_columns:
+            result['structure_info']['month_columns'] = month_columns
+        
+        result['zaehler_overview'].extend(columns.to_zaehler_overview())
+        return len(columns)
+    
+    def _vectorized_columns(self, df: pd.DataFrame) -> Tuple[ZEVColumns, List[str]]:
+        """
+        Findet Zähler und Messpunkte über Masken und liefert sie in Spaltenform
+        
+        Statt jede Zeile einzeln zu prüfen, werden boolesche Masken über die
+        Spalten A-C gebildet (Zähler-IDs, "Untermessungen"-Abschnitte,
+        Messpunkte) und die Monatswerte als Block aus den Spalten E-P gelesen.
+        Python-Schleifen laufen nur noch über gefundene Zähler.
+        
+        Returns:
+            Tuple[ZEVColumns, List[str]]: Messwerte und Monats-Spalten des
+            ersten Hauptzählers (leer, wenn keiner Monats-Spalten hat)
+        """
+        n_rows, n_cols = df.shape
+        if n_rows == 0:
+            return ZEVColumns.empty(), []
+        
+        col_a = self._text_column(df, 0)
+        col_b = self._text_column(df, 1)
+        col_c = self._text_column(df, 2)
+        
+        # "Untermessungen"-Header (werden übersprungen)
+        is_unter = (
+            col_a.str.contains('Untermessungen', regex=False)
+            | col_b.str.contains('Untermessungen', regex=False)
+            | col_c.str.contains('Untermessungen', regex=False)
+        ).to_numpy(dtype=bool)
+        
+        # Hauptzähler: Zähler-ID in Spalte A
+        is_main = ~is_unter & self._zaehler_id_mask(col_a)
+        
+        # Unterzähler-Bereich: startet bei "Untermessungen", endet beim nächsten Hauptzähler
+        section = np.full(n_rows, np.nan)
+        section[is_unter] = 1.0
+        section[is_main] = 0.0
+        in_section = pd.Series(section).ffill().fillna(0.0).to_numpy() == 1.0
+        
+        # Unterzähler: Zähler-ID in Spalte B, nur im Unterzähler-Bereich
+        is_sub = ~is_unter & ~is_main & in_section & self._zaehler_id_mask(col_b)
+        is_meter = is_main | is_sub
+        
+        text_a = col_a.to_numpy(dtype=object)
+        text_b = col_b.to_numpy(dtype=object)
+        
+        # Monats-Header aller Zählerzeilen auf einmal extrahieren (Spalten E-P)
+        meter_rows = np.flatnonzero(is_meter)
+        month_block = df.iloc[meter_rows, 4:min(16, n_cols)]
+        month_text = np.char.strip(month_block.to_numpy(dtype=str)) if month_block.size else np.empty((len(meter_rows), 0), dtype=str)
+        month_hits = np.isin(month_text, self.month_names)
+        
+        zaehler_ids, zaehler_types, zaehler_codes, zaehler_parents, zaehler_months = [], [], [], [], []
+        month_columns = []
+        for pos, row_idx in enumerate(meter_rows):
+            current_month_columns = month_text[pos][month_hits[pos]].tolist()
+            next_row = row_idx + 1 if row_idx + 1 < n_rows else None
+            
+            if is_main[row_idx]:
+                zaehler_id = text_a[row_idx]
+                zaehler_type = 'hauptzaehler' if 'CHINV' in zaehler_id.upper() else 'virtueller_zaehler'
+                code_und_name = text_a[next_row] if next_row is not None else ''
+                parent_id = None
+                
+                if current_month_columns and not month_columns:
+                    month_columns = current_month_columns
+            else:
+                zaehler_id = text_b[row_idx]
+                zaehler_type = 'unterzaehler' if 'CHINV' in zaehler_id.upper() else 'virtueller_unterzaehler'
+                code_und_name = text_b[next_row] if next_row is not None and n_cols > 1 else ''
+                parent_id = 'Hauptzähler'
+            
+            zaehler_ids.append(zaehler_id)
+            zaehler_types.append(zaehler_type)
+            zaehler_codes.append(code_und_name)
+            zaehler_parents.append(parent_id)
+            zaehler_months.append(current_month_columns)
+        
+        if not zaehler_ids:
+            return ZEVColumns.empty(), month_columns
+        
+        # Jede Zeile dem zuletzt gestarteten Zähler zuordnen
+        owner = np.cumsum(is_meter) - 1
+        candidate = ~is_unter & ~is_meter & (owner >= 0)
+        owner_safe = np.where(owner >= 0, owner, 0)
+        
+        meter_types = np.array(zaehler_types, dtype=object)[owner_safe]
+        meter_codes = np.array(zaehler_codes, dtype=object)[owner_safe]
+        is_virtual = pd.Series(meter_types).str.startswith('virtuell').to_numpy(dtype=bool)
+        
+        mask_a = candidate & (text_a != '') & (text_a != meter_codes) & self._messpunkt_mask(col_a, is_virtual)
+        mask_b = (
+            candidate & (meter_types == 'unterzaehler')
+            & (text_b != '') & (text_b != meter_codes) & self._messpunkt_mask(col_b, is_virtual)
+        )
+        
+        # Treffer in Zeilenreihenfolge, pro Zeile zuerst Spalte B, dann Spalte A
+        rows_b = np.flatnonzero(mask_b)
+        rows_a = np.flatnonzero(mask_a)
+        hit_rows = np.concatenate([rows_b, rows_a])
+        hit_cols = np.concatenate([np.zeros(len(rows_b), dtype=int), np.ones(len(rows_a), dtype=int)])
+        order = np.lexsort((hit_cols, hit_rows))
+        hit_rows = hit_rows[order]
+        hit_cols = hit_cols[order]
+        
+        zaehler_index = owner[hit_rows].astype(np.intp)
+        messpunkt_name = np.where(hit_cols == 0, text_b[hit_rows], text_a[hit_rows]).astype(object)
+        
+        # Monatsblock der Messpunkt-Zeilen auf die Monatsachse der Matrix verteilen:
+        # Spalte j eines Zählers gehört zum Monat an Position j seiner Monats-Spalten
+        unique_rows = np.unique(hit_rows)
+        block, block_text = self._month_values(df, unique_rows)
+        block_pos = np.searchsorted(unique_rows, hit_rows)
+        
+        month_pos = {month: i for i, month in enumerate(MONTH_NAMES)}
+        target = np.full((len(zaehler_ids), block.shape[1]), -1, dtype=np.intp)
+        for z_idx, months in enumerate(zaehler_months):
+            for j, month in enumerate(months[:block.shape[1]]):
+                target[z_idx, j] = month_pos[month]
+        
+        point_target = target[zaehler_index]
+        points, cols = np.nonzero(point_target >= 0)
+        values = np.full((len(hit_rows), len(MONTH_NAMES)), np.nan)
+        values[points, point_target[points, cols]] = block[block_pos[points], cols]
+        
+        text_values = {}
+        if block_text:
+            row_points = {}
+            for point, pos in enumerate(block_pos.tolist()):
+                row_points.setdefault(pos, []).append(point)
+            for (pos, j), text in block_text.items():
+                for point in row_points[pos]:
+                    col = point_target[point, j]
+                    if col >= 0:
+                        text_values[(point, int(col))] = text
+        
+        columns = ZEVColumns(
+            values=values,
+            zaehler_index=zaehler_index,
+            messpunkt_name=messpunkt_name,
+            zaehler_ids=zaehler_ids,
+            zaehler_types=zaehler_types,
+            zaehler_codes=zaehler_codes,
+            zaehler_parents=zaehler_parents,
+            zaehler_months=zaehler_months,
+            text_values=text_values
+        )
+        return columns, month_columns
+    
+    @staticmethod
+    def _text_column(df: pd.DataFrame, col_idx: int) -> pd.Series:
+        """Spalte als getrimmte Strings (wie str(...).strip() pro Zelle)"""
+        if col_idx >= df.shape[1]:
+            return pd.Series([''] * len(df), dtype=object)
+        
+        column = df.iloc[:, col_idx].reset_index(drop=True)
+        return column.astype(object).astype(str).str.strip()
+    
+    @staticmethod
+    def _zaehler_id_mask(text: pd.Series) -> np.ndarray:
+        """Zeilen mit Zähler-ID (CHINV... oder virtuell XX...)"""
+        return (
+            (text != '')
+            & (text.str.upper().str.contains('CHINV', regex=False) | text.str.startswith('XX'))
+        ).to_numpy(dtype=bool)
+    
+    @staticmethod
+    def _messpunkt_mask(text: pd.Series, is_virtual: np.ndarray) -> np.ndarray:
+        """Messpunkt-Erkennung als Maske (gleiche Regeln wie die Zeilen-Engine)"""
+        def has(token):
+            return text.str.contains(token, regex=False).to_numpy(dtype=bool)
+        
+        return (
+            has('[kWh]')
+            | (has('Bezug') & (has('Netz') | has('lokal')))
+            | has('Messung')
+            | has('Verbrauch') | has('Leistung')
+            | (is_virtual & (text.str.len().to_numpy() > 5))
+        )
+    
+    @staticmethod
+    def _month_values(df: pd.DataFrame, rows: np.ndarray) -> Tuple[np.ndarray, Dict[Tuple[int, int], str]]:
+        """
+        Liest die Monatswerte (Spalten E-P) aller Messpunkt-Zeilen als Block
+        
+        Returns:
+            Tuple: float64-Block (Zeilen × Spalten, leere Zellen 0.0, Text NaN)
+            und Texte nicht-numerischer Zellen als {(Blockzeile, Spalte): Text}
+        """
+        block = df.iloc[rows, 4:16]
+        if block.shape[1] == 0:
+            return np.empty((len(rows), 0)), {}
+        
+        numeric = block.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        raw = block.to_numpy(dtype=object)
+        text = np.char.strip(block.to_numpy(dtype=str))
+        
+        values = np.where(np.isnan(numeric), 0.0, numeric)
+        texts = {}
+        
+        # Seltene Nicht-Zahlen (Text, Datum) zellenweise wie die Referenz-Engine behandeln
+        for i, j in zip(*np.nonzero(np.isnan(numeric) & (text != ''))):
+            value = raw[i, j]
+            try:
+                values[i, j] = float(value)
+            except (ValueError, TypeError):
+                values[i, j] = np.nan
+                texts[(int(i), int(j))] = str(value)
+        
+        return values, texts
@@ -5,6 +5,7 @@ Erkennt automatisch die Struktur und passt die Einlesemethode an
 
 import pandas as pd
 import numpy as np
+from pandas.io.parsers import TextParser
 from pathlib import Path
 import logging
 from typing import Dict, List, Any, Tuple, Optional
@@ -41,38 +42,87 @@ class SmartExcelReader:
         Returns:
             Dict: Struktur-Analyse mit Empfehlungen
         """
+        analysis, _ = self._analyze_with_frames(file_path)
+        return analysis
+    
+    def _analyze_with_frames(self, file_path: str) -> Tuple[Dict[str, Any], Dict[str, pd.DataFrame]]:
+        """
+        Struktur-Analyse, die zusätzlich den DataFrame der besten Lesart pro Sheet liefert
+        
+        Returns:
+            Tuple: (Struktur-Analyse, {Sheet-Name: DataFrame der empfohlenen Lesart})
+        """
         logger.info(f"🔍 Analysiere Excel-Struktur: {file_path}")
         
         try:
-            excel_file = pd.ExcelFile(file_path)
-            analysis = {
-                'file_path': file_path,
-                'file_name': Path(file_path).name,
-                'sheets': excel_file.sheet_names,
-                'recommended_reading_method': None,
-                'structure_info': {},
-                'sample_data': {}
-            }
-            
-            # Jedes Sheet analysieren
-            for sheet_name in excel_file.sheet_names:
-                logger.info(f"📊 Analysiere Sheet: {sheet_name}")
-                sheet_analysis = self._analyze_sheet_structure(file_path, sheet_name)
-                analysis['structure_info'][sheet_name] = sheet_analysis
+            with pd.ExcelFile(file_path) as excel_file:
+                analysis = {
+                    'file_path': file_path,
+                    'file_name': Path(file_path).name,
+                    'sheets': excel_file.sheet_names,
+                    'recommended_reading_method': None,
+                    'recommended_sheet': None,
+                    'structure_info': {},
+                    'sample_data': {}
+                }
+                frames = {}
                 
-                # Empfehlung für beste Lesart
-                if sheet_analysis['recommended_method']:
-                    analysis['recommended_reading_method'] = sheet_analysis['recommended_method']
-                    analysis['sample_data'][sheet_name] = sheet_analysis['sample_data']
+                # Jedes Sheet analysieren (einmal lesen, Header-Zeilen im Speicher prüfen)
+                for sheet_name in excel_file.sheet_names:
+                    logger.info(f"📊 Analysiere Sheet: {sheet_name}")
+                    raw_rows = self._read_raw_rows(excel_file, sheet_name)
+                    sheet_analysis, best_frame = self._analyze_sheet_structure(raw_rows, sheet_name)
+                    analysis['structure_info'][sheet_name] = sheet_analysis
+                    
+                    # Empfehlung für beste Lesart
+                    if sheet_analysis['recommended_method']:
+                        analysis['recommended_reading_method'] = sheet_analysis['recommended_method']
+                        analysis['recommended_sheet'] = sheet_name
+                        analysis['sample_data'][sheet_name] = sheet_analysis['sample_data']
+                        frames[sheet_name] = best_frame
             
             logger.info(f"✅ Struktur-Analyse abgeschlossen")
-            return analysis
+            return analysis, frames
             
         except Exception as e:
             logger.error(f"❌ Fehler bei der Struktur-Analyse: {str(e)}")
             raise ValueError(f"Fehler beim Analysieren der Excel-Struktur: {str(e)}")
     
-    def _analyze_sheet_structure(self, file_path: str, sheet_name: str) -> Dict[str, Any]:
+    @staticmethod
+    def _read_raw_rows(excel_file: pd.ExcelFile, sheet_name: str) -> List[List[Any]]:
+        """
+        Liest die Zellwerte eines Sheets einmal als Rohdaten
+        
+        Das sind dieselben Zeilen, die pd.read_excel intern an den TextParser
+        übergibt; jede Header-Variante lässt sich daraus ohne erneutes Lesen bilden.
+        
+        Der Reader ist pandas-intern (Signatur seit pandas 2.0, pandas ist in
+        requirements.txt begrenzt). Aufruf mit Keyword: eine geänderte Signatur
+        führt zum TypeError und damit zum Fallback statt zu falschen Werten.
+        """
+        reader = getattr(excel_file, '_reader', None)
+        if reader is not None:
+            try:
+                return reader.get_sheet_data(reader.get_sheet_by_name(sheet_name), file_rows_needed=None)
+            except (AttributeError, TypeError):
+                logger.warning("pandas-Reader ohne get_sheet_data(sheet, file_rows_needed), lese über parse()")
+        
+        # Fallback über die öffentliche API (leere Zellen wie dort als ''). Ungenau
+        # bei gemischten Bool-/Zahl-Spalten, pandas gleicht deren Typen vorab an
+        raw = excel_file.parse(sheet_name, header=None, dtype=object)
+        return raw.astype(object).where(raw.notna(), '').values.tolist()
+    
+    @staticmethod
+    def _frame_from_raw(raw_rows: List[List[Any]], header_row: Optional[int]) -> pd.DataFrame:
+        """Baut den DataFrame wie pd.read_excel(..., header=header_row) aus den Rohdaten"""
+        if not raw_rows:
+            return pd.DataFrame()
+        
+        # Zeilen kopieren: der Parser darf die gemeinsamen Rohdaten nicht verändern
+        parser = TextParser([list(row) for row in raw_rows], header=header_row, skip_blank_lines=False)
+        return parser.read()
+    
+    def _analyze_sheet_structure(self, raw_rows: List[List[Any]], sheet_name: str) -> Tuple[Dict[str, Any], Optional[pd.DataFrame]]:
         """Analysiert die Struktur eines einzelnen Sheets"""
         
         analysis = {
@@ -86,41 +136,49 @@ class SmartExcelReader:
             'column_mapping': {}
         }
         
-        # Verschiedene Lesarten testen
+        # Verschiedene Lesarten testen (alle aus denselben Rohdaten)
         reading_methods = []
+        frames = []
         
         # Methode 1: Standard-Lesen
         try:
-            df_standard = pd.read_excel(file_path, sheet_name=sheet_name)
+            df_standard = self._frame_from_raw(raw_rows, 0)
             method1 = self._evaluate_reading_method(df_standard, 'standard', 0)
             reading_methods.append(method1)
+            frames.append(df_standard)
         except Exception as e:
             reading_methods.append({'method': 'standard', 'error': str(e), 'score': 0})
+            frames.append(None)
         
         # Methode 2-10: Verschiedene Header-Zeilen
         for header_row in range(1, 11):
             try:
-                df_header = pd.read_excel(file_path, sheet_name=sheet_name, header=header_row)
+                df_header = self._frame_from_raw(raw_rows, header_row)
                 method = self._evaluate_reading_method(df_header, f'header_{header_row}', header_row)
                 reading_methods.append(method)
+                frames.append(df_header)
             except Exception:
                 continue
         
         # Methode 11: Ohne Header
         try:
-            df_no_header = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
+            df_no_header = self._frame_from_raw(raw_rows, None)
             method_no_header = self._evaluate_reading_method(df_no_header, 'no_header', None)
             reading_methods.append(method_no_header)
+            frames.append(df_no_header)
         except Exception as e:
             reading_methods.append({'method': 'no_header', 'error': str(e), 'score': 0})
+            frames.append(None)
         
         # Beste Methode auswählen
-        valid_methods = [m for m in reading_methods if 'error' not in m]
-        if valid_methods:
-            best_method = max(valid_methods, key=lambda x: x['score'])
+        best_frame = None
+        valid = [(m, df) for m, df in zip(reading_methods, frames) if 'error' not in m]
+        if valid:
+            best_method, best_frame = max(valid, key=lambda item: item[0]['score'])
             analysis.update(best_method)
+            analysis['recommended_method'] = best_method['method']
         
-        return analysis
+        return analysis, best_frame
     
     def _evaluate_reading_method(self, df: pd.DataFrame, method_name: str, header_row: Optional[int]) -> Dict[str, Any]:
         """Bewertet eine Lesart und gibt Score zurück"""
@@ -285,34 +343,21 @@ class SmartExcelReader:
             Dict: Gelesene Daten mit Metadaten
         """
         
-        # Struktur analysieren
-        structure_analysis = self.analyze_excel_structure(file_path)
+        # Struktur analysieren (liefert die DataFrames der besten Lesarten gleich mit)
+        structure_analysis, frames = self._analyze_with_frames(file_path)
         
         if not structure_analysis['recommended_reading_method']:
             raise ValueError("Keine geeignete Lesart gefunden")
         
-        recommended_method = structure_analysis['recommended_reading_method']
-        
-        # Mit empfohlener Methode lesen
-        for sheet_name, sheet_info in structure_analysis['structure_info'].items():
-            if sheet_info['method'] == recommended_method['method']:
-                
-                # DataFrame mit empfohlener Methode lesen
-                if recommended_method['method'] == 'no_header':
-                    df = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
-                elif recommended_method['method'].startswith('header_'):
-                    header_row = int(recommended_method['method'].split('_')[1])
-                    df = pd.read_excel(file_path, sheet_name=sheet_name, header=header_row)
-                else:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name)
-                
-                return {
-                    'success': True,
-                    'data': df,
-                    'structure_analysis': structure_analysis,
-                    'reading_method': recommended_method,
-                    'sheet_name': sheet_name
-                }
+        sheet_name = structure_analysis['recommended_sheet']
+        if sheet_name not in frames:
+            raise ValueError("Empfohlene Lesart konnte nicht angewendet werden")
         
-        raise ValueError("Empfohlene Lesart konnte nicht angewendet werden")
+        return {
+            'success': True,
+            'data': frames[sheet_name],
+            'structure_analysis': structure_analysis,
+            'reading_method': structure_analysis['structure_info'][sheet_name],
+            'sheet_name': sheet_name
+        }
 
@@ -0,0 +1,69 @@
+"""
+Streaming-Reader für Excel-Dateien
+Liest Tabellenblätter zeilenweise über openpyxl (read_only), ohne das ganze
+Blatt als DataFrame in den Speicher zu laden
+"""
+
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+import openpyxl
+
+# Zellinhalte, die pd.read_excel standardmässig als NaN liest
+NA_STRINGS = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None',
+    'n/a', 'nan', 'null'
+})
+
+
+def iter_sheet_rows(file_path: str, sheet_name: Optional[str] = None) -> Iterator[Tuple[Any, ...]]:
+    """
+    Liefert die Zeilen eines Tabellenblatts einzeln als Tupel
+
+    Leere Zellen und NA-Texte (siehe NA_STRINGS) werden wie bei
+    ``pd.read_excel(...).fillna('')`` als '' geliefert, alle Zeilen werden
+    auf die Blattbreite aufgefüllt.
+
+    Args:
+        file_path (str): Pfad zur Excel-Datei
+        sheet_name (Optional[str]): Tabellenblatt (None für das erste Blatt)
+
+    Yields:
+        Tuple[Any, ...]: Zellwerte einer Zeile
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        width = worksheet.max_column or 0
+
+        for values in worksheet.iter_rows(values_only=True):
+            row = tuple(
+                '' if value is None or (isinstance(value, str) and value in NA_STRINGS) else value
+                for value in values
+            )
+            if len(row) < width:
+                row += ('',) * (width - len(row))
+            yield row
+    finally:
+        # Read-only Workbooks halten den Datei-Handle offen
+        workbook.close()
+
+
+def with_lookahead(rows: Iterable[Any]) -> Iterator[Tuple[Any, Optional[Any]]]:
+    """
+    Liefert jedes Element zusammen mit seinem Nachfolger (None am Ende)
+
+    Der ZEV-Parser liest Code und Name eines Zählers aus der Folgezeile;
+    so bleibt dafür immer nur eine Zeile gepuffert.
+    """
+    iterator = iter(rows)
+    try:
+        current = next(iterator)
+    except StopIteration:
+        return
+
+    for following in iterator:
+        yield current, following
+        current = following
+
+    yield current, None
@@ -0,0 +1,106 @@
+"""
+Workbook-Session für Excel-Dateien
+Öffnet eine Excel-Datei genau einmal; Formatprüfung, Sheet-Liste und
+Sheet-Lesezugriffe laufen danach über denselben Handle
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls', '.xlsm', '.xlsb')
+
+
+class WorkbookSession:
+    """
+    Einmal geöffnete Excel-Datei
+
+    Verwendung::
+
+        with WorkbookSession(file_path) as session:
+            for sheet_name in session.sheet_names:
+                sample = session.read_sheet(sheet_name, nrows=5)
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Args:
+            file_path (str): Pfad zur Excel-Datei
+        """
+        self.file_path = str(file_path)
+        self._excel: Optional[pd.ExcelFile] = None
+        self._max_rows: Dict[str, Optional[int]] = {}
+
+    def open(self) -> 'WorkbookSession':
+        """
+        Öffnet die Datei und prüft dabei das Excel-Format
+
+        Raises:
+            FileNotFoundError: Wenn die Datei nicht existiert
+            ValueError: Wenn die Datei kein gültiges Excel-Format hat
+        """
+        if not Path(self.file_path).exists():
+            raise FileNotFoundError(f"Datei nicht gefunden: {self.file_path}")
+
+        if Path(self.file_path).suffix.lower() not in EXCEL_EXTENSIONS:
+            raise ValueError("File is not a valid Excel file")
+
+        try:
+            self._excel = pd.ExcelFile(self.file_path)
+        except Exception:
+            raise ValueError("File is not a valid Excel file")
+
+        # Blattgrössen jetzt merken: openpyxl (read_only) setzt die Dimensionen
+        # beim ersten Lesen eines Blatts zurück
+        book = self._excel.book
+        for sheet_name in self._excel.sheet_names:
+            worksheet = book[sheet_name] if hasattr(book, 'sheetnames') else None
+            self._max_rows[sheet_name] = getattr(worksheet, 'max_row', None)
+
+        return self
+
+    def close(self):
+        """Schliesst den Datei-Handle"""
+        if self._excel is not None:
+            self._excel.close()
+            self._excel = None
+
+    def __enter__(self) -> 'WorkbookSession':
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def sheet_names(self) -> List[str]:
+        """Namen aller Tabellenblätter"""
+        return list(self._excel.sheet_names)
+
+    def read_sheet(self, sheet_name: str, nrows: Optional[int] = None, **kwargs) -> pd.DataFrame:
+        """
+        Liest ein Tabellenblatt über den offenen Handle
+
+        Args:
+            sheet_name (str): Name des Tabellenblatts
+            nrows (Optional[int]): Nur die ersten nrows Datenzeilen lesen
+            **kwargs: Weitere Argumente für pd.ExcelFile.parse
+
+        Returns:
+            pd.DataFrame: Inhalt des Tabellenblatts
+        """
+        return self._excel.parse(sheet_name, nrows=nrows, **kwargs)
+
+    def estimated_row_count(self, sheet_name: str) -> Optional[int]:
+        """
+        Anzahl Datenzeilen aus der Blatt-Dimension (ohne das Blatt zu lesen)
+
+        Die Dimension kann leere, aber formatierte Zeilen am Ende mitzählen.
+
+        Returns:
+            Optional[int]: Zeilen ohne Kopfzeile oder None, wenn unbekannt
+        """
+        max_row = self._max_rows.get(sheet_name)
+        if max_row is None:
+            return None
+        return max(max_row - 1, 0)
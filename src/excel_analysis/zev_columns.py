@@ -0,0 +1,206 @@
+"""
+Spaltenweise Darstellung der ZEV-Messwerte
+Alle Messpunkte als float64-Matrix (Messpunkte × Monate) mit parallelen
+Arrays für Zähler und Messpunkt-Namen, für Aufteilung und Aggregation mit NumPy
+"""
+
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+MONTH_NAMES = (
+    "Januar", "Februar", "März", "April", "Mai", "Juni",
+    "Juli", "August", "September", "Oktober", "November", "Dezember"
+)
+
+# Monatsname -> Spalte der Matrix
+MONTH_POS = {month: i for i, month in enumerate(MONTH_NAMES)}
+
+
+class ZEVColumns:
+    """
+    Messwerte eines ZEV-Exports in Spaltenform
+
+    Attribute pro Messpunkt (Länge n):
+        values: float64-Matrix (n × 12), NaN für fehlende Monate
+        zaehler_id, zaehler_type, parent_id, messpunkt_name: object-Arrays
+
+    Attribute pro Zähler (Länge m, in Dateireihenfolge, auch ohne Messpunkte):
+        zaehler_ids, zaehler_types, zaehler_codes, zaehler_parents, zaehler_months
+
+    Die Messpunkte stehen in Dateireihenfolge, zaehler_index ist daher aufsteigend.
+
+    Nicht-numerische Zellen (z.B. 'k.A.') stehen als NaN in der Matrix und
+    im Originaltext in text_values, damit to_zaehler_overview() verlustfrei bleibt.
+    """
+
+    def __init__(self, values: np.ndarray, zaehler_index: np.ndarray, messpunkt_name: np.ndarray,
+                 zaehler_ids: List[str], zaehler_types: List[str], zaehler_codes: List[str],
+                 zaehler_parents: List[Any], zaehler_months: List[List[str]],
+                 text_values: Dict[Tuple[int, int], str] = None):
+        self.values = values
+        self.zaehler_index = zaehler_index
+        self.messpunkt_name = messpunkt_name
+        self.zaehler_ids = np.array(zaehler_ids, dtype=object)
+        self.zaehler_types = np.array(zaehler_types, dtype=object)
+        self.zaehler_codes = list(zaehler_codes)
+        self.zaehler_parents = np.array(zaehler_parents, dtype=object)
+        self.zaehler_months = [list(months) for months in zaehler_months]
+        self.text_values = text_values or {}
+
+    @property
+    def months(self) -> Tuple[str, ...]:
+        """Monatsachse der Matrix"""
+        return MONTH_NAMES
+
+    @property
+    def zaehler_id(self) -> np.ndarray:
+        """Zähler-ID pro Messpunkt"""
+        return self.zaehler_ids[self.zaehler_index]
+
+    @property
+    def zaehler_type(self) -> np.ndarray:
+        """Zähler-Typ pro Messpunkt"""
+        return self.zaehler_types[self.zaehler_index]
+
+    @property
+    def parent_id(self) -> np.ndarray:
+        """Parent-ID des Zählers pro Messpunkt"""
+        return self.zaehler_parents[self.zaehler_index]
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    @classmethod
+    def empty(cls) -> 'ZEVColumns':
+        """Spaltenform ohne Zähler und Messpunkte"""
+        return cls(
+            values=np.empty((0, len(MONTH_NAMES))),
+            zaehler_index=np.empty(0, dtype=np.intp),
+            messpunkt_name=np.empty(0, dtype=object),
+            zaehler_ids=[], zaehler_types=[], zaehler_codes=[], zaehler_parents=[], zaehler_months=[]
+        )
+
+    def messpunkte_of(self, z_idx: int) -> range:
+        """
+        Messpunkt-Positionen eines Zählers
+
+        Args:
+            z_idx (int): Position des Zählers in zaehler_ids
+
+        Returns:
+            range: Zeilen der Matrix, die zu diesem Zähler gehören
+        """
+        start, stop = np.searchsorted(self.zaehler_index, [z_idx, z_idx + 1])
+        return range(int(start), int(stop))
+
+    def messpunkt_values(self, point: int) -> Dict[str, Any]:
+        """
+        Monatswerte eines Messpunkts in der Form von 'messpunkte_details'
+
+        Enthält nur die Monats-Spalten seines Zählers; Text-Zellen erscheinen
+        im Originaltext.
+
+        Args:
+            point (int): Zeile der Matrix
+
+        Returns:
+            Dict[str, Any]: {Monat: Wert}
+        """
+        row = self.values[point].tolist()
+        point_values = {}
+        for month in self.zaehler_months[self.zaehler_index[point]]:
+            col = MONTH_POS[month]
+            text = self.text_values.get((point, col))
+            if text is not None:
+                point_values[month] = text
+            elif row[col] == row[col]:  # NaN: Monat ausserhalb der Datenspalten
+                point_values[month] = row[col]
+        return point_values
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any]) -> 'ZEVColumns':
+        """
+        Erstellt die Spaltenform aus einem fertigen Ergebnis von SimpleZEVParser
+
+        Für Ergebnisse der zeilenweisen Engines oder aus dem Cache; die
+        vektorisierte Engine erzeugt die Spaltenform direkt.
+
+        Args:
+            result (Dict[str, Any]): Ergebnis von parse_zev_file()
+
+        Returns:
+            ZEVColumns: Spaltenweise Messwerte
+        """
+        zaehler_list = result['zaehler_overview']
+
+        n_points = sum(len(z['messpunkte_details']) for z in zaehler_list)
+        values = np.full((n_points, len(MONTH_NAMES)), np.nan)
+        zaehler_index = np.empty(n_points, dtype=np.intp)
+        messpunkt_name = np.empty(n_points, dtype=object)
+        text_values = {}
+
+        point = 0
+        for z_idx, zaehler in enumerate(zaehler_list):
+            for detail in zaehler['messpunkte_details']:
+                zaehler_index[point] = z_idx
+                messpunkt_name[point] = detail['name']
+                for month, value in detail['values'].items():
+                    col = MONTH_POS[month]
+                    if isinstance(value, str):
+                        text_values[(point, col)] = value
+                    else:
+                        values[point, col] = value
+                point += 1
+
+        return cls(
+            values=values,
+            zaehler_index=zaehler_index,
+            messpunkt_name=messpunkt_name,
+            zaehler_ids=[z['id'] for z in zaehler_list],
+            zaehler_types=[z['type'] for z in zaehler_list],
+            zaehler_codes=[z['code_und_name'] for z in zaehler_list],
+            zaehler_parents=[z['parent_id'] for z in zaehler_list],
+            zaehler_months=[z['month_columns'] for z in zaehler_list],
+            text_values=text_values
+        )
+
+    def to_zaehler_overview(self) -> List[Dict[str, Any]]:
+        """
+        Erzeugt die 'zaehler_overview'-Struktur des Dashboards aus der Matrix
+
+        Returns:
+            List[Dict[str, Any]]: Zähler mit Messpunkten wie von parse_zev_file()
+        """
+        overview = []
+
+        for z_idx, zaehler_id in enumerate(self.zaehler_ids.tolist()):
+            overview.append({
+                'id': zaehler_id,
+                'type': self.zaehler_types[z_idx],
+                'code_und_name': self.zaehler_codes[z_idx],
+                'messpunkte_count': 0,
+                'messpunkte_names': [],
+                'messpunkte_details': [],
+                'month_columns': list(self.zaehler_months[z_idx]),
+                'parent_id': self.zaehler_parents[z_idx]
+            })
+
+        for point, (z_idx, name) in enumerate(zip(self.zaehler_index.tolist(), self.messpunkt_name.tolist())):
+            zaehler = overview[z_idx]
+            zaehler['messpunkte_names'].append(name)
+            zaehler['messpunkte_count'] += 1
+            zaehler['messpunkte_details'].append({'name': name, 'values': self.messpunkt_values(point)})
+
+        return overview
+
+    def totals_by_zaehler(self) -> np.ndarray:
+        """
+        Summiert die Messpunkte pro Zähler und Monat
+
+        Returns:
+            np.ndarray: Matrix (Zähler × 12), Zeilen in Reihenfolge von zaehler_ids
+        """
+        totals = np.zeros((len(self.zaehler_ids), len(MONTH_NAMES)))
+        np.add.at(totals, self.zaehler_index, np.nan_to_num(self.values))
+        return totals
@@ -0,0 +1,135 @@
+"""
+Generator für synthetische ZEV-Exporte
+Erzeugt Excel-Dateien im Layout des ZEV-Servers (Hauptzähler, Untermessungen,
+virtuelle Zähler) in beliebiger Grösse, z.B. für Benchmarks
+"""
+
+import random
+from pathlib import Path
+from typing import Any, Dict, List
+
+import openpyxl
+
+from .zev_columns import MONTH_NAMES
+
+# Messpunkt-Namen, die SimpleZEVParser als Messpunkte erkennt
+MESSPUNKT_NAMEN = (
+    'Bezug Netz [kWh]', 'Einspeisung [kWh]', 'Bezug lokal [kWh]',
+    'Messung Wärmepumpe', 'Verbrauch Allgemein', 'Leistung Spitze'
+)
+
+# Grösse des 1×-Exports (ein Mehrfamilienhaus)
+BASIS_KONFIGURATION = {
+    'hauptzaehler': 10,
+    'unterzaehler': 4,
+    'virtuelle_zaehler': 2,
+    'messpunkte': 3,
+    'monate': 12
+}
+
+
+def scaled_config(scale: int = 1) -> Dict[str, int]:
+    """
+    Konfiguration für einen um scale vergrösserten Export
+
+    Skaliert werden die Anzahl Haupt- und virtuelle Zähler, der Aufbau der
+    einzelnen Zählerblöcke bleibt gleich.
+    """
+    config = dict(BASIS_KONFIGURATION)
+    config['hauptzaehler'] *= scale
+    config['virtuelle_zaehler'] *= scale
+    return config
+
+
+def generate_zev_rows(hauptzaehler: int = 10, unterzaehler: int = 4, virtuelle_zaehler: int = 2,
+                      messpunkte: int = 3, monate: int = 12, seed: int = 0) -> List[List[Any]]:
+    """
+    Erzeugt die Zeilen eines ZEV-Exports
+
+    Args:
+        hauptzaehler (int): Anzahl Hauptzähler (CHINV-ID in Spalte A)
+        unterzaehler (int): Unterzähler pro Hauptzähler im Untermessungen-Block
+            (0 = kein Untermessungen-Block)
+        virtuelle_zaehler (int): Anzahl virtuelle Zähler (XX-ID in Spalte A)
+        messpunkte (int): Messpunkte pro Zähler
+        monate (int): Anzahl Monats-Spalten (1-12)
+        seed (int): Startwert für reproduzierbare Werte
+
+    Returns:
+        List[List[Any]]: Zeilen mit Spalten A-D und den Monats-Spalten ab E
+    """
+    if not 1 <= monate <= 12:
+        raise ValueError(f"monate muss zwischen 1 und 12 liegen, erhalten: {monate}")
+
+    rng = random.Random(seed)
+    months = list(MONTH_NAMES[:monate])
+    padding = ['', '', '']
+
+    def values():
+        return [round(rng.uniform(0, 500), 2) for _ in months]
+
+    def points(column):
+        rows = []
+        for p in range(messpunkte):
+            name = MESSPUNKT_NAMEN[p % len(MESSPUNKT_NAMEN)]
+            prefix = [''] * column
+            rows.append(prefix + [name] + [''] * (3 - column) + values())
+        return rows
+
+    rows = [['ZEV Synthetischer Export'], ['Leistungsberechnung Standard'], []]
+    meter_nr = 0
+
+    for h in range(hauptzaehler):
+        meter_nr += 1
+        rows.append([f'CHINV{meter_nr:028d}'] + padding + months)
+        rows.append([f'E{h + 1:02d} Hauptzähler Haus {h + 1}'])
+        rows.extend(points(0))
+        rows.append(['Bemerkung'])
+
+        if unterzaehler:
+            rows.append(['', 'Untermessungen'])
+            for u in range(unterzaehler):
+                meter_nr += 1
+                rows.append(['', f'CHINV{meter_nr:028d}', '', ''] + months)
+                rows.append(['', f'W{h + 1:02d}{u + 1:02d} Wohnung {h + 1}.{u + 1}'])
+                rows.extend(points(1))
+
+    for v in range(virtuelle_zaehler):
+        rows.append([f'XX{v + 1:04d}'] + padding + months)
+        rows.append([f'Virtueller Zähler Allgemein {v + 1}'])
+        for p in range(messpunkte):
+            rows.append([f'Allgemeinstrom Anteil {p + 1}'] + padding + values())
+
+    return rows
+
+
+def generate_zev_workbook(file_path: str, **config) -> Path:
+    """
+    Schreibt einen synthetischen ZEV-Export als .xlsx
+
+    Args:
+        file_path (str): Zieldatei
+        **config: Parameter von generate_zev_rows
+
+    Returns:
+        Path: Pfad der erzeugten Datei
+    """
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet('ZEV')
+    for row in generate_zev_rows(**config):
+        worksheet.append([None if value == '' else value for value in row])
+    workbook.save(file_path)
+
+    return file_path
+
+
+if __name__ == "__main__":
+    import sys
+
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    target = Path('data/sample') / f'zev_synthetisch_{scale}x.xlsx'
+    generate_zev_workbook(target, **scaled_config(scale))
+    print(f"Synthetischer ZEV-Export erstellt: {target}")
@@ -3,7 +3,9 @@
 from .eigentuemer import Eigentuemer
 from .messpunkt import Messpunkt
 from .verbrauchsdaten import Verbrauchsdaten
+from .verbrauch_monat import VerbrauchMonat
 from .rechnung import Rechnung
 from .zaehler import Zaehler
+from .zev_import import ZEVImportBlock
 
-__all__ = ['Eigentuemer', 'Messpunkt', 'Verbrauchsdaten', 'Rechnung', 'Zaehler']
+__all__ = ['Eigentuemer', 'Messpunkt', 'Verbrauchsdaten', 'VerbrauchMonat', 'Rechnung', 'Zaehler', 'ZEVImportBlock']
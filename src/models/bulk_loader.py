@@ -0,0 +1,217 @@
+"""
+Bulk-Loader für Verbrauchsdaten
+Validiert ganze Spalten auf einmal und schreibt in Blöcken per executemany,
+statt pro Zeile ein ORM-Objekt anzulegen
+"""
+
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+
+from .verbrauch_monat import add_to_verbrauch_monate
+from .verbrauchsdaten import Verbrauchsdaten
+
+# Gleiche Regel wie Verbrauchsdaten._validate_periode_format
+PERIODE_PATTERN = r'\d{4}-\d{2}'
+
+# Spalten, die der Bulk-Loader schreibt (id und erstellt_am setzt die Datenbank)
+COLUMNS = ('zeitstempel', 'messpunkt_id', 'verbrauch', 'kosten', 'periode')
+
+
+def _invalid_rows(mask, message, df):
+    """Formatiert eine Validierungsmeldung mit Anzahl und ersten Zeilennummern"""
+    rows = df.index[mask].tolist()
+    beispiele = ', '.join(str(row) for row in rows[:5])
+    return f"{message}: {len(rows)} Zeile(n), z.B. Zeile {beispiele}"
+
+
+def validate_verbrauchsdaten(data):
+    """
+    Validiert Verbrauchsdaten spaltenweise (gleiche Regeln wie Verbrauchsdaten.__init__)
+
+    Args:
+        data: DataFrame oder Dict von Spalten mit zeitstempel, messpunkt_id,
+            verbrauch und optional kosten, periode (fehlt periode, wird sie
+            aus dem Zeitstempel abgeleitet)
+
+    Returns:
+        pd.DataFrame: Bereinigte Spalten in Tabellenreihenfolge
+
+    Raises:
+        ValueError: Mit allen Verstössen und betroffenen Zeilen
+    """
+    df = pd.DataFrame(data).reset_index(drop=True)
+
+    missing = [col for col in ('zeitstempel', 'messpunkt_id', 'verbrauch') if col not in df.columns]
+    if missing:
+        raise ValueError(f"Fehlende Spalte(n): {', '.join(missing)}")
+
+    errors = []
+
+    # Zeitstempel: nur echte Datumswerte (keine Texte)
+    zeitstempel = df['zeitstempel']
+    if not pd.api.types.is_datetime64_any_dtype(zeitstempel):
+        is_datetime = zeitstempel.map(lambda value: isinstance(value, datetime))
+        if is_datetime.all():
+            zeitstempel = pd.to_datetime(zeitstempel)
+        else:
+            errors.append(_invalid_rows((~is_datetime).to_numpy(), "Zeitstempel muss ein datetime-Objekt sein", df))
+    if pd.api.types.is_datetime64_any_dtype(zeitstempel) and zeitstempel.isna().any():
+        errors.append(_invalid_rows(zeitstempel.isna().to_numpy(), "Zeitstempel fehlt", df))
+
+    # Messpunkt
+    messpunkt_id = pd.to_numeric(df['messpunkt_id'], errors='coerce')
+    bad_messpunkt = messpunkt_id.isna() | (messpunkt_id % 1 != 0)
+    if bad_messpunkt.any():
+        errors.append(_invalid_rows(bad_messpunkt.to_numpy(), "messpunkt_id muss eine ganze Zahl sein", df))
+
+    # Verbrauch
+    verbrauch = pd.to_numeric(df['verbrauch'], errors='coerce')
+    if verbrauch.isna().any():
+        errors.append(_invalid_rows(verbrauch.isna().to_numpy(), "Verbrauch fehlt oder ist keine Zahl", df))
+    if (verbrauch < 0).any():
+        errors.append(_invalid_rows((verbrauch < 0).to_numpy(), "Verbrauch darf nicht negativ sein", df))
+
+    # Kosten (optional)
+    if 'kosten' in df.columns:
+        kosten = pd.to_numeric(df['kosten'], errors='coerce')
+        bad_kosten = (kosten.isna() & df['kosten'].notna()) | (kosten < 0)
+        if bad_kosten.any():
+            errors.append(_invalid_rows(bad_kosten.to_numpy(), "Kosten müssen eine Zahl >= 0 sein", df))
+    else:
+        kosten = pd.Series([None] * len(df), dtype=object)
+
+    # Periode (YYYY-MM, Jahr 1900-2100, Monat 1-12)
+    if 'periode' in df.columns:
+        periode = df['periode'].astype(object)
+        text = periode.where(periode.map(lambda v: isinstance(v, str)), '')
+        well_formed = text.str.fullmatch(PERIODE_PATTERN)
+        jahr = pd.to_numeric(text.str[:4], errors='coerce')
+        monat = pd.to_numeric(text.str[5:7], errors='coerce')
+        valid = well_formed & jahr.between(1900, 2100) & monat.between(1, 12)
+        if not valid.all():
+            errors.append(_invalid_rows((~valid).to_numpy(), "Periode muss im Format YYYY-MM sein", df))
+    elif pd.api.types.is_datetime64_any_dtype(zeitstempel):
+        # Nur die wenigen verschiedenen Monate formatieren (strftime pro Zeile ist langsam)
+        monate = zeitstempel.dt.year * 100 + zeitstempel.dt.month
+        labels = {wert: f"{wert // 100:04d}-{wert % 100:02d}" for wert in monate.dropna().unique()}
+        periode = monate.map(labels)
+    else:
+        periode = None
+
+    if errors:
+        raise ValueError("Ungültige Verbrauchsdaten: " + '; '.join(errors))
+
+    return pd.DataFrame({
+        'zeitstempel': zeitstempel,
+        'messpunkt_id': messpunkt_id.astype('int64'),
+        'verbrauch': verbrauch.astype('float64'),
+        'kosten': kosten,
+        'periode': periode
+    })
+
+
+def _sqlite_values(df):
+    """
+    Spaltenwerte im Speicherformat von SQLAlchemy für SQLite
+
+    DateTime wird wie von sqlalchemy.dialects.sqlite.DATETIME als
+    'YYYY-MM-DD HH:MM:SS.ffffff' gespeichert, hier aber für die ganze Spalte
+    auf einmal formatiert.
+    """
+    zeitstempel = df['zeitstempel']
+    if zeitstempel.dt.tz is not None:
+        zeitstempel = zeitstempel.dt.tz_localize(None)
+    formatted = np.datetime_as_string(zeitstempel.to_numpy(dtype='datetime64[us]'), unit='us')
+
+    return {
+        'zeitstempel': np.char.replace(formatted, 'T', ' ').tolist(),
+        'messpunkt_id': df['messpunkt_id'].tolist(),
+        'verbrauch': df['verbrauch'].tolist(),
+        'kosten': df['kosten'].astype(object).where(df['kosten'].notna(), None).tolist(),
+        'periode': df['periode'].tolist()
+    }
+
+
+def _monthly_aggregates(df):
+    """Aggregate pro Messpunkt und Periode für den Monats-Rollup"""
+    grouped = df.groupby(['messpunkt_id', 'periode'], sort=False)
+    aggregates = pd.DataFrame({
+        'total_verbrauch': grouped['verbrauch'].sum(),
+        'total_kosten': grouped['kosten'].sum(min_count=1),
+        'anzahl': grouped.size(),
+        'erster_zeitstempel': grouped['zeitstempel'].min(),
+        'letzter_zeitstempel': grouped['zeitstempel'].max()
+    }).reset_index()
+
+    return [
+        {
+            'messpunkt_id': int(row.messpunkt_id),
+            'periode': row.periode,
+            'total_verbrauch': float(row.total_verbrauch),
+            'total_kosten': None if pd.isna(row.total_kosten) else float(row.total_kosten),
+            'anzahl': int(row.anzahl),
+            'erster_zeitstempel': row.erster_zeitstempel.to_pydatetime().replace(tzinfo=None),
+            'letzter_zeitstempel': row.letzter_zeitstempel.to_pydatetime().replace(tzinfo=None)
+        }
+        for row in aggregates.itertuples(index=False)
+    ]
+
+
+def bulk_insert_verbrauchsdaten(session, data, chunk_size=5000, commit=True):
+    """
+    Schreibt viele Verbrauchsdaten in einer Transaktion und führt den
+    Monats-Rollup (VerbrauchMonat) in derselben Transaktion nach
+
+    Args:
+        session: SQLAlchemy-Session
+        data: Spalten wie bei validate_verbrauchsdaten()
+        chunk_size (int): Zeilen pro executemany-Aufruf
+        commit (bool): Transaktion am Ende committen
+
+    Returns:
+        dict: Anzahl Zeilen, Chunks, Dauer und Zeilen pro Sekunde
+
+    Raises:
+        ValueError: Bei ungültigen Daten (es wird dann nichts geschrieben)
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size muss mindestens 1 sein, erhalten: {chunk_size}")
+
+    start = time.perf_counter()
+    df = validate_verbrauchsdaten(data)
+
+    connection = session.connection()
+    statement = insert(Verbrauchsdaten.__table__)
+    chunks = 0
+    try:
+        if connection.dialect.name == 'sqlite':
+            # Direkt an den Treiber: SQLAlchemy würde jede Zeile einzeln aufbereiten
+            compiled = statement.compile(dialect=connection.dialect, column_keys=list(COLUMNS))
+            values = _sqlite_values(df)
+            rows = list(zip(*(values[key] for key in compiled.positiontup)))
+            for offset in range(0, len(rows), chunk_size):
+                connection.exec_driver_sql(compiled.string, rows[offset:offset + chunk_size])
+                chunks += 1
+        else:
+            records = df.astype(object).where(df.notna(), None).to_dict('records')
+            for offset in range(0, len(records), chunk_size):
+                session.execute(statement, records[offset:offset + chunk_size])
+                chunks += 1
+        add_to_verbrauch_monate(connection, _monthly_aggregates(df))
+        if commit:
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    dauer = time.perf_counter() - start
+    return {
+        'rows': len(df),
+        'chunks': chunks,
+        'duration_s': round(dauer, 4),
+        'rows_per_second': round(len(df) / dauer) if dauer > 0 else None
+    }
@@ -4,10 +4,11 @@ SQLAlchemy Setup und Session-Management
 """
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, StaticPool
 
 # Base-Klasse für alle Modelle
 Base = declarative_base()
@@ -15,13 +16,87 @@ Base = declarative_base()
 # Datenbank-URL (SQLite für lokale Entwicklung)
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///stweg.db')
 
+# SQLite-Profile, werden bei jeder neuen Verbindung als PRAGMA gesetzt
+# (STWEG_SQLITE_PROFILE wählt das Profil, 'default' = SQLite-Standardwerte)
+SQLITE_PROFILES = {
+    'performance': {
+        'journal_mode': 'WAL',        # Leser blockieren nicht während eines Imports
+        'synchronous': 'NORMAL',      # Mit WAL sicher, spart fsync pro Commit
+        'cache_size': -64000,         # 64 MB Page-Cache pro Verbindung
+        'mmap_size': 268435456,       # 256 MB Memory-Mapped I/O
+        'temp_store': 'MEMORY',       # Temporäre Tabellen/Indizes im RAM
+        'busy_timeout': 5000          # ms warten statt sofort "database is locked"
+    },
+    'default': {}
+}
+SQLITE_PROFILE = os.getenv('STWEG_SQLITE_PROFILE', 'performance')
+
+
+def _is_memory_database(url):
+    """Prüft, ob die URL auf eine In-Memory-SQLite-Datenbank zeigt"""
+    return url.database in (None, '', ':memory:') or 'mode=memory' in str(url)
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """
+    Setzt die PRAGMAs bei jeder neuen Verbindung des Engines
+
+    Args:
+        engine: SQLAlchemy-Engine (SQLite)
+        pragmas (dict): PRAGMA-Name -> Wert
+    """
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def build_engine(database_url=DATABASE_URL, profile=SQLITE_PROFILE, echo=False):
+    """
+    Erstellt den Engine mit Pool und Performance-Profil
+
+    Datei-Datenbanken bekommen einen QueuePool (eine Verbindung pro Thread bzw.
+    Request), damit z.B. das Dashboard lesen kann, während ein Import schreibt.
+    In-Memory-Datenbanken existieren nur pro Verbindung und nutzen deshalb
+    eine einzige geteilte Verbindung (StaticPool).
+
+    Args:
+        database_url (str): SQLAlchemy-URL
+        profile (str): Schlüssel in SQLITE_PROFILES
+        echo (bool): SQL-Logging
+
+    Returns:
+        Engine: Konfigurierter Engine
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() != 'sqlite':
+        return create_engine(url, echo=echo, pool_pre_ping=True)
+
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unbekanntes SQLite-Profil: {profile} (erlaubt: {', '.join(SQLITE_PROFILES)})")
+    pragmas = dict(SQLITE_PROFILES[profile])
+
+    if _is_memory_database(url):
+        # WAL und mmap gibt es für In-Memory-Datenbanken nicht
+        pragmas.pop('journal_mode', None)
+        pragmas.pop('mmap_size', None)
+        engine = create_engine(url, echo=echo, poolclass=StaticPool,
+                               connect_args={'check_same_thread': False})
+    else:
+        engine = create_engine(url, echo=echo, poolclass=QueuePool, pool_size=5, max_overflow=10,
+                               connect_args={'check_same_thread': False})
+
+    if pragmas:
+        apply_sqlite_pragmas(engine, pragmas)
+    return engine
+
+
 # Engine erstellen
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,  # Setze auf True für SQL-Logging
-    poolclass=StaticPool,  # Für SQLite
-    connect_args={'check_same_thread': False}  # Für SQLite
-)
+engine = build_engine()
 
 # Session-Factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -40,8 +115,20 @@ def get_session():
 
 
 def create_tables():
-    """Erstellt alle Tabellen in der Datenbank"""
+    """
+    Erstellt alle Tabellen in der Datenbank, ergänzt fehlende Indizes bestehender
+    Verbrauchsdaten und baut einen fehlenden Monats-Rollup auf
+    """
+    from .verbrauch_monat import ensure_verbrauch_monate
+    from .verbrauchsdaten import Verbrauchsdaten
+
     Base.metadata.create_all(bind=engine)
+    Verbrauchsdaten.ensure_indexes(engine)
+    session = SessionLocal()
+    try:
+        ensure_verbrauch_monate(session)
+    finally:
+        session.close()
 
 
 def drop_tables():
@@ -4,7 +4,7 @@ Repräsentiert die 7 Eigentümer der Stockwerkeigentümergesellschaft
 """
 
 from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, selectinload, contains_eager
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -83,6 +83,101 @@ class Eigentuemer(Base):
         """Findet Eigentümer anhand der Wohnung"""
         return session.query(cls).filter(cls.wohnung == wohnung).first()
     
+    @classmethod
+    def query_with_messpunkte(cls, session):
+        """Query mit vorgeladenen Messpunkten (eine Zusatzabfrage für alle Eigentümer)"""
+        return session.query(cls).options(selectinload(cls.messpunkte))
+    
+    @classmethod
+    def query_verbrauchsdaten(cls, session, eigentuemer_id):
+        """
+        Verbrauchsdaten eines Eigentümers über alle Messpunkte mit einer Abfrage
+        
+        Anders als die Property verbrauchsdaten liest die Abfrage nur den
+        Datenbankstand (ohne noch nicht geflushte Datensätze).
+        
+        Args:
+            session: SQLAlchemy-Session
+            eigentuemer_id (int): ID des Eigentümers
+        
+        Returns:
+            Query: Verbrauchsdaten mit per JOIN mitgeladenem Messpunkt
+        """
+        from .messpunkt import Messpunkt
+        from .verbrauchsdaten import Verbrauchsdaten
+        return session.query(Verbrauchsdaten).join(Verbrauchsdaten.messpunkt).filter(
+            Messpunkt.eigentuemer_id == eigentuemer_id
+        ).options(
+            contains_eager(Verbrauchsdaten.messpunkt)
+        ).order_by(Messpunkt.id, Verbrauchsdaten.id)
+    
+    @classmethod
+    def get_all_dicts(cls, session, nur_aktive=False, include_messpunkte=False):
+        """
+        Serialisiert alle Eigentümer mit vorgeladenen Messpunkten
+        
+        Args:
+            session: SQLAlchemy-Session
+            nur_aktive (bool): Nur aktive Eigentümer
+            include_messpunkte (bool): Messpunkte (id, name, typ, aktiv) mitliefern
+        
+        Returns:
+            list: Dictionaries wie to_dict() plus 'messpunkte_count'
+        """
+        query = cls.query_with_messpunkte(session)
+        if nur_aktive:
+            query = query.filter(cls.aktiv == True)
+        
+        result = []
+        for eigentuemer in query.order_by(cls.id):
+            data = eigentuemer.to_dict()
+            data['messpunkte_count'] = len(eigentuemer.messpunkte)
+            if include_messpunkte:
+                data['messpunkte'] = [
+                    {'id': mp.id, 'name': mp.name, 'typ': mp.typ, 'aktiv': mp.aktiv}
+                    for mp in eigentuemer.messpunkte
+                ]
+            result.append(data)
+        return result
+    
+    @classmethod
+    def get_verbrauch_summary(cls, session, eigentuemer_id=None, periode=None):
+        """
+        Verbrauch und Kosten pro Eigentümer mit einer aggregierten Abfrage (Monats-Rollup)
+        
+        Args:
+            session: SQLAlchemy-Session
+            eigentuemer_id (int): Nur diesen Eigentümer (optional)
+            periode (str): Nur diese Periode YYYY-MM (optional)
+        
+        Returns:
+            dict: eigentuemer_id -> {'total_verbrauch', 'total_kosten', 'anzahl'}
+        """
+        from .messpunkt import Messpunkt
+        from .verbrauch_monat import VerbrauchMonat
+        
+        query = session.query(
+            Messpunkt.eigentuemer_id,
+            func.sum(VerbrauchMonat.total_verbrauch),
+            func.sum(VerbrauchMonat.total_kosten),
+            func.sum(VerbrauchMonat.anzahl)
+        ).join(Messpunkt, Messpunkt.id == VerbrauchMonat.messpunkt_id).filter(
+            Messpunkt.eigentuemer_id.isnot(None)
+        )
+        if eigentuemer_id is not None:
+            query = query.filter(Messpunkt.eigentuemer_id == eigentuemer_id)
+        if periode is not None:
+            query = query.filter(VerbrauchMonat.periode == periode)
+        
+        return {
+            owner_id: {
+                'total_verbrauch': total_verbrauch or 0.0,
+                'total_kosten': total_kosten or 0.0,
+                'anzahl': int(anzahl or 0)
+            }
+            for owner_id, total_verbrauch, total_kosten, anzahl in query.group_by(Messpunkt.eigentuemer_id)
+        }
+    
     @classmethod
     def get_total_anteil(cls, session):
         """Berechnet die Summe aller Anteile"""
@@ -4,7 +4,7 @@ Repräsentiert die Messpunkte aus dem Excel-File vom ZEV-Server
 """
 
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, joinedload
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -108,6 +108,19 @@ class Messpunkt(Base):
             cls.aktiv == True
         ).all()
     
+    @classmethod
+    def query_with_eigentuemer(cls, session):
+        """Query mit per JOIN mitgeladenem Eigentümer (für to_dict)"""
+        return session.query(cls).options(joinedload(cls.eigentuemer))
+    
+    @classmethod
+    def get_all_dicts(cls, session, typ=None):
+        """Serialisiert alle Messpunkte (optional eines Typs) mit einer Abfrage"""
+        query = cls.query_with_eigentuemer(session)
+        if typ is not None:
+            query = query.filter(cls.typ == typ)
+        return [messpunkt.to_dict() for messpunkt in query.order_by(cls.id)]
+    
     def to_dict(self):
         """Konvertiert den Messpunkt zu einem Dictionary"""
         return {
@@ -8,7 +8,9 @@ from .database import Base
 from .eigentuemer import Eigentuemer
 from .messpunkt import Messpunkt
 from .verbrauchsdaten import Verbrauchsdaten
+from .verbrauch_monat import VerbrauchMonat
 from .rechnung import Rechnung
+from .zev_import import ZEVImportBlock
 
 # Alle Modelle für einfachen Import
 __all__ = [
@@ -16,6 +18,8 @@ __all__ = [
     'Eigentuemer', 
     'Messpunkt',
     'Verbrauchsdaten',
-    'Rechnung'
+    'VerbrauchMonat',
+    'Rechnung',
+    'ZEVImportBlock'
 ]
 
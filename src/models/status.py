@@ -0,0 +1,99 @@
+"""
+Datenbank-Status für das Dashboard
+Alle Zähler mit einer Abfrage, im Prozess kurz gecacht und bei jedem
+Commit auf dem Engine verworfen
+"""
+
+import threading
+import time
+
+from sqlalchemy import event, func, select
+
+from .eigentuemer import Eigentuemer
+from .messpunkt import Messpunkt
+from .rechnung import Rechnung
+from .verbrauchsdaten import Verbrauchsdaten
+
+# Sekunden, die ein Ergebnis ohne Schreibzugriff gültig bleibt
+STATUS_TTL = 10.0
+
+
+def get_database_counts(session):
+    """
+    Zählt Eigentümer, Messpunkte, Verbrauchsdaten und Rechnungen in einem Roundtrip
+
+    Args:
+        session: SQLAlchemy-Session
+
+    Returns:
+        dict: Zähler wie im 'database'-Block von /api/status
+    """
+    def count(model, *criteria):
+        return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+    row = session.execute(select(
+        count(Eigentuemer).label('eigentuemer_count'),
+        count(Messpunkt).label('messpunkte_count'),
+        count(Verbrauchsdaten).label('verbrauchsdaten_count'),
+        count(Rechnung).label('rechnungen_count'),
+        count(Eigentuemer, Eigentuemer.aktiv == True).label('active_eigentuemer')
+    )).one()
+    return dict(row._mapping)
+
+
+class DatabaseStatusCache:
+    """
+    TTL-Cache für get_database_counts()
+
+    Jeder Commit auf dem Engine verwirft den Cache. Ein Ergebnis, das während
+    eines Commits berechnet wurde, wird nicht gespeichert (Generationszähler).
+    """
+
+    def __init__(self, engine, ttl=STATUS_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._value = None
+        self._expires = 0.0
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        event.listen(engine, 'commit', self._on_commit)
+
+    def _on_commit(self, connection):
+        self.invalidate()
+
+    def invalidate(self):
+        """Verwirft das gecachte Ergebnis"""
+        with self._lock:
+            self._generation += 1
+            self._value = None
+
+    def get(self, session_factory):
+        """
+        Gibt die Zähler zurück, bei Bedarf neu aus der Datenbank
+
+        Args:
+            session_factory: Callable, das eine Session liefert (nur bei Cache-Miss aufgerufen)
+
+        Returns:
+            tuple: (dict mit Zählern, True wenn aus dem Cache)
+        """
+        with self._lock:
+            if self._value is not None and self._clock() < self._expires:
+                self.hits += 1
+                return dict(self._value), True
+            self.misses += 1
+            generation = self._generation
+
+        session = session_factory()
+        try:
+            counts = get_database_counts(session)
+        finally:
+            session.close()
+
+        with self._lock:
+            if generation == self._generation:
+                self._value = counts
+                self._expires = self._clock() + self.ttl
+        return dict(counts), False
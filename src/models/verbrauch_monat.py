@@ -0,0 +1,257 @@
+"""
+Monats-Rollup der Verbrauchsdaten für STWEG
+Vorberechnete Summen pro Messpunkt und Periode, damit Abfragen pro Periode
+nicht bei jedem Aufruf die Rohdaten durchsuchen
+"""
+
+from sqlalchemy import (Column, Integer, String, Float, DateTime, ForeignKey, Index,
+                        and_, case, delete, event, func, insert, inspect, or_, select)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from .database import Base
+from .verbrauchsdaten import Verbrauchsdaten
+
+# Attribute, deren Änderung den Rollup eines Datensatzes beeinflusst
+ROLLUP_ATTRIBUTES = ('messpunkt_id', 'periode', 'zeitstempel', 'verbrauch', 'kosten')
+
+# Dialekte mit INSERT ... ON CONFLICT DO UPDATE
+UPSERT_DIALECTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+class VerbrauchMonat(Base):
+    """
+    Monats-Rollup eines Messpunkts
+
+    Wird bei jedem Flush (ORM) und vom Bulk-Loader nachgeführt. Schreibwege, die
+    beides umgehen (z.B. Query.delete()), müssen rebuild_verbrauch_monate()
+    aufrufen.
+    """
+
+    __tablename__ = 'verbrauch_monate'
+
+    # Schlüssel: Messpunkt + Periode
+    messpunkt_id = Column(Integer, ForeignKey('messpunkte.id'), primary_key=True)
+    periode = Column(String(7), primary_key=True)  # z.B. "2024-01"
+
+    # Aggregate
+    total_verbrauch = Column(Float, nullable=False, default=0.0)
+    total_kosten = Column(Float, nullable=True)  # NULL, solange keine Kosten erfasst sind
+    anzahl = Column(Integer, nullable=False, default=0)
+    erster_zeitstempel = Column(DateTime, nullable=True)
+    letzter_zeitstempel = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('idx_verbrauch_monate_periode', 'periode'),
+    )
+
+    def __repr__(self):
+        """String-Repräsentation für Debugging"""
+        return (f"<VerbrauchMonat(messpunkt_id={self.messpunkt_id}, periode='{self.periode}', "
+                f"total_verbrauch={self.total_verbrauch}, anzahl={self.anzahl})>")
+
+    def to_dict(self):
+        """Konvertiert den Rollup zu einem Dictionary"""
+        return {
+            'messpunkt_id': self.messpunkt_id,
+            'periode': self.periode,
+            'total_verbrauch': self.total_verbrauch,
+            'total_kosten': self.total_kosten,
+            'anzahl': self.anzahl,
+            'erster_zeitstempel': self.erster_zeitstempel.isoformat() if self.erster_zeitstempel else None,
+            'letzter_zeitstempel': self.letzter_zeitstempel.isoformat() if self.letzter_zeitstempel else None
+        }
+
+
+def _aggregate_select():
+    """SELECT der Rollup-Spalten aus den Rohdaten (gruppiert)"""
+    raw = Verbrauchsdaten.__table__.c
+    return select(
+        raw.messpunkt_id,
+        raw.periode,
+        func.sum(raw.verbrauch),
+        func.sum(raw.kosten),
+        func.count(),
+        func.min(raw.zeitstempel),
+        func.max(raw.zeitstempel)
+    ).group_by(raw.messpunkt_id, raw.periode)
+
+
+def _insert_from_raw(connection, where=None):
+    """Schreibt Rollup-Zeilen aus den Rohdaten (optional gefiltert)"""
+    table = VerbrauchMonat.__table__
+    query = _aggregate_select()
+    if where is not None:
+        query = query.where(where)
+    connection.execute(insert(table).from_select(
+        ['messpunkt_id', 'periode', 'total_verbrauch', 'total_kosten', 'anzahl',
+         'erster_zeitstempel', 'letzter_zeitstempel'],
+        query
+    ))
+
+
+def recompute_verbrauch_monate(connection, keys):
+    """
+    Berechnet einzelne Rollup-Zeilen neu aus den Rohdaten
+
+    Nötig bei Löschungen und Änderungen (Minimum/Maximum lassen sich nicht
+    inkrementell zurückrechnen).
+
+    Args:
+        connection: SQLAlchemy-Connection
+        keys: Iterable von (messpunkt_id, periode)
+    """
+    table = VerbrauchMonat.__table__
+    raw = Verbrauchsdaten.__table__.c
+    for messpunkt_id, periode in keys:
+        connection.execute(delete(table).where(
+            table.c.messpunkt_id == messpunkt_id, table.c.periode == periode
+        ))
+        _insert_from_raw(connection, and_(raw.messpunkt_id == messpunkt_id, raw.periode == periode))
+
+
+def add_to_verbrauch_monate(connection, aggregates):
+    """
+    Addiert neu eingefügte Rohdaten zum Rollup (Upsert pro Messpunkt und Periode)
+
+    Args:
+        connection: SQLAlchemy-Connection (gleiche Transaktion wie der Insert)
+        aggregates (list): Dicts mit messpunkt_id, periode, total_verbrauch,
+            total_kosten, anzahl, erster_zeitstempel, letzter_zeitstempel
+    """
+    if not aggregates:
+        return
+
+    dialect_insert = UPSERT_DIALECTS.get(connection.dialect.name)
+    if dialect_insert is None:
+        # Ohne Upsert: betroffene Zeilen aus den bereits geschriebenen Rohdaten berechnen
+        recompute_verbrauch_monate(connection, {(row['messpunkt_id'], row['periode']) for row in aggregates})
+        return
+
+    table = VerbrauchMonat.__table__
+    statement = dialect_insert(table)
+    neu = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.messpunkt_id, table.c.periode],
+        set_={
+            'total_verbrauch': table.c.total_verbrauch + neu.total_verbrauch,
+            'total_kosten': case(
+                (and_(table.c.total_kosten.is_(None), neu.total_kosten.is_(None)), None),
+                else_=func.coalesce(table.c.total_kosten, 0.0) + func.coalesce(neu.total_kosten, 0.0)
+            ),
+            'anzahl': table.c.anzahl + neu.anzahl,
+            'erster_zeitstempel': case(
+                (or_(table.c.erster_zeitstempel.is_(None),
+                     neu.erster_zeitstempel < table.c.erster_zeitstempel), neu.erster_zeitstempel),
+                else_=table.c.erster_zeitstempel
+            ),
+            'letzter_zeitstempel': case(
+                (or_(table.c.letzter_zeitstempel.is_(None),
+                     neu.letzter_zeitstempel > table.c.letzter_zeitstempel), neu.letzter_zeitstempel),
+                else_=table.c.letzter_zeitstempel
+            )
+        }
+    )
+    connection.execute(statement, aggregates)
+
+
+def aggregate_rows(rows):
+    """
+    Fasst Rohdaten pro Messpunkt und Periode zusammen
+
+    Args:
+        rows: Iterable von Verbrauchsdaten-Objekten
+
+    Returns:
+        list: Aggregate für add_to_verbrauch_monate()
+    """
+    aggregates = {}
+    for row in rows:
+        key = (row.messpunkt_id, row.periode)
+        entry = aggregates.get(key)
+        if entry is None:
+            entry = aggregates[key] = {
+                'messpunkt_id': row.messpunkt_id, 'periode': row.periode,
+                'total_verbrauch': 0.0, 'total_kosten': None, 'anzahl': 0,
+                'erster_zeitstempel': row.zeitstempel, 'letzter_zeitstempel': row.zeitstempel
+            }
+        entry['total_verbrauch'] += row.verbrauch
+        if row.kosten is not None:
+            entry['total_kosten'] = (entry['total_kosten'] or 0.0) + row.kosten
+        entry['anzahl'] += 1
+        entry['erster_zeitstempel'] = min(entry['erster_zeitstempel'], row.zeitstempel)
+        entry['letzter_zeitstempel'] = max(entry['letzter_zeitstempel'], row.zeitstempel)
+    return list(aggregates.values())
+
+
+def rebuild_verbrauch_monate(session, commit=True):
+    """
+    Baut den gesamten Rollup aus den Rohdaten neu auf
+
+    Args:
+        session: SQLAlchemy-Session
+        commit (bool): Transaktion am Ende committen
+
+    Returns:
+        int: Anzahl Rollup-Zeilen
+    """
+    connection = session.connection()
+    connection.execute(delete(VerbrauchMonat.__table__))
+    _insert_from_raw(connection)
+    count = session.query(func.count()).select_from(VerbrauchMonat).scalar()
+    if commit:
+        session.commit()
+    return count
+
+
+def ensure_verbrauch_monate(session):
+    """
+    Baut den Rollup auf, falls er leer ist, aber Rohdaten existieren
+    (z.B. bei einer Datenbank aus der Zeit vor dem Rollup)
+
+    Returns:
+        bool: True, wenn neu aufgebaut wurde
+    """
+    if session.query(VerbrauchMonat).first() is not None:
+        return False
+    if session.query(Verbrauchsdaten.id).first() is None:
+        return False
+    rebuild_verbrauch_monate(session)
+    return True
+
+
+def _changed_keys(obj):
+    """Alte und neue Rollup-Schlüssel eines geänderten Datensatzes (leer ohne relevante Änderung)"""
+    state = inspect(obj)
+    histories = {name: state.attrs[name].history for name in ROLLUP_ATTRIBUTES}
+    if not any(history.has_changes() for history in histories.values()):
+        return set()
+
+    def old(name):
+        history = histories[name]
+        return history.deleted[0] if history.deleted else getattr(obj, name)
+
+    return {(old('messpunkt_id'), old('periode')), (obj.messpunkt_id, obj.periode)}
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_verbrauch_monate(session, flush_context):
+    """Führt den Rollup nach jedem Flush mit Verbrauchsdaten nach"""
+    inserted = [obj for obj in session.new if isinstance(obj, Verbrauchsdaten)]
+    recompute = set()
+    for obj in session.deleted:
+        if isinstance(obj, Verbrauchsdaten):
+            recompute.add((obj.messpunkt_id, obj.periode))
+    for obj in session.dirty:
+        if isinstance(obj, Verbrauchsdaten):
+            recompute |= _changed_keys(obj)
+
+    if not inserted and not recompute:
+        return
+
+    connection = session.connection()
+    # Neu berechnete Schlüssel enthalten die Inserts bereits
+    add_to_verbrauch_monate(connection, [
+        aggregate for aggregate in aggregate_rows(inserted)
+        if (aggregate['messpunkt_id'], aggregate['periode']) not in recompute
+    ])
+    recompute_verbrauch_monate(connection, recompute)
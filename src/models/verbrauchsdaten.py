@@ -5,11 +5,37 @@ Repräsentiert die Verbrauchsdaten aus dem Excel-File vom ZEV-Server
 
 import re
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, inspect, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import relationship, joinedload
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.sql import func
+from sqlalchemy.sql.functions import FunctionElement
 from .database import Base
 
+# Jahresabhängige Tarif-Indizes früherer Versionen (werden von ensure_indexes entfernt)
+VERALTETE_INDEX_PREFIX = 'idx_verbrauchsdaten_tarif_'
+
+
+class stunde_der_woche(FunctionElement):
+    """SQL: Wochentag × 100 + Stunde (Wochentag 0 = Sonntag), z.B. 114 = Montag 14 Uhr"""
+    type = Integer()
+    name = 'stunde_der_woche'
+    inherit_cache = True
+
+
+@compiles(stunde_der_woche)
+def _stunde_der_woche_default(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    return f"CAST(EXTRACT(DOW FROM {column}) * 100 + EXTRACT(HOUR FROM {column}) AS INTEGER)"
+
+
+@compiles(stunde_der_woche, 'sqlite')
+def _stunde_der_woche_sqlite(element, compiler, **kw):
+    # Ein strftime-Aufruf pro Zeile statt je einer für Wochentag und Stunde
+    column = compiler.process(element.clauses, **kw)
+    return f"CAST(STRFTIME('%w%H', {column}) AS INTEGER)"
+
 
 class Verbrauchsdaten(Base):
     """
@@ -157,30 +183,59 @@ class Verbrauchsdaten(Base):
     
     @classmethod
     def get_total_verbrauch_periode(cls, session, periode):
-        """Berechnet den Gesamtverbrauch für eine Periode"""
-        result = session.query(func.sum(cls.verbrauch)).filter(cls.periode == periode).scalar()
+        """Berechnet den Gesamtverbrauch für eine Periode (aus dem Monats-Rollup)"""
+        from .verbrauch_monat import VerbrauchMonat
+        result = session.query(func.sum(VerbrauchMonat.total_verbrauch)).filter(
+            VerbrauchMonat.periode == periode
+        ).scalar()
         return result or 0.0
     
     @classmethod
     def get_total_kosten_periode(cls, session, periode):
-        """Berechnet die Gesamtkosten für eine Periode"""
-        result = session.query(func.sum(cls.kosten)).filter(
-            cls.periode == periode,
-            cls.kosten.isnot(None)
+        """Berechnet die Gesamtkosten für eine Periode (aus dem Monats-Rollup)"""
+        from .verbrauch_monat import VerbrauchMonat
+        result = session.query(func.sum(VerbrauchMonat.total_kosten)).filter(
+            VerbrauchMonat.periode == periode,
+            VerbrauchMonat.total_kosten.isnot(None)
         ).scalar()
         return result or 0.0
     
     @classmethod
     def get_verbrauch_by_messpunkt_periode(cls, session, periode):
-        """Gibt Verbrauchsdaten gruppiert nach Messpunkt für eine Periode zurück"""
-        from sqlalchemy import func
+        """Gibt Verbrauchsdaten gruppiert nach Messpunkt für eine Periode zurück (aus dem Monats-Rollup)"""
+        from .verbrauch_monat import VerbrauchMonat
         return session.query(
-            cls.messpunkt_id,
-            func.sum(cls.verbrauch).label('total_verbrauch'),
-            func.sum(cls.kosten).label('total_kosten')
+            VerbrauchMonat.messpunkt_id,
+            VerbrauchMonat.total_verbrauch.label('total_verbrauch'),
+            VerbrauchMonat.total_kosten.label('total_kosten')
         ).filter(
-            cls.periode == periode
-        ).group_by(cls.messpunkt_id).all()
+            VerbrauchMonat.periode == periode
+        ).order_by(VerbrauchMonat.messpunkt_id).all()
+    
+    @classmethod
+    def query_with_messpunkt(cls, session):
+        """Query mit per JOIN mitgeladenem Messpunkt (für to_dict)"""
+        return session.query(cls).options(joinedload(cls.messpunkt))
+    
+    @classmethod
+    def get_dicts(cls, session, periode=None, messpunkt_id=None):
+        """
+        Serialisiert Verbrauchsdaten mit einer Abfrage
+        
+        Args:
+            session: SQLAlchemy-Session
+            periode (str): Nur diese Periode YYYY-MM (optional)
+            messpunkt_id (int): Nur dieser Messpunkt (optional)
+        
+        Returns:
+            list: Dictionaries wie to_dict()
+        """
+        query = cls.query_with_messpunkt(session)
+        if periode is not None:
+            query = query.filter(cls.periode == periode)
+        if messpunkt_id is not None:
+            query = query.filter(cls.messpunkt_id == messpunkt_id)
+        return [row.to_dict() for row in query.order_by(cls.zeitstempel, cls.id)]
     
     def to_dict(self):
         """Konvertiert die Verbrauchsdaten zu einem Dictionary"""
@@ -206,6 +261,41 @@ class Verbrauchsdaten(Base):
             if field in allowed_fields and hasattr(self, field):
                 setattr(self, field, value)
     
+    @classmethod
+    def bulk_insert(cls, session, data, chunk_size=5000, commit=True):
+        """
+        Schreibt viele Verbrauchsdaten spaltenweise validiert in einer Transaktion
+        Siehe bulk_loader.bulk_insert_verbrauchsdaten
+        """
+        from .bulk_loader import bulk_insert_verbrauchsdaten
+        return bulk_insert_verbrauchsdaten(session, data, chunk_size=chunk_size, commit=commit)
+
+    @classmethod
+    def ensure_indexes(cls, engine):
+        """
+        Legt fehlende Indizes einer bestehenden Tabelle an (create_all nur bei neuen Tabellen)
+
+        IF NOT EXISTS statt checkfirst: SQLAlchemy reflektiert Ausdrucks-Indizes
+        unter SQLite nicht. Entfernt ausserdem die jahresabhängigen Tarif-Indizes
+        früherer Versionen (VERALTETE_INDEX_PREFIX).
+
+        Args:
+            engine: SQLAlchemy-Engine
+        """
+        with engine.begin() as connection:
+            if connection.dialect.name == 'sqlite':
+                names = connection.execute(text(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND name GLOB :pattern"
+                ), {'table': cls.__tablename__, 'pattern': f"{VERALTETE_INDEX_PREFIX}*"}).scalars().all()
+            else:
+                names = [index['name'] for index in inspect(connection).get_indexes(cls.__tablename__)
+                         if index['name'].startswith(VERALTETE_INDEX_PREFIX)]
+            for name in names:
+                connection.execute(text(f'DROP INDEX IF EXISTS "{name}"'))
+
+            for index in cls.__table__.indexes:
+                connection.execute(CreateIndex(index, if_not_exists=True))
+
     @classmethod
     def create_sample_data(cls, session, anzahl_tage=7):
         """
@@ -249,3 +339,9 @@ class Verbrauchsdaten(Base):
         session.commit()
         return verbrauchsdaten_list
 
+
+# Tarif-Summen pro Messpunkt (billing.tarif_kalender): unabhängig von Jahr und
+# Feiertagen; die Gruppen (Messpunkt, Wochenstunde) kommen in Index-Reihenfolge,
+# Feiertage sind Bereichssuchen über (Messpunkt, Wochenstunde, Zeitstempel)
+Index('idx_verbrauchsdaten_stunde_der_woche', Verbrauchsdaten.messpunkt_id,
+      stunde_der_woche(Verbrauchsdaten.zeitstempel), Verbrauchsdaten.zeitstempel, Verbrauchsdaten.verbrauch)
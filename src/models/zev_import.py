@@ -0,0 +1,277 @@
+"""
+ZEV-Import-Modell für STWEG
+Merkt sich pro Gebäude und Zähler den Fingerprint des zuletzt importierten
+Zählerblocks, damit ein erneuter Import nur geänderte Zähler verarbeitet
+"""
+
+import hashlib
+import json
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from .database import Base
+
+# Monatsnamen des ZEV-Exports -> Monatsnummer
+MONATE = {
+    "Januar": 1, "Februar": 2, "März": 3, "April": 4, "Mai": 5, "Juni": 6,
+    "Juli": 7, "August": 8, "September": 9, "Oktober": 10, "November": 11, "Dezember": 12
+}
+
+
+class ZEVImportBlock(Base):
+    """
+    Fingerprint eines importierten Zählerblocks
+
+    Ein Zählerblock besteht aus Zähler-ID, Messpunkten und Monatswerten.
+    messpunkt_ids ordnet die Messpunkte des Blocks den Messpunkt-Datensätzen zu.
+    """
+
+    __tablename__ = 'zev_import_bloecke'
+
+    # Primärschlüssel
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Schlüssel: Gebäude + Jahr + Zähler
+    gebaeude = Column(String(100), nullable=False, index=True)
+    jahr = Column(Integer, nullable=False)
+    zaehler_id = Column(String(50), nullable=False)
+
+    # SHA-256 über Zähler, Messpunkte und Werte
+    fingerprint = Column(String(64), nullable=False)
+
+    # JSON: {Messpunkt-Schlüssel: Messpunkt.id}
+    messpunkt_ids = Column(Text, nullable=False, default='{}')
+
+    # Zeitstempel
+    erstellt_am = Column(DateTime(timezone=True), server_default=func.now())
+    aktualisiert_am = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('gebaeude', 'jahr', 'zaehler_id', name='uq_zev_import_block'),
+    )
+
+    def __repr__(self):
+        """String-Repräsentation für Debugging"""
+        return f"<ZEVImportBlock(gebaeude='{self.gebaeude}', jahr={self.jahr}, zaehler_id='{self.zaehler_id}')>"
+
+    @staticmethod
+    def fingerprint_for(columns, z_idx):
+        """
+        Berechnet den Fingerprint eines Zählerblocks
+
+        Args:
+            columns (ZEVColumns): Messwerte in Spaltenform
+            z_idx (int): Position des Zählers in columns.zaehler_ids
+
+        Returns:
+            str: SHA-256 als Hex-String
+        """
+        block = [
+            columns.zaehler_ids[z_idx],
+            columns.zaehler_types[z_idx],
+            columns.zaehler_codes[z_idx],
+            columns.zaehler_months[z_idx],
+            [[columns.messpunkt_name[point], columns.messpunkt_values(point)]
+             for point in columns.messpunkte_of(z_idx)]
+        ]
+        payload = json.dumps(block, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_messpunkt_ids(self):
+        """Gibt die Zuordnung Messpunkt-Schlüssel -> Messpunkt.id zurück"""
+        return json.loads(self.messpunkt_ids or '{}')
+
+
+def _messpunkt_keys(names):
+    """Eindeutige Schlüssel der Messpunkte eines Blocks (Name, bei Duplikaten mit #n)"""
+    seen = {}
+    keys = []
+    for name in names:
+        seen[name] = seen.get(name, 0) + 1
+        keys.append(name if seen[name] == 1 else f"{name}#{seen[name]}")
+    return keys
+
+
+def import_zev_result(session, result, gebaeude, jahr):
+    """
+    Importiert ein Ergebnis des SimpleZEVParser inkrementell in Verbrauchsdaten
+
+    Wandelt das Ergebnis in die Spaltenform um und ruft import_zev_columns() auf.
+
+    Args:
+        session: SQLAlchemy-Session
+        result (dict): Ergebnis von SimpleZEVParser.parse_zev_file()
+        gebaeude (str): Gebäude-Kennung (z.B. 'Zwischenbächen 115')
+        jahr (int): Jahr der Monatswerte
+
+    Returns:
+        dict: Kompakter Diff des Imports
+    """
+    from ..excel_analysis.zev_columns import ZEVColumns
+
+    if not result.get('structure_verified'):
+        raise ValueError("Nur erfolgreich geparste ZEV-Dateien können importiert werden")
+
+    return import_zev_columns(session, ZEVColumns.from_result(result), gebaeude, jahr)
+
+
+def import_zev_columns(session, columns, gebaeude, jahr):
+    """
+    Importiert ZEV-Messwerte in Spaltenform inkrementell in Verbrauchsdaten
+
+    Unveränderte Zählerblöcke (gleicher Fingerprint wie beim letzten Import
+    desselben Gebäudes und Jahres) werden übersprungen. Für neue oder
+    geänderte Blöcke werden nur neue oder geänderte Monatswerte geschrieben.
+    Werte, die ein geänderter Block nicht mehr liefert (Messpunkt entfernt,
+    Monat nicht mehr numerisch oder negativ), werden gelöscht und mit
+    'neu': None in 'aenderungen' gemeldet; entfernte Messpunkte werden
+    deaktiviert und unter 'entfernte_messpunkte' aufgeführt.
+
+    Args:
+        session: SQLAlchemy-Session
+        columns (ZEVColumns): Ergebnis von SimpleZEVParser.parse_zev_columns()
+        gebaeude (str): Gebäude-Kennung (z.B. 'Zwischenbächen 115')
+        jahr (int): Jahr der Monatswerte
+
+    Returns:
+        dict: Kompakter Diff des Imports
+    """
+    from ..excel_analysis.zev_columns import MONTH_POS
+    from .messpunkt import Messpunkt
+    from .verbrauchsdaten import Verbrauchsdaten
+
+    diff = {
+        'gebaeude': gebaeude,
+        'jahr': jahr,
+        'bloecke': {'neu': 0, 'geaendert': 0, 'unveraendert': 0},
+        'werte': {'neu': 0, 'geaendert': 0, 'unveraendert': 0, 'entfernt': 0, 'uebersprungen': 0},
+        'neue_zaehler': [],
+        'geaenderte_zaehler': [],
+        'entfernte_messpunkte': [],
+        'aenderungen': []
+    }
+
+    stored_blocks = {
+        block.zaehler_id: block
+        for block in session.query(ZEVImportBlock).filter(
+            ZEVImportBlock.gebaeude == gebaeude,
+            ZEVImportBlock.jahr == jahr
+        )
+    }
+    perioden = [f"{jahr}-{monat:02d}" for monat in MONATE.values()]
+
+    try:
+        for z_idx, zaehler_id in enumerate(columns.zaehler_ids.tolist()):
+            fingerprint = ZEVImportBlock.fingerprint_for(columns, z_idx)
+            block = stored_blocks.get(zaehler_id)
+
+            if block is not None and block.fingerprint == fingerprint:
+                diff['bloecke']['unveraendert'] += 1
+                continue
+
+            if block is None:
+                block = ZEVImportBlock(gebaeude=gebaeude, jahr=jahr, zaehler_id=zaehler_id,
+                                        fingerprint=fingerprint)
+                session.add(block)
+                diff['bloecke']['neu'] += 1
+                diff['neue_zaehler'].append(zaehler_id)
+            else:
+                diff['bloecke']['geaendert'] += 1
+                diff['geaenderte_zaehler'].append(zaehler_id)
+
+            messpunkt_ids = block.get_messpunkt_ids()
+            points = columns.messpunkte_of(z_idx)
+            keys = _messpunkt_keys(columns.messpunkt_name[points.start:points.stop].tolist())
+
+            # Messpunkte anlegen, die der Block noch nicht kennt
+            for key in keys:
+                if key not in messpunkt_ids:
+                    label = columns.zaehler_codes[z_idx] or zaehler_id
+                    messpunkt = Messpunkt(name=f"{label} - {key}"[:50], typ='gemeinschaft')
+                    session.add(messpunkt)
+                    session.flush()
+                    messpunkt_ids[key] = messpunkt.id
+
+            # Bestehende Werte des Blocks (inkl. entfernter Messpunkte) mit einer Abfrage laden
+            existing = {
+                (row.messpunkt_id, row.periode): row
+                for row in session.query(Verbrauchsdaten).filter(
+                    Verbrauchsdaten.messpunkt_id.in_(list(messpunkt_ids.values())),
+                    Verbrauchsdaten.periode.in_(perioden)
+                )
+            } if messpunkt_ids else {}
+            key_by_id = {messpunkt_id: key for key, messpunkt_id in messpunkt_ids.items()}
+            seen = set()
+
+            # Monats-Spalten des Zählers als Spalten der Matrix
+            monate = list(dict.fromkeys(columns.zaehler_months[z_idx]))
+            cols = [MONTH_POS[month] for month in monate]
+            block_values = columns.values[points.start:points.stop, cols].tolist()
+
+            for point, key, row_values in zip(points, keys, block_values):
+                messpunkt_id = messpunkt_ids[key]
+
+                for month_name, col, value in zip(monate, cols, row_values):
+                    if (point, col) in columns.text_values or value < 0:
+                        diff['werte']['uebersprungen'] += 1
+                        continue
+                    if value != value:  # NaN: Monat ausserhalb der Datenspalten
+                        continue
+
+                    monat = MONATE[month_name]
+                    periode = f"{jahr}-{monat:02d}"
+                    row = existing.get((messpunkt_id, periode))
+                    seen.add((messpunkt_id, periode))
+
+                    if row is None:
+                        session.add(Verbrauchsdaten(
+                            zeitstempel=datetime(jahr, monat, 1),
+                            messpunkt_id=messpunkt_id,
+                            verbrauch=value,
+                            periode=periode
+                        ))
+                        diff['werte']['neu'] += 1
+                    elif row.verbrauch != value:
+                        diff['aenderungen'].append({
+                            'zaehler_id': zaehler_id,
+                            'messpunkt': key,
+                            'periode': periode,
+                            'alt': row.verbrauch,
+                            'neu': value
+                        })
+                        row.verbrauch = value
+                        diff['werte']['geaendert'] += 1
+                    else:
+                        diff['werte']['unveraendert'] += 1
+
+            # Werte, die der Block nicht mehr liefert, entfernen
+            for (messpunkt_id, periode), row in existing.items():
+                if (messpunkt_id, periode) in seen:
+                    continue
+                diff['aenderungen'].append({
+                    'zaehler_id': zaehler_id,
+                    'messpunkt': key_by_id[messpunkt_id],
+                    'periode': periode,
+                    'alt': row.verbrauch,
+                    'neu': None
+                })
+                session.delete(row)
+                diff['werte']['entfernt'] += 1
+
+            # Messpunkte, die nicht mehr im Block stehen, deaktivieren
+            for key in [key for key in messpunkt_ids if key not in keys]:
+                messpunkt = session.get(Messpunkt, messpunkt_ids.pop(key))
+                if messpunkt is not None:
+                    messpunkt.aktiv = False
+                diff['entfernte_messpunkte'].append({'zaehler_id': zaehler_id, 'messpunkt': key})
+
+            block.fingerprint = fingerprint
+            block.messpunkt_ids = json.dumps(messpunkt_ids, ensure_ascii=False)
+
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    return diff
@@ -1,29 +1,255 @@
 """
 Markdown-Parser für STWEG-Dokumentation
 Parst ROADMAP.md und USER_STORIES.md in strukturierte Daten
+Geparste Dokumente werden pro Prozess gecacht, solange Datei-mtime und
+-Grösse gleich bleiben
 """
 
+import bisect
+import copy
+import hashlib
 import re
-from typing import Dict, List, Any
+import threading
+from typing import Callable, Dict, List, Any, NamedTuple, Optional
 from pathlib import Path
 
+# Bei Änderungen am Ausgabeformat erhöhen (Teil des ETags)
+CACHE_VERSION = '1'
+
+# Muster (einmal pro Prozess kompiliert)
+HEADING_PATTERN = re.compile(r'(#+)\s*(.*)')
+EPIC_PATTERN = re.compile(r'## Epic (\d+):\s*(.+)')
+STORY_HEADER_PATTERN = re.compile(r'### US-(\d+):\s*(.+)')
+PHASE_PATTERN = re.compile(r'## Phase (\d+):\s*([^\n]+)')
+SPRINT_PATTERN = re.compile(r'### Sprint (\d+\.\d+):\s*([^\n]+)')
+MILESTONE_PATTERN = re.compile(r'(M\d+)\s*\(Woche\s*(\d+)\):\s*([^\n]+)')
+STEP_PATTERN = re.compile(r'-\s*([^\n]+)')
+STORY_BLOCK_PATTERN = re.compile(
+    r'### ([^-]+)\s*\*\*Status:\*\*\s*([^*]+)\s*\*\*Epic:\*\*\s*([^*]+)\s*\*\*Als\*\* ([^*]+) '
+    r'\*\*möchte ich\*\* ([^*]+) \*\*damit\*\* ([^*]+)',
+    re.DOTALL
+)
+CHECKBOX_PATTERN = re.compile(r'^- \[[ x]\]\s*')
+BACKLOG_STATS_PATTERN = re.compile(
+    r'\*\*Gesamt:\*\*\s*(\d+)\s*User Stories\s*\|\s*\*\*Abgeschlossen:\*\*\s*(\d+)\s*\|'
+    r'\s*\*\*In Bearbeitung:\*\*\s*(\d+)\s*\|\s*\*\*Geplant:\*\*\s*(\d+)'
+)
+
+# Prioritäts-Abschnitte der Roadmap: "## 🎯 Priorität 1 - KRITISCH"
+PRIORITY_HEADING = '## 🎯'
+PRIORITIES = ('kritisch', 'hoch', 'mittel', 'niedrig')
+
+# Zeilen, die die Roadmap-Extraktion auf einen Blick braucht
+STORY_LINE_PREFIX = '- **US-'
+TOPIC_PREFIX = '### '
+STORY_HEADING_PREFIX = '### US-'
+# Wie weit über einer Story-Zeile nach der Epic-Überschrift gesucht wird
+EPIC_LOOKBACK = 5
+
+
+class CachedDocument(NamedTuple):
+    """Geparstes Dokument mit dem Dateistand, aus dem es erzeugt wurde"""
+    path: Path
+    mtime_ns: int
+    size: int
+    data: Dict[str, Any]
+
+
+class DocumentCache:
+    """
+    Cache für geparste Markdown-Dokumente
+
+    Schlüssel ist der Dateipfad; ein Eintrag gilt, solange mtime und Grösse
+    der Datei unverändert sind. Gleichzeitige Zugriffe sind threadsicher.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CachedDocument] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: Path, parse: Callable[[str], Dict[str, Any]]) -> Optional[CachedDocument]:
+        """
+        Gibt das geparste Dokument zurück, bei geänderter Datei neu geparst
+
+        Args:
+            path: Pfad zur Markdown-Datei
+            parse: Funktion, die den Dateiinhalt in ein Dict umwandelt
+
+        Returns:
+            CachedDocument oder None, wenn die Datei fehlt
+        """
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        entry = CachedDocument(path, stat.st_mtime_ns, stat.st_size, parse(content))
+
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def clear(self):
+        """Leert den Cache"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def document_etag(*documents: CachedDocument) -> str:
+    """ETag für eine Antwort aus den angegebenen Dokumenten"""
+    stamps = '|'.join(f"{doc.path}:{doc.mtime_ns}:{doc.size}" for doc in documents)
+    return hashlib.sha1(f"{CACHE_VERSION}|{stamps}".encode('utf-8')).hexdigest()
+
+
+# Gemeinsamer Cache für alle Endpunkte
+document_cache = DocumentCache()
+
+
+class Section:
+    """Überschrift mit Unterabschnitten; umfasst die Zeilen line bis end (exklusiv)"""
+
+    __slots__ = ('level', 'title', 'line', 'end', 'parent', 'children')
+
+    def __init__(self, level: int, title: str, line: int, parent: Optional['Section']):
+        self.level = level
+        self.title = title
+        self.line = line
+        self.end = None
+        self.parent = parent
+        self.children: List['Section'] = []
+
+
+class MarkdownDocument:
+    """
+    Einmal tokenisiertes Markdown-Dokument
+
+    Ein Durchlauf über alle Zeilen baut den Überschriften-Baum sowie die
+    Verweise auf, die die Extraktion sonst durch Vor- und Zurückscannen findet.
+    """
+
+    def __init__(self, content: str):
+        self.lines = content.split('\n')
+        self.root = Section(0, '', -1, None)
+        self.headings: List[Section] = []
+        # Pro Zeile: Index der letzten '## 🎯'-Überschrift bis hier (-1: keine)
+        self.priority_heading: List[int] = []
+        # '### '-Überschriften ausser Story-Überschriften (sortiert)
+        self.topic_lines: List[int] = []
+        # Story-Zeilen '- **US-...' (sortiert)
+        self.story_lines: List[int] = []
+
+        stack = [self.root]
+        last_priority = -1
+        for index, line in enumerate(self.lines):
+            if line.startswith('#'):
+                hashes, title = HEADING_PATTERN.match(line).groups()
+                level = len(hashes)
+                while stack[-1].level >= level:
+                    stack.pop().end = index
+                section = Section(level, title.strip(), index, stack[-1])
+                stack[-1].children.append(section)
+                stack.append(section)
+                self.headings.append(section)
+
+                if line.startswith(PRIORITY_HEADING):
+                    last_priority = index
+                elif line.startswith(TOPIC_PREFIX) and not line.startswith(STORY_HEADING_PREFIX):
+                    self.topic_lines.append(index)
+            elif line.startswith(STORY_LINE_PREFIX):
+                self.story_lines.append(index)
+            self.priority_heading.append(last_priority)
+
+        for section in stack:
+            section.end = len(self.lines)
+
+    def first_topic_before(self, index: int, lookback: int) -> Optional[str]:
+        """Oberste '### '-Überschrift in den lookback Zeilen vor index"""
+        position = bisect.bisect_left(self.topic_lines, max(0, index - lookback))
+        if position < len(self.topic_lines) and self.topic_lines[position] < index:
+            return self.lines[self.topic_lines[position]]
+        return None
+
+    def section_text(self, section_name: str) -> str:
+        """
+        Text ab der ersten '##'-Überschrift mit section_name bis zur nächsten
+        '##'-Überschrift (nicht '###') ohne section_name
+        """
+        start = end = None
+        for section in self.headings:
+            line = self.lines[section.line]
+            if start is None:
+                if section_name in line and line.startswith('##'):
+                    start = section.line
+            elif line.startswith('##') and not line.startswith('###') and section_name not in line:
+                end = section.line
+                break
+        if start is None:
+            return ''
+        return '\n'.join(self.lines[start:end])
+
 
 class MarkdownParser:
     """Parser für Markdown-Dokumentation"""
     
-    def __init__(self, project_root: Path):
+    def __init__(self, project_root: Path, cache: Optional[DocumentCache] = None):
         self.project_root = project_root
+        self.cache = cache if cache is not None else document_cache
+        self._tokenized: Optional[tuple] = None
+    
+    def _document(self, content: str) -> MarkdownDocument:
+        """Tokenisiertes Dokument (der letzte Inhalt wird wiederverwendet)"""
+        if self._tokenized is None or self._tokenized[0] != content:
+            self._tokenized = (content, MarkdownDocument(content))
+        return self._tokenized[1]
+    
+    @staticmethod
+    def _priority_from_heading(heading: str) -> Optional[str]:
+        """Priorität aus einer '## 🎯'-Überschrift (None ohne bekanntes Stichwort)"""
+        heading = heading.upper()
+        for priority in PRIORITIES:
+            if priority.upper() in heading:
+                return priority
+        return None
+    
+    def load_roadmap(self) -> Optional[CachedDocument]:
+        """ROADMAP.md aus dem Cache (None, wenn die Datei fehlt)"""
+        return self.cache.get(self.project_root / 'ROADMAP.md', self._parse_roadmap_content)
+    
+    def load_user_stories(self) -> Optional[CachedDocument]:
+        """USER_STORIES.md aus dem Cache (None, wenn die Datei fehlt)"""
+        return self.cache.get(self.project_root / 'USER_STORIES.md', self._parse_user_stories_content)
     
     def parse_roadmap(self) -> Dict[str, Any]:
         """Parse ROADMAP.md als priorisiertes Backlog"""
-        roadmap_file = self.project_root / 'ROADMAP.md'
-        
-        if not roadmap_file.exists():
+        document = self.load_roadmap()
+        if document is None:
             return {'error': 'ROADMAP.md nicht gefunden'}
-        
-        with open(roadmap_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
+        # Kopie, damit Aufrufer den Cache-Eintrag nicht verändern
+        return copy.deepcopy(document.data)
+    
+    def parse_user_stories(self) -> Dict[str, Any]:
+        """Parse USER_STORIES.md in strukturierte Daten"""
+        document = self.load_user_stories()
+        if document is None:
+            return {'error': 'USER_STORIES.md nicht gefunden'}
+        return copy.deepcopy(document.data)
+    
+    def _parse_roadmap_content(self, content: str) -> Dict[str, Any]:
+        """Parst den Inhalt von ROADMAP.md"""
         # Priorisierte User Stories extrahieren
         priorities = self._extract_priorities(content)
         
@@ -38,16 +264,8 @@ class MarkdownParser:
             'progress_percentage': status.get('progress_percentage', 0)
         }
     
-    def parse_user_stories(self) -> Dict[str, Any]:
-        """Parse USER_STORIES.md in strukturierte Daten"""
-        user_stories_file = self.project_root / 'USER_STORIES.md'
-        
-        if not user_stories_file.exists():
-            return {'error': 'USER_STORIES.md nicht gefunden'}
-        
-        with open(user_stories_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
+    def _parse_user_stories_content(self, content: str) -> Dict[str, Any]:
+        """Parst den Inhalt von USER_STORIES.md"""
         # Epics extrahieren
         epics = self._extract_epics(content)
         
@@ -71,8 +289,7 @@ class MarkdownParser:
         phases = []
         
         # Suche nach ## Phase X: Pattern
-        phase_pattern = r'## Phase (\d+):\s*([^\n]+)'
-        phase_matches = re.findall(phase_pattern, content)
+        phase_matches = PHASE_PATTERN.findall(content)
         
         for phase_num, phase_title in phase_matches:
             phase_info = {
@@ -83,16 +300,14 @@ class MarkdownParser:
             }
             
             # Status bestimmen
-            if f'Phase {phase_num}' in content:
-                phase_section = self._extract_section(content, f'Phase {phase_num}')
-                if '100%' in phase_section or 'Abgeschlossen' in phase_section:
-                    phase_info['status'] = 'completed'
-                elif 'AKTUELL' in phase_section or 'IN BEARBEITUNG' in phase_section:
-                    phase_info['status'] = 'current'
+            phase_section = self._extract_section(content, f'Phase {phase_num}')
+            if '100%' in phase_section or 'Abgeschlossen' in phase_section:
+                phase_info['status'] = 'completed'
+            elif 'AKTUELL' in phase_section or 'IN BEARBEITUNG' in phase_section:
+                phase_info['status'] = 'current'
             
             # Sprints extrahieren
-            sprint_pattern = r'### Sprint (\d+\.\d+):\s*([^\n]+)'
-            sprint_matches = re.findall(sprint_pattern, phase_section)
+            sprint_matches = SPRINT_PATTERN.findall(phase_section)
             
             for sprint_num, sprint_title in sprint_matches:
                 phase_info['sprints'].append({
@@ -123,7 +338,7 @@ class MarkdownParser:
                     epics.append(current_epic)
                 
                 # Epic-Nummer und Titel extrahieren
-                epic_match = re.match(r'## Epic (\d+):\s*(.+)', line)
+                epic_match = EPIC_PATTERN.match(line)
                 if epic_match:
                     epic_num, epic_title = epic_match.groups()
                     current_epic = {
@@ -147,7 +362,7 @@ class MarkdownParser:
                     current_epic['stories'].append(current_story)
                 
                 # Story-ID und Titel extrahieren
-                story_match = re.match(r'### US-(\d+):\s*(.+)', line)
+                story_match = STORY_HEADER_PATTERN.match(line)
                 if story_match:
                     story_num, story_title = story_match.groups()
                     current_story = {
@@ -219,8 +434,7 @@ class MarkdownParser:
         milestones = []
         
         # Suche nach Muster: M1 (Woche X): Beschreibung
-        milestone_pattern = r'(M\d+)\s*\(Woche\s*(\d+)\):\s*([^\n]+)'
-        milestone_matches = re.findall(milestone_pattern, content)
+        milestone_matches = MILESTONE_PATTERN.findall(content)
         
         for milestone_id, week, description in milestone_matches:
             milestones.append({
@@ -243,92 +457,59 @@ class MarkdownParser:
         # Nächste Schritte extrahieren
         if 'Nächste Schritte' in content:
             next_steps_section = self._extract_section(content, 'Nächste Schritte')
-            step_pattern = r'-\s*([^\n]+)'
-            steps = re.findall(step_pattern, next_steps_section)
+            steps = STEP_PATTERN.findall(next_steps_section)
             status['next_steps'] = [step.strip() for step in steps[:3]]  # Nur die ersten 3
         
         return status
     
     def _extract_section(self, content: str, section_name: str) -> str:
         """Extrahiert einen Abschnitt aus dem Markdown-Content"""
-        lines = content.split('\n')
-        section_lines = []
-        in_section = False
-        
-        for i, line in enumerate(lines):
-            if section_name in line and line.startswith('##'):
-                in_section = True
-                section_lines.append(line)
-            elif in_section and line.startswith('##') and not line.startswith('###') and section_name not in line:
-                # Stoppe nur bei echten ## Headern (nicht bei ###)
-                break
-            elif in_section:
-                section_lines.append(line)
-        
-        return '\n'.join(section_lines)
+        return self._document(content).section_text(section_name)
     
     def _extract_priorities(self, content: str) -> Dict[str, List[Dict[str, Any]]]:
         """Extrahiert priorisierte User Stories aus der Roadmap"""
-        priorities = {
-            'kritisch': [],
-            'hoch': [],
-            'mittel': [],
-            'niedrig': []
-        }
+        priorities = {priority: [] for priority in PRIORITIES}
         
-        lines = content.split('\n')
-        current_priority = None
+        document = self._document(content)
         
-        for i, line in enumerate(lines):
-            # Prioritäts-Header erkennen
-            if line.startswith('## 🎯'):
-                # Neue Priorität bestimmen
-                if 'KRITISCH' in line.upper():
-                    current_priority = 'kritisch'
-                elif 'HOCH' in line.upper():
-                    current_priority = 'hoch'
-                elif 'MITTEL' in line.upper():
-                    current_priority = 'mittel'
-                elif 'NIEDRIG' in line.upper():
-                    current_priority = 'niedrig'
-                else:
-                    current_priority = None
+        # User Story Zeilen (z.B. "- **US-008** - PDF-Rechnung generieren ⭐⭐⭐")
+        for index in document.story_lines:
+            heading = document.priority_heading[index]
+            current_priority = self._priority_from_heading(document.lines[heading]) if heading >= 0 else None
+            if not current_priority:
+                continue
             
-            # User Story ID erkennen (z.B. "- **US-008** - PDF-Rechnung generieren ⭐⭐⭐")
-            elif line.startswith('- **US-') and current_priority:
-                try:
-                    # Story-ID extrahieren
-                    story_id = line.split('**')[1]  # US-008
-                    
-                    # Titel extrahieren - alles nach dem zweiten "- " bis zu den Sternen
-                    parts = line.split(' - ')
-                    if len(parts) >= 3:
-                        story_title = parts[2].split(' ⭐')[0].strip()
-                    elif len(parts) >= 2:
-                        # Fallback: alles nach dem ersten "- " bis zu den Sternen
-                        story_title = parts[1].split(' ⭐')[0].strip()
-                    else:
-                        story_title = "Unbekannt"
-                    
-                    # Epic aus dem Kontext extrahieren (vorherige Zeilen)
-                    epic = "Unbekannt"
-                    for j in range(max(0, i-5), i):
-                        if lines[j].startswith('### ') and not lines[j].startswith('### US-'):
-                            epic = lines[j].replace('### ', '').strip()
-                            break
-                    
-                    story_data = {
-                        'id': story_id,
-                        'title': story_title,
-                        'epic': epic,
-                        'status': 'Geplant',
-                        'priority': current_priority
-                    }
-                    
-                    priorities[current_priority].append(story_data)
-                except Exception as e:
-                    print(f"Fehler beim Parsen der Zeile: {line}")
-                    continue
+            line = document.lines[index]
+            try:
+                # Story-ID extrahieren
+                story_id = line.split('**')[1]  # US-008
+                
+                # Titel extrahieren - alles nach dem zweiten "- " bis zu den Sternen
+                parts = line.split(' - ')
+                if len(parts) >= 3:
+                    story_title = parts[2].split(' ⭐')[0].strip()
+                elif len(parts) >= 2:
+                    # Fallback: alles nach dem ersten "- " bis zu den Sternen
+                    story_title = parts[1].split(' ⭐')[0].strip()
+                else:
+                    story_title = "Unbekannt"
+                
+                # Epic: oberste '### '-Überschrift in den Zeilen direkt darüber
+                topic = document.first_topic_before(index, EPIC_LOOKBACK)
+                epic = topic.replace('### ', '').strip() if topic is not None else "Unbekannt"
+                
+                story_data = {
+                    'id': story_id,
+                    'title': story_title,
+                    'epic': epic,
+                    'status': 'Geplant',
+                    'priority': current_priority
+                }
+                
+                priorities[current_priority].append(story_data)
+            except Exception as e:
+                print(f"Fehler beim Parsen der Zeile: {line}")
+                continue
         
         return priorities
     
@@ -374,28 +555,22 @@ class MarkdownParser:
     
     def _extract_priority_from_title(self, title: str, content: str) -> str:
         """Extrahiert die Priorität einer User Story basierend auf dem Kontext"""
-        # Suche nach dem Abschnitt, in dem die Story steht
-        lines = content.split('\n')
+        # Erste '###'-Überschrift mit dem Titel, Priorität aus dem Abschnitt darüber
+        document = self._document(content)
         current_section = None
         
-        for i, line in enumerate(lines):
+        for section in document.headings:
+            line = document.lines[section.line]
             if title in line and line.startswith('###'):
-                # Schaue zurück nach dem nächsten ## Header
-                for j in range(i-1, -1, -1):
-                    if lines[j].startswith('## 🎯'):
-                        current_section = lines[j].lower()
-                        break
+                heading = document.priority_heading[section.line]
+                if heading >= 0:
+                    current_section = document.lines[heading].lower()
                 break
         
         if current_section:
-            if 'kritisch' in current_section:
-                return 'kritisch'
-            elif 'hoch' in current_section:
-                return 'hoch'
-            elif 'mittel' in current_section:
-                return 'mittel'
-            elif 'niedrig' in current_section:
-                return 'niedrig'
+            for priority in PRIORITIES:
+                if priority in current_section:
+                    return priority
         
         return 'niedrig'
     
@@ -403,10 +578,7 @@ class MarkdownParser:
         """Extrahiert User Stories aus einem Prioritäts-Abschnitt"""
         stories = []
         
-        # User Story Pattern
-        story_pattern = r'### ([^-]+)\s*\*\*Status:\*\*\s*([^*]+)\s*\*\*Epic:\*\*\s*([^*]+)\s*\*\*Als\*\* ([^*]+) \*\*möchte ich\*\* ([^*]+) \*\*damit\*\* ([^*]+)'
-        
-        matches = re.findall(story_pattern, content, re.DOTALL)
+        matches = STORY_BLOCK_PATTERN.findall(content)
         
         for title, status, epic, as_user, want, so_that in matches:
             # Akzeptanzkriterien extrahieren
@@ -439,7 +611,7 @@ class MarkdownParser:
         for line in lines:
             if line.strip().startswith('- ['):
                 # Entferne Checkbox-Syntax und extrahiere Text
-                criteria_text = re.sub(r'^- \[[ x]\]\s*', '', line.strip())
+                criteria_text = CHECKBOX_PATTERN.sub('', line.strip())
                 if criteria_text:
                     criteria.append(criteria_text)
         
@@ -450,8 +622,7 @@ class MarkdownParser:
         status = {}
         
         # Gesamtstatistiken extrahieren
-        stats_pattern = r'\*\*Gesamt:\*\*\s*(\d+)\s*User Stories\s*\|\s*\*\*Abgeschlossen:\*\*\s*(\d+)\s*\|\s*\*\*In Bearbeitung:\*\*\s*(\d+)\s*\|\s*\*\*Geplant:\*\*\s*(\d+)'
-        stats_match = re.search(stats_pattern, content)
+        stats_match = BACKLOG_STATS_PATTERN.search(content)
         
         if stats_match:
             total, completed, in_progress, planned = map(int, stats_match.groups())
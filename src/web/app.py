@@ -3,9 +3,9 @@ STWEG Web-Interface
 Flask-Anwendung mit Dashboard und API-Endpunkten
 """
 
+import io
 import os
 import sys
-import subprocess
 import json
 from datetime import datetime
 from pathlib import Path
@@ -14,15 +14,18 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from flask import Flask, render_template, jsonify, request, send_file
+from flask import Flask, Response, render_template, jsonify, request, send_file, stream_with_context
 from flask_cors import CORS
 
 # Modelle importieren
 from src.models.models import Base, Eigentuemer, Messpunkt, Verbrauchsdaten, Rechnung
 # from src.models.zaehler import Zaehler  # Temporär auskommentiert
-from src.models.database import get_db_session, create_tables
+from src.models.database import engine, get_db_session, create_tables
+from src.models.status import DatabaseStatusCache
 from src.excel_analysis.excel_analyzer import ExcelAnalyzer
-from src.billing.pdf_generator import STWEGPDFGenerator
+from src.excel_analysis.parse_cache import ParseCache
+from src.billing.pdf_generator import STWEGPDFGenerator, save_invoice_async
+from src.web.jobs import FINISHED_STATES, InvoiceBatchJobManager, ParseJobManager, PytestJobRunner
 
 app = Flask(__name__)
 CORS(app)
@@ -40,6 +43,23 @@ EXPORT_FOLDER.mkdir(parents=True, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = str(UPLOAD_FOLDER)
 app.config['EXPORT_FOLDER'] = str(EXPORT_FOLDER)
 
+# Cache für ZEV-Parser-Ergebnisse (inhaltsadressiert)
+CACHE_FOLDER = project_root / 'data' / 'cache' / 'zev_parse'
+parse_cache = ParseCache(CACHE_FOLDER)
+
+# ZEV-Dateien nach dem Upload im lokalen Prozess-Pool parsen
+parse_jobs = ParseJobManager(parse_cache=parse_cache)
+
+# Testläufe im Hintergrund, letztes Ergebnis unter data/cache/test_runs
+TEST_RUNS_FOLDER = project_root / 'data' / 'cache' / 'test_runs'
+test_runner = PytestJobRunner(project_root, TEST_RUNS_FOLDER)
+
+# Rechnungs-Batches im Hintergrund (Stand über /api/billing/batch-jobs/<id>)
+invoice_jobs = InvoiceBatchJobManager(EXPORT_FOLDER / 'invoices')
+
+# Datenbank-Zähler für /api/status (kurze TTL, bei jedem Commit verworfen)
+status_cache = DatabaseStatusCache(engine)
+
 
 @app.route('/')
 def dashboard():
@@ -51,8 +71,8 @@ def dashboard():
 def api_status():
     """API: Aktueller Projektstatus"""
     try:
-        # Datenbank-Status
-        session = get_db_session()
+        # Datenbank-Status (eine Abfrage, zwischen Schreibzugriffen gecacht)
+        database_counts, _ = status_cache.get(get_db_session)
         
         stats = {
             'timestamp': datetime.now().isoformat(),
@@ -61,20 +81,13 @@ def api_status():
                 'progress': 65,
                 'status': 'In Entwicklung'
             },
-            'database': {
-                'eigentuemer_count': session.query(Eigentuemer).count(),
-                'messpunkte_count': session.query(Messpunkt).count(),
-                'verbrauchsdaten_count': session.query(Verbrauchsdaten).count(),
-                'rechnungen_count': session.query(Rechnung).count(),
-                'active_eigentuemer': session.query(Eigentuemer).filter(Eigentuemer.aktiv == True).count()
-            },
+            'database': database_counts,
             'files': {
                 'upload_folder': str(UPLOAD_FOLDER),
                 'export_folder': str(EXPORT_FOLDER)
             }
         }
         
-        session.close()
         return jsonify(stats)
         
     except Exception as e:
@@ -83,36 +96,19 @@ def api_status():
 
 @app.route('/api/tests')
 def api_tests():
-    """API: Test-Status"""
+    """API: Letztes Testergebnis (mit Alter) und Status eines laufenden Testlaufs"""
+    return jsonify(test_runner.status())
+
+
+@app.route('/api/tests', methods=['POST'])
+def api_tests_run():
+    """API: Testlauf im Hintergrund starten (läuft schon einer, wird dieser zurückgegeben)"""
     try:
-        # Tests ausführen und Ergebnis parsen
-        python_cmd = sys.executable  # Verwendet den gleichen Python-Interpreter
-        result = subprocess.run([
-            python_cmd, '-m', 'pytest', 'tests/', '--tb=short', '-q'
-        ], capture_output=True, text=True, cwd=project_root)
-        
-        # Test-Ergebnisse parsen
-        test_results = {
-            'timestamp': datetime.now().isoformat(),
-            'exit_code': result.returncode,
-            'success': result.returncode == 0,
-            'output': result.stdout,
-            'errors': result.stderr,
-            'summary': parse_test_output(result.stdout)
-        }
-        
-        return jsonify(test_results)
+        job, started = test_runner.start()
+        return jsonify({'job': job, 'started': started}), 202
         
     except Exception as e:
-        import traceback
-        error_details = {
-            'error': str(e),
-            'traceback': traceback.format_exc(),
-            'timestamp': datetime.now().isoformat(),
-            'project_root': str(project_root),
-            'python_cmd': sys.executable
-        }
-        return jsonify(error_details), 500
+        return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/excel/upload', methods=['POST'])
@@ -129,6 +125,12 @@ def api_excel_upload():
         if not file.filename.lower().endswith(('.xlsx', '.xls')):
             return jsonify({'error': 'Nur Excel-Dateien (.xlsx, .xls) erlaubt'}), 400
         
+        # Engine vor dem Speichern prüfen: abgelehnte Uploads hinterlassen keine Datei
+        from src.excel_analysis.simple_zev_parser import ENGINES
+        engine = request.form.get('engine', 'streaming')
+        if engine not in ENGINES:
+            return jsonify({'error': f'Unbekannte Parser-Engine: {engine}'}), 400
+        
         # Alte Upload-Dateien bereinigen (nur die letzten 5 behalten)
         cleanup_old_uploads()
         
@@ -138,13 +140,14 @@ def api_excel_upload():
         filepath.parent.mkdir(parents=True, exist_ok=True)
         file.save(str(filepath))
         
-        # Excel-Datei nur speichern (keine Analyse mit ExcelAnalyzer - NaN-Problem!)
-        # Die Analyse erfolgt später über /api/excel/explore/<filename>
+        # Parsen als Hintergrund-Job (Fortschritt über /api/excel/jobs/<id>/events)
+        job = parse_jobs.submit(filepath, engine=engine)
         
         return jsonify({
             'success': True,
             'filename': filename,
-            'filepath': str(filepath)
+            'filepath': str(filepath),
+            'job': job
         })
         
     except Exception as e:
@@ -206,23 +209,37 @@ def api_excel_explore(filename):
             return jsonify({'error': 'Datei nicht gefunden'}), 404
         
         # Simple ZEV-Parser verwenden (NaN-frei)
-        from src.excel_analysis.simple_zev_parser import SimpleZEVParser
-        parser = SimpleZEVParser()
+        from src.excel_analysis.simple_zev_parser import SimpleZEVParser, ENGINES, PARSER_VERSION
+        engine = request.args.get('engine', 'vectorized')
+        if engine not in ENGINES:
+            return jsonify({'error': f'Unbekannte Parser-Engine: {engine}'}), 400
+        
+        # ?trace=1 liefert den Diagnose-Bericht des Parsers (immer frisch geparst)
+        trace = request.args.get('trace', '0').lower() in ('1', 'true', 'yes')
+        
+        # Gleicher Dateiinhalt -> gespeichertes Ergebnis (auch bei Re-Upload)
+        digest = parse_cache.file_digest(str(filepath))
+        result = None if trace else parse_cache.get(digest, PARSER_VERSION)
+        if result is not None:
+            result['file_name'] = filepath.name
+            return jsonify({
+                'success': True,
+                'cached': True,
+                'result': result
+            })
         
-        # ZEV-Datei parsen
-        print(f"🔍 DEBUG: Parse ZEV-Datei: {filepath}")
-        result = parser.parse_zev_file(str(filepath))
-        print(f"🔍 DEBUG: Result: {type(result)}")
+        parser = SimpleZEVParser(engine=engine)
         
-        print(f"🔍 DEBUG: Final Result: {type(result)}")
-        print(f"🔍 DEBUG: Zähler Overview: {len(result['zaehler_overview'])}")
+        # ZEV-Datei parsen
+        app.logger.debug("Parse ZEV-Datei: %s (Engine: %s)", filepath, engine)
+        result = parser.parse_zev_file(str(filepath), trace=trace)
+        app.logger.debug("Zähler Overview: %d", len(result['zaehler_overview']))
         
         # JSON-Serialisierung testen
         try:
             json.dumps(result)
-            print("✅ DEBUG: JSON-Serialisierung erfolgreich")
         except Exception as json_error:
-            print(f"❌ DEBUG: JSON-Fehler: {json_error}")
+            app.logger.error("JSON-Fehler: %s", json_error)
             # Fallback: Minimale Response
             result = {
                 'file_name': filename,
@@ -232,8 +249,13 @@ def api_excel_explore(filename):
                 'zaehler_overview': []
             }
         
+        # Nur erfolgreich geparste Dateien ohne Diagnose-Bericht cachen
+        if result.get('structure_verified') and not trace:
+            parse_cache.put(digest, PARSER_VERSION, result)
+        
         return jsonify({
             'success': True,
+            'cached': False,
             'result': result
         })
         
@@ -241,6 +263,113 @@ def api_excel_explore(filename):
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/excel/jobs/<job_id>')
+def api_excel_job(job_id):
+    """API: Stand eines Parse-Jobs"""
+    job = parse_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job nicht gefunden'}), 404
+    return jsonify(job)
+
+
+@app.route('/api/excel/jobs/<job_id>/result')
+def api_excel_job_result(job_id):
+    """API: Ergebnis eines fertigen Parse-Jobs (gleiches Format wie /api/excel/explore)"""
+    job = parse_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job nicht gefunden'}), 404
+    if job['status'] == 'failed':
+        return jsonify({'error': job['error'], 'job': job}), 500
+    if job['status'] != 'done':
+        return jsonify({'error': 'Job läuft noch', 'job': job}), 409
+    
+    return jsonify({
+        'success': True,
+        'cached': job['cached'],
+        'result': parse_jobs.result(job_id)
+    })
+
+
+@app.route('/api/excel/jobs/<job_id>/events')
+def api_excel_job_events(job_id):
+    """API: Fortschritt eines Parse-Jobs als Server-Sent Events (progress, done, failed)"""
+    if parse_jobs.get(job_id) is None:
+        return jsonify({'error': 'Job nicht gefunden'}), 404
+    
+    def stream():
+        version = None
+        while True:
+            job = parse_jobs.wait_for_update(job_id, version, timeout=15)
+            if job is None:
+                yield f"event: failed\ndata: {json.dumps({'error': 'Job nicht gefunden'})}\n\n"
+                return
+            if job['version'] == version:
+                # Kommentarzeile hält die Verbindung offen
+                yield ": keepalive\n\n"
+                continue
+            version = job['version']
+            event = job['status'] if job['status'] in FINISHED_STATES else 'progress'
+            yield f"event: {event}\ndata: {json.dumps(job)}\n\n"
+            if event in FINISHED_STATES:
+                return
+    
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/excel/cache', methods=['GET', 'DELETE'])
+def api_excel_cache():
+    """API: Statistik des Parse-Caches abrufen bzw. Cache leeren"""
+    try:
+        if request.method == 'DELETE':
+            parse_cache.clear()
+        
+        return jsonify(parse_cache.stats())
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/excel/import/<filename>', methods=['POST'])
+def api_excel_import(filename):
+    """API: ZEV-Datei inkrementell in die Verbrauchsdaten importieren"""
+    try:
+        filepath = Path(app.config['UPLOAD_FOLDER']) / 'excel' / filename
+        
+        if not filepath.exists():
+            return jsonify({'error': 'Datei nicht gefunden'}), 404
+        
+        data = request.get_json(silent=True) or {}
+        gebaeude = data.get('gebaeude')
+        jahr = data.get('jahr')
+        if not gebaeude or not isinstance(jahr, int):
+            return jsonify({'error': 'gebaeude (Text) und jahr (Zahl) sind erforderlich'}), 400
+        
+        from src.excel_analysis.simple_zev_parser import SimpleZEVParser
+        from src.models.zev_import import import_zev_columns
+        
+        try:
+            columns = SimpleZEVParser(engine='vectorized').parse_zev_columns(str(filepath))
+        except ValueError as e:
+            return jsonify({'error': 'ZEV-Datei konnte nicht geparst werden',
+                            'details': [str(e)]}), 400
+        
+        create_tables()
+        session = get_db_session()
+        try:
+            diff = import_zev_columns(session, columns, gebaeude, jahr)
+        finally:
+            session.close()
+        
+        return jsonify({
+            'success': True,
+            'diff': diff
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/database/sample-data', methods=['POST'])
 def api_create_sample_data():
     """API: Beispieldaten erstellen"""
@@ -284,41 +413,6 @@ def api_clear_database():
         return jsonify({'error': str(e)}), 500
 
 
-def parse_test_output(output):
-    """Parst pytest-Ausgabe und extrahiert Zusammenfassung"""
-    lines = output.split('\n')
-    summary = {'total': 0, 'passed': 0, 'failed': 0, 'errors': 0}
-    
-    for line in lines:
-        # Verschiedene pytest-Formate unterstützen
-        if 'passed' in line and ('failed' in line or 'warning' in line or 'in ' in line):
-            # Beispiele: 
-            # "24 passed, 1 warning in 0.59s"
-            # "5 passed, 2 failed in 2.34s"
-            # "3 passed, 1 error in 1.23s"
-            
-            import re
-            
-            # Regex für verschiedene Formate
-            passed_match = re.search(r'(\d+)\s+passed', line)
-            failed_match = re.search(r'(\d+)\s+failed', line)
-            error_match = re.search(r'(\d+)\s+error', line)
-            warning_match = re.search(r'(\d+)\s+warning', line)
-            
-            if passed_match:
-                summary['passed'] = int(passed_match.group(1))
-            if failed_match:
-                summary['failed'] = int(failed_match.group(1))
-            if error_match:
-                summary['errors'] = int(error_match.group(1))
-            
-            # Total berechnen
-            summary['total'] = summary['passed'] + summary['failed'] + summary['errors']
-            break
-    
-    return summary
-
-
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Endpoint nicht gefunden'}), 404
@@ -414,26 +508,40 @@ def api_modules_excel():
         return jsonify({'error': str(e)}), 500
 
 
+def document_response(data, *documents):
+    """
+    JSON-Antwort aus gecachten Markdown-Dokumenten mit ETag/Last-Modified
+
+    Unveränderte Dokumente ergeben bei If-None-Match/If-Modified-Since ein 304.
+    """
+    from src.utils.markdown_parser import document_etag
+    response = jsonify(data)
+    response.set_etag(document_etag(*documents))
+    response.last_modified = datetime.fromtimestamp(max(doc.mtime_ns for doc in documents) / 1e9)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
 @app.route('/api/roadmap')
 def api_roadmap():
     """API: Roadmap-Daten (vereinfacht)"""
     try:
         from src.utils.markdown_parser import MarkdownParser
-        parser = MarkdownParser(project_root)
-        roadmap_data = parser.parse_roadmap()
+        roadmap = MarkdownParser(project_root).load_roadmap()
         
-        if 'error' in roadmap_data:
-            return jsonify(roadmap_data), 404
+        if roadmap is None:
+            return jsonify({'error': 'ROADMAP.md nicht gefunden'}), 404
+        roadmap_data = roadmap.data
         
         # Vereinfachte Antwort für Dashboard
-        return jsonify({
+        return document_response({
             'current_phase': roadmap_data.get('status', {}).get('current_phase', 'Priorität 1 - KRITISCH'),
             'next_steps': roadmap_data.get('status', {}).get('next_steps', []),
             'progress': roadmap_data.get('progress_percentage', 35),
             'total_phases': roadmap_data.get('total_stories', 17),
             'completed_phases': roadmap_data.get('completed_stories', 6),
-            'last_updated': datetime.now().isoformat()
-        })
+            'last_updated': datetime.fromtimestamp(roadmap.mtime_ns / 1e9).isoformat()
+        }, roadmap)
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -444,13 +552,12 @@ def api_roadmap_full():
     """API: Vollständige Roadmap-Daten mit allen Phasen"""
     try:
         from src.utils.markdown_parser import MarkdownParser
-        parser = MarkdownParser(project_root)
-        roadmap_data = parser.parse_roadmap()
+        roadmap = MarkdownParser(project_root).load_roadmap()
         
-        if 'error' in roadmap_data:
-            return jsonify(roadmap_data), 404
+        if roadmap is None:
+            return jsonify({'error': 'ROADMAP.md nicht gefunden'}), 404
         
-        return jsonify(roadmap_data)
+        return document_response(roadmap.data, roadmap)
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -461,11 +568,11 @@ def api_user_stories():
     """API: User Stories-Daten (vereinfacht)"""
     try:
         from src.utils.markdown_parser import MarkdownParser
-        parser = MarkdownParser(project_root)
-        user_stories_data = parser.parse_user_stories()
+        user_stories = MarkdownParser(project_root).load_user_stories()
         
-        if 'error' in user_stories_data:
-            return jsonify(user_stories_data), 404
+        if user_stories is None:
+            return jsonify({'error': 'USER_STORIES.md nicht gefunden'}), 404
+        user_stories_data = user_stories.data
         
         # Vereinfachte Antwort für Dashboard
         recent_stories = []
@@ -473,13 +580,13 @@ def api_user_stories():
             for story in epic['stories'][-1:]:  # Letzte Story pro Epic
                 recent_stories.append(f"US-{story['number']}: {story['title']}")
         
-        return jsonify({
+        return document_response({
             'completed': user_stories_data['completed_stories'],
             'total': user_stories_data['total_stories'],
             'recent_stories': recent_stories,
             'progress_percentage': user_stories_data['progress_percentage'],
             'total_epics': user_stories_data['total_epics']
-        })
+        }, user_stories)
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -493,15 +600,21 @@ def api_user_stories_full():
         parser = MarkdownParser(project_root)
         
         # User Stories aus USER_STORIES.md laden
-        user_stories_data = parser.parse_user_stories()
+        user_stories = parser.load_user_stories()
         
-        if 'error' in user_stories_data:
-            return jsonify(user_stories_data), 404
+        if user_stories is None:
+            return jsonify({'error': 'USER_STORIES.md nicht gefunden'}), 404
+        
+        # Flache Kopie: der Cache-Eintrag bleibt unverändert
+        user_stories_data = dict(user_stories.data)
+        documents = [user_stories]
         
         # Backlog-Daten aus ROADMAP.md laden
-        roadmap_data = parser.parse_roadmap()
+        roadmap = parser.load_roadmap()
         
-        if 'error' not in roadmap_data:
+        if roadmap is not None:
+            roadmap_data = roadmap.data
+            documents.append(roadmap)
             # Backlog-Daten hinzufügen
             user_stories_data['backlog'] = {
                 'priorities': roadmap_data.get('priorities', {}),
@@ -511,7 +624,7 @@ def api_user_stories_full():
                 'progress_percentage': roadmap_data.get('progress_percentage', 0)
             }
         
-        return jsonify(user_stories_data)
+        return document_response(user_stories_data, *documents)
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -538,6 +651,120 @@ def api_billing_generate_sample():
         return jsonify({'error': str(e)}), 500
 
 
+def invoice_response(content, filename):
+    """
+    Streamt eine im Speicher gerenderte Rechnung direkt an den Client
+
+    Mit ?save=1 wird sie zusätzlich im Hintergrund unter data/exports/invoices
+    abgelegt (Download-Link im Header X-Invoice-Download-Url), mit
+    ?download=1 als Anhang statt inline ausgeliefert.
+    """
+    response = send_file(
+        io.BytesIO(content),
+        mimetype='application/pdf',
+        as_attachment=request.args.get('download') == '1',
+        download_name=filename,
+        max_age=0
+    )
+    if request.args.get('save') == '1':
+        save_invoice_async(content, EXPORT_FOLDER / 'invoices' / filename)
+        response.headers['X-Invoice-Download-Url'] = f'/api/billing/download/{filename}'
+    return response
+
+
+@app.route('/api/billing/sample-invoice')
+def api_billing_sample_invoice():
+    """API: Beispiel-Rechnung im Speicher rendern und streamen (ohne Datei)"""
+    try:
+        content = STWEGPDFGenerator().render_sample_invoice()
+        return invoice_response(content, f'sample_invoice_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf')
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/billing/invoice/<int:eigentuemer_id>')
+def api_billing_invoice(eigentuemer_id):
+    """
+    API: Rechnung eines Eigentümers für ?periode=YYYY[-MM] im Speicher rendern und streamen
+    
+    Stromkosten werden aus den Verbrauchsdaten berechnet; die Netz-Tarife (Rp./kWh
+    laut ewz-Rechnung) sind Pflicht, z.B. ?netz_hochtarif=54.9&netz_niedertarif=34.9
+    """
+    try:
+        from src.billing.allocation import TarifTabelle, allocate_period
+        from src.billing.batch import billing_period_label, invoice_data_for_owner, invoice_file_name
+        periode = request.args.get('periode', str(datetime.now().year))
+        billing_period_label(periode)
+        tarife = TarifTabelle.from_dict({key: value for key, value in request.args.items()
+                                         if key in TarifTabelle._fields})
+        
+        session = get_db_session()
+        try:
+            eigentuemer = session.get(Eigentuemer, eigentuemer_id)
+            if not eigentuemer:
+                return jsonify({'error': 'Eigentümer nicht gefunden'}), 404
+            owner = eigentuemer.to_dict()
+            strom_details = allocate_period(session, [owner], periode, tarife)[eigentuemer_id]
+        finally:
+            session.close()
+        
+        data = invoice_data_for_owner(owner, periode, strom_details=strom_details)
+        content = STWEGPDFGenerator().render_invoice(data)
+        return invoice_response(content, invoice_file_name(periode, eigentuemer_id))
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/billing/generate-batch', methods=['POST'])
+def api_billing_generate_batch():
+    """API: Rechnungs-Batch für eine Periode und mehrere Eigentümer im Hintergrund starten"""
+    try:
+        from src.billing.allocation import TarifTabelle, allocate_period
+        from src.billing.batch import billing_period_label, check_workers, load_eigentuemer
+        payload = request.get_json(silent=True) or {}
+        periode = str(payload.get('periode', ''))
+        billing_period_label(periode)
+        workers = check_workers(payload.get('workers'))
+        tarife = TarifTabelle.from_dict(payload.get('tarife') or {})
+        
+        session = get_db_session()
+        try:
+            eigentuemer = load_eigentuemer(session, payload.get('eigentuemer_ids'))
+            strom_details = allocate_period(session, eigentuemer, periode, tarife)
+        finally:
+            session.close()
+        
+        job = invoice_jobs.submit(eigentuemer, periode, workers=workers, force=bool(payload.get('force')),
+                                  strom_details=strom_details)
+        return jsonify({'success': True, 'job': job}), 202
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/billing/batch-jobs/<job_id>')
+def api_billing_batch_job(job_id):
+    """API: Stand eines Rechnungs-Batches, nach Abschluss mit Manifest und Download-Links"""
+    job = invoice_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job nicht gefunden'}), 404
+    
+    manifest = invoice_jobs.manifest(job_id)
+    if manifest is not None:
+        manifest = dict(manifest, invoices=[
+            dict(entry, download_url=f"/api/billing/download/{Path(entry['file']).name}") if entry['success']
+            else entry
+            for entry in manifest['invoices']
+        ])
+    return jsonify({'job': job, 'manifest': manifest})
+
+
 @app.route('/api/billing/download/<filename>')
 def api_billing_download(filename):
     """API: Generierte Rechnung herunterladen"""
@@ -590,7 +817,7 @@ def api_eigentuemer_list():
     """API: Alle Eigentümer auflisten"""
     try:
         session = get_db_session()
-        eigentuemer = session.query(Eigentuemer).all()
+        eigentuemer = Eigentuemer.query_with_messpunkte(session).all()
         
         eigentuemer_data = []
         for eig in eigentuemer:
@@ -827,7 +1054,7 @@ def api_eigentuemer_export():
     """API: Eigentümer-Daten in verschiedenen Formaten exportieren"""
     try:
         session = get_db_session()
-        eigentuemer = session.query(Eigentuemer).filter(Eigentuemer.aktiv == True).all()
+        eigentuemer = Eigentuemer.query_with_messpunkte(session).filter(Eigentuemer.aktiv == True).all()
         
         # Format-Parameter
         export_format = request.args.get('format', 'json')
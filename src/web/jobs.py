@@ -0,0 +1,514 @@
+"""
+Hintergrund-Jobs für das Web-Interface
+Testläufe laufen in einem eigenen Thread statt im Request; gleichzeitige
+Anfragen teilen sich einen laufenden Job. ZEV-Dateien werden in einem lokalen
+Prozess-Pool geparst, der Fortschritt kommt über eine Queue zurück.
+Rechnungs-Batches laufen in einem Thread mit eigenem (spawn-)Prozess-Pool.
+"""
+
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from src.billing.batch import billing_period_label, check_workers, generate_invoice_batch
+from src.excel_analysis.simple_zev_parser import ENGINES, PARSER_VERSION, SimpleZEVParser
+
+
+def parse_junit_xml(xml_path):
+    """
+    Liest die Zusammenfassung aus einem JUnit-XML-Report (pytest --junitxml)
+
+    Args:
+        xml_path: Pfad zum Report
+
+    Returns:
+        dict: total, passed, failed, errors, skipped (total ohne skipped,
+            wie bisher auf dem Dashboard angezeigt)
+    """
+    root = ET.parse(xml_path).getroot()
+    suites = [root] if root.tag == 'testsuite' else root.findall('testsuite')
+
+    counts = {'tests': 0, 'failures': 0, 'errors': 0, 'skipped': 0}
+    for suite in suites:
+        for key in counts:
+            counts[key] += int(suite.get(key, 0))
+
+    passed = counts['tests'] - counts['failures'] - counts['errors'] - counts['skipped']
+    return {
+        'total': passed + counts['failures'] + counts['errors'],
+        'passed': passed,
+        'failed': counts['failures'],
+        'errors': counts['errors'],
+        'skipped': counts['skipped']
+    }
+
+
+def _write_json_atomic(path, data):
+    """Schreibt JSON über eine temporäre Datei (kein halbes File bei Absturz)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+            json.dump(data, handle, ensure_ascii=False, indent=2)
+        os.replace(tmp_name, path)
+    except Exception:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+class PytestJobRunner:
+    """
+    Führt die Test-Suite im Hintergrund aus
+
+    Es läuft höchstens ein Testlauf gleichzeitig; start() während eines Laufs
+    gibt den laufenden Job zurück. Das letzte Ergebnis wird in result_dir
+    gespeichert und übersteht Neustarts.
+    """
+
+    def __init__(self, project_root, result_dir, test_path='tests/', extra_args=None):
+        self.project_root = Path(project_root)
+        self.result_dir = Path(result_dir)
+        self.result_file = self.result_dir / 'latest.json'
+        self.test_path = test_path
+        self.extra_args = list(extra_args or [])
+        self._lock = threading.Lock()
+        self._job = None
+        self._thread = None
+        self._result = self._load_result()
+
+    def _load_result(self):
+        """Letztes gespeichertes Ergebnis (None, wenn keines oder unlesbar)"""
+        try:
+            return json.loads(self.result_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    def start(self):
+        """
+        Startet einen Testlauf, falls keiner läuft
+
+        Returns:
+            tuple: (Job-Dict, True wenn neu gestartet)
+        """
+        with self._lock:
+            if self._job is not None:
+                return dict(self._job), False
+
+            self._job = {
+                'id': uuid.uuid4().hex,
+                'status': 'running',
+                'started_at': datetime.now().isoformat()
+            }
+            job = dict(self._job)
+            self._thread = threading.Thread(target=self._run, args=(job,), daemon=True,
+                                            name=f"pytest-job-{job['id'][:8]}")
+            self._thread.start()
+        return job, True
+
+    def wait(self, timeout=None):
+        """Wartet auf den laufenden Job (für Tests und CLI)"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _command(self, junit_path):
+        return [
+            sys.executable, '-m', 'pytest', self.test_path, '--tb=short', '-q',
+            f'--junitxml={junit_path}', *self.extra_args
+        ]
+
+    def _run(self, job):
+        """Führt pytest aus und speichert das Ergebnis"""
+        self.result_dir.mkdir(parents=True, exist_ok=True)
+        junit_path = self.result_dir / f"junit_{job['id']}.xml"
+        start = time.perf_counter()
+
+        result = {
+            'job_id': job['id'],
+            'started_at': job['started_at'],
+            'summary': {'total': 0, 'passed': 0, 'failed': 0, 'errors': 0, 'skipped': 0}
+        }
+        try:
+            completed = subprocess.run(self._command(junit_path), capture_output=True, text=True,
+                                       cwd=self.project_root)
+            result.update({
+                'exit_code': completed.returncode,
+                'success': completed.returncode == 0,
+                'output': completed.stdout,
+                'errors': completed.stderr
+            })
+            if junit_path.exists():
+                result['summary'] = parse_junit_xml(junit_path)
+        except Exception as e:
+            result.update({'exit_code': None, 'success': False, 'output': '', 'errors': str(e)})
+        finally:
+            if junit_path.exists():
+                junit_path.unlink()
+
+        result['duration_s'] = round(time.perf_counter() - start, 3)
+        result['timestamp'] = datetime.now().isoformat()
+        result['finished_at_epoch'] = time.time()
+
+        try:
+            _write_json_atomic(self.result_file, result)
+        except OSError as e:
+            result['persist_error'] = str(e)
+
+        with self._lock:
+            self._result = result
+            self._job = None
+
+    def status(self):
+        """
+        Aktueller Stand für GET /api/tests
+
+        Returns:
+            dict: running, job (laufender Job oder None), result (letztes
+                Ergebnis oder None) und age_s (Alter des Ergebnisses in Sekunden)
+        """
+        with self._lock:
+            job = dict(self._job) if self._job else None
+            result = dict(self._result) if self._result else None
+
+        age = None
+        if result and result.get('finished_at_epoch') is not None:
+            age = round(time.time() - result['finished_at_epoch'], 1)
+
+        return {
+            'running': job is not None,
+            'job': job,
+            'result': result,
+            'age_s': age
+        }
+
+
+# Status eines Parse-Jobs: queued -> running -> done | failed
+FINISHED_STATES = ('done', 'failed')
+
+# Queue für Fortschrittsmeldungen im Worker-Prozess (per Initializer gesetzt)
+_progress_queue = None
+
+
+def _init_parse_worker(queue):
+    """Initializer der Worker-Prozesse"""
+    global _progress_queue
+    _progress_queue = queue
+
+
+def _run_parse_job(job_id, file_path, engine):
+    """Parst eine ZEV-Datei im Worker-Prozess und meldet den Fortschritt"""
+    def report(progress):
+        _progress_queue.put((job_id, progress))
+
+    return SimpleZEVParser(engine=engine).parse_zev_file(file_path, progress=report)
+
+
+class ParseJobManager:
+    """
+    Parse-Jobs für hochgeladene ZEV-Dateien
+
+    Jobs laufen in einem lokalen ProcessPoolExecutor (kein externer Broker).
+    Der Pool wird erst beim ersten Job gestartet. Ergebnisse landen, wenn ein
+    ParseCache übergeben wird, auch im Parse-Cache; ein Cache-Treffer ist
+    sofort fertig.
+    """
+
+    # Anzahl Jobs, die im Speicher gehalten werden (älteste fertige fallen weg)
+    MAX_JOBS = 50
+
+    def __init__(self, max_workers=2, parse_cache=None):
+        self.max_workers = max_workers
+        self.parse_cache = parse_cache
+        self._changed = threading.Condition()
+        self._jobs = OrderedDict()
+        self._results = {}
+        self._executor = None
+        self._queue = None
+        self._listener = None
+
+    def _ensure_pool(self):
+        """Startet Pool und Listener-Thread beim ersten Job (spawn: sicher neben Flask-Threads)"""
+        if self._executor is not None:
+            return
+        context = multiprocessing.get_context('spawn')
+        self._queue = context.Queue()
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context,
+                                             initializer=_init_parse_worker, initargs=(self._queue,))
+        self._listener = threading.Thread(target=self._listen, daemon=True, name='parse-job-progress')
+        self._listener.start()
+
+    def submit(self, file_path, engine='streaming'):
+        """
+        Legt einen Parse-Job an
+
+        Args:
+            file_path: Pfad zur ZEV-Datei
+            engine (str): Parser-Engine ('streaming' meldet den Fortschritt zeilenweise)
+
+        Returns:
+            dict: Job (ohne Ergebnis)
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unbekannte Parser-Engine: {engine} (erlaubt: {', '.join(ENGINES)})")
+
+        file_path = Path(file_path)
+        job = {
+            'id': uuid.uuid4().hex,
+            'file_name': file_path.name,
+            'engine': engine,
+            'status': 'queued',
+            'cached': False,
+            'progress': {'rows_scanned': 0, 'total_rows': None, 'zaehler_found': 0},
+            'error': None,
+            'created_at': datetime.now().isoformat(),
+            'finished_at': None,
+            'version': 0
+        }
+
+        digest = None
+        if self.parse_cache is not None:
+            digest = self.parse_cache.file_digest(str(file_path))
+            cached = self.parse_cache.get(digest, PARSER_VERSION)
+            if cached is not None:
+                cached['file_name'] = file_path.name
+                zaehler = len(cached['zaehler_overview'])
+                job.update({'status': 'done', 'cached': True, 'finished_at': datetime.now().isoformat(),
+                            'progress': {'rows_scanned': None, 'total_rows': None, 'zaehler_found': zaehler}})
+                self._add(job, cached)
+                return self._snapshot(job)
+
+        with self._changed:
+            self._ensure_pool()
+            self._add(job)
+            future = self._executor.submit(_run_parse_job, job['id'], str(file_path), engine)
+        future.add_done_callback(lambda done: self._finish(job['id'], done, digest))
+        return self._snapshot(job)
+
+    def _add(self, job, result=None):
+        """Job registrieren und alte, fertige Jobs verwerfen"""
+        with self._changed:
+            self._jobs[job['id']] = job
+            if result is not None:
+                self._results[job['id']] = result
+            finished = [job_id for job_id, entry in self._jobs.items() if entry['status'] in FINISHED_STATES]
+            for job_id in finished[:max(0, len(self._jobs) - self.MAX_JOBS)]:
+                del self._jobs[job_id]
+                self._results.pop(job_id, None)
+
+    def _listen(self):
+        """Überträgt Fortschrittsmeldungen aus den Workern in die Jobs"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            job_id, progress = item
+            with self._changed:
+                job = self._jobs.get(job_id)
+                if job is None or job['status'] in FINISHED_STATES:
+                    continue
+                job['status'] = 'running'
+                job['progress'] = progress
+                job['version'] += 1
+                self._changed.notify_all()
+
+    def _finish(self, job_id, future, digest):
+        """Ergebnis eines Workers übernehmen (läuft im Callback-Thread des Pools)"""
+        error = None
+        result = None
+        try:
+            result = future.result()
+        except Exception as e:
+            error = str(e)
+
+        if result is not None and digest is not None and result.get('structure_verified'):
+            self.parse_cache.put(digest, PARSER_VERSION, result)
+
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if error is None:
+                job['status'] = 'done'
+                job['progress'] = dict(job['progress'], zaehler_found=len(result['zaehler_overview']))
+                self._results[job_id] = result
+            else:
+                job['status'] = 'failed'
+                job['error'] = error
+            job['finished_at'] = datetime.now().isoformat()
+            job['version'] += 1
+            self._changed.notify_all()
+
+    @staticmethod
+    def _snapshot(job):
+        return dict(job, progress=dict(job['progress']))
+
+    def get(self, job_id):
+        """Aktueller Stand eines Jobs (None, wenn unbekannt)"""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    def result(self, job_id):
+        """Parser-Ergebnis eines fertigen Jobs (None, solange es keines gibt)"""
+        with self._changed:
+            return self._results.get(job_id)
+
+    def wait_for_update(self, job_id, version, timeout=None):
+        """
+        Wartet, bis sich der Job gegenüber version geändert hat
+
+        Args:
+            job_id (str): Job-ID
+            version (int): Zuletzt gesehene Version
+            timeout (float): Maximale Wartezeit in Sekunden
+
+        Returns:
+            dict: Aktueller Stand (bei Timeout unverändert), None wenn unbekannt
+        """
+        with self._changed:
+            self._changed.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id]['version'] != version,
+                timeout
+            )
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    def shutdown(self):
+        """Beendet Pool und Listener"""
+        with self._changed:
+            executor, self._executor = self._executor, None
+            queue, self._queue = self._queue, None
+            listener, self._listener = self._listener, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+            queue.put(None)
+            listener.join(timeout=5)
+
+
+class InvoiceBatchJobManager:
+    """
+    Rechnungs-Batches im Hintergrund
+
+    Jeder Batch läuft in einem eigenen Thread; generate_invoice_batch startet
+    seinen Prozess-Pool mit 'spawn', weil der Web-Prozess bereits Threads hat
+    (Flask, Testlauf, Parse-Listener, Rechnungs-Writer).
+    """
+
+    # Anzahl Jobs, die im Speicher gehalten werden (älteste fertige fallen weg)
+    MAX_JOBS = 20
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self._changed = threading.Condition()
+        self._jobs = OrderedDict()
+        self._manifests = {}
+
+    def submit(self, eigentuemer, periode, workers=None, force=False, strom_details=None):
+        """
+        Startet einen Batch
+
+        Args:
+            eigentuemer (list): Eigentümer wie Eigentuemer.to_dict()
+            periode (str): Abrechnungsperiode 'YYYY' oder 'YYYY-MM'
+            workers (int): Anzahl Worker-Prozesse (None = Anzahl CPUs)
+            force (bool): Auch unveränderte Rechnungen neu erstellen
+            strom_details (dict): Berechnete Stromkosten pro Eigentümer-ID
+
+        Returns:
+            dict: Job (ohne Manifest)
+
+        Raises:
+            ValueError: Ungültige Periode oder Anzahl Worker
+        """
+        billing_period_label(periode)
+        check_workers(workers)
+
+        eigentuemer = list(eigentuemer)
+        job = {
+            'id': uuid.uuid4().hex,
+            'periode': periode,
+            'status': 'queued',
+            'progress': {'done': 0, 'failed': 0, 'total': len(eigentuemer)},
+            'error': None,
+            'created_at': datetime.now().isoformat(),
+            'finished_at': None
+        }
+        with self._changed:
+            self._jobs[job['id']] = job
+            finished = [job_id for job_id, entry in self._jobs.items() if entry['status'] in FINISHED_STATES]
+            for job_id in finished[:max(0, len(self._jobs) - self.MAX_JOBS)]:
+                del self._jobs[job_id]
+                self._manifests.pop(job_id, None)
+            thread = threading.Thread(target=self._run, args=(job['id'], eigentuemer, periode, workers, force,
+                                                              strom_details),
+                                      daemon=True, name=f"invoice-batch-{job['id'][:8]}")
+            thread.start()
+            return self._snapshot(job)
+
+    def _run(self, job_id, eigentuemer, periode, workers, force, strom_details):
+        """Erstellt die Rechnungen und hält den Fortschritt im Job nach"""
+        def on_result(entry):
+            with self._changed:
+                progress = self._jobs[job_id]['progress']
+                progress['done'] += 1
+                progress['failed'] += 0 if entry['success'] else 1
+                self._changed.notify_all()
+
+        with self._changed:
+            self._jobs[job_id]['status'] = 'running'
+
+        manifest = None
+        error = None
+        try:
+            manifest = generate_invoice_batch(eigentuemer, periode, output_dir=self.output_dir, workers=workers,
+                                              on_result=on_result, force=force, strom_details=strom_details,
+                                              mp_context=multiprocessing.get_context('spawn'))
+        except Exception as e:
+            error = str(e)
+
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job['status'] = 'done' if error is None else 'failed'
+                job['error'] = error
+                job['finished_at'] = datetime.now().isoformat()
+                if manifest is not None:
+                    self._manifests[job_id] = manifest
+            self._changed.notify_all()
+
+    @staticmethod
+    def _snapshot(job):
+        return dict(job, progress=dict(job['progress']))
+
+    def get(self, job_id):
+        """Aktueller Stand eines Jobs (None, wenn unbekannt)"""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    def manifest(self, job_id):
+        """Manifest eines fertigen Jobs (None, solange es keines gibt)"""
+        with self._changed:
+            return self._manifests.get(job_id)
+
+    def wait(self, job_id, timeout=None):
+        """Wartet, bis der Job fertig ist (für Tests und CLI); liefert den Stand"""
+        with self._changed:
+            self._changed.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id]['status'] in FINISHED_STATES,
+                timeout
+            )
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
@@ -131,17 +131,32 @@ function updateProjectStatus(data) {
 
 /**
  * Test-Status laden
+ * Liefert das letzte gespeicherte Ergebnis; gibt es noch keines, wird ein Testlauf gestartet
  */
 async function loadTestStatus() {
     try {
         const response = await fetch('/api/tests');
         const data = await response.json();
         
-        if (response.ok) {
-            updateTestStatus(data);
-        } else {
+        if (!response.ok) {
             console.error('Fehler beim Laden der Tests:', data.error);
             showTestError(data.error);
+            return;
+        }
+        
+        if (data.result) {
+            updateTestStatus(data.result, data.age_s);
+        }
+        
+        if (data.running) {
+            testRunning = true;
+            try {
+                await waitForTestRun();
+            } finally {
+                testRunning = false;
+            }
+        } else if (!data.result) {
+            await runTests();
         }
     } catch (error) {
         console.error('Netzwerk-Fehler beim Laden der Tests:', error);
@@ -149,10 +164,33 @@ async function loadTestStatus() {
     }
 }
 
+/**
+ * Auf laufenden Testlauf warten (Polling alle 2 Sekunden)
+ */
+async function waitForTestRun() {
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, 2000));
+        
+        const response = await fetch('/api/tests');
+        const data = await response.json();
+        
+        if (!response.ok) {
+            throw new Error(data.error || 'Fehler beim Abfragen des Testlaufs');
+        }
+        
+        if (!data.running) {
+            if (data.result) {
+                updateTestStatus(data.result, data.age_s);
+            }
+            return data.result;
+        }
+    }
+}
+
 /**
  * Test-Status im UI aktualisieren
  */
-function updateTestStatus(data) {
+function updateTestStatus(data, ageSeconds) {
     const testStatus = document.getElementById('test-status');
     const testResults = document.getElementById('test-results');
     
@@ -167,7 +205,11 @@ function updateTestStatus(data) {
             updateElement('tests-total', data.summary.total || 0);
         }
         
-        updateElement('test-timestamp', new Date(data.timestamp).toLocaleString('de-DE'));
+        let timestamp = new Date(data.timestamp).toLocaleString('de-DE');
+        if (ageSeconds !== undefined && ageSeconds !== null) {
+            timestamp += ` (vor ${formatAge(ageSeconds)})`;
+        }
+        updateElement('test-timestamp', timestamp);
         
         // Visual feedback
         const testStats = testResults.querySelectorAll('.test-stat');
@@ -179,6 +221,19 @@ function updateTestStatus(data) {
     }
 }
 
+/**
+ * Alter eines Ergebnisses lesbar formatieren
+ */
+function formatAge(seconds) {
+    if (seconds < 60) {
+        return `${Math.round(seconds)} s`;
+    }
+    if (seconds < 3600) {
+        return `${Math.round(seconds / 60)} min`;
+    }
+    return `${Math.round(seconds / 3600)} h`;
+}
+
 /**
  * Test-Fehler anzeigen
  */
@@ -226,11 +281,12 @@ async function runTests() {
     `;
     
     try {
-        const response = await fetch('/api/tests');
+        // Testlauf im Hintergrund starten (läuft schon einer, wird dieser geteilt)
+        const response = await fetch('/api/tests', { method: 'POST' });
         const data = await response.json();
         
         if (response.ok) {
-            updateTestStatus(data);
+            await waitForTestRun();
         } else {
             showTestError(data.error);
         }
@@ -288,8 +344,12 @@ async function handleExcelUpload(event) {
             currentUploadedFile = data.filename;
             console.log('📁 Aktuell hochgeladene Datei:', currentUploadedFile);
             
-            // Direkt erkunden nach Upload
-            await exploreUploadedFile(currentUploadedFile);
+            // Parse-Job läuft bereits, Fortschritt per SSE verfolgen
+            if (data.job && window.EventSource) {
+                await followParseJob(data.job, currentUploadedFile);
+            } else {
+                await exploreUploadedFile(currentUploadedFile);
+            }
             fileInput.value = ''; // Reset file input
         } else {
             analysisContent.innerHTML = `
@@ -432,6 +492,71 @@ async function exploreCurrentFile() {
     await exploreUploadedFile(currentUploadedFile);
 }
 
+/**
+ * Fortschritt eines Parse-Jobs anzeigen (Server-Sent Events) und danach das Ergebnis laden
+ */
+function followParseJob(job, filename) {
+    const analysisContent = document.getElementById('analysis-content');
+    
+    const showProgress = (progress) => {
+        const rows = progress.rows_scanned != null ? progress.rows_scanned.toLocaleString('de-CH') : '–';
+        const total = progress.total_rows ? ` / ${progress.total_rows.toLocaleString('de-CH')}` : '';
+        analysisContent.innerHTML = `
+            <div class="text-center">
+                <div class="spinner-border spinner-border-sm text-primary" role="status">
+                    <span class="visually-hidden">Parse...</span>
+                </div>
+                <span class="ms-2">Parse Excel-Datei... ${rows}${total} Zeilen, ${progress.zaehler_found} Zähler gefunden</span>
+            </div>
+        `;
+    };
+    
+    return new Promise((resolve) => {
+        const source = new EventSource(`/api/excel/jobs/${job.id}/events`);
+        
+        source.addEventListener('progress', (event) => {
+            showProgress(JSON.parse(event.data).progress);
+        });
+        
+        source.addEventListener('done', async () => {
+            source.close();
+            try {
+                const response = await fetch(`/api/excel/jobs/${job.id}/result`);
+                const data = await response.json();
+                if (!response.ok) {
+                    throw new Error(data.error);
+                }
+                displayExplorationResults(data.result);
+            } catch (error) {
+                analysisContent.innerHTML = `
+                    <div class="alert alert-danger">
+                        <strong>Fehler bei der Excel-Erkundung:</strong> ${error.message}
+                    </div>
+                `;
+            }
+            resolve();
+        });
+        
+        source.addEventListener('failed', (event) => {
+            source.close();
+            const data = JSON.parse(event.data);
+            analysisContent.innerHTML = `
+                <div class="alert alert-danger">
+                    <strong>Fehler bei der Excel-Erkundung:</strong> ${data.error}
+                </div>
+            `;
+            resolve();
+        });
+        
+        // Verbindung abgebrochen: synchron erkunden (Ergebnis kommt dann meist aus dem Cache)
+        source.onerror = async () => {
+            source.close();
+            await exploreUploadedFile(filename);
+            resolve();
+        };
+    });
+}
+
 /**
  * Hochgeladene Excel-Datei erkunden (ohne erneuten Upload)
  */
@@ -1352,33 +1477,32 @@ async function generateSampleInvoice() {
     downloadBtn.style.display = 'none';
     
     try {
-        const response = await fetch('/api/billing/generate-sample', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            }
-        });
-        
-        const data = await response.json();
+        // PDF wird im Speicher gerendert und direkt gestreamt (keine Datei im Export-Ordner)
+        const response = await fetch('/api/billing/sample-invoice');
         
         if (response.ok) {
+            const blob = await response.blob();
+            const disposition = response.headers.get('Content-Disposition') || '';
+            const match = disposition.match(/filename="?([^";]+)"?/);
+            const filename = match ? match[1] : 'rechnung.pdf';
+            
             resultText.innerHTML = `
                 <strong>PDF erfolgreich generiert!</strong><br>
-                <small class="text-muted">Datei: ${data.filename}</small>
+                <small class="text-muted">Datei: ${filename}</small>
             `;
             
-            // Download-Button konfigurieren
+            // Download-Button öffnet die PDF aus dem Speicher des Browsers
+            if (downloadBtn.dataset.objectUrl) {
+                URL.revokeObjectURL(downloadBtn.dataset.objectUrl);
+            }
+            const objectUrl = URL.createObjectURL(blob);
+            downloadBtn.dataset.objectUrl = objectUrl;
             downloadBtn.onclick = () => {
-                window.open(data.download_url, '_blank');
+                window.open(objectUrl, '_blank');
             };
             downloadBtn.style.display = 'inline-block';
-            
-            // Modul-Daten aktualisieren
-            setTimeout(() => {
-                loadPDFBillingModuleData();
-            }, 1000);
-            
         } else {
+            const data = await response.json();
             resultText.innerHTML = `
                 <div class="text-danger">
                     <strong>Fehler:</strong> ${data.error}
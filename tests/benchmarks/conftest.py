@@ -0,0 +1,91 @@
+"""
+Gemeinsame Fixtures für die Benchmarks
+Benchmarks laufen nur mit STWEG_BENCHMARKS=1 und installiertem pytest-benchmark
+"""
+
+import json
+import os
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from src.excel_analysis.zev_generator import generate_zev_workbook, scaled_config
+
+SCALES = [1, 10, 100]
+MEMORY_BASELINE = Path(__file__).parent / 'memory_baseline.json'
+# Erlaubte Abweichung der Speicherspitze gegenüber der Baseline
+MEMORY_TOLERANCE = 1.5
+
+
+def pytest_collection_modifyitems(config, items):
+    """Benchmarks ohne STWEG_BENCHMARKS=1 überspringen (dauern mehrere Minuten)"""
+    if os.getenv('STWEG_BENCHMARKS') == '1':
+        return
+
+    skip = pytest.mark.skip(reason="Benchmarks nur mit STWEG_BENCHMARKS=1")
+    for item in items:
+        if 'benchmarks' in item.nodeid:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope='session')
+def zev_workbooks(tmp_path_factory):
+    """Synthetische ZEV-Exporte in 1×, 10× und 100× Grösse"""
+    directory = tmp_path_factory.mktemp('zev_benchmarks')
+    return {
+        scale: str(generate_zev_workbook(directory / f'zev_{scale}x.xlsx', **scaled_config(scale)))
+        for scale in SCALES
+    }
+
+
+@pytest.fixture(scope='session')
+def memory_baseline():
+    """
+    Gespeicherte Speicherspitzen (MB) pro Benchmark
+
+    Mit STWEG_BENCH_UPDATE_BASELINE=1 werden die gemessenen Werte am Ende
+    des Laufs in memory_baseline.json geschrieben.
+    """
+    baseline = json.loads(MEMORY_BASELINE.read_text(encoding='utf-8')) if MEMORY_BASELINE.exists() else {}
+    measured = {}
+    yield baseline, measured
+
+    if os.getenv('STWEG_BENCH_UPDATE_BASELINE') == '1' and measured:
+        baseline.update(measured)
+        MEMORY_BASELINE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+
+
+@pytest.fixture
+def run_benchmark(benchmark, memory_baseline, request):
+    """
+    Misst Laufzeit (pytest-benchmark) und Speicherspitze (tracemalloc) einer Funktion
+
+    Die Speicherspitze wird in einem eigenen Lauf gemessen, damit tracemalloc
+    die Zeitmessung nicht verfälscht, und gegen die Baseline geprüft.
+    """
+    baseline, measured = memory_baseline
+
+    def run(func, *args, scale=1):
+        tracemalloc.start()
+        try:
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        peak_mb = round(peak / 1024 / 1024, 2)
+        benchmark.extra_info['peak_memory_mb'] = peak_mb
+        measured[request.node.name] = peak_mb
+
+        rounds = 1 if scale >= 100 else 3
+        result = benchmark.pedantic(func, args=args, rounds=rounds, iterations=1)
+
+        expected = baseline.get(request.node.name)
+        if expected is not None and os.getenv('STWEG_BENCH_UPDATE_BASELINE') != '1':
+            assert peak_mb <= expected * MEMORY_TOLERANCE, (
+                f"Speicherspitze {peak_mb} MB über Baseline {expected} MB (Toleranz {MEMORY_TOLERANCE}×)"
+            )
+        return result
+
+    return run
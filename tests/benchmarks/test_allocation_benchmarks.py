@@ -0,0 +1,55 @@
+"""
+Benchmarks der Stromkosten-Verteilung auf einem synthetischen Gebäude mit
+2'000 Eigentümern (Wohnung und Ladestation, Netz/PV, HT/NT)
+
+Ausführen mit ``make bench``.
+"""
+
+import random
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from src.billing.allocation import TarifTabelle, Verbrauchstabelle, allocate_strom_costs
+
+OWNERS = 2000
+TARIFE = TarifTabelle.from_dict({'netz_hochtarif': '32.50', 'netz_niedertarif': '22.80'})
+
+
+def synthetic_rows(owners=OWNERS, seed=0):
+    """Acht Strom-Messpunkte pro Eigentümer plus Wärmepumpe"""
+    rng = random.Random(seed)
+    rows = []
+    for owner in range(1, owners + 1):
+        for nutzung in ('Wohnung', 'Ladestation'):
+            for quelle in ('Netz', 'lokal'):
+                for tarif in ('HT', 'NT'):
+                    rows.append((f"W{owner:04d} {nutzung} - Bezug {quelle} {tarif} [kWh]", owner,
+                                 round(rng.uniform(0, 2000), 2)))
+    rows += [('WP Wärmepumpe - Bezug Netz HT [kWh]', None, 50000.0),
+             ('WP Wärmepumpe - Bezug lokal NT [kWh]', None, 8000.0)]
+    return rows
+
+
+class TestAllocationBenchmarks:
+    """Benchmark-Suite für allocate_strom_costs"""
+
+    def test_allocate(self, benchmark):
+        """Benchmark: Arrays für alle Eigentümer (ohne Rundung)"""
+        verbrauch = Verbrauchstabelle.from_rows(synthetic_rows())
+        ids = list(range(1, OWNERS + 1))
+        promille = [1000 / OWNERS] * OWNERS
+
+        verteilung = benchmark(allocate_strom_costs, ids, verbrauch, TARIFE, waerme_promille=promille)
+
+        assert verteilung.kwh.shape == (OWNERS, 2, 2, 2)
+
+    def test_allocate_and_round(self, benchmark):
+        """Benchmark: Arrays und gerundete strom_details aller Eigentümer"""
+        verbrauch = Verbrauchstabelle.from_rows(synthetic_rows())
+        ids = list(range(1, OWNERS + 1))
+
+        details = benchmark(lambda: allocate_strom_costs(ids, verbrauch, TARIFE).all_strom_details())
+
+        assert len(details) == OWNERS
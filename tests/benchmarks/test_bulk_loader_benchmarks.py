@@ -0,0 +1,69 @@
+"""
+Benchmarks des Bulk-Loaders gegenüber dem Weg über einzelne ORM-Objekte
+
+Ausführen mit ``make bench``.
+"""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.models.bulk_loader import bulk_insert_verbrauchsdaten
+from src.models.models import Base, Messpunkt, Verbrauchsdaten
+
+ROWS = 20000
+
+
+def _session(tmp_path_factory):
+    """Neue Datei-Datenbank mit einem Messpunkt"""
+    db_file = tmp_path_factory.mktemp('bulk') / 'stweg.db'
+    engine = create_engine(f'sqlite:///{db_file}')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Messpunkt(name='Allgemeinstrom', typ='gemeinschaft'))
+    session.commit()
+    return (session,), {}
+
+
+def _data():
+    """Viertelstundenwerte eines Messpunkts"""
+    return pd.DataFrame({
+        'zeitstempel': pd.date_range('2024-01-01', periods=ROWS, freq='15min'),
+        'messpunkt_id': 1,
+        'verbrauch': 1.5,
+        'kosten': 0.375
+    })
+
+
+class TestBulkLoaderBenchmarks:
+    """Benchmark-Suite für bulk_insert_verbrauchsdaten"""
+
+    def test_orm_objects(self, benchmark, tmp_path_factory):
+        """Benchmark: Bisheriger Weg mit einem Verbrauchsdaten-Objekt pro Zeile"""
+        data = _data()
+
+        def insert_orm(session):
+            for zeitstempel, verbrauch, kosten in zip(data['zeitstempel'].dt.to_pydatetime(),
+                                                      data['verbrauch'], data['kosten']):
+                session.add(Verbrauchsdaten(zeitstempel=zeitstempel, messpunkt_id=1, verbrauch=verbrauch,
+                                            kosten=kosten, periode=zeitstempel.strftime('%Y-%m')))
+            session.commit()
+            return session.query(Verbrauchsdaten).count()
+
+        count = benchmark.pedantic(insert_orm, setup=lambda: _session(tmp_path_factory), rounds=3)
+
+        assert count == ROWS
+
+    def test_bulk_insert(self, benchmark, tmp_path_factory):
+        """Benchmark: Bulk-Loader (spaltenweise Validierung, executemany in Chunks)"""
+        data = _data()
+
+        stats = benchmark.pedantic(lambda session: bulk_insert_verbrauchsdaten(session, data),
+                                   setup=lambda: _session(tmp_path_factory), rounds=3)
+
+        benchmark.extra_info['rows_per_second'] = stats['rows_per_second']
+        assert stats['rows'] == ROWS
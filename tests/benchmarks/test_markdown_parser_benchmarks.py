@@ -0,0 +1,82 @@
+"""
+Benchmarks des MarkdownParsers auf einem synthetischen Backlog mit 10'000 Zeilen
+
+Ausführen mit ``make bench``.
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from src.utils.markdown_parser import DocumentCache, MarkdownParser
+
+LINES = 10000
+PRIORITIES = ['KRITISCH', 'HOCH', 'MITTEL', 'NIEDRIG']
+
+
+def synthetic_backlog(lines=LINES):
+    """Roadmap und User Stories mit zusammen etwa lines Zeilen"""
+    roadmap = ["# Roadmap", "",
+               "**Gesamt:** 0 User Stories | **Abgeschlossen:** 0 | **In Bearbeitung:** 0 | **Geplant:** 0", ""]
+    stories = ["# User Stories", ""]
+    number = 0
+    while len(roadmap) + len(stories) < lines:
+        epic = number // 20 + 1
+        if number % 20 == 0:
+            roadmap += [f"## 🎯 Priorität {epic} - {PRIORITIES[epic % 4]}", "", f"### Epic {epic}"]
+            stories += [f"## Epic {epic}: Thema {epic}", f"**Beschreibung:** Beschreibung {epic}", ""]
+        number += 1
+        roadmap.append(f"- **US-{number:03d}** - Story {number} ⭐⭐")
+        stories += [
+            f"### US-{number:03d}: Story {number}",
+            "**Als** Verwalter",
+            f"**möchte ich** Funktion {number}",
+            "**damit** der Workflow verbessert wird",
+            "",
+            "**Akzeptanzkriterien:**",
+            "- [x] Erstes Kriterium",
+            "- [ ] Zweites Kriterium",
+            "",
+            "---",
+        ]
+    return '\n'.join(roadmap), '\n'.join(stories), number
+
+
+def _parse_all(roadmap, stories, titles):
+    """Roadmap und User Stories parsen und die Priorität jeder Story nachschlagen"""
+    parser = MarkdownParser(None, cache=DocumentCache())
+    result = parser._parse_roadmap_content(roadmap), parser._parse_user_stories_content(stories)
+    priorities = [parser._extract_priority_from_title(title, stories) for title in titles]
+    return result, priorities
+
+
+class TestMarkdownParserBenchmarks:
+    """Benchmark-Suite für den MarkdownParser"""
+
+    def test_parse_backlog(self, benchmark):
+        """Benchmark: Roadmap, User Stories und Prioritäten aller Stories (10'000 Zeilen)"""
+        roadmap, stories, count = synthetic_backlog()
+        titles = [f"US-{number:03d}:" for number in range(1, count + 1)]
+
+        (parsed_roadmap, parsed_stories), priorities = benchmark(_parse_all, roadmap, stories, titles)
+
+        assert sum(len(items) for items in parsed_roadmap['priorities'].values()) == count
+        assert parsed_stories['total_stories'] == count
+        assert len(priorities) == count
+
+    def test_linear_scaling(self):
+        """Test: Zehnfache Grösse kostet höchstens etwa zehnfache Zeit"""
+        def best_of_three(lines):
+            roadmap, stories, _ = synthetic_backlog(lines)
+            timings = []
+            for _ in range(3):
+                start = time.perf_counter()
+                parser = MarkdownParser(None, cache=DocumentCache())
+                parser._parse_roadmap_content(roadmap)
+                parser._parse_user_stories_content(stories)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        assert best_of_three(LINES) < 20 * best_of_three(LINES // 10)
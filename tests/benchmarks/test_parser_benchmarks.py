@@ -0,0 +1,49 @@
+"""
+Benchmarks der Excel-Parser auf synthetischen ZEV-Exporten (1×, 10×, 100×)
+
+Ausführen mit ``make bench`` (vergleicht mit der gespeicherten Baseline)
+bzw. ``make bench-baseline`` (speichert eine neue Baseline).
+"""
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from src.excel_analysis.excel_analyzer import ExcelAnalyzer
+from src.excel_analysis.simple_zev_parser import ENGINES, SimpleZEVParser
+from src.excel_analysis.smart_excel_reader import SmartExcelReader
+
+from .conftest import SCALES
+
+
+class TestParserBenchmarks:
+    """Benchmark-Suite für SimpleZEVParser, ExcelAnalyzer und SmartExcelReader"""
+
+    @pytest.mark.parametrize('scale', SCALES)
+    @pytest.mark.parametrize('engine', ENGINES)
+    def test_simple_zev_parser(self, run_benchmark, zev_workbooks, engine, scale):
+        """Benchmark: SimpleZEVParser.parse_zev_file pro Engine"""
+        parser = SimpleZEVParser(engine=engine)
+
+        result = run_benchmark(parser.parse_zev_file, zev_workbooks[scale], scale=scale)
+
+        assert result['structure_verified']
+        assert result['summary']['hauptzaehler'] == 10 * scale
+
+    @pytest.mark.parametrize('scale', SCALES)
+    def test_excel_analyzer(self, run_benchmark, zev_workbooks, scale):
+        """Benchmark: ExcelAnalyzer.analyze_file"""
+        analyzer = ExcelAnalyzer()
+
+        result = run_benchmark(analyzer.analyze_file, zev_workbooks[scale], scale=scale)
+
+        assert result['sheets'] == ['ZEV']
+
+    @pytest.mark.parametrize('scale', SCALES)
+    def test_smart_excel_reader(self, run_benchmark, zev_workbooks, scale):
+        """Benchmark: SmartExcelReader.analyze_excel_structure"""
+        reader = SmartExcelReader()
+
+        result = run_benchmark(reader.analyze_excel_structure, zev_workbooks[scale], scale=scale)
+
+        assert result['recommended_reading_method']
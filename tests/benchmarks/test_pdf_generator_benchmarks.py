@@ -0,0 +1,44 @@
+"""
+Benchmarks des STWEGPDFGenerators: Kosten pro Rechnung mit und ohne
+prozessweit geteilte Styles
+
+Ausführen mit ``make bench``.
+"""
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from src.billing.pdf_generator import STWEGPDFGenerator, build_styles, get_shared_styles
+
+INVOICES = 20
+
+
+def _render_invoices(output_path, shared_styles):
+    """Rendert INVOICES Rechnungen mit je einem neuen Generator"""
+    data = STWEGPDFGenerator._generate_sample_data()
+    for _ in range(INVOICES):
+        generator = STWEGPDFGenerator()
+        if not shared_styles:
+            # Verhalten vor dem Cache: Stylesheet pro Generator neu aufbauen
+            generator.styles = build_styles()
+        generator.generate_invoice(data, str(output_path))
+
+
+class TestPDFGeneratorBenchmarks:
+    """Benchmark-Suite für den STWEGPDFGenerator"""
+
+    @pytest.mark.parametrize('shared_styles', [False, True], ids=['uncached', 'cached'])
+    def test_invoice_cost(self, benchmark, tmp_path, shared_styles):
+        """Benchmark: 20 Rechnungen, Styles pro Rechnung neu bzw. geteilt"""
+        output_path = tmp_path / 'rechnung.pdf'
+
+        benchmark.pedantic(_render_invoices, args=(output_path, shared_styles), rounds=5, iterations=1)
+
+        assert output_path.read_bytes().startswith(b'%PDF')
+
+    def test_style_setup(self, benchmark):
+        """Benchmark: Generator-Aufbau mit geteilten Styles"""
+        generator = benchmark(STWEGPDFGenerator)
+
+        assert generator.styles is get_shared_styles()
@@ -0,0 +1,70 @@
+"""
+Benchmarks des Tarif-Kalenders: ein Jahr 15-Minuten-Werte eines Gebäudes,
+vektorisiert in NumPy und als SQL-Ausdruck in SQLite
+
+Ausführen mit ``make bench``.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.billing.tarif_kalender import DEFAULT_KALENDER, load_tarif_verbrauch
+from src.models.models import Base, Messpunkt, Verbrauchsdaten
+
+SERIES = 10
+# 2024: 366 Tage × 96 Viertelstunden
+INTERVALS = 366 * 96
+
+
+@pytest.fixture(scope='module')
+def session():
+    """In-Memory-SQLite mit SERIES Messpunkten à einem Jahr 15-Minuten-Werte"""
+    engine = create_engine('sqlite://', echo=False)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    messpunkte = [Messpunkt(name=f"W{i:02d} Wohnung - Bezug Netz [kWh]", typ='gemeinschaft') for i in range(SERIES)]
+    session.add_all(messpunkte)
+    session.flush()
+
+    start = datetime(2024, 1, 1)
+    stamps = [start + timedelta(minutes=15 * i) for i in range(INTERVALS)]
+    session.execute(Verbrauchsdaten.__table__.insert(), [
+        {'zeitstempel': stamp, 'messpunkt_id': mp.id, 'verbrauch': 0.25, 'periode': stamp.strftime('%Y-%m')}
+        for mp in messpunkte for stamp in stamps
+    ])
+    session.commit()
+    session.messpunkt_ids = [mp.id for mp in messpunkte]
+    yield session
+    session.close()
+
+
+class TestTarifKalenderBenchmarks:
+    """Benchmark-Suite für TarifKalender"""
+
+    def test_classify_year(self, benchmark):
+        """Benchmark: Ein Jahr 15-Minuten-Zeitstempel in NumPy einteilen"""
+        stamps = np.arange('2024-01-01', '2025-01-01', np.timedelta64(15, 'm'), dtype='datetime64[m]')
+
+        tarif = benchmark(DEFAULT_KALENDER.classify, stamps)
+
+        assert tarif.shape == (INTERVALS,)
+
+    def test_sql_one_series(self, benchmark, session):
+        """Benchmark: Tarif-Summen eines Messpunkts über ein Jahr in der Datenbank"""
+        rows = benchmark(load_tarif_verbrauch, session, session.messpunkt_ids[:1], '2024')
+
+        assert sum(kwh for _, _, kwh in rows) == pytest.approx(INTERVALS * 0.25)
+
+    def test_sql_building(self, benchmark, session):
+        """Benchmark: Tarif-Summen aller Messpunkte über ein Jahr in der Datenbank"""
+        rows = benchmark.pedantic(load_tarif_verbrauch, args=(session, session.messpunkt_ids, '2024'),
+                                  rounds=3, iterations=1)
+
+        assert len(rows) == 2 * SERIES
@@ -0,0 +1,186 @@
+"""
+Tests für die Stromkosten-Verteilung
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.billing.allocation import (TarifTabelle, Verbrauchstabelle, allocate_period, allocate_strom_costs,
+                                    apply_strom_details, classify_messpunkt)
+from src.billing.batch import generate_invoice_batch, invoice_data_for_owner, load_eigentuemer
+from src.models.models import Base, Eigentuemer, Messpunkt, Verbrauchsdaten
+
+# Verbrauch einer Periode: zwei Eigentümer, ein nicht abgerechneter, Wärmepumpe
+ROWS = [
+    ('W1 Wohnung 1.1 - Bezug Netz HT [kWh]', 1, 1000.0),
+    ('W1 Wohnung 1.1 - Bezug Netz NT [kWh]', 1, 500.0),
+    ('W1 Wohnung 1.1 - Bezug lokal HT [kWh]', 1, 400.0),
+    ('L1 Ladestation 1 - Bezug Netz HT [kWh]', 1, 200.0),
+    ('W2 Wohnung 1.2 - Bezug Netz HT [kWh]', 2, 3000.0),
+    ('W3 Wohnung 2.1 - Bezug Netz HT [kWh]', 3, 800.0),
+    ('WP Wärmepumpe - Bezug Netz HT [kWh]', None, 2000.0),
+    ('WP Wärmepumpe - Bezug lokal NT [kWh]', None, 100.0),
+    ('E1 Haus - Einspeisung [kWh]', None, 999.0),
+]
+
+# Netz-Tarife sind Pflicht; PV-Tarife aus DEFAULT_PV_TARIFE (16.40 Rp./kWh)
+TARIFE = TarifTabelle.from_dict({'netz_hochtarif': '32.50', 'netz_niedertarif': '22.80'})
+
+
+class TestStromkostenVerteilung:
+    """Test-Klasse für allocate_strom_costs"""
+
+    @pytest.mark.parametrize('name, kategorie', [
+        ('W1 Wohnung 1.1 - Bezug Netz HT [kWh]', (0, 0, 0)),
+        ('W1 Wohnung 1.1 - Bezug lokal NT [kWh]', (1, 1, 0)),
+        ('L1 Ladestation 1 - Bezug Netz NT [kWh]', (0, 1, 1)),
+        ('WP Wärmepumpe - Bezug lokal HT [kWh]', (1, 0, -1)),
+        ('E1 Haus - Einspeisung [kWh]', None),
+        ('E1 Haus - Bezug Netz [kWh]', (0, None, 0)),
+    ])
+    def test_classify_messpunkt(self, name, kategorie):
+        """Test: Quelle, Tarif und Nutzung werden aus dem Messpunkt-Namen erkannt"""
+        assert classify_messpunkt(name) == kategorie
+
+    def test_allocation(self):
+        """Test: kWh, Promille und Beträge pro Kategorie, Wärme nach Schlüssel"""
+        verteilung = allocate_strom_costs([2, 1], Verbrauchstabelle.from_rows(ROWS), TARIFE,
+                                          waerme_promille=[400, 600])
+        details = verteilung.strom_details(1)
+
+        # Netz HT im Gebäude: 1000 + 200 + 3000 + 800 = 5000 kWh (ohne Wärmepumpe)
+        assert details['netz_ewz']['wohnung_hochtarif'] == {'kwh': 1000, 'promille': 200.0, 'betrag': Decimal('325.00')}
+        assert details['netz_ewz']['ladestation_hochtarif'] == {'kwh': 200, 'promille': 40.0, 'betrag': Decimal('65.00')}
+        assert details['netz_ewz']['wohnung_niedertarif'] == {'kwh': 500, 'promille': 1000.0, 'betrag': Decimal('114.00')}
+        assert details['netz_ewz']['total'] == Decimal('504.00')
+        assert details['pv']['wohnung_hochtarif'] == {'kwh': 400, 'tarif': 16.4, 'betrag': Decimal('65.60')}
+
+        assert details['waerme']['netz_ewz'] == {'total': Decimal('650.00'), 'promille': 600.0, 'betrag': Decimal('390.00')}
+        assert details['waerme']['pv']['betrag'] == Decimal('9.84')
+        assert details['total_strom'] == Decimal('504.00') + Decimal('65.60') + Decimal('399.84')
+        assert details['erneuerungsfond'] == Decimal('65.60') + Decimal('9.84')
+
+        assert verteilung.strom_details(2)['netz_ewz']['wohnung_hochtarif']['promille'] == 600.0
+
+    def test_rounding_half_up(self):
+        """Test: Beträge werden erst am Schluss kaufmännisch auf Rappen gerundet"""
+        tarife = TarifTabelle.from_dict({'netz_hochtarif': '14.5', 'netz_niedertarif': '14.5'})
+        verbrauch = Verbrauchstabelle.from_rows([('W1 - Bezug Netz HT [kWh]', 1, 1.0)])
+
+        details = allocate_strom_costs([1], verbrauch, tarife).strom_details(1)
+
+        # 1 kWh × 14.5 Rp. = 0.145 CHF (binär 0.14499…) -> 0.15
+        assert details['netz_ewz']['wohnung_hochtarif']['betrag'] == Decimal('0.15')
+
+    def test_owner_without_consumption(self):
+        """Test: Eigentümer ohne Messpunkte erhalten Nullbeträge"""
+        details = allocate_strom_costs([7], Verbrauchstabelle.from_rows([]), TARIFE).strom_details(7)
+
+        assert details['total_strom'] == Decimal('0.00')
+        assert details['netz_ewz']['wohnung_hochtarif']['promille'] == 0.0
+
+    @pytest.mark.parametrize('tarife', [
+        {'strom': 1, 'netz_hochtarif': 1, 'netz_niedertarif': 1},
+        {'pv_hochtarif': 'gratis', 'netz_hochtarif': 1, 'netz_niedertarif': 1},
+        {'netz_hochtarif': -1, 'netz_niedertarif': 1},
+    ])
+    def test_invalid_tarife(self, tarife):
+        """Test: Unbekannte, nicht numerische oder negative Tarife werden abgelehnt"""
+        with pytest.raises(ValueError):
+            TarifTabelle.from_dict(tarife)
+
+    @pytest.mark.parametrize('tarife', [{}, {'netz_hochtarif': 54.9}, {'netz_hochtarif': 54.9, 'netz_niedertarif': ''}])
+    def test_netz_tarife_required(self, tarife):
+        """Test: Ohne beide Netz-Tarife keine Tariftabelle (keine erfundenen Standardwerte)"""
+        with pytest.raises(ValueError, match="Netz-Tarife fehlen"):
+            TarifTabelle.from_dict(tarife)
+
+    def test_pv_tarife_default(self):
+        """Test: PV-Tarife der Vorlage, wenn nur die Netz-Tarife angegeben sind"""
+        assert (TARIFE.pv_hochtarif, TARIFE.pv_niedertarif) == (Decimal('16.40'), Decimal('16.40'))
+
+    def test_apply_strom_details(self):
+        """Test: Rechnungstotale werden aus den berechneten Stromkosten nachgeführt"""
+        details = allocate_strom_costs([1], Verbrauchstabelle.from_rows(ROWS), TARIFE).strom_details(1)
+        data = invoice_data_for_owner({'id': 1, 'name': 'Max Mustermann', 'wohnung': '1A'}, '2024')
+
+        result = apply_strom_details(data, details)
+
+        strom_wasser = details['total_strom'] + data['wasser_details']['total']
+        assert result['strom_details'] is details
+        assert result['totals'] == {'strom_wasser_total': strom_wasser,
+                                    'erneuerungsfond_total': details['erneuerungsfond']}
+        assert result['costs']['total_nebenkosten'] == strom_wasser + data['costs']['betriebskosten']['owner_share']
+        assert data['strom_details'] is not details
+
+
+class TestAllocatePeriod:
+    """Test-Klasse für allocate_period mit Datenbank"""
+
+    @pytest.fixture
+    def session(self):
+        """In-Memory-Datenbank mit zwei Eigentümern und Monatswerten 2024"""
+        engine = create_engine('sqlite:///:memory:', echo=False)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        max_ = Eigentuemer(name='Max Mustermann', wohnung='1A', anteil=0.4)
+        anna = Eigentuemer(name='Anna Schmidt', wohnung='1B', anteil=0.6)
+        session.add_all([max_, anna])
+        session.flush()
+
+        messpunkte = {
+            'max_ht': Messpunkt(name='W1 Wohnung 1A - Bezug Netz HT [kWh]', typ='individual', eigentuemer_id=max_.id),
+            'anna_ht': Messpunkt(name='W2 Wohnung 1B - Bezug Netz HT [kWh]', typ='individual', eigentuemer_id=anna.id),
+            'wp': Messpunkt(name='WP Wärmepumpe - Bezug Netz HT [kWh]', typ='gemeinschaft')
+        }
+        session.add_all(messpunkte.values())
+        session.flush()
+        for key, kwh in [('max_ht', 100.0), ('anna_ht', 300.0), ('wp', 200.0)]:
+            for monat in (1, 2):
+                session.add(Verbrauchsdaten(zeitstempel=datetime(2024, monat, 1), messpunkt_id=messpunkte[key].id,
+                                            verbrauch=kwh, periode=f'2024-{monat:02d}'))
+        session.commit()
+        yield session
+        session.close()
+
+    def test_year_and_month(self, session):
+        """Test: Jahr summiert alle Monate, Monat nur den einen; Wärme nach Wertquote"""
+        eigentuemer = load_eigentuemer(session)
+
+        jahr = allocate_period(session, eigentuemer, '2024', TARIFE)
+        monat = allocate_period(session, eigentuemer, '2024-02', TARIFE)
+
+        assert jahr[1]['netz_ewz']['wohnung_hochtarif'] == {'kwh': 200, 'promille': 250.0, 'betrag': Decimal('65.00')}
+        assert monat[1]['netz_ewz']['wohnung_hochtarif']['kwh'] == 100
+        # Wärmepumpe 400 kWh × 32.50 Rp. = 130 CHF, Anna 600 ‰
+        assert jahr[2]['waerme']['netz_ewz'] == {'total': Decimal('130.00'), 'promille': 600.0,
+                                                 'betrag': Decimal('78.00')}
+
+    def test_period_without_consumption(self, session):
+        """Test: Periode ohne Verbrauchsdaten ergibt einen Fehler statt Rechnungen mit 0 CHF Strom"""
+        with pytest.raises(ValueError, match="Keine Stromverbrauchsdaten für die Periode 2023"):
+            allocate_period(session, load_eigentuemer(session), '2023', TARIFE)
+
+    def test_batch_uses_allocation(self, session, tmp_path):
+        """Test: Batch rendert berechnete Stromkosten, geänderter Verbrauch erneuert die Rechnung"""
+        eigentuemer = load_eigentuemer(session)
+
+        first = generate_invoice_batch(eigentuemer, '2024', output_dir=tmp_path, workers=1,
+                                       strom_details=allocate_period(session, eigentuemer, '2024', TARIFE))
+        row = session.query(Verbrauchsdaten).filter(Verbrauchsdaten.verbrauch == 300.0).first()
+        row.verbrauch = 310.0
+        session.commit()
+        second = generate_invoice_batch(eigentuemer, '2024', output_dir=tmp_path, workers=1,
+                                        strom_details=allocate_period(session, eigentuemer, '2024', TARIFE))
+
+        assert first['succeeded'] == 2
+        # Annas Verbrauch ändert auch Max' Promille-Anteil: beide neu
+        assert [entry['skipped'] for entry in second['invoices']] == [False, False]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,96 @@
+"""
+Tests für die Batch-Verarbeitung von ZEV-Dateien
+"""
+
+import multiprocessing
+import os
+
+import pytest
+import pandas as pd
+
+from src.excel_analysis.batch import find_zev_files, iter_batch, parse_batch
+from src.excel_analysis.simple_zev_parser import SimpleZEVParser
+
+
+def _write_zev(file_path, zaehler_id, values):
+    """Schreibt eine minimale ZEV-Datei mit einem Hauptzähler"""
+    rows = [
+        [zaehler_id, None, None, None, 'Januar', 'Februar'],
+        ['E01 Hauptzähler', None, None, None, None, None],
+        ['Bezug Netz [kWh]', None, None, None] + list(values),
+    ]
+    pd.DataFrame(rows).to_excel(file_path, header=False, index=False)
+
+
+@pytest.fixture
+def batch_dir(tmp_path):
+    """Verzeichnis mit zwei gültigen und einer defekten Datei"""
+    _write_zev(tmp_path / 'haus_a.xlsx', 'CHINV0000000000000000000000001', [1, 2])
+    _write_zev(tmp_path / 'haus_b.xlsx', 'CHINV0000000000000000000000002', [3, 4])
+    (tmp_path / 'defekt.xlsx').write_bytes(b'keine Excel-Datei')
+    (tmp_path / '~$haus_a.xlsx').write_bytes(b'Sperrdatei')
+    return tmp_path
+
+
+class TestBatchParsing:
+    """Test-Klasse für parse_batch"""
+
+    def test_find_zev_files_skips_lock_files(self, batch_dir):
+        """Test: Excel-Sperrdateien werden ignoriert"""
+        names = [p.name for p in find_zev_files(str(batch_dir))]
+
+        assert names == ['defekt.xlsx', 'haus_a.xlsx', 'haus_b.xlsx']
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_bad_file_does_not_abort_batch(self, batch_dir, workers):
+        """Test: Eine defekte Datei bricht den Batch nicht ab"""
+        summary = parse_batch(find_zev_files(str(batch_dir)), workers=workers)
+
+        assert summary['total_files'] == 3
+        assert summary['succeeded'] == 2
+        assert summary['failed'] == 1
+        assert summary['total_zaehler'] == 2
+        assert summary['total_messpunkte'] == 2
+
+        failed = [r for r in summary['files'] if not r['success']]
+        assert failed[0]['file'].endswith('defekt.xlsx')
+        assert failed[0]['errors']
+        assert all(r['duration_s'] is not None for r in summary['files'])
+
+    def test_results_stream_per_file(self, batch_dir):
+        """Test: Jede Datei liefert genau ein Ergebnis"""
+        files = find_zev_files(str(batch_dir))
+
+        results = list(iter_batch(files, workers=2))
+
+        assert sorted(r['file'] for r in results) == sorted(str(f) for f in files)
+
+    def test_crashed_worker_fails_only_its_file(self, tmp_path, monkeypatch):
+        """Test: Ein abstürzender Worker (z.B. in openpyxl) lässt nur seine Datei fehlschlagen"""
+        for i in range(6):
+            _write_zev(tmp_path / f'haus_{i}.xlsx', f'CHINV{i:025d}', [1, 2])
+        original = SimpleZEVParser.parse_zev_file
+
+        def crash_on_haus_1(self, file_path, *args, **kwargs):
+            if file_path.endswith('haus_1.xlsx'):
+                os._exit(1)
+            return original(self, file_path, *args, **kwargs)
+
+        # fork: die Worker erben die gepatchte Methode
+        monkeypatch.setattr(SimpleZEVParser, 'parse_zev_file', crash_on_haus_1)
+        summary = parse_batch(find_zev_files(str(tmp_path)), workers=2, mp_context=multiprocessing.get_context('fork'))
+
+        assert (summary['total_files'], summary['succeeded'], summary['failed']) == (6, 5, 1)
+        failed = [r for r in summary['files'] if not r['success']]
+        assert failed[0]['file'].endswith('haus_1.xlsx')
+        assert 'abgestürzt' in failed[0]['errors'][0]
+
+    @pytest.mark.parametrize('workers', [0, -1, '2'])
+    def test_invalid_workers(self, batch_dir, workers):
+        """Test: Anzahl Worker muss eine positive Ganzzahl sein"""
+        with pytest.raises(ValueError, match="Worker"):
+            parse_batch(find_zev_files(str(batch_dir)), workers=workers)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
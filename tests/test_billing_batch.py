@@ -0,0 +1,294 @@
+"""
+Tests für die Batch-Erstellung von Rechnungen
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.billing.pdf_generator import STWEGPDFGenerator, get_shared_styles, save_invoice_async
+from src.billing.batch import (billing_period_label, generate_invoice_batch, input_hash_path, invoice_data_for_owner,
+                               invoice_input_hash, load_eigentuemer)
+from src.models.models import Base, Eigentuemer, Messpunkt, Verbrauchsdaten
+
+
+# Netz-Tarife (Pflicht) für die Rechnungs-Endpunkte
+TARIFE = {'netz_hochtarif': 54.9, 'netz_niedertarif': 34.9}
+
+
+@pytest.fixture
+def session_factory():
+    """In-Memory-Datenbank mit drei Eigentümern (einer inaktiv) und Stromverbrauch 2024"""
+    engine = create_engine('sqlite:///:memory:', echo=False)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    session = factory()
+    session.add_all([
+        Eigentuemer(name='Max Mustermann', wohnung='1A', anteil=0.4),
+        Eigentuemer(name='Anna Schmidt', wohnung='1B', anteil=0.4),
+        Eigentuemer(name='Peter Weber', wohnung='2A', anteil=0.2, aktiv=False)
+    ])
+    session.flush()
+    for eigentuemer_id in (1, 2):
+        messpunkt = Messpunkt(name=f'W{eigentuemer_id} Wohnung - Bezug Netz HT [kWh]', typ='individual',
+                              eigentuemer_id=eigentuemer_id)
+        session.add(messpunkt)
+        session.flush()
+        session.add(Verbrauchsdaten(zeitstempel=datetime(2024, 1, 1), messpunkt_id=messpunkt.id,
+                                    verbrauch=100.0 * eigentuemer_id, periode='2024-01'))
+    session.commit()
+    session.close()
+    return factory
+
+
+class TestInvoiceBatch:
+    """Test-Klasse für generate_invoice_batch"""
+
+    @pytest.mark.parametrize('periode, label', [
+        ('2024', '01.01.2024 - 31.12.2024'),
+        ('2024-02', '01.02.2024 - 29.02.2024'),
+    ])
+    def test_billing_period_label(self, periode, label):
+        """Test: Jahr und Monat werden als Datumsbereich formatiert"""
+        assert billing_period_label(periode) == label
+
+    @pytest.mark.parametrize('periode', ['24', '2024-13', '2024-1', ''])
+    def test_invalid_period(self, periode):
+        """Test: Ungültige Periode wird abgelehnt"""
+        with pytest.raises(ValueError):
+            billing_period_label(periode)
+
+    def test_load_eigentuemer(self, session_factory):
+        """Test: Ohne IDs alle aktiven, mit IDs genau diese (auch inaktive)"""
+        session = session_factory()
+
+        assert [o['name'] for o in load_eigentuemer(session)] == ['Max Mustermann', 'Anna Schmidt']
+        assert [o['name'] for o in load_eigentuemer(session, [3])] == ['Peter Weber']
+        with pytest.raises(ValueError, match="nicht gefunden: 9"):
+            load_eigentuemer(session, [1, 9])
+
+    def test_invoice_data_for_owner(self):
+        """Test: Stammdaten und Periode des Eigentümers landen in den Rechnungsdaten"""
+        data = invoice_data_for_owner({'id': 7, 'name': 'Anna Schmidt', 'wohnung': '1B'}, '2024-03')
+
+        assert data['invoice_number'] == 'R-202403-007'
+        assert data['billing_period'] == '01.03.2024 - 31.03.2024'
+        assert data['owner']['name'] == 'Anna Schmidt'
+        assert data['property_info']['apartment'] == '1B'
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_batch_writes_invoices_and_manifest(self, session_factory, tmp_path, workers):
+        """Test: Eine PDF pro Eigentümer, Manifest mit Laufzeit und SHA-256"""
+        eigentuemer = load_eigentuemer(session_factory())
+
+        manifest = generate_invoice_batch(eigentuemer, '2024', output_dir=tmp_path, workers=workers)
+
+        assert (manifest['total'], manifest['succeeded'], manifest['failed']) == (2, 2, 0)
+        assert [entry['eigentuemer_id'] for entry in manifest['invoices']] == [1, 2]
+        for entry in manifest['invoices']:
+            content = (tmp_path / f"rechnung_2024_{entry['eigentuemer_id']:04d}.pdf").read_bytes()
+            assert content.startswith(b'%PDF')
+            assert entry['sha256'] == hashlib.sha256(content).hexdigest()
+            assert entry['duration_s'] > 0
+        saved = json.loads((tmp_path / 'manifest_2024.json').read_text(encoding='utf-8'))
+        assert saved['invoices'] == manifest['invoices']
+
+    def test_identical_input_identical_pdf(self, session_factory, tmp_path):
+        """Test: Gleiche Daten ergeben denselben Hash (reproduzierbare PDFs)"""
+        eigentuemer = load_eigentuemer(session_factory(), [1])
+
+        first = generate_invoice_batch(eigentuemer, '2024', output_dir=tmp_path / 'a', workers=1)
+        second = generate_invoice_batch(eigentuemer, '2024', output_dir=tmp_path / 'b', workers=1)
+
+        assert first['invoices'][0]['sha256'] == second['invoices'][0]['sha256']
+
+    def test_input_hash_normalized(self):
+        """Test: Reihenfolge und Rechnungsdatum egal, geänderter Betrag ergibt anderen Hash"""
+        data = invoice_data_for_owner({'id': 1, 'name': 'Max Mustermann', 'wohnung': '1A'}, '2024')
+        reordered = dict(reversed(list(data.items())), invoice_date='01.01.2030')
+        changed = dict(data, totals=dict(data['totals'], erneuerungsfond_total=Decimal('194.89')))
+
+        assert invoice_input_hash(data) == invoice_input_hash(reordered)
+        assert invoice_input_hash(data) != invoice_input_hash(changed)
+
+    def test_unchanged_invoices_skipped(self, session_factory, tmp_path):
+        """Test: Zweiter Lauf überspringt alles, geänderter Eigentümer wird neu erstellt"""
+        first = generate_invoice_batch(load_eigentuemer(session_factory()), '2024', output_dir=tmp_path, workers=1)
+        assert first['skipped'] == 0
+        assert input_hash_path(first['invoices'][0]['file']).exists()
+
+        second = generate_invoice_batch(load_eigentuemer(session_factory()), '2024', output_dir=tmp_path, workers=1)
+        assert (second['succeeded'], second['skipped']) == (2, 2)
+        assert [e['sha256'] for e in second['invoices']] == [e['sha256'] for e in first['invoices']]
+
+        session = session_factory()
+        session.get(Eigentuemer, 2).name = 'Anna Meier'
+        session.commit()
+        session.close()
+
+        third = generate_invoice_batch(load_eigentuemer(session_factory()), '2024', output_dir=tmp_path, workers=1)
+        assert [e['skipped'] for e in third['invoices']] == [True, False]
+        assert third['invoices'][1]['sha256'] != first['invoices'][1]['sha256']
+
+    def test_modified_pdf_or_force_rerendered(self, session_factory, tmp_path):
+        """Test: Veränderte PDF auf der Platte oder force=True erzwingen neues Rendern"""
+        eigentuemer = load_eigentuemer(session_factory())
+        first = generate_invoice_batch(eigentuemer, '2024', output_dir=tmp_path, workers=1)
+        (tmp_path / 'rechnung_2024_0001.pdf').write_bytes(b'%PDF-kaputt')
+
+        second = generate_invoice_batch(eigentuemer, '2024', output_dir=tmp_path, workers=1)
+        assert [e['skipped'] for e in second['invoices']] == [False, True]
+        assert second['invoices'][0]['sha256'] == first['invoices'][0]['sha256']
+
+        forced = generate_invoice_batch(eigentuemer, '2024', output_dir=tmp_path, workers=1, force=True)
+        assert forced['skipped'] == 0
+
+    def test_generators_share_styles(self):
+        """Test: Alle Generatoren eines Prozesses teilen ein Stylesheet"""
+        first, second = STWEGPDFGenerator(), STWEGPDFGenerator()
+
+        assert first.styles is second.styles is get_shared_styles()
+        assert 'InvoiceTitle' in first.styles
+
+    def test_crashed_worker_fails_only_its_invoice(self, tmp_path, monkeypatch):
+        """Test: Ein abstürzender Worker lässt nur seine Rechnung fehlschlagen"""
+        eigentuemer = [{'id': i, 'name': f'Eigentümer {i}', 'wohnung': f'{i}A'} for i in range(1, 7)]
+        original = STWEGPDFGenerator.render_invoice
+
+        def crash_on_2a(self, data, *args, **kwargs):
+            if data['owner']['apartment'] == '2A':
+                os._exit(1)
+            return original(self, data, *args, **kwargs)
+
+        # fork: die Worker erben die gepatchte Methode
+        monkeypatch.setattr(STWEGPDFGenerator, 'render_invoice', crash_on_2a)
+        manifest = generate_invoice_batch(eigentuemer, '2024', output_dir=tmp_path, workers=2,
+                                          mp_context=multiprocessing.get_context('fork'))
+
+        assert (manifest['total'], manifest['succeeded'], manifest['failed']) == (6, 5, 1)
+        failed = [entry for entry in manifest['invoices'] if not entry['success']]
+        assert failed[0]['eigentuemer_id'] == 2
+        assert 'abgestürzt' in failed[0]['errors'][0]
+        assert not (tmp_path / 'rechnung_2024_0002.pdf').exists()
+
+    @pytest.mark.parametrize('workers', ['4', 'abc', 0, True])
+    def test_invalid_workers(self, session_factory, tmp_path, workers):
+        """Test: Anzahl Worker muss eine positive Ganzzahl sein"""
+        with pytest.raises(ValueError, match="Worker"):
+            generate_invoice_batch(load_eigentuemer(session_factory()), '2024', output_dir=tmp_path, workers=workers)
+
+    def test_api_generate_batch(self, session_factory, tmp_path, monkeypatch):
+        """Test: API startet den Batch als Job (spawn-Pool), Stand liefert Manifest mit Download-Links"""
+        from src.web import app as web_app
+        from src.web.jobs import InvoiceBatchJobManager
+        jobs = InvoiceBatchJobManager(tmp_path / 'invoices')
+        monkeypatch.setattr(web_app, 'get_db_session', session_factory)
+        monkeypatch.setattr(web_app, 'invoice_jobs', jobs)
+        client = web_app.app.test_client()
+
+        response = client.post('/api/billing/generate-batch', json={'periode': '2024', 'workers': 2, 'tarife': TARIFE})
+        job = response.get_json()['job']
+
+        assert response.status_code == 202
+        assert jobs.wait(job['id'], timeout=120)['status'] == 'done'
+        data = client.get(f"/api/billing/batch-jobs/{job['id']}").get_json()
+        assert data['job']['progress'] == {'done': 2, 'failed': 0, 'total': 2}
+        assert [e['download_url'] for e in data['manifest']['invoices']] == [
+            '/api/billing/download/rechnung_2024_0001.pdf', '/api/billing/download/rechnung_2024_0002.pdf'
+        ]
+        assert client.get('/api/billing/batch-jobs/unbekannt').status_code == 404
+
+    @pytest.mark.parametrize('payload', [
+        {'periode': 'x', 'tarife': TARIFE},
+        {'periode': '2024', 'workers': '4', 'tarife': TARIFE},
+        {'periode': '2024', 'workers': 'abc', 'tarife': TARIFE},
+        {'periode': '2024'},
+        {'periode': '2023', 'tarife': TARIFE},
+    ])
+    def test_api_generate_batch_invalid(self, session_factory, monkeypatch, payload):
+        """Test: Ungültige Periode oder Worker-Anzahl, fehlende Netz-Tarife oder Verbrauch ergibt 400, kein Job"""
+        from src.web import app as web_app
+        monkeypatch.setattr(web_app, 'get_db_session', session_factory)
+        client = web_app.app.test_client()
+
+        response = client.post('/api/billing/generate-batch', json=payload)
+
+        assert response.status_code == 400
+        assert 'job' not in response.get_json()
+
+
+class TestInvoiceStreaming:
+    """Test-Klasse für Rechnungen aus dem Speicher"""
+
+    @pytest.fixture
+    def client(self, session_factory, tmp_path, monkeypatch):
+        """Test-Client mit In-Memory-Datenbank und temporärem Export-Ordner"""
+        from src.web import app as web_app
+        monkeypatch.setattr(web_app, 'get_db_session', session_factory)
+        monkeypatch.setattr(web_app, 'EXPORT_FOLDER', tmp_path)
+        return web_app.app.test_client()
+
+    def test_render_matches_file(self, tmp_path):
+        """Test: Rendern im Speicher ergibt dieselben Bytes wie die Datei"""
+        generator = STWEGPDFGenerator()
+        data = generator._generate_sample_data()
+
+        content = generator.render_invoice(data)
+        generator.generate_invoice(data, str(tmp_path / 'rechnung.pdf'))
+
+        assert content.startswith(b'%PDF')
+        assert (tmp_path / 'rechnung.pdf').read_bytes() == content
+
+    def test_save_invoice_async(self, tmp_path):
+        """Test: Speichern im Hintergrund schreibt die Datei vollständig"""
+        target = tmp_path / 'sub' / 'rechnung.pdf'
+
+        assert save_invoice_async(b'%PDF-test', target).result(timeout=5) == str(target)
+        assert target.read_bytes() == b'%PDF-test'
+        assert [p.name for p in target.parent.iterdir()] == ['rechnung.pdf']
+
+    def test_sample_invoice_streamed_without_file(self, client, tmp_path):
+        """Test: Beispiel-Rechnung kommt inline als PDF, der Export-Ordner bleibt leer"""
+        response = client.get('/api/billing/sample-invoice')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/pdf'
+        assert response.headers['Content-Disposition'].startswith('inline')
+        assert response.data.startswith(b'%PDF')
+        assert list(tmp_path.iterdir()) == []
+
+    def test_owner_invoice_saved_in_background(self, client, tmp_path):
+        """Test: Mit save=1 wird die gestreamte Rechnung zusätzlich abgelegt"""
+        response = client.get('/api/billing/invoice/2?periode=2024&netz_hochtarif=54.9&netz_niedertarif=34.9'
+                              '&save=1&download=1')
+
+        assert response.status_code == 200
+        assert response.headers['Content-Disposition'].startswith('attachment')
+        assert response.headers['X-Invoice-Download-Url'] == '/api/billing/download/rechnung_2024_0002.pdf'
+
+        target = tmp_path / 'invoices' / 'rechnung_2024_0002.pdf'
+        deadline = time.monotonic() + 5
+        while not target.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert target.read_bytes() == response.data
+        assert client.get('/api/billing/download/rechnung_2024_0002.pdf').data == response.data
+
+    def test_owner_invoice_errors(self, client):
+        """Test: Unbekannter Eigentümer ergibt 404; ungültige Periode, fehlende Netz-Tarife oder Verbrauch 400"""
+        tarife = 'netz_hochtarif=54.9&netz_niedertarif=34.9'
+        assert client.get(f'/api/billing/invoice/9?periode=2024&{tarife}').status_code == 404
+        assert client.get(f'/api/billing/invoice/1?periode=2024-13&{tarife}').status_code == 400
+        assert 'Netz-Tarife fehlen' in client.get('/api/billing/invoice/1?periode=2024').get_json()['error']
+        assert client.get(f'/api/billing/invoice/1?periode=2023&{tarife}').status_code == 400
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,124 @@
+"""
+Tests für den Bulk-Loader der Verbrauchsdaten
+"""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from src.models.bulk_loader import bulk_insert_verbrauchsdaten, validate_verbrauchsdaten
+from src.models.models import Base, Messpunkt, Verbrauchsdaten
+
+
+class TestBulkLoader:
+    """Test-Klasse für bulk_insert_verbrauchsdaten"""
+
+    @pytest.fixture
+    def engine(self):
+        """In-Memory-Datenbank für Tests"""
+        engine = create_engine('sqlite:///:memory:', echo=False)
+        Base.metadata.create_all(engine)
+        return engine
+
+    @pytest.fixture
+    def db_session(self, engine):
+        """Session mit einem Messpunkt"""
+        session = sessionmaker(bind=engine)()
+        session.add(Messpunkt(name='Allgemeinstrom', typ='gemeinschaft'))
+        session.commit()
+        yield session
+        session.close()
+
+    @staticmethod
+    def _data(anzahl, messpunkt_id=1):
+        """Stündliche Werte ab 1.1.2024"""
+        return pd.DataFrame({
+            'zeitstempel': pd.date_range('2024-01-01', periods=anzahl, freq='h'),
+            'messpunkt_id': [messpunkt_id] * anzahl,
+            'verbrauch': [float(i % 10) for i in range(anzahl)],
+            'kosten': [None if i % 2 else 0.25 * (i % 10) for i in range(anzahl)]
+        })
+
+    def test_insert_matches_orm_path(self, db_session):
+        """Test: Bulk-Insert speichert dieselben Werte wie der ORM-Weg"""
+        stats = bulk_insert_verbrauchsdaten(db_session, self._data(3))
+
+        assert stats['rows'] == 3
+        rows = db_session.query(Verbrauchsdaten).order_by(Verbrauchsdaten.id).all()
+        assert [row.zeitstempel for row in rows] == [
+            datetime(2024, 1, 1, 0), datetime(2024, 1, 1, 1), datetime(2024, 1, 1, 2)
+        ]
+        assert [row.verbrauch for row in rows] == [0.0, 1.0, 2.0]
+        assert [row.kosten for row in rows] == [0.0, None, 0.5]
+        assert all(row.periode == '2024-01' for row in rows)
+        assert all(row.erstellt_am is not None for row in rows)
+
+    def test_stored_format_matches_orm(self, db_session):
+        """Test: Zeitstempel werden im selben Textformat wie vom ORM gespeichert"""
+        db_session.add(Verbrauchsdaten(zeitstempel=datetime(2024, 5, 6, 7, 8, 9, 123456),
+                                       messpunkt_id=1, verbrauch=1.0, periode='2024-05'))
+        db_session.commit()
+        bulk_insert_verbrauchsdaten(db_session, {
+            'zeitstempel': [datetime(2024, 5, 6, 7, 8, 9, 123456)],
+            'messpunkt_id': [1],
+            'verbrauch': [1.0]
+        })
+
+        stored = db_session.execute(text('SELECT zeitstempel, periode FROM verbrauchsdaten')).all()
+        assert stored[0] == stored[1]
+
+    def test_chunks_in_one_transaction(self, engine, db_session):
+        """Test: Mehrere Chunks, aber nur ein Commit"""
+        commits = []
+        event.listen(engine, 'commit', lambda conn: commits.append(conn))
+
+        stats = Verbrauchsdaten.bulk_insert(db_session, self._data(25), chunk_size=10)
+
+        assert stats['chunks'] == 3
+        assert stats['rows_per_second'] > 0
+        assert len(commits) == 1
+        assert db_session.query(Verbrauchsdaten).count() == 25
+
+    def test_invalid_rows_reported_together(self, db_session):
+        """Test: Alle Verstösse werden gesammelt und nichts geschrieben"""
+        data = self._data(4)
+        data.loc[1, 'verbrauch'] = -1.0
+        data.loc[3, 'kosten'] = -5.0
+        data['periode'] = ['2024-01', '2024-13', '2024-01', 'Jan 24']
+
+        with pytest.raises(ValueError) as excinfo:
+            bulk_insert_verbrauchsdaten(db_session, data)
+
+        message = str(excinfo.value)
+        assert "Verbrauch darf nicht negativ sein: 1 Zeile(n), z.B. Zeile 1" in message
+        assert "Kosten müssen eine Zahl >= 0 sein: 1 Zeile(n), z.B. Zeile 3" in message
+        assert "Periode muss im Format YYYY-MM sein: 2 Zeile(n), z.B. Zeile 1, 3" in message
+        assert db_session.query(Verbrauchsdaten).count() == 0
+
+    def test_accepts_column_dict_with_datetimes(self):
+        """Test: Dict von Listen mit datetime-Objekten wird akzeptiert, Texte nicht"""
+        valid = validate_verbrauchsdaten({
+            'zeitstempel': [datetime(2024, 3, 5)],
+            'messpunkt_id': [1],
+            'verbrauch': [12]
+        })
+        assert valid.loc[0, 'periode'] == '2024-03'
+
+        with pytest.raises(ValueError, match="Zeitstempel muss ein datetime-Objekt sein"):
+            validate_verbrauchsdaten({
+                'zeitstempel': ['2024-03-05'],
+                'messpunkt_id': [1],
+                'verbrauch': [12]
+            })
+
+    def test_missing_columns(self):
+        """Test: Fehlende Pflichtspalten werden gemeldet"""
+        with pytest.raises(ValueError, match="Fehlende Spalte"):
+            validate_verbrauchsdaten({'zeitstempel': [datetime(2024, 1, 1)]})
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
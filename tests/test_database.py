@@ -0,0 +1,83 @@
+"""
+Tests für die Datenbank-Konfiguration (Pool und SQLite-Profil)
+"""
+
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from src.models.database import SQLITE_PROFILES, build_engine
+
+
+def _pragma(connection, name):
+    return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+
+class TestBuildEngine:
+    """Test-Klasse für build_engine"""
+
+    def test_file_database_uses_performance_profile(self, tmp_path):
+        """Test: Datei-Datenbank bekommt WAL, NORMAL und die übrigen PRAGMAs"""
+        engine = build_engine(f"sqlite:///{tmp_path / 'stweg.db'}")
+
+        with engine.connect() as connection:
+            assert _pragma(connection, 'journal_mode') == 'wal'
+            assert _pragma(connection, 'synchronous') == 1
+            assert _pragma(connection, 'cache_size') == SQLITE_PROFILES['performance']['cache_size']
+            assert _pragma(connection, 'mmap_size') == SQLITE_PROFILES['performance']['mmap_size']
+            assert _pragma(connection, 'temp_store') == 2
+            assert _pragma(connection, 'busy_timeout') == 5000
+        assert isinstance(engine.pool, QueuePool)
+        engine.dispose()
+
+    def test_memory_database_uses_static_pool(self):
+        """Test: In-Memory-Datenbank teilt eine Verbindung und überspringt WAL"""
+        engine = build_engine('sqlite:///:memory:')
+
+        with engine.connect() as connection:
+            assert _pragma(connection, 'journal_mode') == 'memory'
+            assert _pragma(connection, 'temp_store') == 2
+        assert isinstance(engine.pool, StaticPool)
+
+    def test_default_profile_keeps_sqlite_defaults(self, tmp_path):
+        """Test: Profil 'default' setzt keine PRAGMAs"""
+        engine = build_engine(f"sqlite:///{tmp_path / 'stweg.db'}", profile='default')
+
+        with engine.connect() as connection:
+            assert _pragma(connection, 'journal_mode') == 'delete'
+        engine.dispose()
+
+    def test_unknown_profile(self, tmp_path):
+        """Test: Unbekanntes Profil wird abgelehnt"""
+        with pytest.raises(ValueError, match="Unbekanntes SQLite-Profil"):
+            build_engine(f"sqlite:///{tmp_path / 'stweg.db'}", profile='turbo')
+
+    def test_reads_not_blocked_by_open_write(self, tmp_path):
+        """Test: Lesender Thread bekommt Daten, während eine Schreib-Transaktion offen ist"""
+        engine = build_engine(f"sqlite:///{tmp_path / 'stweg.db'}")
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE werte (wert INTEGER)"))
+            connection.execute(text("INSERT INTO werte VALUES (1)"))
+
+        results = []
+        with engine.connect() as writer:
+            writer.execute(text("BEGIN IMMEDIATE"))
+            writer.execute(text("INSERT INTO werte VALUES (2)"))
+
+            def read():
+                with engine.connect() as reader:
+                    results.append(reader.execute(text("SELECT COUNT(*) FROM werte")).scalar())
+
+            thread = threading.Thread(target=read)
+            thread.start()
+            thread.join(timeout=2)
+            writer.rollback()
+
+        assert results == [1]
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
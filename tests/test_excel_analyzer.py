@@ -233,5 +233,52 @@ class TestExcelValidation:
             os.unlink(temp_file)
 
 
+
+class TestWorkbookSession:
+    """Test-Klasse für das einmalige Öffnen der Excel-Datei"""
+    
+    @pytest.fixture
+    def multi_sheet_file(self, tmp_path):
+        """Excel-Datei mit zwei Sheets und 50 Datenzeilen im Haupt-Sheet"""
+        file_path = tmp_path / 'export.xlsx'
+        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+            pd.DataFrame({
+                'Messpunkt': [f'MP{i}' for i in range(50)],
+                'Gesamtverbrauch': range(50)
+            }).to_excel(writer, sheet_name='Verbrauchsdaten', index=False)
+            pd.DataFrame({'Eigentümer_ID': [1, 2]}).to_excel(writer, sheet_name='Eigentümer', index=False)
+        return str(file_path)
+    
+    def test_file_opened_once(self, multi_sheet_file):
+        """Test: Datei wird für alle Sheets nur einmal geöffnet"""
+        from unittest.mock import patch
+        
+        analyzer = ExcelAnalyzer()
+        
+        with patch('src.excel_analysis.workbook_session.pd.ExcelFile', wraps=pd.ExcelFile) as excel_file, \
+                patch('pandas.read_excel') as read_excel:
+            result = analyzer.analyze_file(multi_sheet_file)
+        
+        assert excel_file.call_count == 1
+        read_excel.assert_not_called()
+        assert result['sheets'] == ['Verbrauchsdaten', 'Eigentümer']
+    
+    def test_sample_rows_and_estimated_row_count(self, multi_sheet_file):
+        """Test: Nur Beispielzeilen lesen, Zeilenzahl aus der Blatt-Dimension"""
+        result = ExcelAnalyzer().analyze_file(multi_sheet_file)
+        
+        assert len(result['sample_data']['Verbrauchsdaten']) == 5
+        assert result['row_count'] == 50
+        assert result['row_count_exact'] is False
+    
+    def test_exact_row_count_on_request(self, multi_sheet_file):
+        """Test: count_rows=True liest das Haupt-Sheet vollständig"""
+        result = ExcelAnalyzer().analyze_file(multi_sheet_file, count_rows=True)
+        
+        assert result['row_count'] == 50
+        assert result['row_count_exact'] is True
+        assert result['main_sample_data'][0] == {'Messpunkt': 'MP0', 'Gesamtverbrauch': 0}
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
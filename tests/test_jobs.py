@@ -0,0 +1,218 @@
+"""
+Tests für Hintergrund-Jobs des Web-Interface (Testläufe, Parse-Jobs)
+"""
+
+import io
+
+import pandas as pd
+import pytest
+
+from src.excel_analysis.parse_cache import ParseCache
+from src.excel_analysis.simple_zev_parser import SimpleZEVParser
+from src.web.jobs import ParseJobManager, PytestJobRunner, parse_junit_xml
+
+JUNIT_XML = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites>
+  <testsuite name="pytest" errors="1" failures="2" skipped="3" tests="10" time="0.5">
+    <testcase classname="tests.test_a" name="test_ok" time="0.01"/>
+  </testsuite>
+</testsuites>
+"""
+
+
+@pytest.fixture
+def sample_project(tmp_path):
+    """Mini-Projekt mit zwei bestandenen, einem fehlgeschlagenen und einem übersprungenen Test"""
+    tests_dir = tmp_path / 'tests'
+    tests_dir.mkdir()
+    (tests_dir / 'test_sample.py').write_text(
+        "import pytest\n"
+        "def test_one():\n    assert True\n"
+        "def test_two():\n    assert True\n"
+        "def test_fail():\n    assert False\n"
+        "@pytest.mark.skip\ndef test_skip():\n    pass\n",
+        encoding='utf-8'
+    )
+    return tmp_path
+
+
+class TestPytestJobRunner:
+    """Test-Klasse für PytestJobRunner und parse_junit_xml"""
+
+    def test_parse_junit_xml(self, tmp_path):
+        """Test: Zusammenfassung aus dem JUnit-Report"""
+        report = tmp_path / 'junit.xml'
+        report.write_text(JUNIT_XML, encoding='utf-8')
+
+        assert parse_junit_xml(report) == {
+            'total': 7, 'passed': 4, 'failed': 2, 'errors': 1, 'skipped': 3
+        }
+
+    def test_concurrent_starts_share_one_run(self, sample_project):
+        """Test: Zweiter Start während eines Laufs liefert denselben Job"""
+        runner = PytestJobRunner(sample_project, sample_project / 'runs', extra_args=['-p', 'no:cacheprovider'])
+
+        first, started_first = runner.start()
+        second, started_second = runner.start()
+        assert runner.status()['running'] is True
+        runner.wait(timeout=60)
+
+        assert (started_first, started_second) == (True, False)
+        assert first['id'] == second['id']
+        status = runner.status()
+        assert status['running'] is False
+        assert status['result']['job_id'] == first['id']
+        assert status['result']['success'] is False
+        assert status['result']['summary'] == {'total': 3, 'passed': 2, 'failed': 1, 'errors': 0, 'skipped': 1}
+        assert status['age_s'] >= 0
+
+    def test_result_survives_restart(self, sample_project):
+        """Test: Letztes Ergebnis wird gespeichert und nach einem Neustart geladen"""
+        runner = PytestJobRunner(sample_project, sample_project / 'runs', extra_args=['-p', 'no:cacheprovider'])
+        job, _ = runner.start()
+        runner.wait(timeout=60)
+
+        restarted = PytestJobRunner(sample_project, sample_project / 'runs')
+
+        status = restarted.status()
+        assert status['running'] is False
+        assert status['result']['job_id'] == job['id']
+        assert list((sample_project / 'runs').glob('junit_*.xml')) == []
+
+    def test_no_result_before_first_run(self, tmp_path):
+        """Test: Ohne Lauf gibt es weder Ergebnis noch Alter"""
+        status = PytestJobRunner(tmp_path, tmp_path / 'runs').status()
+
+        assert status == {'running': False, 'job': None, 'result': None, 'age_s': None}
+
+
+@pytest.fixture
+def zev_file(tmp_path):
+    """ZEV-Datei mit zwei Zählern und genug Zeilen für Zwischenmeldungen"""
+    rows = [
+        ['CHINV0000000000000000000000001', None, None, None, 'Januar', 'Februar'],
+        ['E01 Hauptzähler', None, None, None, None, None],
+        ['Bezug Netz [kWh]', None, None, None, 10, 20],
+        [None, 'Untermessungen', None, None, None, None],
+        [None, 'CHINV0000000000000000000000002', None, None, 'Januar', 'Februar'],
+        [None, 'W01 Wohnung 0.1', None, None, None, None],
+        [None, 'Bezug lokal [kWh]', None, None, 3, 4],
+    ]
+    rows += [['Bemerkung', None, None, None, None, None]] * 2500
+    file_path = tmp_path / 'zev.xlsx'
+    pd.DataFrame(rows).to_excel(file_path, header=False, index=False)
+    return file_path
+
+
+@pytest.fixture(scope='module')
+def job_manager():
+    """Ein Prozess-Pool für alle Parse-Job-Tests (Start der Worker ist teuer)"""
+    manager = ParseJobManager(max_workers=1)
+    yield manager
+    manager.shutdown()
+
+
+def _wait_until_finished(manager, job_id, timeout=60):
+    """Sammelt alle Zwischenstände eines Jobs bis zum Ende"""
+    seen = []
+    version = None
+    while True:
+        job = manager.wait_for_update(job_id, version, timeout=timeout)
+        assert job['version'] != version, "Job hat sich nicht mehr verändert"
+        version = job['version']
+        seen.append(job)
+        if job['status'] in ('done', 'failed'):
+            return seen
+
+
+class TestParseJobManager:
+    """Test-Klasse für ParseJobManager"""
+
+    def test_job_reports_progress_and_result(self, job_manager, zev_file):
+        """Test: Job meldet Fortschritt und liefert das Ergebnis des Parsers"""
+        job = job_manager.submit(zev_file)
+        assert job['status'] == 'queued'
+
+        seen = _wait_until_finished(job_manager, job['id'])
+
+        assert seen[-1]['status'] == 'done'
+        scanned = [state['progress']['rows_scanned'] for state in seen if state['status'] == 'running']
+        assert scanned == sorted(scanned)
+        assert 1000 in scanned
+        assert seen[-1]['progress']['zaehler_found'] == 2
+
+        expected = SimpleZEVParser(engine='streaming').parse_zev_file(str(zev_file))
+        assert job_manager.result(job['id']) == expected
+
+    def test_unreadable_file(self, job_manager, tmp_path):
+        """Test: Lesefehler kommen wie bei /api/excel/explore im Ergebnis zurück"""
+        job = job_manager.submit(tmp_path / 'fehlt.xlsx')
+
+        final = _wait_until_finished(job_manager, job['id'])[-1]
+
+        assert final['status'] == 'done'
+        result = job_manager.result(job['id'])
+        assert result['structure_verified'] is False
+        assert result['structure_info']['errors']
+
+    def test_cache_hit_is_done_immediately(self, tmp_path, zev_file):
+        """Test: Bereits geparste Datei braucht keinen Worker"""
+        cache = ParseCache(tmp_path / 'cache')
+        result = SimpleZEVParser(engine='streaming').parse_zev_file(str(zev_file))
+        cache.put(cache.file_digest(str(zev_file)), '1', result)
+        manager = ParseJobManager(parse_cache=cache)
+
+        job = manager.submit(zev_file)
+
+        assert job['status'] == 'done'
+        assert job['cached'] is True
+        assert manager.result(job['id'])['zaehler_overview'] == result['zaehler_overview']
+        assert manager._executor is None
+
+    def test_unknown_engine_rejected(self, zev_file):
+        """Test: Unbekannte Engine wird beim Anlegen abgelehnt"""
+        with pytest.raises(ValueError, match="Unbekannte Parser-Engine"):
+            ParseJobManager().submit(zev_file, engine='turbo')
+
+    def test_upload_streams_events(self, job_manager, zev_file, tmp_path, monkeypatch):
+        """Test: Upload liefert Job-ID, Events enden mit done, Ergebnis danach abrufbar"""
+        from src.web import app as web_app
+        monkeypatch.setattr(web_app, 'parse_jobs', job_manager)
+        monkeypatch.setitem(web_app.app.config, 'UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+        client = web_app.app.test_client()
+
+        upload = client.post('/api/excel/upload', data={
+            'file': (io.BytesIO(zev_file.read_bytes()), 'zev.xlsx')
+        }, content_type='multipart/form-data').get_json()
+        job_id = upload['job']['id']
+
+        events = client.get(f'/api/excel/jobs/{job_id}/events')
+        assert events.mimetype == 'text/event-stream'
+        names = [line.split(': ', 1)[1] for line in events.get_data(as_text=True).splitlines()
+                 if line.startswith('event: ')]
+
+        assert names[-1] == 'done'
+        assert set(names[:-1]) <= {'progress'}
+        result = client.get(f'/api/excel/jobs/{job_id}/result').get_json()
+        assert result['success'] is True
+        assert len(result['result']['zaehler_overview']) == 2
+        assert client.get('/api/excel/jobs/unbekannt').status_code == 404
+
+    def test_upload_unknown_engine_saves_nothing(self, job_manager, zev_file, tmp_path, monkeypatch):
+        """Test: Upload mit unbekannter Engine ergibt 400 und legt keine Datei ab"""
+        from src.web import app as web_app
+        monkeypatch.setattr(web_app, 'parse_jobs', job_manager)
+        monkeypatch.setitem(web_app.app.config, 'UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+        client = web_app.app.test_client()
+
+        response = client.post('/api/excel/upload', data={
+            'file': (io.BytesIO(zev_file.read_bytes()), 'zev.xlsx'), 'engine': 'turbo'
+        }, content_type='multipart/form-data')
+
+        assert response.status_code == 400
+        assert 'turbo' in response.get_json()['error']
+        assert not (tmp_path / 'uploads').exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
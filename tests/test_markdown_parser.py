@@ -0,0 +1,181 @@
+"""
+Tests für den MarkdownParser und den Dokument-Cache
+"""
+
+import os
+
+import pytest
+
+from src.utils.markdown_parser import DocumentCache, MarkdownDocument, MarkdownParser
+
+ROADMAP = """# Roadmap
+
+**Gesamt:** 3 User Stories | **Abgeschlossen:** 1 | **In Bearbeitung:** 1 | **Geplant:** 1
+
+## 🎯 Priorität 1 - KRITISCH
+
+### Abrechnung
+- **US-008** - PDF-Rechnung generieren ⭐⭐⭐
+
+## 🎯 Priorität 2 - HOCH
+
+### Import
+- **US-010** - Excel-Import ⭐⭐
+"""
+
+USER_STORIES = """# User Stories
+
+## Epic 1: Abrechnung
+**Beschreibung:** Rechnungen erstellen
+
+### US-008: PDF-Rechnung generieren
+**Als** Verwalter
+**möchte ich** PDF-Rechnungen erzeugen
+**damit** die Eigentümer eine Abrechnung erhalten
+
+**Akzeptanzkriterien:**
+- [x] PDF wird erzeugt
+- [ ] Versand per E-Mail
+"""
+
+
+@pytest.fixture
+def docs(tmp_path):
+    """Projektverzeichnis mit ROADMAP.md und USER_STORIES.md"""
+    (tmp_path / 'ROADMAP.md').write_text(ROADMAP, encoding='utf-8')
+    (tmp_path / 'USER_STORIES.md').write_text(USER_STORIES, encoding='utf-8')
+    return tmp_path
+
+
+class TestDocumentCache:
+    """Test-Klasse für den Dokument-Cache"""
+
+    def test_unchanged_document_parsed_once(self, docs):
+        """Test: Zweiter Aufruf kommt aus dem Cache"""
+        cache = DocumentCache()
+        parser = MarkdownParser(docs, cache=cache)
+
+        first = parser.parse_roadmap()
+        second = parser.parse_roadmap()
+
+        assert first == second
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert [story['id'] for story in first['priorities']['kritisch']] == ['US-008']
+
+    def test_changed_document_is_reparsed(self, docs):
+        """Test: Neue mtime/Grösse verwirft den Eintrag"""
+        cache = DocumentCache()
+        parser = MarkdownParser(docs, cache=cache)
+        parser.parse_roadmap()
+
+        roadmap = docs / 'ROADMAP.md'
+        roadmap.write_text(ROADMAP + "- **US-011** - Export ⭐\n", encoding='utf-8')
+        stat = roadmap.stat()
+        os.utime(roadmap, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        data = parser.parse_roadmap()
+
+        assert cache.misses == 2
+        assert [story['id'] for story in data['priorities']['hoch']] == ['US-010', 'US-011']
+
+    def test_callers_cannot_modify_cache(self, docs):
+        """Test: Änderungen am Ergebnis landen nicht im Cache"""
+        parser = MarkdownParser(docs, cache=DocumentCache())
+
+        parser.parse_user_stories()['epics'].clear()
+
+        assert len(parser.parse_user_stories()['epics']) == 1
+
+    def test_missing_document(self, tmp_path):
+        """Test: Fehlende Datei liefert weiterhin die Fehlermeldung"""
+        parser = MarkdownParser(tmp_path, cache=DocumentCache())
+
+        assert parser.parse_roadmap() == {'error': 'ROADMAP.md nicht gefunden'}
+        assert parser.load_user_stories() is None
+
+
+class TestMarkdownDocument:
+    """Test-Klasse für den Tokenizer und die Extraktion darauf"""
+
+    def test_heading_tree(self):
+        """Test: Überschriften werden nach Ebene verschachtelt"""
+        document = MarkdownDocument(ROADMAP)
+
+        top = document.root.children
+        assert [section.title for section in top] == ['Roadmap']
+        priorities = top[0].children
+        assert [section.title for section in priorities] == ['🎯 Priorität 1 - KRITISCH', '🎯 Priorität 2 - HOCH']
+        assert [section.title for section in priorities[0].children] == ['Abrechnung']
+        assert priorities[0].end == priorities[1].line
+        assert priorities[1].end == len(document.lines)
+
+    def test_priorities_and_epics(self, docs):
+        """Test: Story-Zeilen erhalten Priorität und Epic aus den Überschriften darüber"""
+        priorities = MarkdownParser(docs, cache=DocumentCache())._extract_priorities(ROADMAP)
+
+        assert priorities['kritisch'] == [{
+            'id': 'US-008', 'title': 'PDF-Rechnung generieren', 'epic': 'Abrechnung',
+            'status': 'Geplant', 'priority': 'kritisch'
+        }]
+        assert [story['epic'] for story in priorities['hoch']] == ['Import']
+
+    def test_priority_from_title(self, docs):
+        """Test: Priorität einer Story-Überschrift aus dem umgebenden Abschnitt"""
+        parser = MarkdownParser(docs, cache=DocumentCache())
+
+        assert parser._extract_priority_from_title('Import', ROADMAP) == 'hoch'
+        assert parser._extract_priority_from_title('Abrechnung', ROADMAP) == 'kritisch'
+        assert parser._extract_priority_from_title('fehlt', ROADMAP) == 'niedrig'
+
+    def test_section_text(self, docs):
+        """Test: Abschnitt endet bei der nächsten Überschrift zweiter Ebene"""
+        parser = MarkdownParser(docs, cache=DocumentCache())
+
+        section = parser._extract_section(ROADMAP, 'KRITISCH')
+
+        assert section.startswith('## 🎯 Priorität 1 - KRITISCH')
+        assert 'US-008' in section
+        assert 'US-010' not in section
+
+
+class TestDocumentEndpoints:
+    """Test-Klasse für ETag/Last-Modified der Roadmap- und User-Story-Endpunkte"""
+
+    @pytest.fixture
+    def client(self, docs, monkeypatch):
+        from src.web import app as web_app
+        from src.utils import markdown_parser
+        monkeypatch.setattr(web_app, 'project_root', docs)
+        monkeypatch.setattr(markdown_parser, 'document_cache', DocumentCache())
+        return web_app.app.test_client()
+
+    @pytest.mark.parametrize('url', ['/api/roadmap', '/api/roadmap/full',
+                                     '/api/user-stories', '/api/user-stories/full'])
+    def test_not_modified(self, client, url):
+        """Test: Gleiches ETag ergibt 304 ohne Inhalt"""
+        first = client.get(url)
+        assert first.status_code == 200
+        assert first.headers['ETag']
+        assert first.headers['Last-Modified']
+
+        second = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+
+        assert second.status_code == 304
+        assert second.get_data() == b''
+
+    def test_etag_changes_with_roadmap(self, client, docs):
+        """Test: /api/user-stories/full hängt auch von ROADMAP.md ab"""
+        first = client.get('/api/user-stories/full')
+        assert first.get_json()['backlog']['total_stories'] == 3
+
+        roadmap = docs / 'ROADMAP.md'
+        roadmap.write_text(ROADMAP.replace('**Gesamt:** 3', '**Gesamt:** 4'), encoding='utf-8')
+
+        second = client.get('/api/user-stories/full', headers={'If-None-Match': first.headers['ETag']})
+
+        assert second.status_code == 200
+        assert second.get_json()['backlog']['total_stories'] == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
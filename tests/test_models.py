@@ -6,7 +6,7 @@ Test-Driven Development für Phase 2: Datenmodelle & Grundstrukturen
 import pytest
 from datetime import datetime, date
 from decimal import Decimal
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import IntegrityError
 
@@ -429,6 +429,116 @@ class TestModelRelationships:
         assert verbrauch.messpunkt.eigentuemer.id == eigentuemer.id
         assert verbrauch in eigentuemer.verbrauchsdaten
         assert len(eigentuemer.verbrauchsdaten) == 1
+        
+        # Noch nicht geflushte Verbrauchsdaten gehören ebenfalls dazu
+        with db_session.no_autoflush:
+            neu = Verbrauchsdaten(zeitstempel=datetime(2024, 2, 1), verbrauch=30.0, periode="2024-02")
+            messpunkt.verbrauchsdaten.append(neu)
+            assert neu in eigentuemer.verbrauchsdaten
+
+
+class TestQueryLoading:
+    """Test-Klasse für Abfragen ohne N+1 Lazy Loading"""
+    
+    @pytest.fixture
+    def engine(self):
+        """In-Memory-Datenbank mit 7 Eigentümern, je 2 Messpunkten und 12 Monatswerten"""
+        engine = create_engine('sqlite:///:memory:', echo=False)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        for nummer in range(1, 8):
+            eigentuemer = Eigentuemer(name=f"Eigentümer {nummer}", wohnung=f"{nummer}A", anteil=0.1)
+            session.add(eigentuemer)
+            session.flush()
+            for art in ('Strom', 'Wärme'):
+                messpunkt = Messpunkt(name=f"{art} {nummer}", typ="individual", eigentuemer_id=eigentuemer.id)
+                session.add(messpunkt)
+                session.flush()
+                for monat in range(1, 13):
+                    session.add(Verbrauchsdaten(
+                        zeitstempel=datetime(2024, monat, 1), messpunkt_id=messpunkt.id,
+                        verbrauch=float(nummer), kosten=0.5, periode=f"2024-{monat:02d}"
+                    ))
+        session.add(Messpunkt(name="Gemeinschaft", typ="gemeinschaft"))
+        session.commit()
+        session.close()
+        return engine
+    
+    @pytest.fixture
+    def db_session(self, engine):
+        """Frische Session (nichts im Identity Map)"""
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+    
+    @pytest.fixture
+    def count_queries(self, engine):
+        """Zählt die SQL-Statements, die innerhalb des Blocks abgesetzt werden"""
+        class Counter:
+            count = 0
+            
+            def __enter__(self):
+                self.count = 0
+                event.listen(engine, 'before_cursor_execute', self._count)
+                return self
+            
+            def __exit__(self, *exc_info):
+                event.remove(engine, 'before_cursor_execute', self._count)
+            
+            def _count(self, *args):
+                self.count += 1
+        
+        return Counter()
+    
+    def test_eigentuemer_dicts_with_messpunkte(self, db_session, count_queries):
+        """Test: Eigentümer mit Messpunkten in zwei Abfragen (selectinload)"""
+        with count_queries as queries:
+            data = Eigentuemer.get_all_dicts(db_session, include_messpunkte=True)
+        
+        assert len(data) == 7
+        assert all(len(row['messpunkte']) == 2 for row in data)
+        assert queries.count == 2
+    
+    def test_messpunkt_dicts_single_query(self, db_session, count_queries):
+        """Test: Messpunkte mit Eigentümer-Namen in einer Abfrage (joinedload)"""
+        with count_queries as queries:
+            data = Messpunkt.get_all_dicts(db_session)
+        
+        assert len(data) == 15
+        assert data[0]['eigentuemer_name'] == "Eigentümer 1"
+        assert queries.count == 1
+    
+    def test_verbrauchsdaten_dicts_single_query(self, db_session, count_queries):
+        """Test: Ein Jahr Verbrauchsdaten mit Messpunkt-Namen in einer Abfrage"""
+        with count_queries as queries:
+            data = Verbrauchsdaten.get_dicts(db_session)
+        
+        assert len(data) == 7 * 2 * 12
+        assert data[0]['messpunkt_name'] == "Strom 1"
+        assert queries.count == 1
+    
+    def test_eigentuemer_verbrauchsdaten_single_query(self, db_session, count_queries):
+        """Test: Eigentuemer.query_verbrauchsdaten lädt alle Messpunkte mit einer Abfrage"""
+        eigentuemer = Eigentuemer.get_by_wohnung(db_session, "3A")
+        
+        with count_queries as queries:
+            verbrauchsdaten = Eigentuemer.query_verbrauchsdaten(db_session, eigentuemer.id).all()
+            namen = {row.messpunkt.name for row in verbrauchsdaten}
+        
+        assert len(verbrauchsdaten) == 24
+        assert namen == {"Strom 3", "Wärme 3"}
+        assert queries.count == 1
+    
+    def test_verbrauch_summary_single_query(self, db_session, count_queries):
+        """Test: Verbrauch aller Eigentümer in einer aggregierten Abfrage"""
+        with count_queries as queries:
+            summary = Eigentuemer.get_verbrauch_summary(db_session)
+            januar = Eigentuemer.get_verbrauch_summary(db_session, eigentuemer_id=2, periode="2024-01")
+        
+        assert queries.count == 2
+        assert len(summary) == 7
+        assert summary[3] == {'total_verbrauch': 72.0, 'total_kosten': 12.0, 'anzahl': 24}
+        assert januar == {2: {'total_verbrauch': 4.0, 'total_kosten': 1.0, 'anzahl': 2}}
 
 
 if __name__ == "__main__":
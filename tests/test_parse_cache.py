@@ -0,0 +1,97 @@
+"""
+Tests für den Parse-Cache der ZEV-Dateien
+"""
+
+import os
+import pytest
+import pandas as pd
+
+from src.excel_analysis.parse_cache import ParseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Leerer Cache in einem temporären Verzeichnis"""
+    return ParseCache(tmp_path / 'cache')
+
+
+@pytest.fixture
+def zev_upload(tmp_path):
+    """Upload-Verzeichnis mit einer minimalen ZEV-Datei"""
+    excel_dir = tmp_path / 'uploads' / 'excel'
+    excel_dir.mkdir(parents=True)
+    rows = [
+        ['CHINV0000000000000000000000001', None, None, None, 'Januar', 'Februar'],
+        ['E01 Hauptzähler', None, None, None, None, None],
+        ['Bezug Netz [kWh]', None, None, None, 10, 20],
+    ]
+    pd.DataFrame(rows).to_excel(excel_dir / 'zev.xlsx', header=False, index=False)
+    return tmp_path / 'uploads'
+
+
+class TestParseCache:
+    """Test-Klasse für ParseCache"""
+
+    def test_miss_then_hit(self, cache):
+        """Test: Erster Zugriff verfehlt, nach put wird getroffen"""
+        assert cache.get('abc', '1') is None
+
+        cache.put('abc', '1', {'summary': {'total_zaehler': 1}})
+
+        assert cache.get('abc', '1') == {'summary': {'total_zaehler': 1}}
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['entries'] == 1
+
+    def test_parser_version_is_part_of_key(self, cache):
+        """Test: Neue Parser-Version verwendet alte Einträge nicht"""
+        cache.put('abc', '1', {'value': 1})
+
+        assert cache.get('abc', '2') is None
+
+    def test_digest_depends_on_content_only(self, tmp_path):
+        """Test: Gleicher Inhalt unter anderem Namen ergibt gleichen Schlüssel"""
+        first = tmp_path / 'a.xlsx'
+        second = tmp_path / 'b.xlsx'
+        first.write_bytes(b'zev-daten')
+        second.write_bytes(b'zev-daten')
+
+        assert ParseCache.file_digest(str(first)) == ParseCache.file_digest(str(second))
+
+    def test_lru_eviction_by_size(self, tmp_path):
+        """Test: Bei Überschreitung von max_bytes fällt der älteste Eintrag weg"""
+        cache = ParseCache(tmp_path / 'cache', max_bytes=250)
+        payload = {'data': 'x' * 100}
+
+        cache.put('alt', '1', payload)
+        cache.put('neu', '1', payload)
+        # 'neu' künstlich altern lassen, damit er zum LRU-Eintrag wird
+        os.utime(cache._entry_path('neu', '1'), (1, 1))
+        cache.put('dritt', '1', payload)
+
+        assert cache.get('neu', '1') is None
+        assert cache.get('alt', '1') == payload
+        assert cache.stats()['size_bytes'] <= 250
+
+    def test_explore_endpoint_uses_cache(self, cache, zev_upload, monkeypatch):
+        """Test: Zweiter Explore-Aufruf kommt aus dem Cache"""
+        from src.web import app as web_app
+        monkeypatch.setattr(web_app, 'parse_cache', cache)
+        monkeypatch.setitem(web_app.app.config, 'UPLOAD_FOLDER', str(zev_upload))
+        client = web_app.app.test_client()
+
+        first = client.get('/api/excel/explore/zev.xlsx').get_json()
+        second = client.get('/api/excel/explore/zev.xlsx').get_json()
+
+        assert first['cached'] is False
+        assert second['cached'] is True
+        assert second['result'] == first['result']
+
+        stats = client.get('/api/excel/cache').get_json()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,217 @@
+"""
+Tests für den SimpleZEVParser
+Parität der vektorisierten Engine mit der zeilenweisen Referenz-Engine
+"""
+
+import logging
+import numpy as np
+import pytest
+import pandas as pd
+from pathlib import Path
+
+from src.excel_analysis.simple_zev_parser import SimpleZEVParser
+from src.excel_analysis.zev_columns import ZEVColumns
+
+
+SAMPLE_DIR = Path(__file__).parent.parent / 'data' / 'sample'
+MONTHS = ['Januar', 'Februar', 'März', 'April']
+
+
+def _row(a='', b='', c='', d='', values=()):
+    """Erstellt eine Zeile im ZEV-Layout (Spalten A-D + Monatsspalten ab E)"""
+    row = [a, b, c, d] + list(values)
+    return row + [None] * (4 + len(MONTHS) - len(row))
+
+
+@pytest.fixture
+def zev_file(tmp_path):
+    """Erstellt eine kleine ZEV-Datei mit Haupt-, Unter- und virtuellen Zählern"""
+    rows = [
+        _row('ZEV Zwischenbächen 115'),
+        _row('CHINV0000000000000000000000001', values=MONTHS),
+        _row('E01 Hauptzähler'),
+        _row('Bezug Netz [kWh]', values=[100.5, 200, None, 50]),
+        _row('Einspeisung [kWh]', values=[1, 2, 3, 4]),
+        _row('Bemerkung'),
+        _row(b='Untermessungen'),
+        _row(b='CHINV0000000000000000000000002', values=MONTHS),
+        _row(b='W01 Wohnung 0.1'),
+        _row(b='Bezug lokal [kWh]', values=[10, 'k.A.', '', 7]),
+        _row('Leistung', 'Verbrauch [kWh]', values=[1.5, 2.5, 3.5, 4.5]),
+        _row(b='XX-VIRT-1', values=MONTHS[:2]),
+        _row(b='Virtuell Allgemein'),
+        _row('Restverbrauch Haus', 'Allgemeinstrom', values=[5, 6]),
+        _row('XX0001', values=MONTHS[:3]),
+        _row('Virtueller Zähler Allgemein'),
+        _row('Allgemein gesamt', values=[5, 6, 7]),
+        _row('kurz', values=[1, 1, 1]),
+        _row('CHINV0000000000000000000000003'),
+        _row('E02 ohne Monate'),
+        _row('Messung Wärmepumpe', values=[9, 9]),
+    ]
+    file_path = tmp_path / 'zev_export.xlsx'
+    pd.DataFrame(rows).to_excel(file_path, header=False, index=False)
+    return file_path
+
+
+class TestSimpleZEVParserEngines:
+    """Test-Klasse für die Parser-Engines"""
+
+    def test_unknown_engine_rejected(self):
+        """Test: Unbekannte Engine wird abgelehnt"""
+        with pytest.raises(ValueError):
+            SimpleZEVParser(engine='turbo')
+
+    def test_reference_engine_structure(self, zev_file):
+        """Test: Referenz-Engine erkennt Zähler und Messpunkte"""
+        result = SimpleZEVParser().parse_zev_file(str(zev_file))
+
+        ids = [z['id'] for z in result['zaehler_overview']]
+        assert ids == [
+            'CHINV0000000000000000000000001', 'CHINV0000000000000000000000002',
+            'XX-VIRT-1', 'XX0001', 'CHINV0000000000000000000000003'
+        ]
+        assert result['summary']['hauptzaehler'] == 2
+        assert result['summary']['unterzaehler'] == 1
+        assert result['summary']['virtuelle_zaehler'] == 2
+        assert result['structure_info']['month_columns'] == MONTHS
+
+    @pytest.mark.parametrize('engine', ['vectorized', 'streaming'])
+    def test_engine_matches_reference(self, zev_file, engine):
+        """Test: Alternative Engines liefern identische Ausgabe"""
+        reference = SimpleZEVParser(engine='iterrows').parse_zev_file(str(zev_file))
+        result = SimpleZEVParser(engine=engine).parse_zev_file(str(zev_file))
+
+        assert result == reference
+        assert result['summary']['total_messpunkte'] > 0
+
+    @pytest.mark.parametrize('engine', ['iterrows', 'vectorized', 'streaming'])
+    def test_progress_callback(self, zev_file, engine):
+        """Test: Fortschritt endet mit allen Zeilen und allen Zählern, Ergebnis unverändert"""
+        events = []
+        result = SimpleZEVParser(engine=engine).parse_zev_file(str(zev_file), progress=events.append)
+
+        assert events
+        final = events[-1]
+        assert final['rows_scanned'] == final['total_rows'] == len(pd.read_excel(zev_file, header=None))
+        assert final['zaehler_found'] == len(result['zaehler_overview'])
+        assert result == SimpleZEVParser(engine=engine).parse_zev_file(str(zev_file))
+
+    @pytest.mark.parametrize('engine', ['vectorized', 'streaming'])
+    @pytest.mark.parametrize(
+        'sample_file',
+        sorted(p for p in SAMPLE_DIR.glob('*.xlsx') if not p.name.startswith('~$')),
+        ids=lambda p: p.name
+    )
+    def test_engine_matches_reference_on_samples(self, sample_file, engine):
+        """Test: Parität auf allen Beispieldateien unter data/sample"""
+        reference = SimpleZEVParser(engine='iterrows').parse_zev_file(str(sample_file))
+        result = SimpleZEVParser(engine=engine).parse_zev_file(str(sample_file))
+
+        assert result == reference
+
+    def test_iter_zaehler_streams_meters(self, zev_file):
+        """Test: Zähler werden einzeln und in Dateireihenfolge geliefert"""
+        parser = SimpleZEVParser()
+        reference = parser.parse_zev_file(str(zev_file))
+
+        stream = parser.iter_zaehler(str(zev_file))
+        first = next(stream)
+
+        assert first == reference['zaehler_overview'][0]
+        assert [first] + list(stream) == reference['zaehler_overview']
+
+
+class TestSimpleZEVParserTrace:
+    """Test-Klasse für das Parser-Tracing"""
+
+    def test_no_output_without_trace(self, zev_file, capsys):
+        """Test: Ohne Trace keine Ausgabe und kein Diagnose-Bericht"""
+        result = SimpleZEVParser().parse_zev_file(str(zev_file))
+
+        assert 'diagnostics' not in result
+        assert capsys.readouterr().out == ''
+
+    @pytest.mark.parametrize('engine', ['iterrows', 'vectorized', 'streaming'])
+    def test_trace_report(self, zev_file, engine):
+        """Test: Trace liefert strukturierte Entscheidungen, Ergebnis bleibt gleich"""
+        reference = SimpleZEVParser().parse_zev_file(str(zev_file))
+        result = SimpleZEVParser(engine=engine).parse_zev_file(str(zev_file), trace=True)
+
+        diagnostics = result.pop('diagnostics')
+        assert result == reference
+
+        records = diagnostics['records']
+        assert {'row', 'zaehler_id', 'decision'} <= set(records[0])
+        assert diagnostics['decision_counts']['zaehler'] == len(reference['zaehler_overview'])
+        assert diagnostics['decision_counts']['messpunkt'] == reference['summary']['total_messpunkte']
+
+        rejected = [r for r in records if r['decision'] == 'kein_messpunkt']
+        assert {'row': 17, 'zaehler_id': 'XX0001', 'decision': 'kein_messpunkt',
+                'column': 'A', 'text': 'kurz'} in rejected
+
+    def test_trace_logs_at_debug_level(self, zev_file, caplog):
+        """Test: Entscheidungen erscheinen im DEBUG-Log"""
+        with caplog.at_level(logging.DEBUG, logger='src.excel_analysis.simple_zev_parser'):
+            SimpleZEVParser(engine='streaming').parse_zev_file(str(zev_file))
+
+        assert any('untermessungen_start' in message for message in caplog.messages)
+
+
+
+class TestZEVColumns:
+    """Test-Klasse für die Spaltenform der Messwerte"""
+
+    def test_matrix_and_parallel_arrays(self, zev_file):
+        """Test: Matrix und parallele Arrays pro Messpunkt"""
+        columns = SimpleZEVParser().parse_zev_columns(str(zev_file))
+
+        assert columns.values.dtype == np.float64
+        assert columns.values.shape == (len(columns), 12)
+        assert columns.messpunkt_name[0] == 'Bezug Netz [kWh]'
+        assert columns.zaehler_id[0] == 'CHINV0000000000000000000000001'
+        assert columns.zaehler_type[0] == 'hauptzaehler'
+        assert columns.parent_id[0] is None
+        np.testing.assert_array_equal(columns.values[0, :4], [100.5, 200.0, 0.0, 50.0])
+        assert np.isnan(columns.values[0, 4:]).all()
+
+    def test_text_cells_are_nan(self, zev_file):
+        """Test: Nicht-numerische Zellen sind NaN in der Matrix"""
+        columns = SimpleZEVParser().parse_zev_columns(str(zev_file))
+
+        point = columns.messpunkt_name.tolist().index('Bezug lokal [kWh]')
+        assert np.isnan(columns.values[point, 1])
+        assert columns.text_values[(point, 1)] == 'k.A.'
+
+    def test_overview_round_trip(self, zev_file):
+        """Test: Dashboard-Struktur lässt sich aus der Matrix wiederherstellen"""
+        result = SimpleZEVParser(engine='iterrows').parse_zev_file(str(zev_file))
+
+        columns = SimpleZEVParser().parse_zev_columns(str(zev_file))
+
+        assert columns.to_zaehler_overview() == result['zaehler_overview']
+        assert ZEVColumns.from_result(result).to_zaehler_overview() == result['zaehler_overview']
+
+    def test_messpunkte_of(self, zev_file):
+        """Test: Messpunkt-Positionen pro Zähler"""
+        columns = SimpleZEVParser().parse_zev_columns(str(zev_file))
+
+        for z_idx in range(len(columns.zaehler_ids)):
+            points = columns.messpunkte_of(z_idx)
+            assert (columns.zaehler_index[points.start:points.stop] == z_idx).all()
+        assert sum(len(columns.messpunkte_of(z)) for z in range(len(columns.zaehler_ids))) == len(columns)
+
+    def test_totals_by_zaehler(self, zev_file):
+        """Test: Summen pro Zähler und Monat"""
+        columns = SimpleZEVParser().parse_zev_columns(str(zev_file))
+
+        totals = columns.totals_by_zaehler()
+
+        assert totals.shape == (len(columns.zaehler_ids), 12)
+        np.testing.assert_array_equal(totals[0, :4], [101.5, 202.0, 3.0, 54.0])
+        # Zähler ohne Monats-Spalten trägt nichts bei
+        assert totals[-1].sum() == 0.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
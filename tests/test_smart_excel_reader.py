@@ -0,0 +1,110 @@
+"""
+Tests für den SmartExcelReader
+Header-Erkennung aus einem einzigen Lesevorgang pro Sheet
+"""
+
+import datetime
+import inspect
+from unittest.mock import patch
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from src.excel_analysis.smart_excel_reader import SmartExcelReader
+
+
+@pytest.fixture
+def zev_sheet_file(tmp_path):
+    """ZEV-ähnliche Datei mit Titelzeilen, Leerzeilen und gemischten Datentypen"""
+    workbook = openpyxl.Workbook()
+    worksheet = workbook.active
+    worksheet.title = 'ZEV'
+    months = ['Januar', 'Februar', 'März', 'April', 'Mai', 'Juni', 'Juli']
+    rows = [
+        ['ZEV Zwischenbächen 115'],
+        [],
+        ['Zähler', 'Messpunkt'] + months,
+        ['CHINV0001', 'Bezug Netz [kWh]', 1, 2.5, None, 4, 5, 6, 7],
+        [],
+        ['CHINV0002', 'Bezug lokal [kWh]', 'n/a', 3, 3, 3, 3, 3, True],
+        ['CHINV0003', 'Messung', datetime.datetime(2024, 1, 31), 1, 1, 1, 1, 1, 1],
+    ]
+    for row in rows:
+        worksheet.append(row)
+    workbook.create_sheet('Leer')
+    file_path = tmp_path / 'zev.xlsx'
+    workbook.save(file_path)
+    return str(file_path)
+
+
+class TestSmartExcelReader:
+    """Test-Klasse für SmartExcelReader"""
+
+    @pytest.mark.parametrize('header_row', [None, 0, 1, 2, 3, 4, 5, 6])
+    def test_frame_matches_read_excel(self, zev_sheet_file, header_row):
+        """Test: DataFrame aus Rohdaten entspricht pd.read_excel (Leerzeilen, Datentypen)"""
+        reference = pd.read_excel(zev_sheet_file, sheet_name='ZEV', header=header_row)
+
+        with pd.ExcelFile(zev_sheet_file) as excel_file:
+            raw_rows = SmartExcelReader._read_raw_rows(excel_file, 'ZEV')
+        result = SmartExcelReader._frame_from_raw(raw_rows, header_row)
+
+        pd.testing.assert_frame_equal(result, reference)
+
+    def test_pandas_reader_signature(self, zev_sheet_file):
+        """Test: Interner pandas-Reader hat noch die erwartete Signatur (schlägt bei pandas-Updates an)"""
+        with pd.ExcelFile(zev_sheet_file) as excel_file:
+            parameters = list(inspect.signature(excel_file._reader.get_sheet_data).parameters)
+
+        assert parameters == ['sheet', 'file_rows_needed']
+
+    def test_changed_reader_signature_falls_back(self, zev_sheet_file):
+        """Test: Geänderte Reader-Signatur führt zum öffentlichen parse() statt zu falschen Werten"""
+        with pd.ExcelFile(zev_sheet_file) as excel_file:
+            reader_class = type(excel_file._reader)
+            original = reader_class.get_sheet_data
+
+            def renamed(self, sheet, convert_float=None):
+                return original(self, sheet, convert_float)
+
+            with patch.object(reader_class, 'get_sheet_data', renamed):
+                raw_rows = SmartExcelReader._read_raw_rows(excel_file, 'ZEV')
+
+        assert raw_rows[2][:2] == ['Zähler', 'Messpunkt']
+        assert raw_rows[1] == [''] * 9
+        # parse() wertet 'n/a' als fehlend: Beleg, dass der Fallback gelesen hat
+        assert raw_rows[5][2] == ''
+
+    def test_header_beyond_sheet_raises_like_read_excel(self, zev_sheet_file):
+        """Test: Header-Zeile ausserhalb des Sheets wird wie bei pandas abgelehnt"""
+        with pd.ExcelFile(zev_sheet_file) as excel_file:
+            raw_rows = SmartExcelReader._read_raw_rows(excel_file, 'ZEV')
+
+        with pytest.raises(ValueError):
+            SmartExcelReader._frame_from_raw(raw_rows, 10)
+
+    def test_each_sheet_read_once(self, zev_sheet_file):
+        """Test: Jedes Sheet wird genau einmal gelesen"""
+        reader = SmartExcelReader()
+
+        with patch.object(SmartExcelReader, '_read_raw_rows', wraps=SmartExcelReader._read_raw_rows) as raw_read, \
+                patch('pandas.read_excel') as read_excel:
+            reader.analyze_excel_structure(zev_sheet_file)
+
+        assert raw_read.call_count == 2
+        read_excel.assert_not_called()
+
+    def test_recommended_frame_returned_from_analysis(self, zev_sheet_file):
+        """Test: Empfohlene Lesart liefert den DataFrame ohne erneutes Lesen"""
+        result = SmartExcelReader().read_excel_with_recommended_method(zev_sheet_file)
+
+        assert result['success'] is True
+        assert result['sheet_name'] == 'ZEV'
+        assert result['reading_method']['method'] == 'header_2'
+        expected = pd.read_excel(zev_sheet_file, sheet_name='ZEV', header=2)
+        pd.testing.assert_frame_equal(result['data'], expected)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
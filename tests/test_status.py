@@ -0,0 +1,88 @@
+"""
+Tests für den Datenbank-Status des Dashboards
+"""
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.models.models import Base, Eigentuemer
+from src.models.status import DatabaseStatusCache, get_database_counts
+
+
+class TestDatabaseStatus:
+    """Test-Klasse für get_database_counts und DatabaseStatusCache"""
+
+    @pytest.fixture
+    def engine(self):
+        """In-Memory-Datenbank mit zwei Eigentümern (einer inaktiv)"""
+        engine = create_engine('sqlite:///:memory:', echo=False)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        session.add_all([
+            Eigentuemer(name='Max Mustermann', wohnung='1A', anteil=0.5),
+            Eigentuemer(name='Anna Schmidt', wohnung='1B', anteil=0.5, aktiv=False)
+        ])
+        session.commit()
+        session.close()
+        return engine
+
+    @pytest.fixture
+    def queries(self, engine):
+        """Liste der abgesetzten SQL-Statements"""
+        statements = []
+        event.listen(engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+        return statements
+
+    def test_counts_in_one_query(self, engine, queries):
+        """Test: Alle Zähler kommen aus einem einzigen Statement"""
+        session = sessionmaker(bind=engine)()
+
+        counts = get_database_counts(session)
+
+        assert counts == {
+            'eigentuemer_count': 2,
+            'messpunkte_count': 0,
+            'verbrauchsdaten_count': 0,
+            'rechnungen_count': 0,
+            'active_eigentuemer': 1
+        }
+        assert len(queries) == 1
+        session.close()
+
+    def test_cache_hits_within_ttl(self, engine, queries):
+        """Test: Innerhalb der TTL wird die Datenbank nicht abgefragt"""
+        now = [0.0]
+        cache = DatabaseStatusCache(engine, ttl=10, clock=lambda: now[0])
+        factory = sessionmaker(bind=engine)
+
+        first, cached_first = cache.get(factory)
+        now[0] = 9.0
+        second, cached_second = cache.get(factory)
+        now[0] = 11.0
+        third, cached_third = cache.get(factory)
+
+        assert (cached_first, cached_second, cached_third) == (False, True, False)
+        assert first == second == third
+        assert len(queries) == 2
+
+    def test_commit_invalidates(self, engine):
+        """Test: Ein Commit verwirft den Cache sofort"""
+        cache = DatabaseStatusCache(engine, ttl=60)
+        factory = sessionmaker(bind=engine)
+        cache.get(factory)
+
+        session = factory()
+        session.add(Eigentuemer(name='Peter Weber', wohnung='2A', anteil=0.1))
+        session.commit()
+        session.close()
+        counts, cached = cache.get(factory)
+
+        assert cached is False
+        assert counts['eigentuemer_count'] == 3
+        assert counts['active_eigentuemer'] == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,181 @@
+"""
+Tests für den Tarif-Kalender (Hoch-/Niedertarif von Intervalldaten)
+"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from src.billing.allocation import TarifTabelle, allocate_period
+from src.billing.batch import load_eigentuemer
+from src.billing.tarif_kalender import (DEFAULT_KALENDER, HOCHTARIF, NIEDERTARIF, TarifFenster, TarifKalender,
+                                        feiertag_verbrauch_query, feiertage_zuerich, load_tarif_verbrauch,
+                                        ostersonntag, tarif_verbrauch_query, zeitraum)
+from src.models.models import Base, Eigentuemer, Messpunkt, Verbrauchsdaten
+
+
+def viertelstunden(start, tage):
+    """15-Minuten-Zeitstempel ab start über die angegebene Anzahl Tage"""
+    return [start + timedelta(minutes=15 * i) for i in range(tage * 96)]
+
+
+class TestTarifKalender:
+    """Test-Klasse für TarifKalender"""
+
+    @pytest.mark.parametrize('jahr, ostern', [(2024, date(2024, 3, 31)), (2025, date(2025, 4, 20)),
+                                              (2038, date(2038, 4, 25))])
+    def test_ostersonntag(self, jahr, ostern):
+        """Test: Ostersonntag nach dem Gregorianischen Kalender"""
+        assert ostersonntag(jahr) == ostern
+
+    def test_feiertage_zuerich(self):
+        """Test: Bewegliche und feste Feiertage 2024"""
+        feiertage = feiertage_zuerich(2024)
+
+        assert len(feiertage) == 10
+        assert {date(2024, 3, 29), date(2024, 5, 9), date(2024, 5, 20), date(2024, 8, 1)} <= set(feiertage)
+
+    @pytest.mark.parametrize('zeitstempel, tarif', [
+        (datetime(2024, 3, 4, 6, 0), HOCHTARIF),      # Montag Fensterbeginn
+        (datetime(2024, 3, 4, 5, 45), NIEDERTARIF),   # Montag vor 6 Uhr
+        (datetime(2024, 3, 4, 21, 45), HOCHTARIF),    # letztes Intervall im Fenster
+        (datetime(2024, 3, 4, 22, 0), NIEDERTARIF),   # Fensterende
+        (datetime(2024, 3, 9, 12, 0), HOCHTARIF),     # Samstag
+        (datetime(2024, 3, 10, 12, 0), NIEDERTARIF),  # Sonntag
+        (datetime(2024, 5, 1, 12, 0), NIEDERTARIF),   # Tag der Arbeit (Mittwoch)
+    ])
+    def test_classify(self, zeitstempel, tarif):
+        """Test: Wochentag, Stunde und Feiertag bestimmen den Tarif"""
+        assert DEFAULT_KALENDER.classify([zeitstempel]).tolist() == [tarif]
+
+    def test_split_kwh(self):
+        """Test: Eine Woche mit 1 kWh pro Viertelstunde: 6 Tage × 16 h Hochtarif"""
+        stamps = viertelstunden(datetime(2024, 3, 4), 7)
+
+        assert DEFAULT_KALENDER.split_kwh(stamps, np.ones(len(stamps))).tolist() == [6 * 16 * 4, 168 * 4 - 6 * 16 * 4]
+
+    def test_custom_windows(self):
+        """Test: Mehrere Fenster, ohne Feiertage, und Beschreibung für die Rechnung"""
+        kalender = TarifKalender([TarifFenster((0, 1, 2, 3, 4), 7, 20), TarifFenster((5,), 7, 13)],
+                                 feiertage=lambda jahr: [])
+
+        assert kalender.classify([datetime(2024, 3, 9, 12), datetime(2024, 3, 9, 14),
+                                  datetime(2024, 5, 1, 12)]).tolist() == [HOCHTARIF, NIEDERTARIF, HOCHTARIF]
+        assert kalender.beschreibung() == "Hochtarif Mo - Fr, 7-20 Uhr; Sa, 7-13 Uhr"
+        assert DEFAULT_KALENDER.beschreibung() == "Hochtarif Mo - Sa, 6-22 Uhr"
+
+    @pytest.mark.parametrize('periode, start, ende', [
+        ('2024', datetime(2024, 1, 1), datetime(2025, 1, 1)),
+        ('2024-02', datetime(2024, 2, 1), datetime(2024, 3, 1)),
+        ('2024-12', datetime(2024, 12, 1), datetime(2025, 1, 1)),
+    ])
+    def test_zeitraum(self, periode, start, ende):
+        """Test: Jahr und Monat als halboffener Zeitraum"""
+        assert zeitraum(periode) == (start, ende)
+
+    @pytest.mark.parametrize('fenster', [TarifFenster((0,), 22, 6), TarifFenster((7,), 6, 22),
+                                         TarifFenster((0,), 0, 25)])
+    def test_invalid_window(self, fenster):
+        """Test: Ungültige Wochentage oder Stunden werden abgelehnt"""
+        with pytest.raises(ValueError):
+            TarifKalender([fenster])
+
+
+class TestTarifVerbrauch:
+    """Test-Klasse für die Tarif-Aufteilung in der Datenbank"""
+
+    @pytest.fixture
+    def session(self):
+        """In-Memory-Datenbank: ein Intervall-Messpunkt (Jan.-Mai 2024) und ein Monatswert ohne HT/NT"""
+        engine = create_engine('sqlite:///:memory:', echo=False)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        max_ = Eigentuemer(name='Max Mustermann', wohnung='1A', anteil=1.0)
+        session.add(max_)
+        session.flush()
+        intervall = Messpunkt(name='W1 Wohnung 1A - Bezug Netz [kWh]', typ='individual', eigentuemer_id=max_.id)
+        monat = Messpunkt(name='L1 Ladestation 1 - Bezug Netz [kWh]', typ='individual', eigentuemer_id=max_.id)
+        session.add_all([intervall, monat])
+        session.flush()
+
+        stamps = viertelstunden(datetime(2024, 1, 1), 152)
+        session.add_all([Verbrauchsdaten(zeitstempel=stamp, messpunkt_id=intervall.id, verbrauch=1.0,
+                                         periode=stamp.strftime('%Y-%m')) for stamp in stamps])
+        session.add(Verbrauchsdaten(zeitstempel=datetime(2024, 1, 1), messpunkt_id=monat.id, verbrauch=500.0,
+                                    periode='2024-01'))
+        session.commit()
+        session.stamps = stamps
+        session.intervall_id = intervall.id
+        yield session
+        session.close()
+
+    def test_sql_matches_numpy(self, session):
+        """Test: SQL-Ausdruck und NumPy teilen gleich auf (inkl. Karfreitag/Ostermontag)"""
+        expected = DEFAULT_KALENDER.split_kwh(session.stamps, np.ones(len(session.stamps)))
+
+        rows = load_tarif_verbrauch(session, [session.intervall_id], '2024')
+
+        assert sorted((tarif, kwh) for _, tarif, kwh in rows) == [(HOCHTARIF, expected[0]), (NIEDERTARIF, expected[1])]
+        assert load_tarif_verbrauch(session, [], '2024') == []
+
+    def test_custom_calendar(self, session):
+        """Test: Eigener Kalender (ohne Feiertage) mit demselben Index"""
+        kalender = TarifKalender([TarifFenster((0, 1, 2, 3, 4), 7, 20)], feiertage=lambda jahr: [])
+        expected = kalender.split_kwh(session.stamps, np.ones(len(session.stamps)))
+
+        rows = load_tarif_verbrauch(session, [session.intervall_id], '2024', kalender)
+
+        assert [(tarif, kwh) for _, tarif, kwh in rows] == [(HOCHTARIF, expected[0]), (NIEDERTARIF, expected[1])]
+
+    def test_ensure_indexes(self, session):
+        """Test: Ein jahresunabhängiger Index, veraltete Tarif-Indizes werden entfernt"""
+        session.execute(text("CREATE INDEX idx_verbrauchsdaten_tarif_0123456789ab ON verbrauchsdaten (periode)"))
+        session.execute(text("DROP INDEX idx_verbrauchsdaten_stunde_der_woche"))
+        session.commit()
+
+        Verbrauchsdaten.ensure_indexes(session.get_bind())
+        Verbrauchsdaten.ensure_indexes(session.get_bind())
+
+        names = session.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars().all()
+        assert names.count('idx_verbrauchsdaten_stunde_der_woche') == 1
+        assert not [name for name in names if name.startswith('idx_verbrauchsdaten_tarif_')]
+
+    @pytest.mark.parametrize('periode', ['2024', '2024-05'])
+    def test_queries_use_stunde_der_woche_index(self, session, periode):
+        """Test: Beide Abfragen lesen nur den Index, ohne temporären B-Baum"""
+        queries = [tarif_verbrauch_query(session, [session.intervall_id], periode).statement,
+                   feiertag_verbrauch_query([session.intervall_id], periode)]
+
+        for query in queries:
+            sql = query.compile(session.get_bind(), compile_kwargs={'literal_binds': True})
+            plan = ' '.join(row[-1] for row in session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+            assert "COVERING INDEX idx_verbrauchsdaten_stunde_der_woche" in plan
+            assert "TEMP B-TREE" not in plan
+
+    def test_feiertage_only_in_period(self, session):
+        """Test: Feiertags-Korrektur nur für Feiertage der Periode"""
+        assert feiertag_verbrauch_query([session.intervall_id], '2024-02') is None
+        rows = session.execute(feiertag_verbrauch_query([session.intervall_id], '2024-05')).all()
+
+        # Tag der Arbeit, Auffahrt, Pfingstmontag: je 16 Hochtarif-Stunden à 4 kWh
+        assert rows == [(session.intervall_id, 16 * 4.0)] * 3
+
+    def test_allocate_interval_data(self, session):
+        """Test: Intervalldaten werden nach Tarif verteilt, Monatswert ohne HT/NT ignoriert"""
+        expected = DEFAULT_KALENDER.split_kwh(session.stamps, np.ones(len(session.stamps)))
+
+        tarife = TarifTabelle.from_dict({'netz_hochtarif': 54.9, 'netz_niedertarif': 34.9})
+
+        details = allocate_period(session, load_eigentuemer(session), '2024', tarife)[1]
+
+        assert details['netz_ewz']['wohnung_hochtarif']['kwh'] == round(expected[0])
+        assert details['netz_ewz']['wohnung_niedertarif']['kwh'] == round(expected[1])
+        assert details['netz_ewz']['ladestation_hochtarif']['kwh'] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
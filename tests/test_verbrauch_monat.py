@@ -0,0 +1,155 @@
+"""
+Tests für den Monats-Rollup der Verbrauchsdaten
+"""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from src.models.models import Base, Messpunkt, Verbrauchsdaten, VerbrauchMonat
+from src.models.verbrauch_monat import ensure_verbrauch_monate, rebuild_verbrauch_monate
+
+
+def _raw_aggregates(session):
+    """Aggregate direkt aus den Rohdaten (Referenz für den Rollup)"""
+    rows = session.query(
+        Verbrauchsdaten.messpunkt_id,
+        Verbrauchsdaten.periode,
+        func.sum(Verbrauchsdaten.verbrauch),
+        func.sum(Verbrauchsdaten.kosten),
+        func.count(),
+        func.min(Verbrauchsdaten.zeitstempel),
+        func.max(Verbrauchsdaten.zeitstempel)
+    ).group_by(Verbrauchsdaten.messpunkt_id, Verbrauchsdaten.periode).all()
+    return {(row[0], row[1]): tuple(row[2:]) for row in rows}
+
+
+def _rollup(session):
+    """Inhalt des Rollups im gleichen Format wie _raw_aggregates"""
+    return {
+        (row.messpunkt_id, row.periode): (row.total_verbrauch, row.total_kosten, row.anzahl,
+                                          row.erster_zeitstempel, row.letzter_zeitstempel)
+        for row in session.query(VerbrauchMonat)
+    }
+
+
+class TestVerbrauchMonat:
+    """Test-Klasse für VerbrauchMonat"""
+
+    @pytest.fixture
+    def db_session(self):
+        """In-Memory-Datenbank mit zwei Messpunkten"""
+        engine = create_engine('sqlite:///:memory:', echo=False)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        session.add_all([
+            Messpunkt(name='Allgemeinstrom', typ='gemeinschaft'),
+            Messpunkt(name='Wärmepumpe', typ='gemeinschaft')
+        ])
+        session.commit()
+        yield session
+        session.close()
+
+    @staticmethod
+    def _add(session, messpunkt_id, tag, verbrauch, kosten=None, monat=1):
+        row = Verbrauchsdaten(zeitstempel=datetime(2024, monat, tag), messpunkt_id=messpunkt_id,
+                              verbrauch=verbrauch, kosten=kosten, periode=f'2024-{monat:02d}')
+        session.add(row)
+        return row
+
+    def test_orm_inserts_update_rollup(self, db_session):
+        """Test: Eingefügte Zeilen werden pro Messpunkt und Periode summiert"""
+        self._add(db_session, 1, 1, 10.0, 2.5)
+        self._add(db_session, 1, 15, 5.0)
+        db_session.commit()
+        self._add(db_session, 1, 31, 1.0, 0.5)
+        self._add(db_session, 2, 2, 7.0)
+        self._add(db_session, 2, 3, 3.0, monat=2)
+        db_session.commit()
+
+        assert _rollup(db_session) == _raw_aggregates(db_session)
+        monat = db_session.get(VerbrauchMonat, (1, '2024-01'))
+        assert (monat.total_verbrauch, monat.total_kosten, monat.anzahl) == (16.0, 3.0, 3)
+        assert monat.erster_zeitstempel == datetime(2024, 1, 1)
+        assert monat.letzter_zeitstempel == datetime(2024, 1, 31)
+        assert db_session.get(VerbrauchMonat, (2, '2024-01')).total_kosten is None
+
+    def test_delete_and_update_recompute(self, db_session):
+        """Test: Löschen und Ändern (auch der Periode) rechnet betroffene Zeilen neu"""
+        first = self._add(db_session, 1, 1, 10.0, 1.0)
+        last = self._add(db_session, 1, 20, 4.0)
+        moved = self._add(db_session, 1, 10, 2.0)
+        db_session.commit()
+
+        db_session.delete(first)
+        last.verbrauch = 6.0
+        moved.periode = '2024-02'
+        moved.zeitstempel = datetime(2024, 2, 10)
+        db_session.commit()
+
+        assert _rollup(db_session) == _raw_aggregates(db_session)
+        monat = db_session.get(VerbrauchMonat, (1, '2024-01'))
+        assert (monat.total_verbrauch, monat.total_kosten, monat.anzahl) == (6.0, None, 1)
+        assert monat.erster_zeitstempel == datetime(2024, 1, 20)
+        assert db_session.get(VerbrauchMonat, (1, '2024-02')).total_verbrauch == 2.0
+
+    def test_rollback_discards_rollup_changes(self, db_session):
+        """Test: Rollup-Änderungen gehören zur selben Transaktion"""
+        self._add(db_session, 1, 1, 10.0)
+        db_session.flush()
+        db_session.rollback()
+
+        assert db_session.query(VerbrauchMonat).count() == 0
+
+    def test_bulk_insert_updates_rollup(self, db_session):
+        """Test: Bulk-Loader führt den Rollup nach (auch zusätzlich zu ORM-Zeilen)"""
+        self._add(db_session, 1, 1, 10.0, 1.0)
+        db_session.commit()
+
+        Verbrauchsdaten.bulk_insert(db_session, pd.DataFrame({
+            'zeitstempel': pd.date_range('2024-01-01', periods=24 * 60, freq='h'),
+            'messpunkt_id': [1, 2] * (12 * 60),
+            'verbrauch': 0.5,
+            'kosten': [0.1, None] * (12 * 60)
+        }))
+
+        expected = _raw_aggregates(db_session)
+        rollup = _rollup(db_session)
+        assert rollup.keys() == expected.keys()
+        for key, values in expected.items():
+            assert rollup[key][0] == pytest.approx(values[0])
+            assert rollup[key][1] == pytest.approx(values[1])
+            assert rollup[key][2:] == values[2:]
+
+    def test_aggregate_methods_read_rollup(self, db_session):
+        """Test: Periodenabfragen liefern die Rollup-Werte"""
+        self._add(db_session, 1, 1, 10.0, 2.0)
+        self._add(db_session, 2, 1, 5.0)
+        self._add(db_session, 2, 1, 1.0, monat=2)
+        db_session.commit()
+
+        assert Verbrauchsdaten.get_total_verbrauch_periode(db_session, '2024-01') == 15.0
+        assert Verbrauchsdaten.get_total_kosten_periode(db_session, '2024-01') == 2.0
+        assert Verbrauchsdaten.get_total_kosten_periode(db_session, '2024-02') == 0.0
+        rows = Verbrauchsdaten.get_verbrauch_by_messpunkt_periode(db_session, '2024-01')
+        assert [(r.messpunkt_id, r.total_verbrauch, r.total_kosten) for r in rows] == [(1, 10.0, 2.0), (2, 5.0, None)]
+
+    def test_rebuild_and_ensure(self, db_session):
+        """Test: Rollup lässt sich aus den Rohdaten neu aufbauen"""
+        self._add(db_session, 1, 1, 10.0)
+        self._add(db_session, 2, 5, 3.0, 1.5)
+        db_session.commit()
+        db_session.query(VerbrauchMonat).delete()
+        db_session.commit()
+
+        assert ensure_verbrauch_monate(db_session) is True
+        assert _rollup(db_session) == _raw_aggregates(db_session)
+        assert ensure_verbrauch_monate(db_session) is False
+        assert rebuild_verbrauch_monate(db_session) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
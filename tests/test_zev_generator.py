@@ -0,0 +1,43 @@
+"""
+Tests für den Generator synthetischer ZEV-Exporte
+"""
+
+import pytest
+
+from src.excel_analysis.simple_zev_parser import SimpleZEVParser
+from src.excel_analysis.zev_generator import generate_zev_rows, generate_zev_workbook, scaled_config
+
+
+class TestZEVGenerator:
+    """Test-Klasse für den ZEV-Generator"""
+
+    def test_parser_recognizes_generated_structure(self, tmp_path):
+        """Test: Parser erkennt alle erzeugten Zähler und Messpunkte"""
+        file_path = generate_zev_workbook(tmp_path / 'zev.xlsx', hauptzaehler=3, unterzaehler=2,
+                                          virtuelle_zaehler=1, messpunkte=4, monate=6)
+
+        result = SimpleZEVParser().parse_zev_file(str(file_path))
+
+        assert result['summary']['hauptzaehler'] == 3
+        assert result['summary']['unterzaehler'] == 6
+        assert result['summary']['virtuelle_zaehler'] == 1
+        assert result['summary']['total_messpunkte'] == (3 + 6 + 1) * 4
+        assert len(result['structure_info']['month_columns']) == 6
+
+    def test_scaled_config(self):
+        """Test: Skalierung vervielfacht die Zähler"""
+        assert scaled_config(10)['hauptzaehler'] == 10 * scaled_config(1)['hauptzaehler']
+
+    def test_rows_are_reproducible(self):
+        """Test: Gleicher Seed ergibt gleiche Werte"""
+        assert generate_zev_rows(seed=7) == generate_zev_rows(seed=7)
+        assert generate_zev_rows(seed=7) != generate_zev_rows(seed=8)
+
+    def test_invalid_month_count(self):
+        """Test: Ungültige Monatszahl wird abgelehnt"""
+        with pytest.raises(ValueError):
+            generate_zev_rows(monate=13)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
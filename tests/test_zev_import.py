@@ -0,0 +1,144 @@
+"""
+Tests für den inkrementellen ZEV-Import
+"""
+
+import pytest
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.excel_analysis.simple_zev_parser import SimpleZEVParser
+from src.models.models import Base, Messpunkt, Verbrauchsdaten, ZEVImportBlock
+from src.models.zev_import import import_zev_columns, import_zev_result
+
+
+def _zev_result(tmp_path, name, haupt_values, unter_values, einspeisung_values=None):
+    """Parst eine ZEV-Datei mit einem Haupt- und einem Unterzähler"""
+    months = ['Januar', 'Februar', 'März']
+    rows = [
+        ['CHINV0000000000000000000000001', None, None, None] + months,
+        ['E01 Hauptzähler', None, None, None, None, None, None],
+        ['Bezug Netz [kWh]', None, None, None] + list(haupt_values),
+    ]
+    if einspeisung_values is not None:
+        rows.append(['Einspeisung Netz [kWh]', None, None, None] + list(einspeisung_values))
+    rows += [
+        [None, 'Untermessungen', None, None, None, None, None],
+        [None, 'CHINV0000000000000000000000002', None, None] + months,
+        [None, 'W01 Wohnung 0.1', None, None, None, None, None],
+        [None, 'Bezug lokal [kWh]', None, None] + list(unter_values),
+    ]
+    file_path = tmp_path / name
+    pd.DataFrame(rows).to_excel(file_path, header=False, index=False)
+    return SimpleZEVParser().parse_zev_file(str(file_path))
+
+
+class TestZEVImport:
+    """Test-Klasse für import_zev_result"""
+
+    @pytest.fixture
+    def db_session(self):
+        """Erstellt eine temporäre Datenbank für Tests"""
+        engine = create_engine('sqlite:///:memory:', echo=False)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        session = Session()
+        yield session
+        session.close()
+
+    def test_first_import_writes_everything(self, db_session, tmp_path):
+        """Test: Erster Import legt Messpunkte und alle Monatswerte an"""
+        result = _zev_result(tmp_path, 'jan.xlsx', [100, None, None], [10, None, None])
+
+        diff = import_zev_result(db_session, result, 'Zwischenbächen 115', 2024)
+
+        assert diff['bloecke'] == {'neu': 2, 'geaendert': 0, 'unveraendert': 0}
+        assert diff['werte']['neu'] == 6
+        assert db_session.query(Messpunkt).count() == 2
+        assert db_session.query(Verbrauchsdaten).count() == 6
+        assert all(m.typ == 'gemeinschaft' for m in db_session.query(Messpunkt))
+
+    def test_reimport_only_changed_meters(self, db_session, tmp_path):
+        """Test: Neuer Monat wird nur für geänderte Zähler geschrieben"""
+        january = _zev_result(tmp_path, 'jan.xlsx', [100, None, None], [10, None, None])
+        february = _zev_result(tmp_path, 'feb.xlsx', [100, 120, None], [10, None, None])
+        import_zev_result(db_session, january, 'Zwischenbächen 115', 2024)
+
+        diff = import_zev_result(db_session, february, 'Zwischenbächen 115', 2024)
+
+        assert diff['bloecke'] == {'neu': 0, 'geaendert': 1, 'unveraendert': 1}
+        assert diff['geaenderte_zaehler'] == ['CHINV0000000000000000000000001']
+        assert diff['werte']['geaendert'] == 1
+        assert diff['werte']['unveraendert'] == 2
+        assert diff['aenderungen'] == [{
+            'zaehler_id': 'CHINV0000000000000000000000001',
+            'messpunkt': 'Bezug Netz [kWh]',
+            'periode': '2024-02',
+            'alt': 0.0,
+            'neu': 120.0
+        }]
+        assert db_session.query(Messpunkt).count() == 2
+        assert db_session.query(Verbrauchsdaten).count() == 6
+        assert Verbrauchsdaten.get_total_verbrauch_periode(db_session, '2024-02') == 120.0
+
+    def test_identical_reimport_is_noop(self, db_session, tmp_path):
+        """Test: Identischer Re-Import schreibt nichts"""
+        result = _zev_result(tmp_path, 'jan.xlsx', [100, None, None], [10, None, None])
+        import_zev_result(db_session, result, 'Zwischenbächen 115', 2024)
+
+        diff = import_zev_result(db_session, result, 'Zwischenbächen 115', 2024)
+
+        assert diff['bloecke'] == {'neu': 0, 'geaendert': 0, 'unveraendert': 2}
+        assert diff['werte'] == {'neu': 0, 'geaendert': 0, 'unveraendert': 0, 'entfernt': 0, 'uebersprungen': 0}
+
+    def test_shrinking_block_removes_values(self, db_session, tmp_path):
+        """Test: Entfernte Messpunkte und nicht mehr numerische Monate werden gelöscht"""
+        before = _zev_result(tmp_path, 'feb.xlsx', [100, 120, None], [10, None, None],
+                             einspeisung_values=[5, 6, None])
+        after = _zev_result(tmp_path, 'feb_korr.xlsx', [100, 'k.A.', None], [10, None, None])
+        import_zev_result(db_session, before, 'Zwischenbächen 115', 2024)
+
+        diff = import_zev_result(db_session, after, 'Zwischenbächen 115', 2024)
+
+        assert diff['bloecke'] == {'neu': 0, 'geaendert': 1, 'unveraendert': 1}
+        assert diff['werte']['entfernt'] == 4
+        assert diff['werte']['uebersprungen'] == 1
+        assert diff['entfernte_messpunkte'] == [{
+            'zaehler_id': 'CHINV0000000000000000000000001',
+            'messpunkt': 'Einspeisung Netz [kWh]'
+        }]
+        assert {'messpunkt': 'Bezug Netz [kWh]', 'periode': '2024-02', 'alt': 120.0, 'neu': None} in [
+            {key: change[key] for key in ('messpunkt', 'periode', 'alt', 'neu')} for change in diff['aenderungen']
+        ]
+        assert db_session.query(Verbrauchsdaten).count() == 5
+        assert Verbrauchsdaten.get_total_verbrauch_periode(db_session, '2024-02') == 0.0
+        assert db_session.query(Messpunkt).filter_by(aktiv=False).count() == 1
+
+        # Der bereinigte Block ist beim nächsten Import unverändert
+        diff = import_zev_result(db_session, after, 'Zwischenbächen 115', 2024)
+        assert diff['bloecke']['unveraendert'] == 2
+
+    def test_columns_import_matches_result_import(self, db_session, tmp_path):
+        """Test: Spaltenform und Parser-Ergebnis ergeben dieselben Fingerprints"""
+        result = _zev_result(tmp_path, 'jan.xlsx', [100, None, None], [10, None, None])
+        columns = SimpleZEVParser().parse_zev_columns(str(tmp_path / 'jan.xlsx'))
+        import_zev_columns(db_session, columns, 'Zwischenbächen 115', 2024)
+
+        diff = import_zev_result(db_session, result, 'Zwischenbächen 115', 2024)
+
+        assert diff['bloecke'] == {'neu': 0, 'geaendert': 0, 'unveraendert': 2}
+        assert db_session.query(Verbrauchsdaten).count() == 6
+
+    def test_buildings_are_separate(self, db_session, tmp_path):
+        """Test: Fingerprints gelten pro Gebäude"""
+        result = _zev_result(tmp_path, 'jan.xlsx', [100, None, None], [10, None, None])
+        import_zev_result(db_session, result, 'Haus A', 2024)
+
+        diff = import_zev_result(db_session, result, 'Haus B', 2024)
+
+        assert diff['bloecke']['neu'] == 2
+        assert db_session.query(ZEVImportBlock).count() == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])